@@ -1,8 +1,25 @@
 """A library for mixed-integer linear optimization of energy assets."""
+import importlib
+import typing
+
 from pulp import LpVariable
 
-from energypylinear import data_generation, plot
+from energypylinear import (
+    anytime,
+    batch,
+    cache,
+    data_generation,
+    decomposition,
+    elimination,
+    rolling,
+    scaling,
+    telemetry,
+    tightening,
+    two_phase,
+    warm_start,
+)
 from energypylinear.accounting import get_accounts
+from energypylinear.anytime import LatencyBudget
 from energypylinear.assets.asset import Asset
 from energypylinear.assets.battery import Battery
 from energypylinear.assets.boiler import Boiler
@@ -13,6 +30,9 @@ from energypylinear.assets.renewable_generator import RenewableGenerator
 from energypylinear.assets.site import Site
 from energypylinear.assets.spill import Spill
 from energypylinear.assets.valve import Valve
+from energypylinear.cache import ResultsCache
+from energypylinear.compiled import CompiledSite
+from energypylinear.decomposition import DecompositionConfig
 from energypylinear.flags import Flags
 from energypylinear.freq import Freq
 from energypylinear.interval_data import IntervalVars
@@ -20,24 +40,42 @@ from energypylinear.objectives import objectives
 from energypylinear.optimizer import Optimizer, OptimizerConfig
 from energypylinear.results.checks import check_results
 from energypylinear.results.extract import SimulationResult, extract_results
+from energypylinear.rolling import RollingHorizonConfig
+from energypylinear.warm_start import WarmStart
+
+if typing.TYPE_CHECKING:
+    from energypylinear import plot
 
 __all__ = [
     "Asset",
     "Battery",
     "Boiler",
     "CHP",
+    "CompiledSite",
+    "DecompositionConfig",
     "EVs",
     "Flags",
     "Freq",
     "HeatPump",
     "IntervalVars",
+    "LatencyBudget",
     "LpVariable",
     "Optimizer",
+    "ResultsCache",
+    "RollingHorizonConfig",
     "SimulationResult",
     "Site",
     "Spill",
     "Valve",
+    "WarmStart",
     "check_results",
     "extract_results",
     "get_accounts",
 ]
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Import the `plot` module on first use, as `matplotlib` is slow to import."""
+    if name == "plot":
+        return importlib.import_module("energypylinear.plot")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
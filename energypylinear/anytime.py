@@ -0,0 +1,184 @@
+"""Anytime solving - always return a labelled result within a latency budget.
+
+`Optimizer.solve` asserts a solve is optimal, so a time limit without a
+solution either raises or gives nothing usable.  With a `LatencyBudget`, a site
+is optimized in steps that all fit in the budget:
+
+1. the mixed-integer program is solved with a time limit, keeping a share of
+   the budget in reserve - if CBC has a solution when the limit is hit, it is
+   returned with its gap,
+2. otherwise the linear program relaxation is solved, and its integer
+   variables are rounded and fixed, repairing the relaxation into a solution
+   of the mixed-integer program - the relaxation bounds its gap,
+3. if no rounding is feasible, the relaxation itself is returned - it isn't a
+   feasible dispatch, so results checks are skipped.
+
+The quality of the result is one of:
+
+- `optimal` - the solver gap is within `OptimizerConfig.relative_tolerance`,
+- `incumbent` - the best solution found when the time limit was hit,
+- `repaired` - a rounded linear program relaxation,
+- `relaxation` - the linear program relaxation, not integer feasible,
+- `infeasible` - no solution was found within the budget.
+"""
+import dataclasses
+import time
+
+import numpy as np
+import pulp
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+from energypylinear.telemetry import relative_gap
+
+#  integer values within this distance of an integer are already integral
+tolerance = 1e-6
+
+
+@dataclasses.dataclass
+class LatencyBudget:
+    """Configures anytime solving within a latency budget.
+
+    Attributes:
+        seconds: time budget for building, solving and extracting results.
+        reserve: share of the budget kept back from the mixed-integer solve,
+            for the fallback - 1 skips the mixed-integer solve, for a fast
+            repaired relaxation.
+    """
+
+    seconds: float
+    reserve: float = 0.25
+
+    def __post_init__(self) -> None:
+        """Validates the latency budget."""
+        assert self.seconds > 0, "seconds must be positive"
+        assert 0 <= self.reserve <= 1, "reserve must be in [0, 1]"
+
+
+@dataclasses.dataclass
+class AnytimeReport:
+    """Quality and timing of an anytime optimization.
+
+    Attributes:
+        quality: one of `optimal`, `incumbent`, `repaired`, `relaxation` or
+            `infeasible`.
+        gap: relative gap between the objective and the best bound - None
+            when there is no solution or bound.
+        budget_s: the latency budget in seconds.
+        elapsed_s: wall clock time used, in seconds.
+        solves: number of linear programs solved.
+    """
+
+    quality: str
+    gap: float | None
+    budget_s: float
+    elapsed_s: float
+    solves: int
+
+
+def fix_integers(variables: list[pulp.LpVariable], values: np.ndarray) -> None:
+    """Fix variables at values by setting both of their bounds.
+
+    Args:
+        variables: the variables to fix.
+        values: value of each variable.
+    """
+    for variable, value in zip(variables, values.tolist()):
+        variable.lowBound = variable.upBound = value
+
+
+def optimize_anytime(
+    site: "epl.Site",
+    budget: LatencyBudget,
+    objective: str = "price",
+    flags: Flags = Flags(),
+    verbose: bool = False,
+) -> "epl.SimulationResult":
+    """Optimize a site within a latency budget, labelling the quality of the result.
+
+    An infeasible result doesn't raise, even without `flags.allow_infeasible` -
+    check `anytime.quality`.
+
+    Args:
+        site: the site to optimize.
+        budget: the latency budget.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        verbose: level of printing.
+
+    Returns:
+        epl.results.SimulationResult, with the quality in `anytime`.
+    """
+    start = time.perf_counter()
+    ivars = site.build(objective=objective, flags=flags)
+    #  writing the model for the solver and extracting results take time
+    #  outside of the solver time limit, which grows with the model size like
+    #  building it does - so the build time is kept back for them
+    overhead = time.perf_counter() - start
+
+    def remaining(reserve: float = 0.0) -> float:
+        """Seconds left in the budget, less a share kept in reserve."""
+        elapsed = time.perf_counter() - start
+        return budget.seconds * (1 - reserve) - elapsed - overhead
+
+    optimizer = site.optimizer
+    integers = [v for v in optimizer.variables() if v.cat == pulp.LpInteger]
+    solves = 0
+    quality, gap = "infeasible", None
+
+    def solve(timeout: float) -> "epl.optimizer.OptimizationStatus":
+        """Solve the optimizer with a time limit, counting the solves."""
+        nonlocal solves
+        solves += 1
+        return optimizer.solve(verbose=verbose, allow_infeasible=True, timeout=timeout)
+
+    if remaining(budget.reserve) > 0:
+        status = solve(remaining(budget.reserve))
+        if status.feasible:
+            gap = status.stats.gap
+            within = gap is not None and gap <= optimizer.cfg.relative_tolerance
+            quality = "optimal" if within else "incumbent"
+
+    if quality == "infeasible" and integers and remaining() > 0:
+        optimizer.relax()
+        relaxed = solve(remaining())
+        if relaxed.feasible:
+            values = np.array([optimizer.value(v) for v in integers])
+            bounds = [(v.lowBound, v.upBound) for v in integers]
+            #  rounding up keeps units available, which repairs most roundings
+            #  that are infeasible to the nearest integer
+            for rounded in [np.round(values), np.ceil(values - tolerance)]:
+                if remaining() <= 0:
+                    break
+                fix_integers(integers, rounded)
+                status = solve(remaining())
+                if status.feasible:
+                    quality = "repaired"
+                    gap = relative_gap(status.stats.objective, relaxed.stats.objective)
+                    break
+
+            if quality != "repaired":
+                for variable, (low, up) in zip(integers, bounds):
+                    variable.lowBound, variable.upBound = low, up
+                if remaining() > 0 and solve(remaining()).feasible:
+                    quality = "relaxation"
+
+    feasible = quality in ("optimal", "incumbent", "repaired")
+    simulation = epl.extract_results(
+        site,
+        site.assets,
+        ivars,
+        feasible=feasible,
+        verbose=verbose,
+        flags=flags,
+    )
+    simulation.anytime = AnytimeReport(
+        quality=quality,
+        gap=gap,
+        budget_s=budget.seconds,
+        elapsed_s=time.perf_counter() - start,
+        solves=solves,
+    )
+    logger.debug("anytime.optimize_anytime", report=simulation.anytime)
+    return simulation
@@ -1,15 +1,27 @@
 """Contains AssetOneInterval - used as the base for all single interval energy assets data samples."""
 import abc
+import dataclasses
 import typing
 
+import numpy as np
 import pulp
-import pydantic
 
 import energypylinear as epl
 
 
 class Asset(abc.ABC):
-    """Abstract Base Class for an Asset."""
+    """Abstract Base Class for an Asset.
+
+    Assets can optionally implement a `constrain_all_intervals` method, which
+    receives the linear program data for all intervals at once.  When present,
+    `epl.Site` calls it once after all intervals are created, instead of calling
+    `constrain_within_interval` once per interval.
+
+    Assets can also optionally implement an `all_intervals` method, which creates
+    the linear program data for many intervals at once with the array factories
+    of `epl.Optimizer`.  When present, `epl.Site` calls it once before the
+    intervals are constrained, instead of calling `one_interval` once per interval.
+    """
 
     @abc.abstractmethod
     def __init__(self) -> None:
@@ -55,7 +67,11 @@ class Asset(abc.ABC):
 #         pass
 
 
-class AssetOneInterval(pydantic.BaseModel):
+#  data of a single interval - many of these are created for each simulation, so
+#  they are lightweight slotted dataclasses rather than pydantic models, with the
+#  asset configuration validated once instead of every interval
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
+class AssetOneInterval:
     """Generic energy asset that contains data for a single interval.
 
     Brought to you by the energy balance:
@@ -71,6 +87,9 @@ class AssetOneInterval(pydantic.BaseModel):
     These quantities are considered as both generation and consumption (load).
 
     Charge and discharge are handled as explicit accumulation terms.
+
+    Subclasses are decorated with
+    `dataclasses.dataclass(slots=True, kw_only=True, eq=False)`.
     """
 
     cfg: typing.Any = None
@@ -86,4 +105,15 @@ class AssetOneInterval(pydantic.BaseModel):
     gas_consumption_mwh: pulp.LpVariable | float = 0
 
     binary: pulp.LpVariable | int = 0
-    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+
+def interval_array(intervals: typing.Sequence[typing.Any], attr: str) -> np.ndarray:
+    """Stack an attribute of single interval data into a 1D object array.
+
+    Args:
+        intervals: data for each interval.
+        attr: the attribute to stack.
+    """
+    values = np.empty(len(intervals), dtype=object)
+    values[:] = [getattr(interval, attr) for interval in intervals]
+    return values
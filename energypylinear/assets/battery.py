@@ -1,23 +1,36 @@
 """Battery asset for optimizing battery dispatch for price or carbon arbitrage."""
+import dataclasses
 import pathlib
+import typing
 
 import numpy as np
 import pulp
 import pydantic
 
 import energypylinear as epl
-from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.assets.asset import (
+    AssetOneInterval,
+    interval_array,
+)
 from energypylinear.defaults import defaults
 from energypylinear.flags import Flags
 from energypylinear.freq import Freq
 from energypylinear.optimizer import Optimizer
+from energypylinear.sparse import EQ, LE
 
 
 def setup_initial_final_charge(
-    initial_charge_mwh: float, final_charge_mwh: float | None, capacity_mwh: float
-) -> tuple[float, float]:
-    """Processes the initial and final charge of battery storage."""
-    initial_charge_mwh = min(initial_charge_mwh, capacity_mwh)
+    initial_charge_mwh: float | None,
+    final_charge_mwh: float | None,
+    capacity_mwh: float,
+) -> tuple[float | None, float | None]:
+    """Processes the initial and final charge of battery storage.
+
+    A final charge of None is the same as the initial charge - when the initial
+    charge is None both are free, and tied together by `cyclic_charge`.
+    """
+    if initial_charge_mwh is not None:
+        initial_charge_mwh = min(initial_charge_mwh, capacity_mwh)
     final_charge_mwh = (
         initial_charge_mwh
         if final_charge_mwh is None
@@ -27,14 +40,20 @@ def setup_initial_final_charge(
 
 
 class BatteryConfig(pydantic.BaseModel):
-    """Battery asset configuration."""
+    """Battery asset configuration.
+
+    An `initial_charge_mwh` or `final_charge_mwh` of None leaves the initial or
+    final charge unconstrained - `cyclic_charge` ties a free final charge to a free
+    initial charge.
+    """
 
     name: str
     power_mw: float
     capacity_mwh: float
     efficiency_pct: float
-    initial_charge_mwh: float = 0.0
+    initial_charge_mwh: float | None = 0.0
     final_charge_mwh: float | None = 0.0
+    cyclic_charge: bool = False
     freq_mins: int
 
     @pydantic.validator("name")
@@ -45,6 +64,7 @@ class BatteryConfig(pydantic.BaseModel):
         return name
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class BatteryOneInterval(AssetOneInterval):
     """Battery asset data for a single interval."""
 
@@ -59,6 +79,26 @@ class BatteryOneInterval(AssetOneInterval):
     efficiency_pct: float
 
 
+def charge_discharge_big_m_mwh(cfg: BatteryConfig) -> tuple[float, float]:
+    """Get the smallest big-M of the charge and discharge binary constraints.
+
+    A battery that is only charging can't charge more than its power, or more
+    than its capacity after losses.  A battery that is only discharging can't
+    discharge more than its power or its capacity.
+
+    Returns:
+        The big-M of the charge and discharge constraints.
+    """
+    power_mwh = Freq(cfg.freq_mins).mw_to_mwh(cfg.power_mw)
+    charge_mwh = (
+        min(power_mwh, cfg.capacity_mwh / cfg.efficiency_pct)
+        if cfg.efficiency_pct > 0
+        else power_mwh
+    )
+    margin = 1 + defaults.big_m_margin
+    return charge_mwh * margin, min(power_mwh, cfg.capacity_mwh) * margin
+
+
 def constrain_only_charge_or_discharge(
     optimizer: Optimizer,
     battery: AssetOneInterval,
@@ -73,15 +113,16 @@ def constrain_only_charge_or_discharge(
     """
     assert isinstance(battery, BatteryOneInterval)
     if flags.include_charge_discharge_binary_variables:
+        charge_big_m, discharge_big_m = charge_discharge_big_m_mwh(battery.cfg)
         optimizer.constrain_max(
             battery.electric_charge_mwh,
             battery.electric_charge_binary,
-            battery.cfg.capacity_mwh,
+            charge_big_m,
         )
         optimizer.constrain_max(
             battery.electric_discharge_mwh,
             battery.electric_discharge_binary,
-            battery.cfg.capacity_mwh,
+            discharge_big_m,
         )
         optimizer.constrain(
             battery.electric_charge_binary + battery.electric_discharge_binary <= 1
@@ -135,10 +176,74 @@ def constrain_initial_final_charge(
     assert isinstance(initial, BatteryOneInterval)
     assert isinstance(final, BatteryOneInterval)
 
-    optimizer.constrain(
-        initial.electric_initial_charge_mwh == initial.cfg.initial_charge_mwh
+    if initial.cfg.initial_charge_mwh is not None:
+        optimizer.constrain(
+            initial.electric_initial_charge_mwh == initial.cfg.initial_charge_mwh
+        )
+    if final.cfg.final_charge_mwh is not None:
+        optimizer.constrain(
+            final.electric_final_charge_mwh == final.cfg.final_charge_mwh
+        )
+    elif final.cfg.cyclic_charge and initial.cfg.initial_charge_mwh is None:
+        optimizer.constrain(
+            final.electric_final_charge_mwh == initial.electric_initial_charge_mwh
+        )
+
+
+def constrain_batteries_all_intervals(
+    optimizer: Optimizer, batteries: list[AssetOneInterval], flags: Flags
+) -> None:
+    """Constrain battery dispatch within and between all intervals.
+
+    Creates the same constraints as `constrain_only_charge_or_discharge`,
+    `constrain_battery_electricity_balance` and
+    `constrain_connection_batteries_between_intervals`, one block of rows each.
+    """
+    for battery in batteries:
+        assert isinstance(battery, BatteryOneInterval)
+    charge = interval_array(batteries, "electric_charge_mwh")
+    discharge = interval_array(batteries, "electric_discharge_mwh")
+    loss = interval_array(batteries, "electric_loss_mwh")
+    initial = interval_array(batteries, "electric_initial_charge_mwh")
+    final = interval_array(batteries, "electric_final_charge_mwh")
+    efficiency = interval_array(batteries, "efficiency_pct").astype(np.float64)
+
+    if flags.include_charge_discharge_binary_variables:
+        charge_big_m, discharge_big_m = charge_discharge_big_m_mwh(batteries[0].cfg)
+        for continuous, binary, big_m in [
+            (charge, interval_array(batteries, "electric_charge_binary"), charge_big_m),
+            (
+                discharge,
+                interval_array(batteries, "electric_discharge_binary"),
+                discharge_big_m,
+            ),
+        ]:
+            optimizer.constrain_many(
+                [1, -big_m], np.column_stack([continuous, binary]), LE
+            )
+        optimizer.constrain_many(
+            1,
+            np.column_stack(
+                [
+                    interval_array(batteries, "electric_charge_binary"),
+                    interval_array(batteries, "electric_discharge_binary"),
+                ]
+            ),
+            LE,
+            1,
+        )
+
+    optimizer.constrain_many(
+        [1, 1, -1, -1, -1],
+        np.column_stack([initial, charge, discharge, loss, final]),
+        EQ,
+    )
+    optimizer.constrain_many(
+        np.column_stack([np.ones(len(batteries)), efficiency - 1]),
+        np.column_stack([loss, charge]),
+        EQ,
     )
-    optimizer.constrain(final.electric_final_charge_mwh == final.cfg.final_charge_mwh)
+    optimizer.constrain_many([1, -1], np.column_stack([final[:-1], initial[1:]]), EQ)
 
 
 class Battery:
@@ -151,8 +256,10 @@ class Battery:
         name: the asset name.
         electricity_prices: the price of electricity in each interval.
         electricity_carbon_intensities: carbon intensity of electricity in each interval.
-        initial_charge_mwh: initial charge state of the battery in mega-watt hours.
-        final_charge_mwh: final charge state of the battery in mega-watt hours.
+        initial_charge_mwh: initial charge state of the battery in mega-watt hours -
+            None leaves it free.
+        final_charge_mwh: final charge state of the battery in mega-watt hours -
+            None makes it the same as the initial charge, even when that is free.
     """
 
     def __init__(
@@ -164,7 +271,7 @@ class Battery:
         electricity_prices: np.ndarray | list[float] | float | None = None,
         export_electricity_prices: np.ndarray | list[float] | float | None = None,
         electricity_carbon_intensities: np.ndarray | list[float] | float | None = None,
-        initial_charge_mwh: float = 0.0,
+        initial_charge_mwh: float | None = 0.0,
         final_charge_mwh: float | None = None,
         freq_mins: int = defaults.freq_mins,
         optimizer_config: "epl.OptimizerConfig" = epl.optimizer.OptimizerConfig(),
@@ -182,6 +289,7 @@ class Battery:
             efficiency_pct=efficiency_pct,
             initial_charge_mwh=initial_charge_mwh,
             final_charge_mwh=final_charge_mwh,
+            cyclic_charge=initial_charge_mwh is None and final_charge_mwh is None,
             freq_mins=freq_mins,
         )
 
@@ -204,41 +312,68 @@ class Battery:
         self, optimizer: Optimizer, i: int, freq: Freq, flags: Flags
     ) -> BatteryOneInterval:
         """Generate linear program data for one interval."""
-        return BatteryOneInterval(
-            cfg=self.cfg,
-            electric_charge_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_charge_mwh-{i}",
-                up=freq.mw_to_mwh(self.cfg.power_mw),
-            ),
-            electric_discharge_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_discharge_mwh-{i}",
-                up=freq.mw_to_mwh(self.cfg.power_mw),
-            ),
-            electric_charge_binary=optimizer.binary(
-                f"{self.cfg.name}-electric_charge_binary-{i}"
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: Optimizer,
+        idx: typing.Sequence[int],
+        freq: Freq,
+        flags: Flags,
+    ) -> list[BatteryOneInterval]:
+        """Generate linear program data for many intervals.
+
+        Args:
+            optimizer: linear program optimizer.
+            idx: the intervals to create data for.
+            freq: interval frequency.
+            flags: boolean flags to change simulation and results behaviour.
+        """
+        n = len(idx)
+        name = self.cfg.name
+        power_mwh = freq.mw_to_mwh(self.cfg.power_mw)
+        charge = optimizer.continuous_array(
+            f"{name}-electric_charge_mwh", n, up=power_mwh, index=idx
+        )
+        discharge = optimizer.continuous_array(
+            f"{name}-electric_discharge_mwh", n, up=power_mwh, index=idx
+        )
+        if flags.include_charge_discharge_binary_variables:
+            charge_binary = optimizer.binary_array(
+                f"{name}-electric_charge_binary", n, index=idx
             )
-            if flags.include_charge_discharge_binary_variables
-            else 0,
-            electric_discharge_binary=optimizer.binary(
-                f"{self.cfg.name}-electric_discharge_binary-{i}"
+            discharge_binary = optimizer.binary_array(
+                f"{name}-electric_discharge_binary", n, index=idx
             )
-            if flags.include_charge_discharge_binary_variables
-            else 0,
-            electric_loss_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_loss_mwh-{i}"
-            ),
-            electric_initial_charge_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_initial_charge_mwh-{i}",
-                low=0,
-                up=self.cfg.capacity_mwh,
-            ),
-            electric_final_charge_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_final_charge_mwh-{i}",
-                low=0,
-                up=self.cfg.capacity_mwh,
-            ),
-            efficiency_pct=self.cfg.efficiency_pct,
+        else:
+            charge_binary = discharge_binary = np.zeros(n, dtype=object)
+        loss = optimizer.continuous_array(f"{name}-electric_loss_mwh", n, index=idx)
+        initial = optimizer.continuous_array(
+            f"{name}-electric_initial_charge_mwh",
+            n,
+            up=self.cfg.capacity_mwh,
+            index=idx,
+        )
+        final = optimizer.continuous_array(
+            f"{name}-electric_final_charge_mwh",
+            n,
+            up=self.cfg.capacity_mwh,
+            index=idx,
         )
+        return [
+            BatteryOneInterval(
+                cfg=self.cfg,
+                electric_charge_mwh=charge[k],
+                electric_discharge_mwh=discharge[k],
+                electric_charge_binary=charge_binary[k],
+                electric_discharge_binary=discharge_binary[k],
+                electric_loss_mwh=loss[k],
+                electric_initial_charge_mwh=initial[k],
+                electric_final_charge_mwh=final[k],
+                efficiency_pct=self.cfg.efficiency_pct,
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -264,18 +399,44 @@ class Battery:
         assert isinstance(all_batteries, list)
         constrain_connection_batteries_between_intervals(optimizer, all_batteries)
 
+    def constrain_all_intervals(
+        self,
+        optimizer: Optimizer,
+        ivars: "epl.IntervalVars",
+        freq: Freq,
+        flags: Flags = Flags(),
+    ) -> None:
+        """Constrain asset within and between all intervals."""
+        batteries = [
+            batteries[0]
+            for batteries in ivars.filter_objective_variables(
+                BatteryOneInterval, i=None, asset_name=self.cfg.name
+            )
+        ]
+        constrain_batteries_all_intervals(optimizer, batteries, flags)
+
     def constrain_after_intervals(
         self,
         optimizer: Optimizer,
         ivars: "epl.IntervalVars",
     ) -> None:
-        """Constrain asset after all intervals."""
+        """Constrain asset after all intervals.
+
+        The row of the initial charge constraint is recorded in
+        `initial_charge_row`, so the initial charge can be updated after compiling -
+        None when the initial charge is unconstrained.
+        """
         initial = ivars.filter_objective_variables(
             BatteryOneInterval, i=0, asset_name=self.cfg.name
         )[0][0]
         final = ivars.filter_objective_variables(
             BatteryOneInterval, i=-1, asset_name=self.cfg.name
         )[0][0]
+        self.initial_charge_row = (
+            optimizer.n_constraints()
+            if self.cfg.initial_charge_mwh is not None
+            else None
+        )
         constrain_initial_final_charge(optimizer, initial, final)
 
     def optimize(
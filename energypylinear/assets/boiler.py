@@ -1,11 +1,19 @@
 """Boiler asset for optimizing dispatch of gas fired boilers"""
 
+import dataclasses
+import typing
+
+import numpy as np
 import pulp
 import pydantic
 
 import energypylinear as epl
-from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.assets.asset import (
+    AssetOneInterval,
+    interval_array,
+)
 from energypylinear.defaults import defaults
+from energypylinear.sparse import EQ, LE
 
 
 class BoilerConfig(pydantic.BaseModel):
@@ -23,15 +31,49 @@ class BoilerConfig(pydantic.BaseModel):
         return name
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class BoilerOneInterval(AssetOneInterval):
     """Boiler data for a single interval."""
 
     high_temperature_generation_mwh: pulp.LpVariable
     gas_consumption_mwh: pulp.LpVariable
-    binary: pulp.LpVariable
+    binary: pulp.LpVariable | int
     cfg: BoilerConfig
 
 
+def needs_binary(cfg: BoilerConfig, flags: "epl.Flags") -> bool:
+    """Whether the boiler needs an on / off binary variable.
+
+    Without a minimum output the binary never forces any generation, so it can
+    be left out - unless `flags.force_full_milp` is set.
+    """
+    return flags.force_full_milp or cfg.high_temperature_generation_min_mw > 0
+
+
+def constrain_boiler_intervals(
+    optimizer: "epl.Optimizer", boilers: list[BoilerOneInterval], freq: "epl.Freq"
+) -> None:
+    """Constrain boiler for generation of high temperature heat in many intervals."""
+    cfg = boilers[0].cfg
+    generation = interval_array(boilers, "high_temperature_generation_mwh")
+    binary = interval_array(boilers, "binary")
+    optimizer.constrain_many(
+        [1, -1 / cfg.high_temperature_efficiency_pct],
+        np.column_stack([interval_array(boilers, "gas_consumption_mwh"), generation]),
+        EQ,
+    )
+    optimizer.constrain_many(
+        [1, -freq.mw_to_mwh(cfg.high_temperature_generation_max_mw)],
+        np.column_stack([generation, binary]),
+        LE,
+    )
+    optimizer.constrain_many(
+        [-1, freq.mw_to_mwh(cfg.high_temperature_generation_min_mw)],
+        np.column_stack([generation, binary]),
+        LE,
+    )
+
+
 class Boiler(epl.Asset):
     """Boiler asset - generates high temperature heat from natural gas."""
 
@@ -58,20 +100,40 @@ class Boiler(epl.Asset):
         self, optimizer: "epl.Optimizer", i: int, freq: "epl.Freq", flags: "epl.Flags"
     ) -> BoilerOneInterval:
         """Create asset data for a single interval."""
-        return BoilerOneInterval(
-            high_temperature_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-high_temperature_generation_mwh-{i}",
-                low=freq.mw_to_mwh(self.cfg.high_temperature_generation_min_mw),
-                up=freq.mw_to_mwh(self.cfg.high_temperature_generation_max_mw),
-            ),
-            binary=optimizer.binary(
-                f"{self.cfg.name}-binary_mwh-{i}",
-            ),
-            gas_consumption_mwh=optimizer.continuous(
-                f"{self.cfg.name}-gas_consumption_mwh-{i}"
-            ),
-            cfg=self.cfg,
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        idx: typing.Sequence[int],
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> list[BoilerOneInterval]:
+        """Create asset data for many intervals."""
+        n = len(idx)
+        generation = optimizer.continuous_array(
+            f"{self.cfg.name}-high_temperature_generation_mwh",
+            n,
+            low=freq.mw_to_mwh(self.cfg.high_temperature_generation_min_mw),
+            up=freq.mw_to_mwh(self.cfg.high_temperature_generation_max_mw),
+            index=idx,
         )
+        if needs_binary(self.cfg, flags):
+            binary = optimizer.binary_array(f"{self.cfg.name}-binary_mwh", n, index=idx)
+        else:
+            binary = np.ones(n, dtype=object)
+        gas = optimizer.continuous_array(
+            f"{self.cfg.name}-gas_consumption_mwh", n, index=idx
+        )
+        return [
+            BoilerOneInterval(
+                high_temperature_generation_mwh=generation[k],
+                binary=binary[k],
+                gas_consumption_mwh=gas[k],
+                cfg=self.cfg,
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -86,21 +148,24 @@ class Boiler(epl.Asset):
             BoilerOneInterval, i=-1, asset_name=self.cfg.name
         )[0][0]
         assert isinstance(boiler, BoilerOneInterval)
-        optimizer.constrain(
-            boiler.gas_consumption_mwh
-            == boiler.high_temperature_generation_mwh
-            * (1 / boiler.cfg.high_temperature_efficiency_pct)
-        )
-        optimizer.constrain_max(
-            boiler.high_temperature_generation_mwh,
-            boiler.binary,
-            freq.mw_to_mwh(boiler.cfg.high_temperature_generation_max_mw),
-        )
-        optimizer.constrain_min(
-            boiler.high_temperature_generation_mwh,
-            boiler.binary,
-            freq.mw_to_mwh(boiler.cfg.high_temperature_generation_min_mw),
-        )
+        constrain_boiler_intervals(optimizer, [boiler], freq)
+
+    def constrain_all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        ivars: "epl.IntervalVars",
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> None:
+        """Constrain boiler for generation of high temperature heat in all intervals."""
+        boilers = []
+        for intervals in ivars.filter_objective_variables(
+            BoilerOneInterval, i=None, asset_name=self.cfg.name
+        ):
+            boiler = intervals[0]
+            assert isinstance(boiler, BoilerOneInterval)
+            boilers.append(boiler)
+        constrain_boiler_intervals(optimizer, boilers, freq)
 
     def constrain_after_intervals(
         self, optimizer: "epl.Optimizer", ivars: "epl.IntervalVars"
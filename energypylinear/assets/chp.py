@@ -1,4 +1,5 @@
 """Asset for optimizing combined heat and power (CHP) generators."""
+import dataclasses
 import pathlib
 import typing
 
@@ -7,11 +8,15 @@ import pulp
 import pydantic
 
 import energypylinear as epl
-from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.assets.asset import (
+    AssetOneInterval,
+    interval_array,
+)
 from energypylinear.defaults import defaults
 from energypylinear.flags import Flags
 from energypylinear.freq import Freq
 from energypylinear.optimizer import Optimizer
+from energypylinear.sparse import EQ, LE
 
 
 class CHPConfig(pydantic.BaseModel):
@@ -34,18 +39,65 @@ class CHPConfig(pydantic.BaseModel):
         return name
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class CHPOneInterval(AssetOneInterval):
     """CHP generator data for a single interval."""
 
     cfg: CHPConfig
 
-    binary: pulp.LpVariable
+    binary: pulp.LpVariable | int
     electric_generation_mwh: pulp.LpVariable
     gas_consumption_mwh: pulp.LpVariable
     high_temperature_generation_mwh: pulp.LpVariable
     low_temperature_generation_mwh: pulp.LpVariable
 
 
+def needs_binary(cfg: CHPConfig, flags: Flags = Flags()) -> bool:
+    """Whether the CHP needs an on / off binary variable.
+
+    Without a minimum output the binary never forces any generation, so it can
+    be left out - unless `flags.force_full_milp` is set.
+    """
+    return flags.force_full_milp or cfg.electric_power_min_mw > 0
+
+
+def constrain_chp_intervals(
+    optimizer: Optimizer, chps: list[CHPOneInterval], freq: Freq
+) -> None:
+    """Constrain generator upper and lower bounds for generating electricity, high
+    and low temperature heat within many intervals."""
+    cfg = chps[0].cfg
+    gas = interval_array(chps, "gas_consumption_mwh")
+    electric = interval_array(chps, "electric_generation_mwh")
+    binary = interval_array(chps, "binary")
+    if cfg.electric_efficiency_pct > 0:
+        optimizer.constrain_many(
+            [1, -1 / cfg.electric_efficiency_pct],
+            np.column_stack([gas, electric]),
+            EQ,
+        )
+    optimizer.constrain_many(
+        [1, -cfg.high_temperature_efficiency_pct],
+        np.column_stack([interval_array(chps, "high_temperature_generation_mwh"), gas]),
+        EQ,
+    )
+    optimizer.constrain_many(
+        [1, -cfg.low_temperature_efficiency_pct],
+        np.column_stack([interval_array(chps, "low_temperature_generation_mwh"), gas]),
+        EQ,
+    )
+    optimizer.constrain_many(
+        [1, -freq.mw_to_mwh(cfg.electric_power_max_mw)],
+        np.column_stack([electric, binary]),
+        LE,
+    )
+    optimizer.constrain_many(
+        [-1, freq.mw_to_mwh(cfg.electric_power_min_mw)],
+        np.column_stack([electric, binary]),
+        LE,
+    )
+
+
 class CHP(epl.Asset):
     """CHP asset - handles optimization and plotting of results over many intervals.
 
@@ -123,28 +175,46 @@ class CHP(epl.Asset):
         self, optimizer: Optimizer, i: int, freq: Freq, flags: Flags = Flags()
     ) -> CHPOneInterval:
         """Generate linear program data for one interval."""
-        return CHPOneInterval(
-            electric_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_generation_mwh-{i}",
-                low=0,
-                up=freq.mw_to_mwh(self.cfg.electric_power_max_mw),
-            ),
-            binary=optimizer.binary(
-                f"{self.cfg.name}-binary_mwh-{i}",
-            ),
-            gas_consumption_mwh=optimizer.continuous(
-                f"{self.cfg.name}-gas_consumption_mwh-{i}"
-            ),
-            high_temperature_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-high_temperature_generation_mwh-{i}",
-                low=0,
-            ),
-            low_temperature_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-low_temperature_generation_mwh-{i}",
-                low=0,
-            ),
-            cfg=self.cfg,
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: Optimizer,
+        idx: typing.Sequence[int],
+        freq: Freq,
+        flags: Flags = Flags(),
+    ) -> list[CHPOneInterval]:
+        """Generate linear program data for many intervals."""
+        n = len(idx)
+        name = self.cfg.name
+        electric = optimizer.continuous_array(
+            f"{name}-electric_generation_mwh",
+            n,
+            up=freq.mw_to_mwh(self.cfg.electric_power_max_mw),
+            index=idx,
+        )
+        if needs_binary(self.cfg, flags):
+            binary = optimizer.binary_array(f"{name}-binary_mwh", n, index=idx)
+        else:
+            binary = np.ones(n, dtype=object)
+        gas = optimizer.continuous_array(f"{name}-gas_consumption_mwh", n, index=idx)
+        high_temperature = optimizer.continuous_array(
+            f"{name}-high_temperature_generation_mwh", n, index=idx
+        )
+        low_temperature = optimizer.continuous_array(
+            f"{name}-low_temperature_generation_mwh", n, index=idx
         )
+        return [
+            CHPOneInterval(
+                electric_generation_mwh=electric[k],
+                binary=binary[k],
+                gas_consumption_mwh=gas[k],
+                high_temperature_generation_mwh=high_temperature[k],
+                low_temperature_generation_mwh=low_temperature[k],
+                cfg=self.cfg,
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -159,29 +229,26 @@ class CHP(epl.Asset):
         chp = ivars.filter_objective_variables(
             CHPOneInterval, i=i, asset_name=self.cfg.name
         )[0][0]
-        if chp.cfg.electric_efficiency_pct > 0:
-            optimizer.constrain(
-                chp.gas_consumption_mwh
-                == chp.electric_generation_mwh * (1 / chp.cfg.electric_efficiency_pct)
-            )
-        optimizer.constrain(
-            chp.high_temperature_generation_mwh
-            == chp.gas_consumption_mwh * chp.cfg.high_temperature_efficiency_pct
-        )
-        optimizer.constrain(
-            chp.low_temperature_generation_mwh
-            == chp.gas_consumption_mwh * chp.cfg.low_temperature_efficiency_pct
-        )
-        optimizer.constrain_max(
-            chp.electric_generation_mwh,
-            chp.binary,
-            freq.mw_to_mwh(chp.cfg.electric_power_max_mw),
-        )
-        optimizer.constrain_min(
-            chp.electric_generation_mwh,
-            chp.binary,
-            freq.mw_to_mwh(chp.cfg.electric_power_min_mw),
-        )
+        assert isinstance(chp, CHPOneInterval)
+        constrain_chp_intervals(optimizer, [chp], freq)
+
+    def constrain_all_intervals(
+        self,
+        optimizer: Optimizer,
+        ivars: "epl.interval_data.IntervalVars",
+        freq: Freq,
+        flags: Flags,
+    ) -> None:
+        """Constrain generator upper and lower bounds for generating electricity, high
+        and low temperature heat within all intervals."""
+        chps = []
+        for intervals in ivars.filter_objective_variables(
+            CHPOneInterval, i=None, asset_name=self.cfg.name
+        ):
+            chp = intervals[0]
+            assert isinstance(chp, CHPOneInterval)
+            chps.append(chp)
+        constrain_chp_intervals(optimizer, chps, freq)
 
     def constrain_after_intervals(
         self, *args: typing.Tuple[typing.Any], **kwargs: typing.Any
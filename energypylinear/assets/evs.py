@@ -1,5 +1,7 @@
 """Electric vehicle asset for optimizing the smart charging of electric vehicles."""
+import dataclasses
 import pathlib
+import typing
 
 import numpy as np
 import pulp
@@ -11,19 +13,27 @@ from energypylinear.assets.asset import AssetOneInterval
 from energypylinear.defaults import defaults
 from energypylinear.flags import Flags
 from energypylinear.freq import Freq
+from energypylinear.logger import logger
 from energypylinear.optimizer import Optimizer
+from energypylinear.sparse import EQ, LE
 
 
 def validate_ev_interval_data(
     idx: np.ndarray,
-    charge_events: np.ndarray,
+    cfg: "EVsConfig",
 ) -> None:
     """Helper used to validate EV interval data.
 
     TODO move into an EVsIntervalData model.
     """
-    assert idx.shape[0] == charge_events.shape[0]
-    assert all(np.array(charge_events).sum(axis=0) > 0), "sum across axis=0"
+    if cfg.charge_events is not None:
+        assert idx.shape[0] == cfg.charge_events.shape[0]
+    else:
+        assert all(
+            c.end_interval <= idx.shape[0] for c in cfg.charge_event_cfgs
+        ), "charge events must end within the interval data"
+    first, _ = cfg.windows()
+    assert all(first >= 0), "every charge event must be active in an interval"
 
 
 def validate_charge_events(
@@ -41,11 +51,29 @@ class ChargeEventConfig(pydantic.BaseModel):
     """Electric vehicle (EV) single charge event configuration.
 
     Capacity here refers to the battery capacity of the vehicle being charged.
+
+    The state of charge starts at `initial_soc_mwh` and ends at `final_soc_mwh` -
+    None leaves the initial or final state of charge unconstrained.
+
+    When charge events are given as records, the charge event is active from
+    `start_interval` up to but not including `end_interval`.
     """
 
     name: str
     capacity_mwh: float
     efficiency_pct: float
+    initial_soc_mwh: float | None = 0.0
+    final_soc_mwh: float | None = None
+    start_interval: int | None = None
+    end_interval: int | None = None
+
+    @pydantic.validator("end_interval")
+    def check_window(cls, end_interval: int | None, values: dict) -> int | None:
+        """Check the charge event window is ordered."""
+        if end_interval is not None:
+            assert values.get("start_interval") is not None
+            assert 0 <= values["start_interval"] <= end_interval
+        return end_interval
 
 
 class ChargerConfig(pydantic.BaseModel):
@@ -57,14 +85,28 @@ class ChargerConfig(pydantic.BaseModel):
 
 
 class EVsConfig(pydantic.BaseModel):
-    """Electric vehicle (EV) asset configuration."""
+    """Electric vehicle (EV) asset configuration.
+
+    When a charge event is active is either a dense `charge_events` matrix of
+    shape (intervals, charge events), or the compact `start_interval` and
+    `end_interval` of each charge event config, with `charge_events` as None.
+
+    When `aggregate` is True, the charge events are modelled as one virtual
+    battery rather than with a charger assignment for each charge event.
+
+    Spill charger variables are only created in `spill_intervals` - in all
+    intervals when None.  The aggregate spill charge is always created, as it
+    can be forced by the charge event windows.
+    """
 
     name: str
     charger_cfgs: np.ndarray
     spill_charger_cfgs: np.ndarray
     charge_event_cfgs: np.ndarray
-    charge_events: np.ndarray
+    charge_events: np.ndarray | None
     freq_mins: int
+    aggregate: bool = False
+    spill_intervals: list[int] | None = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @pydantic.validator("name")
@@ -75,13 +117,65 @@ class EVsConfig(pydantic.BaseModel):
 
     @pydantic.validator("charge_events")
     def validate_charge_events(
-        cls, charge_events: np.ndarray, values: dict
-    ) -> np.ndarray:
+        cls, charge_events: np.ndarray | None, values: dict
+    ) -> np.ndarray | None:
         """Check charge events match the configs"""
-        validate_charge_events(values["charge_event_cfgs"], charge_events)
+        if charge_events is None:
+            assert all(
+                c.end_interval is not None for c in values["charge_event_cfgs"]
+            ), "charge event configs need a window when charge_events is None"
+        else:
+            validate_charge_events(values["charge_event_cfgs"], charge_events)
         return charge_events
 
+    def windows(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the first and last active interval of each charge event.
+
+        Charge events that are never active have a first and last interval of -1.
+        """
+        if self.charge_events is not None:
+            return charge_event_windows(self.charge_events)
+        start = np.array([c.start_interval for c in self.charge_event_cfgs], dtype=int)
+        end = np.array([c.end_interval for c in self.charge_event_cfgs], dtype=int)
+        active = end > start
+        return np.where(active, start, -1), np.where(active, end - 1, -1)
+
+    def is_active(self, intervals: np.ndarray, events: np.ndarray) -> np.ndarray:
+        """Get the charge events matrix entry of (interval, charge event) pairs.
+
+        Args:
+            intervals: interval of each pair.
+            events: charge event of each pair, broadcast with `intervals`.
+        """
+        if self.charge_events is not None:
+            return self.charge_events[intervals, events]
+        first, last = self.windows()
+        return ((first[events] <= intervals) & (intervals <= last[events])).astype(
+            np.float64
+        )
+
+    def dense_charge_events(self, n_intervals: int | None = None) -> np.ndarray:
+        """Convert the charge events to a dense matrix of shape (intervals, charge events).
 
+        The linear program is built from the compact charge event windows - this
+        is only needed when a dense matrix is explicitly wanted.
+
+        Args:
+            n_intervals: number of intervals - defaults to the end of the last
+                charge event.
+        """
+        if self.charge_events is not None:
+            return np.asarray(self.charge_events)[:n_intervals]
+        _, last = self.windows()
+        if n_intervals is None:
+            n_intervals = int(last.max(initial=-1)) + 1
+        return self.is_active(
+            np.arange(n_intervals)[:, np.newaxis],
+            np.arange(len(self.charge_event_cfgs)),
+        )
+
+
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class EVOneInterval(AssetOneInterval):
     """EV asset data for a single interval.
 
@@ -100,14 +194,19 @@ class EVOneInterval(AssetOneInterval):
     electric_loss_mwh: pulp.LpVariable
 
     is_spill: bool = False
-    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class EVsArrayOneInterval(AssetOneInterval):
     """EV asset for a single interval as a 1D, 2D & 3D arrays.
 
     This single data structure contains all the data for all assets
     in one interval.
+
+    Only charge events inside their charge event window have variables - the
+    arrays have shape (1, charge events) or (1, charge events, chargers) over
+    the charge events in `charge_event_idx`, which index into
+    `cfg.charge_event_cfgs`.  None is all the charge events.
     """
 
     i: int
@@ -121,333 +220,871 @@ class EVsArrayOneInterval(AssetOneInterval):
     electric_discharge_mwh: np.ndarray
     electric_discharge_binary: np.ndarray
     electric_loss_mwh: np.ndarray
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    charge_event_idx: np.ndarray | None = None
 
     def __repr__(self) -> str:
         """A string representation of self."""
         return f"<EVsArrayOneInterval i: {self.i} chargers: {len(self.cfg.charger_cfgs)} charge-events: {len(self.cfg.charge_event_cfgs)}>"
 
 
-def evs_one_interval(
+def charge_event_windows(charge_events: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Get the first and last active interval of each charge event.
+
+    Charge events that are never active have a first and last interval of -1.
+
+    Args:
+        charge_events: when each charge event is active - shape (intervals, charge events).
+    """
+    active_intervals = np.asarray(charge_events) > 0
+    active = active_intervals.any(axis=0)
+    first = np.where(active, active_intervals.argmax(axis=0), -1)
+    last = np.where(
+        active,
+        len(active_intervals) - 1 - active_intervals[::-1].argmax(axis=0),
+        -1,
+    )
+    return first, last
+
+
+def window_pairs(
+    first: np.ndarray, last: np.ndarray, idx: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the (interval, charge event) pairs inside each charge event window.
+
+    Pairs are created from the windows directly, without a dense matrix of
+    shape (intervals, charge events).
+
+    Args:
+        first: first active interval of each charge event - -1 if never active.
+        last: last active interval of each charge event.
+        idx: the sorted intervals to pair the charge events with.
+
+    Returns:
+        The position in `idx` and the charge event of each pair, ordered by
+        interval and then by charge event.
+    """
+    idx = np.asarray(idx, dtype=np.int64)
+    start = np.searchsorted(idx, first, side="left")
+    stop = np.searchsorted(idx, last, side="right")
+    counts = np.where(first >= 0, np.maximum(stop - start, 0), 0)
+    events = np.repeat(np.arange(len(first), dtype=np.int64), counts)
+    positions = (
+        np.arange(counts.sum(), dtype=np.int64)
+        - np.repeat(np.cumsum(counts) - counts, counts)
+        + np.repeat(start, counts)
+    )
+    order = np.lexsort((events, positions))
+    return positions[order], events[order]
+
+
+def is_variable(variables: np.ndarray) -> np.ndarray:
+    """Returns where an array holds linear program variables rather than numbers."""
+    return np.vectorize(lambda v: isinstance(v, pulp.LpVariable), otypes=[bool])(
+        variables
+    )
+
+
+def evs_pairs(evs: list[EVsArrayOneInterval]) -> tuple[np.ndarray, np.ndarray]:
+    """Get the (interval, charge event) pair of each row of the stacked arrays.
+
+    Args:
+        evs: EVs array data for consecutive intervals.
+
+    Returns:
+        The position of the interval in `evs` and the charge event of each row.
+    """
+    events = [
+        np.arange(len(ev.cfg.charge_event_cfgs))
+        if ev.charge_event_idx is None
+        else ev.charge_event_idx
+        for ev in evs
+    ]
+    positions = [np.full(len(idx), n, dtype=np.int64) for n, idx in enumerate(events)]
+    return np.concatenate(positions), np.concatenate(events).astype(np.int64)
+
+
+def stack_evs_arrays(evs: list[EVsArrayOneInterval], attr: str) -> np.ndarray:
+    """Stacks one attribute of many intervals, one row per (interval, charge event) pair."""
+    return np.concatenate([getattr(ev, attr)[0] for ev in evs], axis=0)
+
+
+def evs_all_intervals(
     optimizer: Optimizer,
     cfg: EVsConfig,
     charger_cfgs: np.ndarray,
     charge_event_cfgs: np.ndarray,
-    charge_events: np.ndarray,
-    i: int,
+    idx: np.ndarray | typing.Sequence[int],
     freq: Freq,
     asset_name: str,
     flags: Flags = Flags(),
     create_charge_event_soc: bool = True,
     create_discharge_variables: bool = True,
     is_spill: bool = False,
-) -> tuple[list[EVOneInterval], EVsArrayOneInterval]:
-    """Create EV asset data for a single interval.
+    available_intervals: typing.Sequence[int] | None = None,
+) -> list[tuple[list[EVOneInterval], EVsArrayOneInterval]]:
+    """Create EV asset data for many intervals.
 
-    Create a list of `EVOneInterval` and one `EVsArrayOneInterval` data structures.
+    Create a list of `EVOneInterval` and one `EVsArrayOneInterval` data structures
+    for each interval.
 
     This data is a collection of linear programming variables for the EV charge, discharge and state of charges.
 
     The list is used in the `vars` lists, which ends up in the objective function.
 
     The array representation is used in constructing the linear program.
+
+    Variables are only created for a charge event inside its window, from the
+    first to the last interval the charge event is active.  The state of charge
+    can't change outside of the window, so it isn't modelled there.
+
+    Charge variables are only created in `available_intervals`, when given.
     """
+    index = np.asarray(idx, dtype=np.int64)
     n_chargers = len(charger_cfgs)
-    n_charge_events = len(charge_event_cfgs)
+    name = f"{asset_name}-spill" if is_spill else asset_name
+
+    #  the (interval, charge event) pairs inside each charge event window
+    intervals, events = window_pairs(*cfg.windows(), index)
+    labels = [f"{i}-{e}" for i, e in zip(index[intervals].tolist(), events.tolist())]
+    n_pairs = len(events)
+    shape = (n_pairs, n_chargers)
+
+    #  when limiting variables to valid events, only create charge variables
+    #  in the intervals where the charge event is active
+    charge_mask = None
+    if flags.limit_charge_variables_to_valid_events:
+        charge_mask = (cfg.is_active(index[intervals], events) == 1)[:, np.newaxis]
+    if available_intervals is not None:
+        available = np.isin(index[intervals], available_intervals)[:, np.newaxis]
+        charge_mask = available if charge_mask is None else charge_mask & available
+
+    if create_charge_event_soc:
+        capacity_mwh = np.array([c.capacity_mwh for c in charge_event_cfgs])[events]
+        initial_socs_mwh = optimizer.continuous_array(
+            f"{name}-initial_soc_mwh", n_pairs, up=capacity_mwh, index=labels
+        )
+        final_socs_mwh = optimizer.continuous_array(
+            f"{name}-final_soc_mwh", n_pairs, up=capacity_mwh, index=labels
+        )
+    else:
+        initial_socs_mwh = np.zeros(n_pairs, dtype=object)
+        final_socs_mwh = np.zeros(n_pairs, dtype=object)
+
+    power_max_mwh = np.array([freq.mw_to_mwh(c.power_max_mw) for c in charger_cfgs])
+    charges_mwh = optimizer.continuous_array(
+        f"{name}-electric_charge_mwh",
+        shape,
+        up=power_max_mwh,
+        index=labels,
+        mask=charge_mask,
+    )
+    charges_binary = optimizer.binary_array(
+        f"{name}-electric_charge_binary", shape, index=labels, mask=charge_mask
+    )
+    if create_discharge_variables and flags.allow_evs_discharge:
+        discharges_mwh = optimizer.continuous_array(
+            f"{name}-electric_discharge_mwh", shape, up=power_max_mwh, index=labels
+        )
+        discharges_binary = optimizer.binary_array(
+            f"{name}-electric_discharge_binary", shape, index=labels
+        )
+    else:
+        discharges_mwh = np.zeros(shape, dtype=object)
+        discharges_binary = np.zeros(shape, dtype=object)
+    losses_mwh = optimizer.continuous_array(
+        f"{name}-electric_loss_mwh", shape, index=labels, mask=charge_mask
+    )
 
-    #  1D array
-    evs = []
+    has_variables = is_variable(charges_mwh) | is_variable(discharges_mwh)
+    counts = np.bincount(intervals, minlength=len(index))
+    stops = np.cumsum(counts)
+    data = []
+    for k, i in enumerate(index.tolist()):
+        pairs = slice(stops[k] - counts[k], stops[k])
+        evs = [
+            EVOneInterval(
+                cfg=cfg,
+                electric_charge_mwh=charges_mwh[p, c],
+                electric_charge_binary=charges_binary[p, c],
+                electric_discharge_mwh=discharges_mwh[p, c],
+                electric_discharge_binary=discharges_binary[p, c],
+                initial_soc_mwh=initial_socs_mwh[p],
+                final_soc_mwh=final_socs_mwh[p],
+                electric_loss_mwh=losses_mwh[p, c],
+                is_spill=is_spill,
+            )
+            for p in range(pairs.start, pairs.stop)
+            for c in range(n_chargers)
+            if has_variables[p, c]
+        ]
+        evs_array = EVsArrayOneInterval(
+            i=i,
+            electric_charge_mwh=charges_mwh[np.newaxis, pairs],
+            electric_charge_binary=charges_binary[np.newaxis, pairs],
+            electric_discharge_mwh=discharges_mwh[np.newaxis, pairs],
+            electric_discharge_binary=discharges_binary[np.newaxis, pairs],
+            cfg=cfg,
+            initial_soc_mwh=initial_socs_mwh[np.newaxis, pairs],
+            final_soc_mwh=final_socs_mwh[np.newaxis, pairs],
+            electric_loss_mwh=losses_mwh[np.newaxis, pairs],
+            charge_event_idx=events[pairs],
+            is_spill=is_spill,
+        )
+        data.append((evs, evs_array))
+    return data
 
-    #  2D arrays
-    initial_socs_mwh = np.zeros((1, n_charge_events)).astype(object)
-    final_socs_mwh = np.zeros((1, n_charge_events)).astype(object)
 
-    #  3D arrays
-    charges_mwh = np.zeros((1, n_charge_events, n_chargers)).astype(object)
-    charges_binary = np.zeros((1, n_charge_events, n_chargers)).astype(object)
-    discharges_mwh = np.zeros((1, n_charge_events, n_chargers)).astype(object)
-    discharges_binary = np.zeros((1, n_charge_events, n_chargers)).astype(object)
-    losses_mwh = np.zeros((1, n_charge_events, n_chargers)).astype(object)
+def constrain_evs_within_intervals(
+    optimizer: Optimizer,
+    cfg: EVsConfig,
+    all_evs: list[EVsArrayOneInterval],
+    all_spill_evs: list[EVsArrayOneInterval],
+    freq: Freq,
+    flags: Flags,
+) -> None:
+    """Constrain EVs dispatch within each interval.
 
+    Constraints are only created for the (interval, charge event) pairs that
+    have variables, one block of rows for each kind of constraint.
     """
-    there is opportunity here to prune the number of variables
-    - when the charge event binary is 0 for a charger, charge_event pair,
-    - when the charge event is over (ie the last charge event)
-
-    leave this as a fun project for later
+    positions, events = evs_pairs(all_evs)
+    intervals = np.array([ev.i for ev in all_evs], dtype=np.int64)[positions]
+    charge_events = cfg.is_active(intervals, events)
+
+    charge = stack_evs_arrays(all_evs, "electric_charge_mwh")
+    charge_binary = stack_evs_arrays(all_evs, "electric_charge_binary")
+    discharge = stack_evs_arrays(all_evs, "electric_discharge_mwh")
+    discharge_binary = stack_evs_arrays(all_evs, "electric_discharge_binary")
+    loss = stack_evs_arrays(all_evs, "electric_loss_mwh")
+    initial = stack_evs_arrays(all_evs, "initial_soc_mwh")
+    final = stack_evs_arrays(all_evs, "final_soc_mwh")
+    spill_charge = stack_evs_arrays(all_spill_evs, "electric_charge_mwh")
+    spill_charge_binary = stack_evs_arrays(all_spill_evs, "electric_charge_binary")
+    spill_discharge = stack_evs_arrays(all_spill_evs, "electric_discharge_mwh")
+    n_pairs, n_chargers = charge.shape
+
+    #  min and max charge & discharge, linking the continuous and binary variables
+    #  the max is also capped by the energy each charge event can take
+    charge_max, spill_charge_max, discharge_max = charge_event_big_m_mwh(cfg, flags)
+    min_max = [(charge, charge_binary, cfg.charger_cfgs, charge_max)]
+    if flags.allow_evs_discharge:
+        min_max.append((discharge, discharge_binary, cfg.charger_cfgs, discharge_max))
+    #  never allow a spill charger to discharge
+    min_max.append(
+        (spill_charge, spill_charge_binary, cfg.spill_charger_cfgs, spill_charge_max)
+    )
+    for continuous, binary, charger_cfgs, event_max_mwh in min_max:
+        mask = is_variable(continuous)
+        power_min_mwh = np.broadcast_to(
+            [freq.mw_to_mwh(c.power_min_mw) for c in charger_cfgs], continuous.shape
+        )
+        #  never below the charger minimum, so the binary isn't forced off
+        power_max_mwh = np.maximum(
+            np.minimum(
+                np.broadcast_to(
+                    [freq.mw_to_mwh(c.power_max_mw) for c in charger_cfgs],
+                    continuous.shape,
+                ),
+                event_max_mwh[events][:, np.newaxis],
+            ),
+            power_min_mwh,
+        )[mask]
+        power_min_mwh = power_min_mwh[mask]
+        variables = np.column_stack([continuous[mask], binary[mask]])
+        optimizer.constrain_many(
+            np.column_stack([np.ones(len(variables)), -power_max_mwh]), variables, LE
+        )
+        optimizer.constrain_many(
+            np.column_stack([-np.ones(len(variables)), power_min_mwh]), variables, LE
+        )
+        #  only let the binary be positive when the charge_event is positive
+        #  this forces the charger to only charge during a charge event
+        limit = np.broadcast_to(charge_events[:, np.newaxis], continuous.shape)
+        inactive = mask & (limit < 1)
+        optimizer.constrain_many(
+            1, binary[inactive][:, np.newaxis], LE, limit[inactive]
+        )
 
-    when the charge event binary is 0 for a charger, charge_event pair,
-    - this seems like the real profitable one
-    - most of the time the charge event binary is 0
-    """
+    #  constrain to only one charger per charging event
+    #  this also has the effect of only allowing charge or discharge
+    variables = np.concatenate([charge_binary, discharge_binary], axis=1)
+    optimizer.constrain_many(1, variables[is_variable(variables).any(axis=1)], LE, 1)
+
+    #  constrain to only one charge event per charger, padding each interval
+    #  to the largest number of charge events in any interval
+    n_intervals = len(all_evs)
+    counts = np.bincount(positions, minlength=n_intervals)
+    rank = np.arange(n_pairs) - np.repeat(np.cumsum(counts) - counts, counts)
+    padded = np.zeros((n_intervals, n_chargers, 2, counts.max(initial=0)), dtype=object)
+    padded[positions, :, 0, rank] = charge_binary
+    padded[positions, :, 1, rank] = discharge_binary
+    variables = padded.reshape(n_intervals * n_chargers, -1)
+    optimizer.constrain_many(1, variables[is_variable(variables).any(axis=1)], LE, 1)
+
+    #  electricity balance of each charge event within each interval
+    terms = [
+        (initial[:, np.newaxis], 1),
+        (charge, 1),
+        (spill_charge, 1),
+        (discharge, -1),
+        (spill_discharge, -1),
+        (loss, -1),
+        (final[:, np.newaxis], -1),
+    ]
+    optimizer.constrain_many(
+        np.concatenate([np.full(v.shape[1], sign) for v, sign in terms]),
+        np.concatenate([v for v, _ in terms], axis=1),
+        EQ,
+    )
 
-    for charge_event_idx, charge_event_cfg in enumerate(charge_event_cfgs):
-        if create_charge_event_soc:
-            name = f"i:{i},asset:{asset_name},charge_event:{charge_event_cfg.name}"
-            initial_charge = optimizer.continuous(
-                f"initial_soc_mwh,{name}",
-                low=0,
-                up=charge_event_cfg.capacity_mwh,
-            )
-            final_charge = optimizer.continuous(
-                f"final_soc_mwh,{name}",
-                low=0,
-                up=charge_event_cfg.capacity_mwh,
-            )
-        else:
-            initial_charge = 0
-            final_charge = 0
-
-        initial_socs_mwh[0, charge_event_idx] = initial_charge
-        final_socs_mwh[0, charge_event_idx] = final_charge
-
-        for charger_idx, charger_cfg in enumerate(charger_cfgs):
-            name = f"i:{i},asset:{asset_name},charge-event:{charge_event_idx},charger:{charger_cfg.name}"
-
-            if flags.limit_charge_variables_to_valid_events:
-                charge_event = charge_events[i, charge_event_idx]
-                charge_mwh = (
-                    optimizer.continuous(
-                        f"electric_charge_mwh,{name}",
-                        low=0,
-                        up=freq.mw_to_mwh(charger_cfg.power_max_mw),
-                    )
-                    if charge_event == 1
-                    else 0
-                )
-                charge_binary = (
-                    optimizer.binary(f"electric_charge_binary,{name}")
-                    if charge_event == 1
-                    else 0
-                )
+    #  losses
+    mask = is_variable(charge) | is_variable(loss)
+    efficiency_pct = np.array([c.efficiency_pct for c in cfg.charge_event_cfgs])
+    optimizer.constrain_many(
+        np.column_stack(
+            [
+                np.broadcast_to(
+                    (1 - efficiency_pct[events])[:, np.newaxis], charge.shape
+                )[mask],
+                -np.ones(mask.sum()),
+            ]
+        ),
+        np.column_stack([charge[mask], loss[mask]]),
+        EQ,
+    )
 
-            else:
-                charge_mwh = optimizer.continuous(
-                    f"electric_charge_mwh,{name}",
-                    low=0,
-                    up=freq.mw_to_mwh(charger_cfg.power_max_mw),
-                )
-                charge_binary = optimizer.binary(f"electric_charge_binary,{name}")
-
-            discharge_mwh = 0
-            discharge_binary = 0
-            if create_discharge_variables:
-                discharge_mwh = (
-                    optimizer.continuous(
-                        f"electric_discharge_mwh,{name}",
-                        low=0,
-                        up=freq.mw_to_mwh(charger_cfg.power_max_mw),
-                    )
-                    if flags.allow_evs_discharge
-                    else 0
-                )
-                discharge_binary = (
-                    optimizer.binary(f"electric_discharge_binary,{name}")
-                    if flags.allow_evs_discharge
-                    else 0
-                )
 
-            loss_mwh = optimizer.continuous(
-                f"electric_loss_mwh,{name}",
-                low=0,
-            )
+def constrain_connection_charge_events_between_intervals(
+    optimizer: Optimizer, evs: list[EVsArrayOneInterval]
+) -> None:
+    """Constrain state of charges between intervals.
 
-            evs.append(
-                EVOneInterval(
-                    cfg=cfg,
-                    electric_charge_mwh=charge_mwh,
-                    electric_charge_binary=charge_binary,
-                    electric_discharge_mwh=discharge_mwh,
-                    electric_discharge_binary=discharge_binary,
-                    initial_soc_mwh=initial_charge,
-                    final_soc_mwh=final_charge,
-                    electric_loss_mwh=loss_mwh,
-                    is_spill=is_spill,
-                )
-            )
-            charges_mwh[0, charge_event_idx, charger_idx] = charge_mwh
-            charges_binary[0, charge_event_idx, charger_idx] = charge_binary
-            discharges_mwh[0, charge_event_idx, charger_idx] = discharge_mwh
-            discharges_binary[0, charge_event_idx, charger_idx] = discharge_binary
-            losses_mwh[0, charge_event_idx, charger_idx] = loss_mwh
-
-    evs_array = EVsArrayOneInterval(
-        i=i,
-        electric_charge_mwh=charges_mwh,
-        electric_charge_binary=charges_binary,
-        electric_discharge_mwh=discharges_mwh,
-        electric_discharge_binary=discharges_binary,
-        cfg=cfg,
-        # charger_cfgs=charger_cfgs,
-        # charge_event_cfgs=charge_event_cfgs,
-        initial_soc_mwh=initial_socs_mwh,
-        final_soc_mwh=final_socs_mwh,
-        electric_loss_mwh=losses_mwh,
-        is_spill=is_spill,
+    Connects the final state of charge of each charge event to the initial
+    state of charge in the next interval of its window."""
+    positions, events = evs_pairs(evs)
+    order = np.lexsort((positions, events))
+    positions, events = positions[order], events[order]
+    initial = stack_evs_arrays(evs, "initial_soc_mwh")[order]
+    final = stack_evs_arrays(evs, "final_soc_mwh")[order]
+    connected = (events[1:] == events[:-1]) & (positions[1:] == positions[:-1] + 1)
+    optimizer.constrain_many(
+        [1, -1], np.column_stack([initial[1:][connected], final[:-1][connected]]), EQ
     )
-    return evs, evs_array
 
 
-def constrain_charge_discharge_min_max(
+def constrain_initial_final_charge(
     optimizer: Optimizer,
-    evs: EVsArrayOneInterval,
-    charge_event: np.ndarray,
-    freq: Freq,
-    charger_cfgs: np.ndarray,
+    evs: list[EVsArrayOneInterval],
     charge_event_cfgs: np.ndarray,
-    i: int,
-    allow_evs_discharge: bool,
 ) -> None:
-    """Add constraints between the continuous and binary variables
-    for the EVs charge and discharge electricity.
+    """Constrain state of charge at the beginning and end of each charge event window."""
+    _, events = evs_pairs(evs)
+    initial = stack_evs_arrays(evs, "initial_soc_mwh")
+    final = stack_evs_arrays(evs, "final_soc_mwh")
+
+    #  rows are ordered by interval, so the first and last row of a charge event
+    #  are the start and end of its window
+    _, first = np.unique(events, return_index=True)
+    _, last = np.unique(events[::-1], return_index=True)
+    last = len(events) - 1 - last
+    for rows, socs, attr in [
+        (first, initial, "initial_soc_mwh"),
+        (last, final, "final_soc_mwh"),
+    ]:
+        targets = [getattr(charge_event_cfgs[e], attr) for e in events[rows]]
+        constrained = np.array([t is not None for t in targets], dtype=bool)
+        optimizer.constrain_many(
+            1,
+            socs[rows][constrained][:, np.newaxis],
+            EQ,
+            np.array([t for t in targets if t is not None], dtype=np.float64),
+        )
 
-    This constraint is applied once per interval."""
-    for charge_event_idx, _ in enumerate(charge_event_cfgs):
-        for charger_idx, charger_cfg in enumerate(charger_cfgs):
+    #  intentionally don't constrain the spill charger
 
-            variables = [
-                (
-                    evs.electric_charge_mwh[0, charge_event_idx, charger_idx],
-                    evs.electric_charge_binary[0, charge_event_idx, charger_idx],
-                )
-            ]
-            if allow_evs_discharge:
-                variables += [
-                    (
-                        evs.electric_discharge_mwh[0, charge_event_idx, charger_idx],
-                        evs.electric_discharge_binary[0, charge_event_idx, charger_idx],
-                    ),
-                ]
 
-            for continuous, binary in variables:
-                if isinstance(continuous, pulp.LpVariable):
-                    optimizer.constrain_max(
-                        continuous, binary, freq.mw_to_mwh(charger_cfg.power_max_mw)
-                    )
-                    optimizer.constrain_min(
-                        continuous, binary, freq.mw_to_mwh(charger_cfg.power_min_mw)
-                    )
-                    #  only let the binary be positive when the charge_event is positive
-                    #  this forces the charger to only charge during a charge event
-                    #  this could be a separate function
-                    optimizer.constrain(binary <= charge_event[i, charge_event_idx])
+def charge_event_targets(
+    charge_event_cfgs: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Get the state of charge targets and efficiency of each charge event.
 
+    An initial state of charge of None starts from empty.  A final state of
+    charge of None can end anywhere from the initial state of charge up to the
+    capacity.
 
-def constrain_single_charger_charge_event(
-    optimizer: Optimizer,
-    evs: EVsArrayOneInterval,
-    charger_cfgs: np.ndarray,
-    charge_event_cfgs: np.ndarray,
-) -> None:
-    """Add constraints to limit when charging can occur.
+    Returns:
+        The initial, lowest final and highest final state of charge, and the
+        efficiency of each charge event.
+    """
+    initial = np.array([c.initial_soc_mwh or 0.0 for c in charge_event_cfgs])
+    lowest = initial.copy()
+    highest = np.array([c.capacity_mwh for c in charge_event_cfgs], dtype=np.float64)
+    for n, c in enumerate(charge_event_cfgs):
+        if c.final_soc_mwh is not None:
+            lowest[n] = highest[n] = c.final_soc_mwh
+    efficiency = np.array(
+        [c.efficiency_pct for c in charge_event_cfgs], dtype=np.float64
+    )
+    return initial, lowest, highest, efficiency
 
-    This constraint is applied once per interval."""
 
-    #  constrain to only one charger per charging event
-    #  this also has the effect of only allowing
-    #  charge or discharge
-    for charge_event_idx, _ in enumerate(charge_event_cfgs):
-        optimizer.constrain(
-            optimizer.sum(
-                evs.electric_charge_binary[0, charge_event_idx, :].tolist()
-                + evs.electric_discharge_binary[0, charge_event_idx, :].tolist()
-            )
-            <= 1
-        )
-    #  constrain to only one charge event per charger
-    for charger_idx, _ in enumerate(charger_cfgs):
-        optimizer.constrain(
-            optimizer.sum(
-                evs.electric_charge_binary[0, :, charger_idx].tolist()
-                + evs.electric_discharge_binary[0, :, charger_idx].tolist()
+def charge_event_big_m_mwh(
+    cfg: EVsConfig, flags: Flags
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the most each charge event can charge or discharge in one interval.
+
+    Without discharge the state of charge only rises, so a charge event can't
+    take more than the gap between its initial and highest final state of
+    charge.  With discharge a charge event can cycle, so the chargers keep
+    their power as the limit.
+
+    Returns:
+        The most charge, spill charge and discharge of each charge event.
+    """
+    n_events = len(cfg.charge_event_cfgs)
+    if flags.allow_evs_discharge:
+        unbounded = np.full(n_events, np.inf)
+        return unbounded, unbounded, unbounded
+
+    initial, _, highest, efficiency = charge_event_targets(cfg.charge_event_cfgs)
+    room = np.maximum(highest - initial, 0)
+    #  spill charge has no losses
+    charge = np.divide(
+        room, efficiency, out=np.full(n_events, np.inf), where=efficiency > 0
+    )
+    margin = 1 + defaults.big_m_margin
+    return charge * margin, room * margin, np.zeros(n_events)
+
+
+@dataclasses.dataclass
+class AggregateEnvelopes:
+    """Power and energy envelopes of the aggregate EVs virtual battery.
+
+    Arrays have one entry for each interval, from the first interval.
+
+    Attributes:
+        charge_mwh: most the chargers can charge in each interval.
+        spill_charge_mwh: most the spill chargers can charge in each interval.
+        forced_spill_charge_mwh: least the spill chargers must charge in each interval.
+        lower_soc_mwh: least energy charged by the end of each interval.
+        upper_soc_mwh: most energy charged by the end of each interval.
+    """
+
+    charge_mwh: np.ndarray
+    spill_charge_mwh: np.ndarray
+    forced_spill_charge_mwh: np.ndarray
+    lower_soc_mwh: np.ndarray
+    upper_soc_mwh: np.ndarray
+
+
+def aggregate_envelopes(
+    cfg: EVsConfig, idx: np.ndarray | typing.Sequence[int], freq: Freq
+) -> AggregateEnvelopes:
+    """Get the power and energy envelopes of the aggregate EVs virtual battery.
+
+    The virtual battery holds the energy charged into all charge events since
+    the first interval, measured at the chargers.  Each charge event adds to
+    the energy envelopes from the start of its window:
+
+    - upper - the energy it can take, as fast as the largest charger can deliver it,
+    - lower - the energy it needs, as late as the largest charger can still
+        deliver it by the end of its window.
+
+    The power envelopes are the most the chargers, or spill chargers, can
+    deliver to the active charge events in one interval - one charger per
+    charge event, and no more than each charge event can take.
+
+    Energy the largest charger can't deliver within the window must come from
+    the spill chargers, spread evenly over the active intervals of the window.
+
+    Args:
+        cfg: EVs asset configuration.
+        idx: the sorted intervals to get the envelopes for - the envelopes are
+            over `max(idx) + 1` intervals.
+        freq: interval frequency.
+    """
+    n_intervals = int(np.max(idx, initial=-1)) + 1
+    first, last = cfg.windows()
+    initial, lowest, highest, efficiency = charge_event_targets(cfg.charge_event_cfgs)
+    need = np.maximum(lowest - initial, 0) / efficiency
+    room = np.maximum(highest - initial, 0) / efficiency
+    rate_mwh = max([freq.mw_to_mwh(c.power_max_mw) for c in cfg.charger_cfgs] + [0])
+
+    positions, events = window_pairs(first, last, np.arange(n_intervals))
+    active = cfg.is_active(positions, events) == 1
+    n_active = np.bincount(events[active], minlength=len(first))
+    shortfall = np.maximum(need - rate_mwh * n_active, 0)
+    forced_spill_mwh = np.bincount(
+        positions[active],
+        weights=(shortfall / np.maximum(n_active, 1))[events[active]],
+        minlength=n_intervals,
+    )
+
+    #  the largest chargers go to the charge events that can take the most energy
+    takers = active & (room[events] > 0)
+    power_envelopes = []
+    for charger_cfgs in [cfg.charger_cfgs, cfg.spill_charger_cfgs]:
+        power_mwh = -np.sort([-freq.mw_to_mwh(c.power_max_mw) for c in charger_cfgs])
+        takes = np.minimum(room[events[takers]], power_mwh.max(initial=0.0))
+        order = np.lexsort((-takes, positions[takers]))
+        counts = np.bincount(positions[takers], minlength=n_intervals)
+        rank = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+        charged = rank < len(power_mwh)
+        power_envelopes.append(
+            np.bincount(
+                positions[takers][order][charged],
+                weights=np.minimum(takes[order][charged], power_mwh[rank[charged]]),
+                minlength=n_intervals,
             )
-            <= 1
         )
 
+    #  each charge event is constant after its window
+    departed = (first >= 0) & (last + 1 < n_intervals)
+    after = np.minimum(room, rate_mwh * n_active) + shortfall
+    upper = np.cumsum(
+        np.bincount(last[departed] + 1, weights=after[departed], minlength=n_intervals)
+    )
+    lower = np.cumsum(
+        np.bincount(last[departed] + 1, weights=need[departed], minlength=n_intervals)
+    )
+    #  active intervals of the window up to and including each interval
+    order = np.lexsort((positions, events))
+    running = np.cumsum(active[order])
+    n_pairs = np.bincount(events, minlength=len(first))
+    starts = np.cumsum(n_pairs) - n_pairs
+    before = (running - active[order])[starts[n_pairs > 0]]
+    elapsed = np.empty(len(order), dtype=np.int64)
+    elapsed[order] = running - np.repeat(before, n_pairs[n_pairs > 0])
+    upper += np.bincount(
+        positions,
+        weights=np.minimum(room[events], rate_mwh * elapsed) + shortfall[events],
+        minlength=n_intervals,
+    )
+    lower += np.bincount(
+        positions,
+        weights=np.maximum(need[events] - rate_mwh * (n_active[events] - elapsed), 0),
+        minlength=n_intervals,
+    )
+    return AggregateEnvelopes(
+        charge_mwh=power_envelopes[0],
+        spill_charge_mwh=power_envelopes[1],
+        forced_spill_charge_mwh=forced_spill_mwh,
+        lower_soc_mwh=lower,
+        upper_soc_mwh=upper,
+    )
+
 
-def constrain_charge_event_electricity_balance(
+def aggregate_all_intervals(
     optimizer: Optimizer,
-    evs_array: EVsArrayOneInterval,
-    spill_evs_array: EVsArrayOneInterval,
-) -> None:
-    """Constrain the electricity balance across the battery.  This is within one interval.
+    cfg: EVsConfig,
+    idx: np.ndarray | typing.Sequence[int],
+    freq: Freq,
+) -> list[tuple]:
+    """Create aggregate EV asset data for many intervals.
 
-    This constraint is applied once per interval."""
-    for charge_event_idx, charge_event_cfg in enumerate(
-        evs_array.cfg.charge_event_cfgs
-    ):
-        optimizer.constrain(
-            evs_array.initial_soc_mwh[0, charge_event_idx]
-            + optimizer.sum(evs_array.electric_charge_mwh[0, charge_event_idx].tolist())
-            + optimizer.sum(
-                spill_evs_array.electric_charge_mwh[0, charge_event_idx].tolist()
-            )
-            - optimizer.sum(
-                evs_array.electric_discharge_mwh[0, charge_event_idx].tolist()
-            )
-            - optimizer.sum(
-                spill_evs_array.electric_discharge_mwh[0, charge_event_idx].tolist()
+    Each interval has one `EVOneInterval` for the aggregate charge of the
+    virtual battery, and one for the aggregate spill charge.  The
+    `EVsArrayOneInterval` data has no charge events, as the aggregate model has
+    no variables for individual charge events or chargers.
+    """
+    index = np.asarray(idx, dtype=np.int64)
+    envelopes = aggregate_envelopes(cfg, index, freq)
+    lower, upper = envelopes.lower_soc_mwh, envelopes.upper_soc_mwh
+    #  the envelopes at the end of the previous interval bound the initial soc
+    lower_before = np.concatenate([[0.0], lower])[index]
+    upper_before = np.concatenate([[0.0], upper])[index]
+    labels = index.tolist()
+
+    name = f"{cfg.name}-aggregate"
+    charges_mwh = optimizer.continuous_array(
+        f"{name}-electric_charge_mwh",
+        len(index),
+        up=envelopes.charge_mwh[index],
+        index=labels,
+    )
+    spill_charges_mwh = optimizer.continuous_array(
+        f"{cfg.name}-spill-aggregate-electric_charge_mwh",
+        len(index),
+        low=envelopes.forced_spill_charge_mwh[index],
+        up=np.maximum(envelopes.spill_charge_mwh, envelopes.forced_spill_charge_mwh)[
+            index
+        ],
+        index=labels,
+    )
+    initial_socs_mwh = optimizer.continuous_array(
+        f"{name}-initial_soc_mwh",
+        len(index),
+        low=lower_before,
+        up=upper_before,
+        index=labels,
+    )
+    final_socs_mwh = optimizer.continuous_array(
+        f"{name}-final_soc_mwh",
+        len(index),
+        low=lower[index],
+        up=upper[index],
+        index=labels,
+    )
+
+    data: list[tuple] = []
+    for k, i in enumerate(index.tolist()):
+        evs_array, spill_evs_array = (
+            EVsArrayOneInterval(
+                i=i,
+                cfg=cfg,
+                is_spill=is_spill,
+                initial_soc_mwh=np.zeros((1, 0), dtype=object),
+                final_soc_mwh=np.zeros((1, 0), dtype=object),
+                electric_charge_mwh=np.zeros((1, 0, n_chargers), dtype=object),
+                electric_charge_binary=np.zeros((1, 0, n_chargers), dtype=object),
+                electric_discharge_mwh=np.zeros((1, 0, n_chargers), dtype=object),
+                electric_discharge_binary=np.zeros((1, 0, n_chargers), dtype=object),
+                electric_loss_mwh=np.zeros((1, 0, n_chargers), dtype=object),
+                charge_event_idx=np.zeros(0, dtype=np.int64),
             )
-            - optimizer.sum(evs_array.electric_loss_mwh[0, charge_event_idx].tolist())
-            == evs_array.final_soc_mwh[0, charge_event_idx]
+            for is_spill, n_chargers in [
+                (False, len(cfg.charger_cfgs)),
+                (True, len(cfg.spill_charger_cfgs)),
+            ]
         )
+        aggregate = EVOneInterval(
+            cfg=cfg,
+            electric_charge_mwh=charges_mwh[k],
+            electric_charge_binary=0,
+            electric_discharge_mwh=0,
+            electric_discharge_binary=0,
+            initial_soc_mwh=initial_socs_mwh[k],
+            final_soc_mwh=final_socs_mwh[k],
+            electric_loss_mwh=0,
+        )
+        spill = EVOneInterval(
+            cfg=cfg,
+            electric_charge_mwh=spill_charges_mwh[k],
+            electric_charge_binary=0,
+            electric_discharge_mwh=0,
+            electric_discharge_binary=0,
+            initial_soc_mwh=0,
+            final_soc_mwh=0,
+            electric_loss_mwh=0,
+            is_spill=True,
+        )
+        data.append(([aggregate], evs_array, [spill], spill_evs_array))
+    return data
 
-        #  losses
-        """
-        used to not do the iteration over chargers here and just take the sum
-        means less constraints
-        """
-        for charger_idx, _ in enumerate(evs_array.cfg.charger_cfgs):
-            optimizer.constrain(
-                optimizer.sum(
-                    evs_array.electric_charge_mwh[0, charge_event_idx, charger_idx]
-                )
-                * (1 - charge_event_cfg.efficiency_pct)
-                == optimizer.sum(
-                    evs_array.electric_loss_mwh[0, charge_event_idx, charger_idx]
-                )
-            )
 
+def aggregate_variables(
+    evs: typing.Sequence[typing.Sequence[AssetOneInterval]],
+) -> np.ndarray:
+    """Get the aggregate EVs variables of each interval.
 
-def constrain_connection_charge_events_between_intervals(
-    optimizer: Optimizer, evs: list[EVsArrayOneInterval], i: int
+    Args:
+        evs: the `EVOneInterval` data of one aggregate EVs asset for each interval.
+
+    Returns:
+        An array of shape (intervals, 4) - the initial soc, charge, spill charge
+        and final soc of the virtual battery.
+    """
+    rows = []
+    for interval in evs:
+        aggregate = next(
+            ev for ev in interval if isinstance(ev, EVOneInterval) and not ev.is_spill
+        )
+        spill = next(
+            ev for ev in interval if isinstance(ev, EVOneInterval) and ev.is_spill
+        )
+        rows.append(
+            [
+                aggregate.initial_soc_mwh,
+                aggregate.electric_charge_mwh,
+                spill.electric_charge_mwh,
+                aggregate.final_soc_mwh,
+            ]
+        )
+    return np.array(rows, dtype=object).reshape(len(evs), 4)
+
+
+def constrain_aggregate_evs(
+    optimizer: Optimizer,
+    evs: typing.Sequence[typing.Sequence[AssetOneInterval]],
+    previous: typing.Sequence[AssetOneInterval] | None = None,
 ) -> None:
-    """Constrain state of charges between intervals.
+    """Constrain the aggregate EVs virtual battery within and between intervals.
 
-    This uses data from two adjacent intervals.
+    The energy and power envelopes are the bounds of the variables, so only the
+    balance of each interval and the connection between intervals are needed.
 
-    This constraint is conditionally applied once per interval."""
-    if i == 0:
-        return None
+    Args:
+        optimizer: linear program optimizer.
+        evs: the aggregate EVs data of consecutive intervals.
+        previous: the aggregate EVs data of the interval before `evs`, if any.
+    """
+    variables = aggregate_variables(evs)
+    optimizer.constrain_many([1, 1, 1, -1], variables, EQ)
+    if previous is not None:
+        variables = np.concatenate([aggregate_variables([previous]), variables])
+    optimizer.constrain_many(
+        [1, -1], np.column_stack([variables[1:, 0], variables[:-1, 3]]), EQ
+    )
 
-    old = evs[-2]
-    new = evs[-1]
-    for initial_soc, final_soc in zip(
-        new.initial_soc_mwh[0], old.final_soc_mwh[0], strict=True
-    ):
-        if isinstance(initial_soc, pulp.LpVariable) and isinstance(
-            final_soc, pulp.LpVariable
-        ):
-            optimizer.constrain(initial_soc == final_soc)
 
+@dataclasses.dataclass
+class EVsDisaggregation:
+    """Aggregate EVs dispatch assigned to charge events and chargers.
 
-def constrain_initial_final_charge(
-    optimizer: Optimizer,
-    evs: list[EVsArrayOneInterval],
-    charge_event_cfgs: np.ndarray,
-) -> None:
-    """Constrain state of charge at the beginning and end of the simulation."""
+    Arrays have one row for each (interval, charge event) pair inside a charge
+    event window, in the same layout as the stacked `EVsArrayOneInterval` arrays.
 
-    for charge_event_idx, charge_event_cfg in enumerate(charge_event_cfgs):
-        #  constrain the initial soc
-        optimizer.constrain(evs[0].initial_soc_mwh[0, charge_event_idx] == 0)
+    Attributes:
+        positions: position of the interval of each pair.
+        events: charge event of each pair.
+        arrays: charger arrays of shape (pairs, chargers) for each attribute.
+        spill: spill charger arrays of shape (pairs, 1) for each attribute.
+        initial_soc_mwh: initial state of charge of each pair.
+        final_soc_mwh: final state of charge of each pair.
+        unassigned_mwh: aggregate charge that couldn't be assigned to a charger,
+            and went to the spill charger.
+    """
 
-        #  constrain the final soc
-        optimizer.constrain(
-            evs[-1].final_soc_mwh[0, charge_event_idx] == charge_event_cfg.capacity_mwh
+    positions: np.ndarray
+    events: np.ndarray
+    arrays: dict[str, np.ndarray]
+    spill: dict[str, np.ndarray]
+    initial_soc_mwh: np.ndarray
+    final_soc_mwh: np.ndarray
+    unassigned_mwh: float
+
+
+def disaggregate_evs(
+    cfg: EVsConfig,
+    idx: np.ndarray | typing.Sequence[int],
+    charge_mwh: np.ndarray,
+    spill_charge_mwh: np.ndarray,
+    freq: Freq,
+    tolerance: float = 1e-6,
+) -> EVsDisaggregation:
+    """Assign the aggregate EVs charge to charge events and chargers.
+
+    Each interval, the active charge events are ranked least-laxity-first - by
+    the number of intervals left in their window less the intervals the largest
+    charger needs to deliver their remaining charge, with ties broken by charge
+    event.  The lowest laxity charge events each get one charger, with the
+    largest chargers going to the largest remaining charge, and each takes the
+    smallest of the remaining charge of its charge event, its charger power and
+    the aggregate charge not yet assigned.  Aggregate charge left over tops up charge events without a
+    final state of charge, up to their capacity.
+
+    Spill charge is assigned in the same order, without a charger power limit.
+    The aggregate model doesn't know which charge event each charger serves,
+    so aggregate charge the chargers can't deliver is also assigned to the
+    spill charger, keeping the site electricity balance.
+
+    Args:
+        cfg: EVs asset configuration.
+        idx: the sorted intervals of the aggregate charge.
+        charge_mwh: aggregate charge of each interval.
+        spill_charge_mwh: aggregate spill charge of each interval.
+        freq: interval frequency.
+        tolerance: smallest charge to assign.
+    """
+    index = np.asarray(idx, dtype=np.int64)
+    first, last = cfg.windows()
+    soc, lowest, highest, efficiency = charge_event_targets(cfg.charge_event_cfgs)
+    power_mwh = np.array([freq.mw_to_mwh(c.power_max_mw) for c in cfg.charger_cfgs])
+    chargers = np.argsort(-power_mwh, kind="stable")
+    rate_mwh = max(power_mwh.max(initial=0.0), tolerance)
+
+    positions, events = window_pairs(first, last, index)
+    n_pairs, n_chargers = len(events), len(power_mwh)
+    charge = np.zeros((n_pairs, n_chargers))
+    spill = np.zeros((n_pairs, 1))
+    initial_soc = np.zeros(n_pairs)
+    final_soc = np.zeros(n_pairs)
+    unassigned_mwh = 0.0
+
+    counts = np.bincount(positions, minlength=len(index))
+    stops = np.cumsum(counts)
+    for k, i in enumerate(index.tolist()):
+        pairs = np.arange(stops[k] - counts[k], stops[k])
+        pair_events = events[pairs]
+        initial_soc[pairs] = soc[pair_events]
+
+        active = cfg.is_active(np.full(len(pairs), i), pair_events) == 1
+        need = np.maximum(lowest[pair_events] - soc[pair_events], 0)
+        room = np.maximum(highest[pair_events] - soc[pair_events], 0)
+        laxity = (last[pair_events] - i + 1) - need / efficiency[pair_events] / rate_mwh
+        ranked = np.lexsort((pair_events, laxity))
+        ranked = ranked[active[ranked]]
+
+        #  one charger per charge event - the lowest laxity charge events get a
+        #  charger, with the largest chargers going to the largest remaining charge
+        candidates = ranked[room[ranked] > tolerance]
+        assigned = candidates[:n_chargers]
+        takes = np.minimum(need / efficiency[pair_events], rate_mwh)
+        if takes[assigned].sum() < charge_mwh[k] - tolerance:
+            #  the aggregate charge needs the charge events that can take the most
+            keep = np.argsort(-takes[candidates], kind="stable")[:n_chargers]
+            assigned = candidates[np.sort(keep)]
+        assigned_chargers = np.empty(len(assigned), dtype=np.int64)
+        assigned_chargers[np.argsort(-need[assigned], kind="stable")] = chargers[
+            : len(assigned)
+        ]
+        left = float(charge_mwh[k])
+        for limit in [need, room]:
+            for n, c in zip(assigned, assigned_chargers):
+                take = min(
+                    limit[n] / efficiency[pair_events[n]] - charge[pairs[n], c],
+                    power_mwh[c] - charge[pairs[n], c],
+                    left,
+                )
+                if take > tolerance:
+                    charge[pairs[n], c] += take
+                    left -= take
+
+        charged = charge[pairs].sum(axis=1) * efficiency[pair_events]
+        need = np.maximum(need - charged, 0)
+        #  charge the chargers can't deliver goes to the spill charger
+        spill_left = float(spill_charge_mwh[k])
+        if left > tolerance:
+            unassigned_mwh += left
+            spill_left += left
+        for n in ranked:
+            take = min(need[n], spill_left)
+            if take > tolerance:
+                spill[pairs[n], 0] += take
+                spill_left -= take
+        if spill_left > tolerance and len(pairs):
+            spill[pairs[ranked[0] if len(ranked) else 0], 0] += spill_left
+
+        soc[pair_events] += charged + spill[pairs, 0]
+        final_soc[pairs] = soc[pair_events]
+
+    if unassigned_mwh > tolerance:
+        logger.warning(
+            "evs.disaggregate_evs", name=cfg.name, unassigned_mwh=unassigned_mwh
         )
 
-    #  intentionally don't constrain the spill charger
+    charge_binary = (charge > tolerance).astype(np.float64)
+    zeros = np.zeros_like(charge)
+    return EVsDisaggregation(
+        positions=positions,
+        events=events,
+        arrays={
+            "electric_charge_mwh": charge,
+            "electric_charge_binary": charge_binary,
+            "electric_discharge_mwh": zeros,
+            "electric_discharge_binary": zeros,
+            "electric_loss_mwh": charge * (1 - efficiency[events])[:, np.newaxis],
+        },
+        spill={
+            "electric_charge_mwh": spill,
+            "electric_charge_binary": (spill > tolerance).astype(np.float64),
+            "electric_discharge_mwh": np.zeros_like(spill),
+            "electric_discharge_binary": np.zeros_like(spill),
+        },
+        initial_soc_mwh=initial_soc,
+        final_soc_mwh=final_soc,
+        unassigned_mwh=unassigned_mwh,
+    )
 
 
 class EVs:
@@ -462,6 +1099,7 @@ class EVs:
         charge_events_capacity_mwh:
             1D array of final SOC for each charge event.
             Length is the number of charge events.
+            Not used with charge event records.
         charge_event_efficiency:
             Roundtrip efficiency of the charge event charge & discharge.
         charger_turndown:
@@ -479,13 +1117,32 @@ class EVs:
                 [0, 0, 0, 1, 1],
                 [0, 1, 0, 0, 0],
             ]
+            Not used with `charge_event_records`.
+        aggregate: model the charge events as one virtual battery with energy
+            and power envelopes, solved as a linear program without charger
+            binaries.  The aggregate charge is assigned back to charge events
+            and chargers least-laxity-first after solving.  Charger turndown
+            and vehicle-to-grid discharge aren't modelled.
+        charge_event_records: the charge events as a list of `(start_interval,
+            end_interval, capacity_mwh, efficiency_pct)` records instead of a
+            `charge_events` matrix, one record per charge event, where the
+            charge event is active from `start_interval` up to but not
+            including `end_interval`.  The same 4 charge events as records:
+            charge_event_records = [
+                (0, 1, 50, 0.9),
+                (1, 4, 100, 0.9),
+                (3, 5, 30, 0.9),
+                (1, 2, 40, 0.9),
+            ]
+            Records stay in this compact form - `cfg.dense_charge_events()`
+            converts them to a dense matrix.
     """
 
     def __init__(
         self,
-        charge_events: np.ndarray | list[list[int]],
-        chargers_power_mw: np.ndarray | list[float],
-        charge_events_capacity_mwh: np.ndarray | list[float],
+        charge_events: np.ndarray | list[list[int]] | None = None,
+        chargers_power_mw: np.ndarray | list[float] | None = None,
+        charge_events_capacity_mwh: np.ndarray | list[float] | None = None,
         charge_event_efficiency: float = 0.9,
         charger_turndown: float = 0.1,
         name: str = "evs",
@@ -494,8 +1151,14 @@ class EVs:
         electricity_carbon_intensities: np.ndarray | list[float] | np.ndarray | None = None,
         freq_mins: int = defaults.freq_mins,
         optimizer_config: "epl.OptimizerConfig" = epl.optimizer.OptimizerConfig(),
+        aggregate: bool = False,
+        charge_event_records: typing.Sequence[typing.Sequence[float]] | None = None,
     ):
         """Initialize an electric vehicle asset model."""
+        assert chargers_power_mw is not None, "chargers_power_mw is required"
+        assert (charge_events is None) != (
+            charge_event_records is None
+        ), "give one of charge_events or charge_event_records"
 
         charger_cfgs = np.array(
             [
@@ -516,25 +1179,59 @@ class EVs:
                 )
             ]
         )
-        charge_event_cfgs = np.array(
-            [
-                ChargeEventConfig(
-                    name=f"charge-event-{name}",
-                    capacity_mwh=capacity_mwh,
-                    efficiency_pct=charge_event_efficiency,
-                )
-                for name, capacity_mwh in enumerate(charge_events_capacity_mwh)
-            ]
-        )
+        if charge_event_records is not None:
+            assert (
+                charge_events_capacity_mwh is None
+            ), "capacity is given by the charge event records"
+            assert all(
+                len(record) == 4 for record in charge_event_records
+            ), "charge event records are (start_interval, end_interval, capacity_mwh, efficiency_pct)"
+            charge_event_cfgs = np.array(
+                [
+                    ChargeEventConfig(
+                        name=f"charge-event-{name}",
+                        capacity_mwh=capacity_mwh,
+                        efficiency_pct=efficiency_pct,
+                        final_soc_mwh=capacity_mwh,
+                        start_interval=start_interval,
+                        end_interval=end_interval,
+                    )
+                    for name, (
+                        start_interval,
+                        end_interval,
+                        capacity_mwh,
+                        efficiency_pct,
+                    ) in enumerate(charge_event_records)
+                ]
+            )
+            dense_charge_events = None
+        else:
+            assert charge_events_capacity_mwh is not None
+            charge_event_cfgs = np.array(
+                [
+                    ChargeEventConfig(
+                        name=f"charge-event-{name}",
+                        capacity_mwh=capacity_mwh,
+                        efficiency_pct=charge_event_efficiency,
+                        final_soc_mwh=capacity_mwh,
+                    )
+                    for name, capacity_mwh in enumerate(charge_events_capacity_mwh)
+                ]
+            )
+            # transpose charge_events to have time as first dimension
+            dense_charge_events = np.array(charge_events).T
+            assert (
+                dense_charge_events.ndim == 2
+            ), "charge_events must be a 2D matrix of (charge events, intervals)"
 
         self.cfg = EVsConfig(
             name=name,
             charger_cfgs=charger_cfgs,
             spill_charger_cfgs=spill_charger_config,
             charge_event_cfgs=charge_event_cfgs,
-            # transpose charge_events to have time as first dimension
-            charge_events=np.array(charge_events).T,
+            charge_events=dense_charge_events,
             freq_mins=freq_mins,
+            aggregate=aggregate,
         )
 
         if electricity_prices is not None or electricity_carbon_intensities is not None:
@@ -548,9 +1245,7 @@ class EVs:
                 optimizer_config=optimizer_config,
             )
             assert isinstance(self.site.cfg.interval_data.idx, np.ndarray)
-            validate_ev_interval_data(
-                self.site.cfg.interval_data.idx, self.cfg.charge_events
-            )
+            validate_ev_interval_data(self.site.cfg.interval_data.idx, self.cfg)
 
     def __repr__(self) -> str:
         """A string representation of self."""
@@ -560,38 +1255,62 @@ class EVs:
         self, optimizer: Optimizer, i: int, freq: Freq, flags: Flags = Flags()
     ) -> tuple:
         """Create EV asset data for a single interval."""
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: Optimizer,
+        idx: typing.Sequence[int],
+        freq: Freq,
+        flags: Flags = Flags(),
+    ) -> list[tuple]:
+        """Create EV asset data for many intervals.
+
+        Args:
+            optimizer: linear program optimizer.
+            idx: the intervals to create data for.
+            freq: interval frequency.
+            flags: boolean flags to change simulation and results behaviour.
+        """
 
         assert isinstance(self.cfg.charge_event_cfgs, np.ndarray)
         assert isinstance(self.cfg.charger_cfgs, np.ndarray)
         assert isinstance(self.cfg.spill_charger_cfgs, np.ndarray)
-        assert isinstance(self.cfg.charge_events, np.ndarray)
 
-        evs, evs_array = evs_one_interval(
+        if self.cfg.aggregate:
+            assert (
+                not flags.allow_evs_discharge
+            ), "aggregate EVs can't discharge - use aggregate=False"
+            return aggregate_all_intervals(optimizer, self.cfg, idx, freq)
+
+        evs = evs_all_intervals(
             optimizer,
             self.cfg,
             self.cfg.charger_cfgs,
             self.cfg.charge_event_cfgs,
-            self.cfg.charge_events,
-            i,
+            idx,
             freq,
             asset_name=self.cfg.name,
             flags=flags,
         )
-        spill_evs, spill_evs_array = evs_one_interval(
+        spill_evs = evs_all_intervals(
             optimizer,
             self.cfg,
             self.cfg.spill_charger_cfgs,
             self.cfg.charge_event_cfgs,
-            self.cfg.charge_events,
-            i,
+            idx,
             freq,
             asset_name=self.cfg.name,
             flags=flags,
             create_charge_event_soc=False,
             create_discharge_variables=False,
             is_spill=True,
+            available_intervals=self.cfg.spill_intervals,
         )
-        return evs, evs_array, spill_evs, spill_evs_array
+        return [
+            (*interval, *spill_interval)
+            for interval, spill_interval in zip(evs, spill_evs, strict=True)
+        ]
 
     def constrain_within_interval(
         self,
@@ -602,47 +1321,58 @@ class EVs:
         flags: Flags = Flags(),
     ) -> None:
         """Constrain EVs dispatch within a single interval"""
+        if self.cfg.aggregate:
+            all_aggregate = ivars.filter_objective_variables(
+                EVOneInterval, asset_name=self.cfg.name
+            )
+            constrain_aggregate_evs(
+                optimizer,
+                [all_aggregate[i]],
+                previous=all_aggregate[i - 1] if i > 0 else None,
+            )
+            return
 
-        assert self.cfg.charge_events is not None
-
-        constrain_charge_discharge_min_max(
+        constrain_evs_within_intervals(
             optimizer,
-            ivars.filter_evs_array(is_spill=False, i=i, asset_name=self.cfg.name),
-            self.cfg.charge_events,
+            self.cfg,
+            [ivars.filter_evs_array(is_spill=False, i=i, asset_name=self.cfg.name)],
+            [ivars.filter_evs_array(is_spill=True, i=i, asset_name=self.cfg.name)],
             freq,
-            self.cfg.charger_cfgs,
-            self.cfg.charge_event_cfgs,
-            i,
-            allow_evs_discharge=flags.allow_evs_discharge,
+            flags,
         )
-
-        constrain_charge_discharge_min_max(
-            optimizer,
-            ivars.filter_evs_array(is_spill=True, i=i, asset_name=self.cfg.name),
-            self.cfg.charge_events,
-            freq,
-            self.cfg.spill_charger_cfgs,
-            self.cfg.charge_event_cfgs,
-            i,
-            #  never allow a spill charger to discharge
-            allow_evs_discharge=False,
+        all_evs = ivars.filter_all_evs_array(False, self.cfg.name)
+        start, stop = max(i - 1, 0), i + 1
+        constrain_connection_charge_events_between_intervals(
+            optimizer, all_evs[start:stop]
         )
 
-        constrain_single_charger_charge_event(
-            optimizer,
-            ivars.filter_evs_array(is_spill=False, i=i, asset_name=self.cfg.name),
-            self.cfg.charger_cfgs,
-            self.cfg.charge_event_cfgs,
-        )
+    def constrain_all_intervals(
+        self,
+        optimizer: Optimizer,
+        ivars: "epl.interval_data.IntervalVars",
+        freq: Freq,
+        flags: Flags = Flags(),
+    ) -> None:
+        """Constrain EVs dispatch within and between all intervals."""
+        if self.cfg.aggregate:
+            constrain_aggregate_evs(
+                optimizer,
+                ivars.filter_objective_variables(
+                    EVOneInterval, asset_name=self.cfg.name
+                ),
+            )
+            return
 
-        constrain_charge_event_electricity_balance(
+        all_evs = ivars.filter_all_evs_array(False, self.cfg.name)
+        constrain_evs_within_intervals(
             optimizer,
-            ivars.filter_evs_array(is_spill=False, i=i, asset_name=self.cfg.name),
-            ivars.filter_evs_array(is_spill=True, i=i, asset_name=self.cfg.name),
-        )
-        constrain_connection_charge_events_between_intervals(
-            optimizer, ivars.filter_all_evs_array(False, self.cfg.name), i
+            self.cfg,
+            all_evs,
+            ivars.filter_all_evs_array(True, self.cfg.name),
+            freq,
+            flags,
         )
+        constrain_connection_charge_events_between_intervals(optimizer, all_evs)
 
     def constrain_after_intervals(
         self,
@@ -650,6 +1380,9 @@ class EVs:
         ivars: "epl.interval_data.IntervalVars",
     ) -> None:
         """Constrain EVs after all interval asset models are created."""
+        #  the aggregate energy envelopes include the initial and final socs
+        if self.cfg.aggregate:
+            return
         assert isinstance(self.cfg.charge_event_cfgs, np.ndarray)
         constrain_initial_final_charge(
             optimizer,
@@ -1,14 +1,20 @@
 """Heat Pump asset."""
+import dataclasses
 import pathlib
+import typing
 
 import numpy as np
 import pulp
 import pydantic
 
 import energypylinear as epl
-from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.assets.asset import (
+    AssetOneInterval,
+    interval_array,
+)
 from energypylinear.defaults import defaults
 from energypylinear.flags import Flags
+from energypylinear.sparse import EQ, LE
 
 
 class HeatPumpConfig(pydantic.BaseModel):
@@ -35,16 +41,56 @@ class HeatPumpConfig(pydantic.BaseModel):
         return value
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class HeatPumpOneInterval(AssetOneInterval):
     """Heat pump asset data for a single interval."""
 
     cfg: HeatPumpConfig
     electric_load_mwh: pulp.LpVariable
-    electric_load_binary: pulp.LpVariable
+    electric_load_binary: pulp.LpVariable | int
     low_temperature_load_mwh: pulp.LpVariable
     high_temperature_generation_mwh: pulp.LpVariable
 
 
+def needs_binary(cfg: HeatPumpConfig, flags: "epl.Flags") -> bool:
+    """Whether the heat pump needs an on / off binary variable.
+
+    The heat pump has no minimum power, so the binary never forces any load -
+    it is only kept when `flags.force_full_milp` is set.
+    """
+    return flags.force_full_milp
+
+
+def constrain_heat_pump_intervals(
+    optimizer: "epl.Optimizer",
+    heat_pumps: list[HeatPumpOneInterval],
+    freq: "epl.Freq",
+) -> None:
+    """Constrain the heat pump electricity and heat balances in many intervals."""
+    cfg = heat_pumps[0].cfg
+    electric = interval_array(heat_pumps, "electric_load_mwh")
+    high_temperature = interval_array(heat_pumps, "high_temperature_generation_mwh")
+    optimizer.constrain_many(
+        [1, -freq.mw_to_mwh(cfg.electric_power_mw)],
+        np.column_stack([electric, interval_array(heat_pumps, "electric_load_binary")]),
+        LE,
+    )
+    optimizer.constrain_many(
+        [1, -cfg.cop], np.column_stack([high_temperature, electric]), EQ
+    )
+    optimizer.constrain_many(
+        [1, 1, -1],
+        np.column_stack(
+            [
+                interval_array(heat_pumps, "low_temperature_load_mwh"),
+                electric,
+                high_temperature,
+            ]
+        ),
+        EQ,
+    )
+
+
 class HeatPump(epl.Asset):
     """Heat pump asset - handles optimization and plotting of results over many intervals.
 
@@ -124,26 +170,46 @@ class HeatPump(epl.Asset):
         self, optimizer: "epl.Optimizer", i: int, freq: "epl.Freq", flags: "epl.Flags"
     ) -> HeatPumpOneInterval:
         """Create asset data for a single interval."""
-        name = f"i:{i},asset:{self.cfg.name}"
-        return HeatPumpOneInterval(
-            cfg=self.cfg,
-            electric_load_mwh=optimizer.continuous(
-                f"electric_load_mwh,{name}",
-                low=0,
-                up=freq.mw_to_mwh(self.cfg.electric_power_mw),
-            ),
-            electric_load_binary=optimizer.binary(
-                f"electric_load_binary,{name}",
-            ),
-            low_temperature_load_mwh=optimizer.continuous(
-                f"low_temperature_load_mwh,{name}",
-                low=0,
-            ),
-            high_temperature_generation_mwh=optimizer.continuous(
-                f"high_temperature_generation_mwh,{name}",
-                low=0,
-            ),
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        idx: typing.Sequence[int],
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> list[HeatPumpOneInterval]:
+        """Create asset data for many intervals."""
+        n = len(idx)
+        name = self.cfg.name
+        electric = optimizer.continuous_array(
+            f"{name}-electric_load_mwh",
+            n,
+            up=freq.mw_to_mwh(self.cfg.electric_power_mw),
+            index=idx,
+        )
+        if needs_binary(self.cfg, flags):
+            binary = optimizer.binary_array(
+                f"{name}-electric_load_binary", n, index=idx
+            )
+        else:
+            binary = np.ones(n, dtype=object)
+        low_temperature = optimizer.continuous_array(
+            f"{name}-low_temperature_load_mwh", n, index=idx
+        )
+        high_temperature = optimizer.continuous_array(
+            f"{name}-high_temperature_generation_mwh", n, index=idx
         )
+        return [
+            HeatPumpOneInterval(
+                cfg=self.cfg,
+                electric_load_mwh=electric[k],
+                electric_load_binary=binary[k],
+                low_temperature_load_mwh=low_temperature[k],
+                high_temperature_generation_mwh=high_temperature[k],
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -158,19 +224,24 @@ class HeatPump(epl.Asset):
             HeatPumpOneInterval, i=i, asset_name=self.cfg.name
         )[0][0]
         assert isinstance(heat_pump, HeatPumpOneInterval)
-        optimizer.constrain_max(
-            heat_pump.electric_load_mwh,
-            heat_pump.electric_load_binary,
-            freq.mw_to_mwh(heat_pump.cfg.electric_power_mw),
-        )
-        optimizer.constrain(
-            heat_pump.high_temperature_generation_mwh
-            == heat_pump.electric_load_mwh * heat_pump.cfg.cop
-        )
-        optimizer.constrain(
-            heat_pump.low_temperature_load_mwh + heat_pump.electric_load_mwh
-            == heat_pump.high_temperature_generation_mwh
-        )
+        constrain_heat_pump_intervals(optimizer, [heat_pump], freq)
+
+    def constrain_all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        ivars: "epl.IntervalVars",
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> None:
+        """Constrain asset within all intervals."""
+        heat_pumps = []
+        for intervals in ivars.filter_objective_variables(
+            HeatPumpOneInterval, i=None, asset_name=self.cfg.name
+        ):
+            heat_pump = intervals[0]
+            assert isinstance(heat_pump, HeatPumpOneInterval)
+            heat_pumps.append(heat_pump)
+        constrain_heat_pump_intervals(optimizer, heat_pumps, freq)
 
     def constrain_after_intervals(
         self,
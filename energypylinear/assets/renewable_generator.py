@@ -2,6 +2,8 @@
 Renewable Generator asset.
 
 Suitable for modelling either turndownable wind or solar."""
+import dataclasses
+import typing
 
 import numpy as np
 import pydantic
@@ -53,6 +55,7 @@ class RenewableGeneratorConfig(pydantic.BaseModel):
     freq_mins: int
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class RenewableGeneratorOneInterval(AssetOneInterval):
     """Contains linear program data for a single interval."""
 
@@ -127,17 +130,31 @@ class RenewableGenerator(epl.Asset):
         self, optimizer: "epl.Optimizer", i: int, freq: "epl.Freq", flags: "epl.Flags"
     ) -> RenewableGeneratorOneInterval:
         """Create asset data for a single interval."""
-        name = f"i:{i},asset:{self.cfg.name}"
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        idx: typing.Sequence[int],
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> list[RenewableGeneratorOneInterval]:
+        """Create asset data for many intervals."""
         assert isinstance(self.cfg.interval_data.electric_generation_mwh, np.ndarray)
-        return RenewableGeneratorOneInterval(
-            cfg=self.cfg,
-            electric_generation_mwh=optimizer.continuous(
-                f"electric_generation_mwh,{name}",
-                low=self.cfg.interval_data.electric_generation_mwh[i]
-                * self.cfg.electric_generation_lower_bound_pct,
-                up=self.cfg.interval_data.electric_generation_mwh[i],
-            ),
+        available = self.cfg.interval_data.electric_generation_mwh[np.asarray(idx)]
+        generation = optimizer.continuous_array(
+            f"{self.cfg.name}-electric_generation_mwh",
+            len(idx),
+            low=available * self.cfg.electric_generation_lower_bound_pct,
+            up=available,
+            index=idx,
         )
+        return [
+            RenewableGeneratorOneInterval(
+                cfg=self.cfg, electric_generation_mwh=generation[k]
+            )
+            for k in range(len(idx))
+        ]
 
     def constrain_within_interval(
         self,
@@ -148,7 +165,19 @@ class RenewableGenerator(epl.Asset):
         flags: "epl.Flags",
     ) -> None:
         """Constrain optimization within a single interval."""
-        pass
+
+    def constrain_all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        ivars: "epl.IntervalVars",
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> None:
+        """Constrain optimization within all intervals.
+
+        Generation is bounded by the variable bounds set in `all_intervals`,
+        so there are no constraints to add.
+        """
 
     def constrain_after_intervals(
         self,
@@ -156,7 +185,6 @@ class RenewableGenerator(epl.Asset):
         ivars: "epl.IntervalVars",
     ) -> None:
         """Constrain asset after all intervals."""
-        pass
 
     def optimize(
         self,
@@ -1,14 +1,18 @@
 """Site asset for optimizing dispatch of combined heat and power (CHP) generators."""
+import dataclasses
+import typing
 
 import numpy as np
 import pulp
 import pydantic
 
 import energypylinear as epl
+from energypylinear.assets.asset import interval_array
 from energypylinear.defaults import defaults
 from energypylinear.flags import Flags
 from energypylinear.freq import Freq
 from energypylinear.optimizer import Optimizer
+from energypylinear.sparse import EQ, LE
 from energypylinear.utils import repeat_to_match_length
 
 
@@ -120,19 +124,19 @@ class SiteConfig(pydantic.BaseModel):
     export_limit_mw: float
 
 
-class SiteOneInterval(pydantic.BaseModel):
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
+class SiteOneInterval:
     """Site data for a single interval."""
 
     cfg: SiteConfig
 
     import_power_mwh: pulp.LpVariable
     export_power_mwh: pulp.LpVariable
-    import_power_bin: pulp.LpVariable
-    export_power_bin: pulp.LpVariable
+    import_power_bin: pulp.LpVariable | int
+    export_power_bin: pulp.LpVariable | int
 
     import_limit_mwh: float
     export_limit_mwh: float
-    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
 
 
 def constrain_site_electricity_balance(
@@ -172,20 +176,121 @@ def constrain_site_electricity_balance(
     )
 
 
+def pad_terms(
+    rows: list[list[tuple[float, typing.Any]]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pad the terms of each row into (rows, terms) arrays for `constrain_many`.
+
+    Rows with fewer terms are padded with zero coefficients of the constant 0.
+
+    Args:
+        rows: the (coefficient, variable) terms of each row.
+    """
+    width = max(len(row) for row in rows)
+    coefficients = np.zeros((len(rows), width))
+    variables = np.zeros((len(rows), width), dtype=object)
+    for r, row in enumerate(rows):
+        for t, (coefficient, variable) in enumerate(row):
+            coefficients[r, t] = coefficient
+            variables[r, t] = variable
+    return coefficients, variables
+
+
+def constrain_site_balances(
+    optimizer: Optimizer,
+    cfg: SiteConfig,
+    ivars: "epl.interval_data.IntervalVars",
+    interval_data: SiteIntervalData,
+) -> dict[str, np.ndarray]:
+    """Constrain the site energy balances in all intervals.
+
+    Creates the same constraints as `constrain_site_electricity_balance`,
+    `constrain_site_high_temperature_heat_balance` and
+    `constrain_site_low_temperature_heat_balance`, one block of rows each.
+
+    Returns:
+        The rows of the electric, high and low temperature balances.
+    """
+    electric = []
+    high_temperature = []
+    low_temperature = []
+    for k, site in enumerate(ivars.asset[cfg.name]["site"]):
+        assets = ivars.objective_variables[k]
+        spills = ivars.filter_objective_variables(
+            epl.assets.spill.SpillOneInterval, i=k
+        )[0]
+        electric.append(
+            [(1.0, site.import_power_mwh), (-1.0, site.export_power_mwh)]
+            + [(1.0, a.electric_generation_mwh) for a in assets]
+            + [(-1.0, a.electric_load_mwh) for a in assets]
+            + [(-1.0, a.electric_charge_mwh) for a in assets]
+            + [(1.0, a.electric_discharge_mwh) for a in assets]
+            + (
+                [
+                    (1.0, spills[-1].electric_generation_mwh),
+                    (-1.0, spills[-1].electric_load_mwh),
+                ]
+                if spills
+                else []
+            )
+        )
+        high_temperature.append(
+            [(1.0, a.high_temperature_generation_mwh) for a in assets]
+            + [(-1.0, a.high_temperature_load_mwh) for a in assets]
+        )
+        low_temperature.append(
+            [(1.0, a.low_temperature_generation_mwh) for a in assets]
+            + [(-1.0, a.low_temperature_load_mwh) for a in assets]
+        )
+
+    assert isinstance(interval_data.electric_load_mwh, np.ndarray)
+    assert isinstance(interval_data.high_temperature_load_mwh, np.ndarray)
+    assert isinstance(interval_data.low_temperature_load_mwh, np.ndarray)
+    assert isinstance(interval_data.low_temperature_generation_mwh, np.ndarray)
+    return {
+        "electric": optimizer.constrain_many(
+            *pad_terms(electric), EQ, interval_data.electric_load_mwh
+        ),
+        "high_temperature": optimizer.constrain_many(
+            *pad_terms(high_temperature), EQ, interval_data.high_temperature_load_mwh
+        ),
+        "low_temperature": optimizer.constrain_many(
+            *pad_terms(low_temperature),
+            EQ,
+            interval_data.low_temperature_load_mwh
+            - interval_data.low_temperature_generation_mwh,
+        ),
+    }
+
+
 def constrain_site_import_export(
     optimizer: Optimizer,
     cfg: SiteConfig,
     ivars: "epl.interval_data.IntervalVars",
 ) -> None:
-    """Constrain to only do one of import and export electricity in an interval."""
-    site = ivars.filter_site(i=-1, site_name=cfg.name)
-    optimizer.constrain(
-        site.import_power_mwh - site.import_limit_mwh * site.import_power_bin <= 0
+    """Constrain to only do one of import and export electricity in an interval.
+
+    Constrains all the intervals in `ivars` at once.
+    """
+    sites = ivars.asset[cfg.name]["site"]
+    import_power = interval_array(sites, "import_power_mwh")
+    export_power = interval_array(sites, "export_power_mwh")
+    import_bin = interval_array(sites, "import_power_bin")
+    export_bin = interval_array(sites, "export_power_bin")
+    import_limit = interval_array(sites, "import_limit_mwh").astype(np.float64)
+    export_limit = interval_array(sites, "export_limit_mwh").astype(np.float64)
+    ones = np.ones(len(sites))
+    optimizer.constrain_many(
+        np.column_stack([ones, -import_limit]),
+        np.column_stack([import_power, import_bin]),
+        LE,
     )
-    optimizer.constrain(
-        site.export_power_mwh - site.export_limit_mwh * site.export_power_bin <= 0
+    optimizer.constrain_many(
+        np.column_stack([ones, -export_limit]),
+        np.column_stack([export_power, export_bin]),
+        LE,
     )
-    optimizer.constrain(site.import_power_bin + site.export_power_bin == 1)
+    optimizer.constrain_many(1, np.column_stack([import_bin, export_bin]), EQ, 1)
 
 
 def constrain_site_high_temperature_heat_balance(
@@ -268,24 +373,27 @@ class Site:
         """Initialize a Site asset model."""
         self.assets = assets
 
-        self.cfg = SiteConfig(
-            name=name,
-            interval_data=SiteIntervalData(
-                electricity_prices=electricity_prices,
-                export_electricity_prices=export_electricity_prices,
-                electricity_carbon_intensities=electricity_carbon_intensities,
-                gas_prices=gas_prices,
-                electric_load_mwh=electric_load_mwh,
-                high_temperature_load_mwh=high_temperature_load_mwh,
-                low_temperature_load_mwh=low_temperature_load_mwh,
-                low_temperature_generation_mwh=low_temperature_generation_mwh,
-            ),
-            import_limit_mw=import_limit_mw,
-            export_limit_mw=export_limit_mw,
-            freq_mins=freq_mins,
-        )
+        #  validation is timed here, and added to the timings of each build
+        self.validation_timings = epl.telemetry.Timings()
+        with self.validation_timings.phase("validation"):
+            self.cfg = SiteConfig(
+                name=name,
+                interval_data=SiteIntervalData(
+                    electricity_prices=electricity_prices,
+                    export_electricity_prices=export_electricity_prices,
+                    electricity_carbon_intensities=electricity_carbon_intensities,
+                    gas_prices=gas_prices,
+                    electric_load_mwh=electric_load_mwh,
+                    high_temperature_load_mwh=high_temperature_load_mwh,
+                    low_temperature_load_mwh=low_temperature_load_mwh,
+                    low_temperature_generation_mwh=low_temperature_generation_mwh,
+                ),
+                import_limit_mw=import_limit_mw,
+                export_limit_mw=export_limit_mw,
+                freq_mins=freq_mins,
+            )
 
-        validate_interval_data(assets, self)
+            validate_interval_data(assets, self)
 
         self.optimizer_cfg = optimizer_config
 
@@ -293,23 +401,78 @@ class Site:
         """A string representation of self."""
         return f"<energypylinear.Site assets: {len(self.assets)}>"
 
+    def __getstate__(self) -> dict:
+        """Pickle the site configuration and assets, without the linear program.
+
+        The optimizer, balance constraint rows, tightening and binary elimination
+        reports are rebuilt by `build`.
+        """
+        state = self.__dict__.copy()
+        state.pop("optimizer", None)
+        state.pop("balance_rows", None)
+        state.pop("tightening", None)
+        state.pop("elimination", None)
+        return state
+
     def one_interval(
         self, optimizer: Optimizer, site: SiteConfig, i: int, freq: Freq
     ) -> SiteOneInterval:
         """Create Site asset data for a single interval."""
-        return SiteOneInterval(
-            cfg=site,
-            import_power_mwh=optimizer.continuous(
-                f"import_power_mw-{i}", up=freq.mw_to_mwh(self.cfg.import_limit_mw)
-            ),
-            export_power_mwh=optimizer.continuous(
-                f"export_power_mw-{i}", up=freq.mw_to_mwh(self.cfg.export_limit_mw)
-            ),
-            import_power_bin=optimizer.binary(f"import_power_bin-{i}"),
-            export_power_bin=optimizer.binary(f"export_power_bin-{i}"),
-            import_limit_mwh=freq.mw_to_mwh(site.import_limit_mw),
-            export_limit_mwh=freq.mw_to_mwh(site.export_limit_mw),
+        return self.all_intervals(optimizer, site, [i], freq)[0]
+
+    def all_intervals(
+        self,
+        optimizer: Optimizer,
+        site: SiteConfig,
+        idx: typing.Sequence[int],
+        freq: Freq,
+        import_limit_mwh: np.ndarray | None = None,
+        export_limit_mwh: np.ndarray | None = None,
+        binaries: bool = True,
+    ) -> list[SiteOneInterval]:
+        """Create Site asset data for many intervals.
+
+        Args:
+            optimizer: linear program optimizer.
+            site: the site configuration.
+            idx: the intervals to create data for.
+            freq: interval frequency.
+            import_limit_mwh: import limit of each interval - defaults to the
+                site import limit.
+            export_limit_mwh: export limit of each interval - defaults to the
+                site export limit.
+            binaries: whether to create the import and export binary variables -
+                without them the site can import and export in one interval.
+        """
+        n = len(idx)
+        if import_limit_mwh is None:
+            import_limit_mwh = np.full(n, freq.mw_to_mwh(site.import_limit_mw))
+        if export_limit_mwh is None:
+            export_limit_mwh = np.full(n, freq.mw_to_mwh(site.export_limit_mw))
+        import_power = optimizer.continuous_array(
+            "import_power_mw", n, up=import_limit_mwh, index=idx
         )
+        export_power = optimizer.continuous_array(
+            "export_power_mw", n, up=export_limit_mwh, index=idx
+        )
+        if binaries:
+            import_bin = optimizer.binary_array("import_power_bin", n, index=idx)
+            export_bin = optimizer.binary_array("export_power_bin", n, index=idx)
+        else:
+            import_bin = np.ones(n, dtype=object)
+            export_bin = np.ones(n, dtype=object)
+        return [
+            SiteOneInterval(
+                cfg=site,
+                import_power_mwh=import_power[k],
+                export_power_mwh=export_power[k],
+                import_power_bin=import_bin[k],
+                export_power_bin=export_bin[k],
+                import_limit_mwh=float(import_limit_mwh[k]),
+                export_limit_mwh=float(export_limit_mwh[k]),
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -318,29 +481,75 @@ class Site:
         interval_data: SiteIntervalData,
         i: int,
     ) -> None:
-        """Constrain site within a single interval."""
+        """Constrain site within a single interval.
+
+        The row of each balance constraint is recorded in `balance_rows`, so the
+        interval data in the right hand side can be updated after compiling.
+
+        The import and export constraints are added for all intervals by `build`.
+        """
+        self.balance_rows["electric"].append(optimizer.n_constraints())
         constrain_site_electricity_balance(optimizer, self.cfg, ivars, interval_data, i)
-        constrain_site_import_export(optimizer, self.cfg, ivars)
+        self.balance_rows["high_temperature"].append(optimizer.n_constraints())
         constrain_site_high_temperature_heat_balance(
             optimizer, self.cfg, ivars, interval_data, i
         )
+        self.balance_rows["low_temperature"].append(optimizer.n_constraints())
         constrain_site_low_temperature_heat_balance(
             optimizer, self.cfg, ivars, interval_data, i
         )
 
-    def optimize(
+    def constrain_all_intervals(
+        self,
+        optimizer: Optimizer,
+        ivars: "epl.interval_data.IntervalVars",
+        interval_data: SiteIntervalData,
+    ) -> None:
+        """Constrain site within all intervals.
+
+        Creates the same constraints as `constrain_within_interval`, one block of
+        rows for each balance, and records the rows in `balance_rows`.
+        """
+        rows = constrain_site_balances(optimizer, self.cfg, ivars, interval_data)
+        for name, balance_rows in rows.items():
+            self.balance_rows[name].extend(balance_rows.tolist())
+
+    def build(
         self,
         objective: str = "price",
         flags: Flags = Flags(),
-        verbose: bool = True,
-    ) -> "epl.SimulationResult":
-        """Optimize sites dispatch using a mixed-integer linear program.
+        optimizer_cfg: "epl.OptimizerConfig | None" = None,
+        fixed_interval_data: bool = True,
+    ) -> "epl.IntervalVars":
+        """Build the linear program for the site and assets, without solving.
+
+        The big-M constraints are tightened from the asset configurations and
+        interval data - how much each was tightened is kept in `tightening`.
+
+        Binary variables that can't change the optimal dispatch are left out,
+        unless `flags.force_full_milp` is set - the binary variables left out
+        are kept in `elimination`.
+
+        The time spent in each phase of the build is kept in `optimizer.timings`.
+
+        Args:
+            objective: name of the objective to minimize.
+            flags: boolean flags to change simulation and results behaviour.
+            optimizer_cfg: optimizer configuration - defaults to the site config.
+            fixed_interval_data: whether the site interval data stays fixed -
+                False when the loads are updated after building.
 
         Returns:
-            epl.results.SimulationResult
+            The linear program variables for each interval.
         """
-
-        self.optimizer = Optimizer(self.optimizer_cfg)
+        self.optimizer = Optimizer(optimizer_cfg or self.optimizer_cfg)
+        timings = self.optimizer.timings
+        timings.update(self.validation_timings)
+        self.balance_rows: dict[str, list[int]] = {
+            "electric": [],
+            "high_temperature": [],
+            "low_temperature": [],
+        }
         freq = Freq(self.cfg.freq_mins)
 
         #  TODO this is repeated in `validate_interval_data`
@@ -352,61 +561,338 @@ class Site:
 
         #  TODO warn about sites without boilers?  warn sites without valve / spill?
 
+        #  create the linear program data for all intervals up front where we can
+        idx = list(self.cfg.interval_data.idx)
+        with timings.phase("tightening"):
+            self.tightening = epl.tightening.tighten(self, flags, fixed_interval_data)
+            self.elimination = epl.elimination.eliminate_binaries(
+                self, objective, flags, fixed_interval_data
+            )
+        site_binaries = (
+            f"{self.cfg.name}-import_power_bin" not in self.elimination.eliminated
+        )
+        asset_flags = {
+            asset.cfg.name: self.elimination.asset_flags(asset, flags)
+            for asset in self.assets
+        }
+        with timings.phase("variables"):
+            sites = self.all_intervals(
+                self.optimizer,
+                self.cfg,
+                idx,
+                freq,
+                import_limit_mwh=self.tightening.bounds[
+                    f"{self.cfg.name}-import_power_mwh"
+                ].tightened,
+                export_limit_mwh=self.tightening.bounds[
+                    f"{self.cfg.name}-export_power_mwh"
+                ].tightened,
+                binaries=site_binaries,
+            )
+            intervals = {
+                asset.cfg.name: asset.all_intervals(
+                    self.optimizer, idx, freq, asset_flags[asset.cfg.name]
+                )
+                for asset in self.assets
+                if hasattr(asset, "all_intervals")
+            }
+
         ivars = epl.IntervalVars()
-        for i in self.cfg.interval_data.idx:
-            ivars.append(self.one_interval(self.optimizer, self.cfg, i, freq))
+        for n, i in enumerate(idx):
+            ivars.append(sites[n])
+
+            with timings.phase("variables"):
+                assets = []
+                for asset in self.assets:
+                    if asset.cfg.name in intervals:
+                        neu_assets = intervals[asset.cfg.name][n]
+                    else:
+                        neu_assets = asset.one_interval(
+                            self.optimizer, i, freq, asset_flags[asset.cfg.name]
+                        )
+                    #  tech debt TODO
+                    #  EV is special because it returns many one interval blocks per step
+                    if isinstance(asset, epl.EVs):
+                        evs, evs_array, spill_evs, spill_evs_array = neu_assets
+                        assets.extend(evs)
+                        assets.extend(spill_evs)
+                        #  ivars has special logic for append
+                        #  the EVsArrayOneInterval deals with them separately
+                        ivars.append(evs_array)
+                        ivars.append(spill_evs_array)
+                    else:
+                        assets.append(neu_assets)
+                ivars.append(assets)
+
+            with timings.phase("constraints"):
+                #  assets without a whole horizon hook are constrained one interval at a time
+                for asset in self.assets:
+                    if not hasattr(asset, "constrain_all_intervals"):
+                        asset.constrain_within_interval(
+                            self.optimizer,
+                            ivars,
+                            i,
+                            flags=asset_flags[asset.cfg.name],
+                            freq=freq,
+                        )
 
-            assets = []
+        with timings.phase("constraints"):
+            self.constrain_all_intervals(self.optimizer, ivars, self.cfg.interval_data)
+            if site_binaries:
+                constrain_site_import_export(self.optimizer, self.cfg, ivars)
             for asset in self.assets:
-                neu_assets = asset.one_interval(self.optimizer, i, freq, flags)
-                #  tech debt TODO
-                #  EV is special because it returns many one interval blocks per step
-                if isinstance(asset, epl.EVs):
-                    evs, evs_array, spill_evs, spill_evs_array = neu_assets
-                    assets.extend(evs)
-                    assets.extend(spill_evs)
-                    #  ivars has special logic for append
-                    #  the EVsArrayOneInterval deals with them separately
-                    ivars.append(evs_array)
-                    ivars.append(spill_evs_array)
-                else:
-                    assets.append(neu_assets)
-
-            ivars.append(assets)
-
-            self.constrain_within_interval(
-                self.optimizer, ivars, self.cfg.interval_data, i
-            )
+                if hasattr(asset, "constrain_all_intervals"):
+                    asset.constrain_all_intervals(
+                        self.optimizer,
+                        ivars,
+                        flags=asset_flags[asset.cfg.name],
+                        freq=freq,
+                    )
+
             for asset in self.assets:
-                asset.constrain_within_interval(
-                    self.optimizer, ivars, i, flags=flags, freq=freq
+                asset.constrain_after_intervals(
+                    self.optimizer,
+                    ivars,
                 )
 
-        for asset in self.assets:
-            asset.constrain_after_intervals(
-                self.optimizer,
-                ivars,
+        with timings.phase("objective"):
+            objective_fn = epl.objectives[objective]
+            self.optimizer.objective(
+                objective_fn(
+                    self.optimizer,
+                    ivars,
+                    self.cfg.interval_data,
+                )
             )
+        return ivars
 
-        objective_fn = epl.objectives[objective]
-        self.optimizer.objective(
-            objective_fn(
-                self.optimizer,
-                ivars,
-                self.cfg.interval_data,
-            )
+    def compile(
+        self,
+        objective: str = "price",
+        flags: Flags = Flags(),
+    ) -> "epl.CompiledSite":
+        """Build a persistent linear program that can be re-solved for new interval data.
+
+        The site interval data (prices, carbon intensities and loads) can be
+        updated in place on the compiled site, which skips model construction
+        when re-solving.
+
+        Args:
+            objective: name of the objective to minimize.
+            flags: boolean flags to change simulation and results behaviour.
+
+        Returns:
+            epl.CompiledSite
+        """
+        cfg = dataclasses.replace(self.optimizer_cfg, builder="sparse")
+        ivars = self.build(
+            objective=objective,
+            flags=flags,
+            optimizer_cfg=cfg,
+            fixed_interval_data=False,
         )
+        return epl.CompiledSite(self, ivars, objective=objective, flags=flags)
 
-        status = self.optimizer.solve(
+    def optimize_rolling(
+        self,
+        window: int,
+        commit: int | None = None,
+        overlap: int | None = None,
+        objective: str = "price",
+        flags: Flags = Flags(),
+        verbose: bool = False,
+    ) -> "epl.SimulationResult":
+        """Optimize sites dispatch as a rolling horizon of smaller linear programs.
+
+        Battery and EV charge event state of charge is carried between windows.
+
+        Args:
+            window: number of intervals optimized in each window.
+            commit: number of intervals kept from each window.
+            overlap: number of look ahead intervals solved but not kept.
+            objective: name of the objective to minimize.
+            flags: boolean flags to change simulation and results behaviour.
+            verbose: level of printing.
+
+        Returns:
+            epl.results.SimulationResult
+        """
+        return epl.rolling.optimize_rolling(
+            self,
+            epl.RollingHorizonConfig(window=window, commit=commit, overlap=overlap),
+            objective=objective,
+            flags=flags,
             verbose=verbose,
-            allow_infeasible=flags.allow_infeasible
         )
 
-        return epl.extract_results(
+    def optimize_many(
+        self,
+        scenarios: typing.Sequence[typing.Mapping],
+        workers: int = 1,
+        objective: str = "price",
+        flags: Flags = Flags(),
+        verbose: bool = False,
+    ) -> list["epl.SimulationResult"]:
+        """Optimize sites dispatch for many scenarios of site interval data.
+
+        Each worker compiles the site once and re-solves it for each scenario.
+
+        Args:
+            scenarios: site interval data overrides for each scenario, for
+                example `{"electricity_prices": prices}`.
+            workers: number of processes - 1 solves in this process.
+            objective: name of the objective to minimize.
+            flags: boolean flags to change simulation and results behaviour.
+            verbose: level of printing.
+
+        Returns:
+            A list of epl.results.SimulationResult, in the order of the scenarios.
+        """
+        return epl.batch.optimize_many(
             self,
-            self.assets,
-            ivars,
-            feasible=status.feasible,
-            verbose=verbose,
+            scenarios,
+            workers=workers,
+            objective=objective,
             flags=flags,
+            verbose=verbose,
         )
+
+    def optimize(
+        self,
+        objective: str = "price",
+        flags: Flags = Flags(),
+        verbose: bool = True,
+        decomposition: "epl.DecompositionConfig | None" = None,
+        cache: "epl.ResultsCache | None" = None,
+        latency_budget: "epl.LatencyBudget | None" = None,
+        warm_start: "epl.WarmStart | None" = None,
+    ) -> "epl.SimulationResult":
+        """Optimize sites dispatch using a mixed-integer linear program.
+
+        With `flags.two_phase_spill`, spill variables are only added when the
+        site is infeasible without them - see `energypylinear.two_phase`.
+
+        With a `latency_budget`, a result always comes back within the budget,
+        labelled with its quality - see `energypylinear.anytime`.
+
+        With a `warm_start`, the solver starts from a previous or heuristic
+        dispatch - see `energypylinear.warm_start`.
+
+        Args:
+            objective: name of the objective to minimize.
+            flags: boolean flags to change simulation and results behaviour.
+            verbose: level of printing.
+            decomposition: optionally solve the horizon as chunks coordinated
+                through the state of charge of storage - see
+                `energypylinear.decomposition`.
+            cache: optionally reuse the results of an identical optimization,
+                skipping the build and solve of the linear program.
+            latency_budget: optionally solve within a time budget, falling
+                back to a repaired linear program relaxation.
+            warm_start: optionally pass a MIP start to the solver - not used
+                with a decomposition, latency budget or two phase spill.
+
+        Returns:
+            epl.results.SimulationResult
+        """
+        if cache is not None:
+            #  a cache hit keeps the reports of the stored optimization, with the
+            #  timings of this lookup
+            timings = epl.telemetry.Timings()
+            timings.update(self.validation_timings)
+            with timings.phase("cache"):
+                key = epl.cache.cache_key(
+                    self,
+                    objective=objective,
+                    flags=flags,
+                    decomposition=decomposition,
+                    latency_budget=latency_budget,
+                )
+                cached = cache.get(key)
+            if cached is not None:
+                return epl.SimulationResult(
+                    site=self,
+                    assets=self.assets,
+                    results=cached.results,
+                    feasible=cached.feasible,
+                    spill=cached.spill,
+                    decomposition=cached.decomposition,
+                    tightening=cached.tightening,
+                    elimination=cached.elimination,
+                    spill_phase=cached.spill_phase,
+                    timings=timings,
+                    model_stats=cached.model_stats,
+                    solver_stats=cached.solver_stats,
+                    anytime=cached.anytime,
+                    warm_start=cached.warm_start,
+                )
+
+        if warm_start is not None:
+            assert (
+                decomposition is None
+                and latency_budget is None
+                and not flags.two_phase_spill
+            ), "warm_start is only used when solving the whole horizon at once"
+
+        if decomposition is not None:
+            simulation = epl.decomposition.optimize_decomposed(
+                self, decomposition, objective=objective, flags=flags, verbose=verbose
+            )
+
+        elif latency_budget is not None:
+            simulation = epl.anytime.optimize_anytime(
+                self, latency_budget, objective=objective, flags=flags, verbose=verbose
+            )
+
+        elif flags.two_phase_spill:
+            simulation = epl.two_phase.optimize_two_phase(
+                self, objective=objective, flags=flags, verbose=verbose
+            )
+
+        else:
+            #  a previous result of this site is read before the build
+            #  replaces its optimizer
+            start = warm_start.values() if warm_start is not None else None
+            ivars = self.build(objective=objective, flags=flags)
+            if start is not None:
+                mapped = self.optimizer.set_warm_start(start)
+
+            status = self.optimizer.solve(
+                verbose=verbose,
+                allow_infeasible=flags.allow_infeasible
+            )
+
+            simulation = epl.extract_results(
+                self,
+                self.assets,
+                ivars,
+                feasible=status.feasible,
+                verbose=verbose,
+                flags=flags,
+            )
+            if start is not None:
+                simulation.warm_start = epl.warm_start.WarmStartReport(
+                    mapped=mapped,
+                    variables=len(self.optimizer.variables()),
+                    accepted=status.stats.mip_start,
+                    objective=status.stats.mip_start_objective,
+                )
+
+        if cache is not None:
+            cache.put(
+                key,
+                epl.cache.CachedResult(
+                    results=simulation.results,
+                    feasible=simulation.feasible,
+                    spill=simulation.spill,
+                    decomposition=simulation.decomposition,
+                    spill_phase=simulation.spill_phase,
+                    anytime=simulation.anytime,
+                    tightening=simulation.tightening,
+                    elimination=simulation.elimination,
+                    model_stats=simulation.model_stats,
+                    solver_stats=simulation.solver_stats,
+                    warm_start=simulation.warm_start,
+                ),
+            )
+        return simulation
@@ -2,8 +2,10 @@
 
 This allows infeasible simulations to become feasible. If a spill asset is used, then a warning is raised.
 """
+import dataclasses
 import typing
 
+import numpy as np
 import pulp
 import pydantic
 
@@ -11,10 +13,14 @@ import energypylinear as epl
 from energypylinear.assets.asset import AssetOneInterval
 
 
-class SpillConfig(AssetOneInterval):
-    """Spill configuration."""
+class SpillConfig(pydantic.BaseModel):
+    """Spill configuration.
+
+    Spill variables are only created in `intervals` - in all intervals when None.
+    """
 
     name: str = "spill"
+    intervals: list[int] | None = None
 
     @pydantic.validator("name")
     def check_name(cls, name: str) -> str:
@@ -23,14 +29,15 @@ class SpillConfig(AssetOneInterval):
         return name
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class SpillOneInterval(AssetOneInterval):
     """Spill asset data for a single interval."""
 
-    cfg: SpillConfig = SpillConfig()
-    electric_generation_mwh: pulp.LpVariable
-    electric_load_mwh: pulp.LpVariable
-    high_temperature_generation_mwh: pulp.LpVariable
-    low_temperature_load_mwh: pulp.LpVariable
+    cfg: SpillConfig = dataclasses.field(default_factory=SpillConfig)
+    electric_generation_mwh: pulp.LpVariable | int
+    electric_load_mwh: pulp.LpVariable | int
+    high_temperature_generation_mwh: pulp.LpVariable | int
+    low_temperature_load_mwh: pulp.LpVariable | int
 
     electric_charge_mwh: float = 0.0
     electric_discharge_mwh: float = 0.0
@@ -39,9 +46,14 @@ class SpillOneInterval(AssetOneInterval):
 class Spill(epl.Asset):
     """Spill asset - allows excess or insufficient balances to be filled in."""
 
-    def __init__(self, name: str = "spill"):
-        """Initializes the asset."""
-        self.cfg = SpillConfig(name=name)
+    def __init__(self, name: str = "spill", intervals: list[int] | None = None):
+        """Initializes the asset.
+
+        Args:
+            name: the asset name - must contain `spill`.
+            intervals: the intervals spill is allowed in - all intervals when None.
+        """
+        self.cfg = SpillConfig(name=name, intervals=intervals)
 
     def __repr__(self) -> str:
         """A string representation of self."""
@@ -55,21 +67,38 @@ class Spill(epl.Asset):
         flags: epl.flags.Flags = epl.flags.Flags(),
     ) -> SpillOneInterval:
         """Generate linear program data for one interval."""
-        return SpillOneInterval(
-            cfg=self.cfg,
-            electric_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_generation_mwh-{i}", low=0
-            ),
-            high_temperature_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-high_temperature_generation_mwh-{i}", low=0
-            ),
-            electric_load_mwh=optimizer.continuous(
-                f"{self.cfg.name}-electric_load_mwh-{i}", low=0
-            ),
-            low_temperature_load_mwh=optimizer.continuous(
-                f"{self.cfg.name}-low_temperature_load_mwh-{i}", low=0
-            ),
-        )
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: epl.optimizer.Optimizer,
+        idx: typing.Sequence[int],
+        freq: epl.freq.Freq,
+        flags: epl.flags.Flags = epl.flags.Flags(),
+    ) -> list[SpillOneInterval]:
+        """Generate linear program data for many intervals."""
+        n = len(idx)
+        mask = None
+        if self.cfg.intervals is not None:
+            mask = np.isin(np.asarray(idx), self.cfg.intervals)
+        variables = {
+            quantity: optimizer.continuous_array(
+                f"{self.cfg.name}-{quantity}", n, index=idx, mask=mask
+            )
+            for quantity in [
+                "electric_generation_mwh",
+                "high_temperature_generation_mwh",
+                "electric_load_mwh",
+                "low_temperature_load_mwh",
+            ]
+        }
+        return [
+            SpillOneInterval(
+                cfg=self.cfg,
+                **{quantity: values[k] for quantity, values in variables.items()},
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self, *args: typing.Any, **kwargs: typing.Any
@@ -3,11 +3,19 @@
 This allows high temperature heat generated by either gas boilers or
 CHP generators to be used for low temperature heat consumption.
 """
+import dataclasses
+import typing
+
+import numpy as np
 import pulp
 import pydantic
 
 import energypylinear as epl
-from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.assets.asset import (
+    AssetOneInterval,
+    interval_array,
+)
+from energypylinear.sparse import EQ
 
 
 class ValveConfig(pydantic.BaseModel):
@@ -22,6 +30,7 @@ class ValveConfig(pydantic.BaseModel):
         return name
 
 
+@dataclasses.dataclass(slots=True, kw_only=True, eq=False)
 class ValveOneInterval(AssetOneInterval):
     """Valve asset data for a single interval."""
 
@@ -45,15 +54,31 @@ class Valve(epl.Asset):
         self, optimizer: "epl.Optimizer", i: int, freq: "epl.Freq", flags: "epl.Flags"
     ) -> ValveOneInterval:
         """Create asset data for a single interval."""
-        return ValveOneInterval(
-            cfg=self.cfg,
-            high_temperature_load_mwh=optimizer.continuous(
-                f"{self.cfg.name}-high_temperature_load_mwh-{i}", low=0
-            ),
-            low_temperature_generation_mwh=optimizer.continuous(
-                f"{self.cfg.name}-low_temperature_generation_mwh-{i}", low=0
-            ),
+        return self.all_intervals(optimizer, [i], freq, flags)[0]
+
+    def all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        idx: typing.Sequence[int],
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> list[ValveOneInterval]:
+        """Create asset data for many intervals."""
+        n = len(idx)
+        high_temperature = optimizer.continuous_array(
+            f"{self.cfg.name}-high_temperature_load_mwh", n, index=idx
+        )
+        low_temperature = optimizer.continuous_array(
+            f"{self.cfg.name}-low_temperature_generation_mwh", n, index=idx
         )
+        return [
+            ValveOneInterval(
+                cfg=self.cfg,
+                high_temperature_load_mwh=high_temperature[k],
+                low_temperature_generation_mwh=low_temperature[k],
+            )
+            for k in range(n)
+        ]
 
     def constrain_within_interval(
         self,
@@ -71,6 +96,31 @@ class Valve(epl.Asset):
             valve.high_temperature_load_mwh == valve.low_temperature_generation_mwh
         )
 
+    def constrain_all_intervals(
+        self,
+        optimizer: "epl.Optimizer",
+        ivars: "epl.IntervalVars",
+        freq: "epl.Freq",
+        flags: "epl.Flags",
+    ) -> None:
+        """Constrain thermal balance across the valve in all intervals."""
+        valves = [
+            valves[0]
+            for valves in ivars.filter_objective_variables(
+                ValveOneInterval, i=None, asset_name=self.cfg.name
+            )
+        ]
+        optimizer.constrain_many(
+            [1, -1],
+            np.column_stack(
+                [
+                    interval_array(valves, "high_temperature_load_mwh"),
+                    interval_array(valves, "low_temperature_generation_mwh"),
+                ]
+            ),
+            EQ,
+        )
+
     def constrain_after_intervals(
         self, optimizer: "epl.Optimizer", ivars: "epl.IntervalVars"
     ) -> None:
@@ -0,0 +1,161 @@
+"""Batch optimization of many interval data scenarios for one site.
+
+Each worker compiles the site once, then re-solves the compiled linear program
+for each scenario, updating the site interval data in place.  Workers return
+only the results of each scenario, which are gathered in order.
+"""
+import concurrent.futures
+import copy
+import dataclasses
+import typing
+
+import numpy as np
+import pandas as pd
+
+import energypylinear as epl
+from energypylinear.compiled import updatable_fields
+from energypylinear.flags import Flags
+
+#  site interval data overrides for one scenario
+typing_scenario = typing.Mapping[str, np.ndarray | list[float] | float]
+
+#  compiled site of a worker process, created once by `init_worker`
+worker: "ScenarioWorker | None" = None
+
+
+@dataclasses.dataclass
+class ScenarioOutcome:
+    """Results of one scenario, sent back from a worker process.
+
+    Attributes:
+        results: simulation results.
+        feasible: whether the linear program was feasible.
+        spill: whether the spill asset was used.
+    """
+
+    results: pd.DataFrame
+    feasible: bool
+    spill: bool
+
+
+class ScenarioWorker:
+    """Compiles a site once and solves it for many scenarios.
+
+    The site is copied before compiling, as the compiled site updates its
+    interval data in place.
+
+    Args:
+        site: the site to compile.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+    """
+
+    def __init__(
+        self, site: "epl.Site", objective: str = "price", flags: Flags = Flags()
+    ) -> None:
+        """Initialize a scenario worker."""
+        site = copy.deepcopy(site)
+        self.compiled = site.compile(objective=objective, flags=flags)
+        interval_data = site.cfg.interval_data
+        self.base = {
+            name: np.array(getattr(interval_data, name)) for name in updatable_fields
+        }
+
+    def solve(
+        self, scenario: typing_scenario, verbose: bool = False
+    ) -> ScenarioOutcome:
+        """Solve one scenario.
+
+        Fields not in the scenario are reset to the site interval data, so each
+        scenario is independent of the scenarios solved before it.
+
+        Args:
+            scenario: site interval data overrides.
+            verbose: level of printing.
+        """
+        interval_data: dict[str, typing.Any] = {**self.base, **scenario}
+        #  let the export prices follow the scenario import prices
+        if (
+            "electricity_prices" in scenario
+            and "export_electricity_prices" not in scenario
+        ):
+            interval_data.pop("export_electricity_prices")
+        self.compiled.update(**interval_data)
+        simulation = self.compiled.optimize(verbose=verbose)
+        return ScenarioOutcome(
+            results=simulation.results,
+            feasible=simulation.feasible,
+            spill=simulation.spill,
+        )
+
+
+def init_worker(site: "epl.Site", objective: str, flags: Flags) -> None:
+    """Compile the site in a worker process.
+
+    Args:
+        site: the site to compile.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+    """
+    global worker
+    worker = ScenarioWorker(site, objective=objective, flags=flags)
+
+
+def solve_scenario(scenario: typing_scenario) -> ScenarioOutcome:
+    """Solve one scenario with the compiled site of this worker process.
+
+    Args:
+        scenario: site interval data overrides.
+    """
+    assert worker is not None, "worker process was not initialized"
+    return worker.solve(scenario)
+
+
+def optimize_many(
+    site: "epl.Site",
+    scenarios: typing.Sequence[typing_scenario],
+    workers: int = 1,
+    objective: str = "price",
+    flags: Flags = Flags(),
+    verbose: bool = False,
+) -> list["epl.SimulationResult"]:
+    """Optimize a site for many scenarios of site interval data.
+
+    Args:
+        site: the site to optimize.
+        scenarios: site interval data overrides for each scenario.
+        workers: number of processes - 1 solves in this process.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        verbose: level of printing.
+
+    Returns:
+        A list of epl.results.SimulationResult, in the order of the scenarios.
+    """
+    assert workers >= 1, "workers must be at least 1"
+    for scenario in scenarios:
+        for name in scenario:
+            assert name in updatable_fields, f"{name} must be one of {updatable_fields}"
+
+    if workers == 1:
+        local = ScenarioWorker(site, objective=objective, flags=flags)
+        outcomes = [local.solve(scenario, verbose=verbose) for scenario in scenarios]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(site, objective, flags),
+        ) as pool:
+            chunksize = max(1, len(scenarios) // (4 * workers))
+            outcomes = list(pool.map(solve_scenario, scenarios, chunksize=chunksize))
+
+    return [
+        epl.SimulationResult(
+            site=site,
+            assets=site.assets,
+            results=outcome.results,
+            feasible=outcome.feasible,
+            spill=outcome.spill,
+        )
+        for outcome in outcomes
+    ]
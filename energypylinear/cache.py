@@ -0,0 +1,261 @@
+"""Content-addressed on-disk cache of optimization results.
+
+The cache key is a hash of everything that defines a site optimization - the
+site configuration and interval data, the asset configurations, the objective,
+the flags and the optimizer configuration.  A cache hit returns the stored
+results without building or solving the linear program.
+"""
+import dataclasses
+import hashlib
+import os
+import pathlib
+import pickle
+import time
+import typing
+
+import numpy as np
+import pandas as pd
+import pydantic
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+
+#  bump to invalidate existing cache entries when the linear program or the
+#  stored results change
+cache_version = 2
+
+#  optimizer configuration that doesn't change the results
+ignored_optimizer_fields = ("verbose",)
+
+
+def update_hash(hasher: typing.Any, value: typing.Any) -> None:
+    """Update a hash with a deterministic encoding of a value.
+
+    Args:
+        hasher: a `hashlib` hash object.
+        value: numbers, strings, numpy arrays, pydantic models, dataclasses and
+            containers of these.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            hasher.update(f"objects{value.shape}".encode())
+            for item in value.flat:
+                update_hash(hasher, item)
+        else:
+            array = np.ascontiguousarray(value)
+            hasher.update(f"array{array.dtype.str}{array.shape}".encode())
+            hasher.update(array.tobytes())
+    elif isinstance(value, pydantic.BaseModel):
+        hasher.update(type(value).__name__.encode())
+        update_hash(hasher, dict(value))
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        hasher.update(type(value).__name__.encode())
+        update_hash(hasher, dataclasses.asdict(value))
+    elif isinstance(value, dict):
+        hasher.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=str):
+            update_hash(hasher, str(key))
+            update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"list{len(value)}".encode())
+        for item in value:
+            update_hash(hasher, item)
+    elif isinstance(value, np.generic):
+        update_hash(hasher, value.item())
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    else:
+        raise TypeError(f"can't hash {type(value)} for the results cache")
+
+
+def cache_key(
+    site: "epl.Site",
+    objective: str = "price",
+    flags: Flags = Flags(),
+    **options: typing.Any,
+) -> str:
+    """Create the cache key of a site optimization.
+
+    Args:
+        site: the site to optimize.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        options: other optimization options that change the results - options
+            of None are left out, so they match not giving the option.
+    """
+    optimizer_cfg = {
+        name: value
+        for name, value in dataclasses.asdict(site.optimizer_cfg).items()
+        if name not in ignored_optimizer_fields
+    }
+    hasher = hashlib.sha256()
+    update_hash(
+        hasher,
+        {
+            "version": cache_version,
+            "site": site.cfg,
+            "assets": [(type(asset).__name__, asset.cfg) for asset in site.assets],
+            "objective": objective,
+            "flags": flags,
+            "optimizer": optimizer_cfg,
+            "options": {
+                name: value for name, value in options.items() if value is not None
+            },
+        },
+    )
+    return hasher.hexdigest()
+
+
+def touch(path: pathlib.Path) -> None:
+    """Mark a file as recently used.
+
+    The modification time is set from `time.time_ns`, as file system timestamps
+    can be too coarse to order files written in quick succession.
+
+    Args:
+        path: the file to mark.
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+@dataclasses.dataclass
+class CachedResult:
+    """Results of a site optimization, as stored in the cache.
+
+    Attributes:
+        results: simulation results.
+        feasible: whether the linear program was feasible.
+        spill: whether the spill asset was used.
+        decomposition: the report of a temporal decomposition.
+        spill_phase: the phase used by a two phase spill optimization.
+        anytime: the quality of a result solved within a latency budget.
+        tightening: how much each big-M bound was tightened.
+        elimination: binary variables left out of the linear program.
+        model_stats: size of the linear program.
+        solver_stats: statistics of the solve.
+        warm_start: how a MIP start was used by the solver.
+    """
+
+    results: pd.DataFrame
+    feasible: bool
+    spill: bool
+    decomposition: typing.Any = None
+    spill_phase: typing.Any = None
+    anytime: typing.Any = None
+    tightening: typing.Any = None
+    elimination: typing.Any = None
+    model_stats: typing.Any = None
+    solver_stats: typing.Any = None
+    warm_start: typing.Any = None
+
+
+class ResultsCache:
+    """A directory of optimization results, addressed by a hash of their inputs.
+
+    When the cache is larger than `max_bytes`, the least recently used entries
+    are removed.
+
+    Args:
+        directory: where the results are stored - created if it doesn't exist.
+        max_bytes: largest total size of the stored results.
+
+    Attributes:
+        hits: number of lookups that found results.
+        misses: number of lookups that didn't find results.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(
+        self, directory: pathlib.Path | str, max_bytes: int = 1024**3
+    ) -> None:
+        """Initialize a results cache."""
+        assert max_bytes > 0, "max_bytes must be positive"
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        """A string representation of self."""
+        return f"<energypylinear.ResultsCache directory: {self.directory} hits: {self.hits} misses: {self.misses}>"
+
+    def path(self, key: str) -> pathlib.Path:
+        """Location of the results for a cache key.
+
+        Args:
+            key: the cache key.
+        """
+        return self.directory / f"{key}{self.suffix}"
+
+    def entries(self) -> list[pathlib.Path]:
+        """Stored results, least recently used first."""
+        paths = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                paths.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(paths)]
+
+    def size(self) -> int:
+        """Total size of the stored results in bytes."""
+        return sum(path.stat().st_size for path in self.entries())
+
+    def get(self, key: str) -> CachedResult | None:
+        """Get the results for a cache key, marking them as recently used.
+
+        Args:
+            key: the cache key.
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            logger.debug("cache.get", key=key, hit=False)
+            return None
+
+        touch(path)
+        self.hits += 1
+        logger.debug("cache.get", key=key, hit=True)
+        return cached
+
+    def put(self, key: str, cached: CachedResult) -> None:
+        """Store the results for a cache key, then evict to the size limit.
+
+        Args:
+            key: the cache key.
+            cached: the results to store.
+        """
+        path = self.path(key)
+        #  write to a temporary file then rename, so readers never see partial results
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        touch(path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used results until under the size limit."""
+        entries = self.entries()
+        sizes = [path.stat().st_size for path in entries]
+        total = sum(sizes)
+        for path, size in zip(entries, sizes):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug("cache.evict", path=str(path))
+
+    def clear(self) -> None:
+        """Remove all stored results and reset the counters."""
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,197 @@
+"""Persistent site linear program, re-solved for new interval data without rebuilding."""
+import numpy as np
+import pulp
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.objectives import objective_terms
+
+#  site interval data that enters the right hand side of each balance constraint
+#  with the sign it enters with
+balance_fields = {
+    "electric": [("electric_load_mwh", 1.0)],
+    "high_temperature": [("high_temperature_load_mwh", 1.0)],
+    "low_temperature": [
+        ("low_temperature_load_mwh", 1.0),
+        ("low_temperature_generation_mwh", -1.0),
+    ],
+}
+
+updatable_fields = [
+    "electricity_prices",
+    "export_electricity_prices",
+    "electricity_carbon_intensities",
+    "gas_prices",
+    "electric_load_mwh",
+    "high_temperature_load_mwh",
+    "low_temperature_load_mwh",
+    "low_temperature_generation_mwh",
+]
+
+
+class CompiledSite:
+    """A site linear program that is built once and re-solved many times.
+
+    Created by `Site.compile`.  Site interval data is updated in place with
+    `update` - objective coefficients are rewritten in the cost vector and
+    loads are shifted in the right hand side of the balance constraints.  Each
+    re-solve is warm started from the previous solution.
+
+    Args:
+        site: the site the linear program was built for.
+        ivars: linear program variables for each interval.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+    """
+
+    def __init__(
+        self,
+        site: "epl.Site",
+        ivars: "epl.IntervalVars",
+        objective: str = "price",
+        flags: Flags = Flags(),
+    ) -> None:
+        """Initialize a compiled site."""
+        assert (
+            objective in objective_terms
+        ), f"objective must be one of {list(objective_terms)}"
+        self.site = site
+        self.optimizer = site.optimizer
+        self.ivars = ivars
+        self.objective = objective
+        self.flags = flags
+
+        assert self.optimizer.model is not None
+        self.model = self.optimizer.model
+        self.rows = {
+            name: np.array(rows, dtype=np.int64)
+            for name, rows in site.balance_rows.items()
+        }
+
+        #  column of each objective variable - floats are constants
+        self.terms = objective_terms[objective](ivars, site.cfg.interval_data)
+        self.term_columns = []
+        for term in self.terms:
+            is_variable = np.array(
+                [isinstance(v, pulp.LpVariable) for v in term.variables], dtype=bool
+            )
+            columns = np.array(
+                [
+                    self.model.column(v)
+                    for v in term.variables
+                    if isinstance(v, pulp.LpVariable)
+                ],
+                dtype=np.int64,
+            )
+            constants = np.array(
+                [v for v in term.variables if not isinstance(v, pulp.LpVariable)],
+                dtype=np.float64,
+            )
+            self.term_columns.append((is_variable, columns, constants))
+
+    def __repr__(self) -> str:
+        """A string representation of self."""
+        return f"<energypylinear.CompiledSite objective: {self.objective} model: {self.model}>"
+
+    def update(self, **interval_data: np.ndarray | list[float] | float) -> None:
+        """Update site interval data in place.
+
+        As with `Site`, updating `electricity_prices` without
+        `export_electricity_prices` sets the export prices to match.
+
+        Args:
+            interval_data: new values for fields of the site interval data -
+                prices, carbon intensities, gas prices or loads.
+        """
+        for name in interval_data:
+            assert name in updatable_fields, f"{name} must be one of {updatable_fields}"
+        if (
+            "electricity_prices" in interval_data
+            and "export_electricity_prices" not in interval_data
+        ):
+            interval_data["export_electricity_prices"] = interval_data[
+                "electricity_prices"
+            ]
+
+        data = self.site.cfg.interval_data
+        n = len(data.idx)
+        previous = {}
+        for name, value in interval_data.items():
+            value = np.atleast_1d(np.array(value, dtype=np.float64))
+            if len(value) == 1:
+                value = np.repeat(value, n)
+            assert len(value) == n, f"{name} has len {len(value)}, index has {n}"
+            assert np.isnan(value).sum() == 0
+            previous[name] = getattr(data, name)
+            setattr(data, name, value)
+
+        for balance, fields in balance_fields.items():
+            delta = np.zeros(n)
+            for name, sign in fields:
+                if name in previous:
+                    delta += sign * (getattr(data, name) - previous[name])
+            if delta.any():
+                self.model.shift_rhs(self.rows[balance], delta)
+
+        self.update_objective()
+
+    def set_initial_charge(self, asset_name: str, initial_charge_mwh: float) -> None:
+        """Update the initial charge of a battery in place.
+
+        Args:
+            asset_name: name of the battery.
+            initial_charge_mwh: new initial charge of the battery.
+        """
+        batteries = [
+            asset
+            for asset in self.site.assets
+            if isinstance(asset, epl.Battery) and asset.cfg.name == asset_name
+        ]
+        assert len(batteries) == 1, f"no battery called {asset_name}"
+        battery = batteries[0]
+        assert (
+            battery.initial_charge_row is not None
+            and battery.cfg.initial_charge_mwh is not None
+        ), f"{asset_name} was compiled without an initial charge"
+        assert 0 <= initial_charge_mwh <= battery.cfg.capacity_mwh
+        self.model.shift_rhs(
+            np.array([battery.initial_charge_row]),
+            np.array([initial_charge_mwh - battery.cfg.initial_charge_mwh]),
+        )
+        battery.cfg.initial_charge_mwh = initial_charge_mwh
+
+    def update_objective(self) -> None:
+        """Rewrite the objective cost vector for the current site interval data."""
+        cost = np.zeros(self.model.n_cols)
+        offset = 0.0
+        for term, (is_variable, columns, constants) in zip(
+            self.terms, self.term_columns
+        ):
+            coefficients = term.coefficients(self.site.cfg.interval_data)
+            np.add.at(cost, columns, coefficients[is_variable])
+            offset += float(np.dot(constants, coefficients[~is_variable]))
+        self.model.set_cost(cost, offset)
+
+    def optimize(self, verbose: bool = True) -> "epl.SimulationResult":
+        """Solve the compiled linear program for the current interval data.
+
+        After the first solve, the previous solution is used as a warm start.
+
+        Returns:
+            epl.results.SimulationResult
+        """
+        backend = self.optimizer.backend
+        if backend.solution is not None:
+            backend.warm_start = backend.solution
+
+        status = self.optimizer.solve(
+            verbose=verbose, allow_infeasible=self.flags.allow_infeasible
+        )
+        return epl.extract_results(
+            self.site,
+            self.site.assets,
+            self.ivars,
+            feasible=status.feasible,
+            verbose=verbose,
+            flags=self.flags,
+        )
@@ -0,0 +1,673 @@
+"""Temporal decomposition - a whole horizon optimization solved as parallel chunks.
+
+The horizon is split into chunks that are coupled only through the state of
+charge of storage - batteries and EV charge events - at the boundaries between
+chunks.
+
+Chunks are solved in parallel with their boundary state of charge free.  Storage
+left at the end of a chunk is credited, and storage used from the start of a
+chunk is charged, at a price of storage for each boundary.  The prices are updated
+from the mismatch of the state of charge either side of each boundary until the
+chunks agree.
+
+The chunks are then re-solved with the boundary state of charge fixed to targets,
+and the stitched objective is compared against the linear program relaxation of
+the whole horizon, which is a lower bound on the optimal objective.
+"""
+import concurrent.futures
+import copy
+import dataclasses
+import typing
+
+import numpy as np
+import pandas as pd
+import pulp
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+
+#  interval data used to scale the price of storage for each objective
+price_fields = {
+    "price": "electricity_prices",
+    "carbon": "electricity_carbon_intensities",
+}
+
+#  state of charge, capacity or price of storage for each storage asset - one value
+#  for a battery, one per charge event for EVs
+typing_storage = dict[str, np.ndarray]
+
+
+@dataclasses.dataclass
+class DecompositionConfig:
+    """Configures a temporal decomposition.
+
+    Attributes:
+        n_chunks: number of chunks the horizon is split into.
+        workers: number of processes solving chunks - 1 solves in this process.
+        max_iterations: maximum number of price of storage updates.
+        tolerance: largest boundary state of charge mismatch to stop at, as a
+            fraction of storage capacity.
+        step_size: size of the price of storage update, relative to the mean
+            absolute price of the objective.
+        compute_bound: whether to solve the linear program relaxation of the
+            whole horizon for a lower bound.
+    """
+
+    n_chunks: int = 4
+    workers: int = 1
+    max_iterations: int = 20
+    tolerance: float = 0.01
+    step_size: float = 1.0
+    compute_bound: bool = True
+
+    def __post_init__(self) -> None:
+        """Validates the decomposition configuration."""
+        assert self.n_chunks >= 1, "n_chunks must be at least 1"
+        assert self.workers >= 1, "workers must be at least 1"
+        assert self.max_iterations >= 1, "max_iterations must be at least 1"
+        assert self.tolerance >= 0, "tolerance must be non-negative"
+
+
+@dataclasses.dataclass
+class DecompositionReport:
+    """Convergence and quality of a temporal decomposition.
+
+    Attributes:
+        iterations: number of price of storage iterations.
+        converged: whether the boundary mismatch reached the tolerance.
+        max_mismatch: largest boundary state of charge mismatch at the last
+            iteration, as a fraction of storage capacity.
+        objective: objective of the stitched solution.
+        bound: objective of the linear program relaxation of the whole horizon.
+        gap: relative gap between the objective and the bound.
+        prices: price of storage at each boundary between chunks.
+    """
+
+    iterations: int
+    converged: bool
+    max_mismatch: float
+    objective: float
+    bound: float | None = None
+    gap: float | None = None
+    prices: list[typing_storage] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class ChunkTask:
+    """One chunk linear program, sent to a worker process.
+
+    Attributes:
+        site: site with the assets and interval data of the chunk.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        initial_prices: price of storage at the start of the chunk.
+        final_prices: price of storage at the end of the chunk.
+    """
+
+    site: "epl.Site"
+    objective: str
+    flags: Flags
+    initial_prices: typing_storage
+    final_prices: typing_storage
+
+
+@dataclasses.dataclass
+class ChunkOutcome:
+    """Solution of one chunk linear program.
+
+    Attributes:
+        results: simulation results of the chunk.
+        feasible: whether the chunk linear program was feasible.
+        spill: whether the spill asset was used.
+        objective: objective of the chunk, without the price of storage.
+    """
+
+    results: pd.DataFrame
+    feasible: bool
+    spill: bool
+    objective: float
+
+
+def storage_capacities(assets: list) -> typing_storage:
+    """Get the capacity of each storage asset.
+
+    Args:
+        assets: assets in the site.
+    """
+    capacities: typing_storage = {}
+    for asset in assets:
+        if isinstance(asset, epl.Battery):
+            capacities[asset.cfg.name] = np.array([asset.cfg.capacity_mwh])
+        elif isinstance(asset, epl.EVs):
+            capacities[asset.cfg.name] = np.array(
+                [cfg.capacity_mwh for cfg in asset.cfg.charge_event_cfgs]
+            )
+    return capacities
+
+
+def coupled_storage(assets: list, boundary: int) -> dict[str, np.ndarray]:
+    """Which storage carries state of charge across a boundary between chunks.
+
+    Batteries are always coupled - charge events only while they are active on
+    both sides of the boundary.
+
+    Args:
+        assets: assets in the site.
+        boundary: first interval after the boundary.
+    """
+    coupled = {}
+    for asset in assets:
+        if isinstance(asset, epl.Battery):
+            coupled[asset.cfg.name] = np.array([True])
+        elif isinstance(asset, epl.EVs):
+            first, last = asset.cfg.windows()
+            coupled[asset.cfg.name] = (
+                (first >= 0) & (first < boundary) & (last >= boundary)
+            )
+    return coupled
+
+
+def chunk_asset(
+    asset: typing.Any,
+    start: int,
+    stop: int,
+    initial: typing_storage,
+    final: typing_storage,
+) -> typing.Any:
+    """Create a copy of an asset for the chunk `start:stop`.
+
+    Args:
+        asset: the asset to copy - any asset with a `cfg`.
+        start: first interval of the chunk.
+        stop: interval after the last interval of the chunk.
+        initial: initial state of charge of each storage asset - None is free.
+        final: final state of charge of each storage asset - None is free.
+    """
+    name = asset.cfg.name
+    socs: dict = {}
+    if isinstance(asset, epl.Battery):
+        socs[name] = initial[name][0]
+    elif isinstance(asset, epl.EVs):
+        socs[name] = initial[name]
+    chunk = epl.rolling.window_asset(asset, start, stop, last=True, socs=socs)
+    #  the standalone site of an asset isn't needed by a chunk
+    vars(chunk).pop("site", None)
+
+    if isinstance(asset, epl.Battery):
+        chunk.cfg = chunk.cfg.model_copy(update={"final_charge_mwh": final[name][0]})
+    elif isinstance(asset, epl.EVs):
+        chunk.cfg = chunk.cfg.model_copy(
+            update={
+                "charge_event_cfgs": np.array(
+                    [
+                        cfg.model_copy(update={"final_soc_mwh": soc})
+                        for cfg, soc in zip(chunk.cfg.charge_event_cfgs, final[name])
+                    ]
+                )
+            }
+        )
+    return chunk
+
+
+def chunk_storage(
+    assets: list,
+    start: int,
+    stop: int,
+    n_intervals: int,
+    initial_targets: typing_storage | None,
+    final_targets: typing_storage | None,
+) -> tuple[typing_storage, typing_storage]:
+    """Get the initial and final state of charge constraints of a chunk.
+
+    Storage coupled across a boundary takes the boundary target - None leaves it
+    free.  Other storage keeps the constraints of the whole horizon in the chunk
+    where they apply, and charge events that have ended stay at their final state
+    of charge.
+
+    Args:
+        assets: assets in the site.
+        start: first interval of the chunk.
+        stop: interval after the last interval of the chunk.
+        n_intervals: number of intervals in the whole horizon.
+        initial_targets: state of charge at the start of the chunk.
+        final_targets: state of charge at the end of the chunk.
+    """
+    first_chunk = start == 0
+    last_chunk = stop == n_intervals
+    coupled_in = coupled_storage(assets, start)
+    coupled_out = coupled_storage(assets, stop)
+
+    def target(targets: typing_storage | None, name: str, idx: int) -> float | None:
+        """The target of one storage at the boundary - None when free."""
+        return None if targets is None else float(targets[name][idx])
+
+    initial: typing_storage = {}
+    final: typing_storage = {}
+    for asset in assets:
+        name = asset.cfg.name
+        if isinstance(asset, epl.Battery):
+            initial[name] = np.array(
+                [
+                    asset.cfg.initial_charge_mwh
+                    if first_chunk
+                    else target(initial_targets, name, 0)
+                ],
+                dtype=object,
+            )
+            final[name] = np.array(
+                [
+                    asset.cfg.final_charge_mwh
+                    if last_chunk
+                    else target(final_targets, name, 0)
+                ],
+                dtype=object,
+            )
+
+        elif isinstance(asset, epl.EVs):
+            _, last = asset.cfg.windows()
+            initial[name] = np.empty(len(last), dtype=object)
+            final[name] = np.empty(len(last), dtype=object)
+            for idx, cfg in enumerate(asset.cfg.charge_event_cfgs):
+                if not first_chunk and coupled_in[name][idx]:
+                    initial[name][idx] = target(initial_targets, name, idx)
+                elif not first_chunk and 0 <= last[idx] < start:
+                    initial[name][idx] = cfg.final_soc_mwh
+                else:
+                    initial[name][idx] = cfg.initial_soc_mwh
+
+                if not last_chunk and coupled_out[name][idx]:
+                    final[name][idx] = target(final_targets, name, idx)
+                elif start <= last[idx] < stop:
+                    final[name][idx] = cfg.final_soc_mwh
+                else:
+                    final[name][idx] = None
+
+    return initial, final
+
+
+def chunk_site(
+    site: "epl.Site",
+    start: int,
+    stop: int,
+    initial: typing_storage,
+    final: typing_storage,
+) -> "epl.Site":
+    """Create a site for the chunk `start:stop`.
+
+    Args:
+        site: the site of the whole horizon.
+        start: first interval of the chunk.
+        stop: interval after the last interval of the chunk.
+        initial: initial state of charge of each storage asset - None is free.
+        final: final state of charge of each storage asset - None is free.
+    """
+    interval_data = site.cfg.interval_data
+    chunk_data = {
+        name: value[start:stop]
+        for name, value in interval_data.__dict__.items()
+        if isinstance(value, np.ndarray) and name != "idx"
+    }
+    return epl.Site(
+        assets=[
+            chunk_asset(asset, start, stop, initial, final) for asset in site.assets
+        ],
+        name=site.cfg.name,
+        freq_mins=site.cfg.freq_mins,
+        import_limit_mw=site.cfg.import_limit_mw,
+        export_limit_mw=site.cfg.export_limit_mw,
+        optimizer_config=site.optimizer_cfg,
+        **chunk_data,
+    )
+
+
+def storage_variables(
+    asset: "epl.Battery | epl.EVs", ivars: "epl.IntervalVars"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the initial and final state of charge variables of a storage asset.
+
+    Args:
+        asset: a battery or EVs asset.
+        ivars: linear program variables for each interval.
+    """
+    name = asset.cfg.name
+    if isinstance(asset, epl.Battery):
+        batteries = ivars.filter_objective_variables(
+            epl.assets.battery.BatteryOneInterval, i=None, asset_name=name
+        )
+        first, last = batteries[0][0], batteries[-1][0]
+        assert isinstance(first, epl.assets.battery.BatteryOneInterval)
+        assert isinstance(last, epl.assets.battery.BatteryOneInterval)
+        return (
+            np.array([first.electric_initial_charge_mwh], dtype=object),
+            np.array([last.electric_final_charge_mwh], dtype=object),
+        )
+    assert (
+        not asset.cfg.aggregate
+    ), "decomposition prices each charge event - use aggregate=False"
+    #  charge events outside of their window at the boundary have no variables
+    evs = ivars.filter_all_evs_array(False, name)
+    initial = np.zeros(len(asset.cfg.charge_event_cfgs), dtype=object)
+    final = np.zeros(len(asset.cfg.charge_event_cfgs), dtype=object)
+    _, events = epl.assets.evs.evs_pairs(evs[:1])
+    initial[events] = evs[0].initial_soc_mwh[0]
+    _, events = epl.assets.evs.evs_pairs(evs[-1:])
+    final[events] = evs[-1].final_soc_mwh[0]
+    return initial, final
+
+
+def solve_chunk(task: ChunkTask) -> ChunkOutcome:
+    """Solve one chunk, pricing the storage at its boundaries.
+
+    Module level so it can be sent to a worker process.
+
+    Args:
+        task: the chunk to solve.
+    """
+    site = task.site
+    ivars = site.build(objective=task.objective, flags=task.flags)
+    optimizer = site.optimizer
+    objective = epl.objectives[task.objective](optimizer, ivars, site.cfg.interval_data)
+
+    storage_value: list[pulp.LpAffineExpression] = []
+    for asset in site.assets:
+        name = asset.cfg.name
+        if name not in task.initial_prices:
+            continue
+        initial, final = storage_variables(asset, ivars)
+        storage_value.extend(
+            price * soc
+            for price, soc in zip(task.initial_prices[name], initial)
+            if price != 0
+        )
+        storage_value.extend(
+            -price * soc
+            for price, soc in zip(task.final_prices[name], final)
+            if price != 0
+        )
+    optimizer.objective(objective + optimizer.sum(storage_value))
+
+    status = optimizer.solve(allow_infeasible=True)
+    simulation = epl.extract_results(
+        site,
+        site.assets,
+        ivars,
+        feasible=status.feasible,
+        flags=task.flags,
+        verbose=False,
+    )
+    return ChunkOutcome(
+        results=simulation.results,
+        feasible=status.feasible,
+        spill=simulation.spill,
+        objective=float(pulp.value(objective)) if status.feasible else np.nan,
+    )
+
+
+def boundary_socs(
+    assets: list, results: pd.DataFrame
+) -> tuple[typing_storage, typing_storage]:
+    """Get the initial and final state of charge of each storage asset in a chunk.
+
+    Args:
+        assets: assets in the site.
+        results: simulation results of the chunk.
+    """
+    initial: typing_storage = {}
+    final: typing_storage = {}
+    for asset in assets:
+        name = asset.cfg.name
+        if isinstance(asset, epl.Battery):
+            cols = [f"{name}-electric_initial_charge_mwh"], [
+                f"{name}-electric_final_charge_mwh"
+            ]
+        elif isinstance(asset, epl.EVs):
+            idxs = range(len(asset.cfg.charge_event_cfgs))
+            cols = [f"{name}-charge-event-{idx}-initial_soc_mwh" for idx in idxs], [
+                f"{name}-charge-event-{idx}-final_soc_mwh" for idx in idxs
+            ]
+        else:
+            continue
+        initial[name] = np.nan_to_num(
+            results[cols[0]].iloc[0].to_numpy(dtype=np.float64)
+        )
+        final[name] = np.nan_to_num(
+            results[cols[1]].iloc[-1].to_numpy(dtype=np.float64)
+        )
+    return initial, final
+
+
+def relaxation_bound(
+    site: "epl.Site", objective: str = "price", flags: Flags = Flags()
+) -> float | None:
+    """Solve the linear program relaxation of the whole horizon.
+
+    Args:
+        site: the site of the whole horizon.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+
+    Returns:
+        The relaxed objective, which is a lower bound on the optimal objective -
+        None if the relaxation is infeasible.
+    """
+    relaxed = copy.copy(site)
+    ivars = relaxed.build(objective=objective, flags=flags)
+    relaxed.optimizer.relax()
+    status = relaxed.optimizer.solve(allow_infeasible=True)
+    if not status.feasible:
+        return None
+    return float(
+        pulp.value(
+            epl.objectives[objective](
+                relaxed.optimizer, ivars, relaxed.cfg.interval_data
+            )
+        )
+    )
+
+
+def optimize_decomposed(
+    site: "epl.Site",
+    cfg: DecompositionConfig,
+    objective: str = "price",
+    flags: Flags = Flags(),
+    verbose: bool = False,
+) -> "epl.SimulationResult":
+    """Optimize a site as chunks of the horizon, coordinated by a price of storage.
+
+    Args:
+        site: the site to optimize.
+        cfg: decomposition configuration.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        verbose: level of printing.
+
+    Returns:
+        epl.results.SimulationResult with the stitched chunks, and a
+        `DecompositionReport` in `decomposition`.
+    """
+    interval_data = site.cfg.interval_data
+    n_intervals = len(interval_data.idx)
+    assert (
+        cfg.n_chunks <= n_intervals
+    ), f"n_chunks {cfg.n_chunks} must be at most the {n_intervals} intervals"
+    assert cfg.n_chunks == 1 or not any(
+        isinstance(asset, epl.Battery) and asset.cfg.cyclic_charge
+        for asset in site.assets
+    ), "batteries with a cyclic charge can't be split into chunks"
+    stops = [
+        int(chunk[-1]) + 1
+        for chunk in np.array_split(np.arange(n_intervals), cfg.n_chunks)
+    ]
+    starts = [0] + stops[:-1]
+
+    #  boundary b is between chunk b and chunk b + 1
+    capacities = storage_capacities(site.assets)
+    coupled = [coupled_storage(site.assets, stop) for stop in stops[:-1]]
+    prices_data = np.asarray(
+        getattr(interval_data, price_fields.get(objective, "electricity_prices"))
+    )
+    price_scale = float(np.abs(prices_data).mean()) or 1.0
+    prices = [
+        {
+            name: np.where(coupled[b][name], float(prices_data.mean()), 0.0)
+            for name in capacities
+        }
+        for b in range(len(coupled))
+    ]
+    zeros = {name: np.zeros_like(capacity) for name, capacity in capacities.items()}
+
+    def task(
+        k: int,
+        initial_targets: typing_storage | None = None,
+        final_targets: typing_storage | None = None,
+    ) -> ChunkTask:
+        """The task of chunk `k`, with its boundaries free or fixed at targets."""
+        initial, final = chunk_storage(
+            site.assets,
+            starts[k],
+            stops[k],
+            n_intervals,
+            initial_targets,
+            final_targets,
+        )
+        return ChunkTask(
+            site=chunk_site(site, starts[k], stops[k], initial, final),
+            objective=objective,
+            flags=flags,
+            initial_prices=prices[k - 1]
+            if k > 0 and initial_targets is None
+            else zeros,
+            final_prices=prices[k]
+            if k < len(coupled) and final_targets is None
+            else zeros,
+        )
+
+    pool = (
+        concurrent.futures.ProcessPoolExecutor(max_workers=cfg.workers)
+        if cfg.workers > 1
+        else None
+    )
+
+    def solve(tasks: list[ChunkTask]) -> list[ChunkOutcome]:
+        """Solve chunks in the process pool, or in this process for one worker."""
+        if pool is None:
+            return [solve_chunk(t) for t in tasks]
+        return list(pool.map(solve_chunk, tasks))
+
+    try:
+        targets: list[typing_storage] = []
+        averages: list[typing_storage] = []
+        converged = False
+        max_mismatch = np.inf
+        iteration = 0
+        for iteration in range(1, cfg.max_iterations + 1):
+            outcomes = solve([task(k) for k in range(cfg.n_chunks)])
+            socs = [boundary_socs(site.assets, o.results) for o in outcomes]
+
+            targets = []
+            max_mismatch = 0.0
+            for b in range(len(coupled)):
+                target = {}
+                for name, capacity in capacities.items():
+                    before, after = socs[b][1][name], socs[b + 1][0][name]
+                    mismatch = (
+                        np.where(coupled[b][name], after - before, 0.0) / capacity
+                    )
+                    max_mismatch = max(
+                        max_mismatch, float(np.abs(mismatch).max(initial=0))
+                    )
+                    prices[b][name] += (
+                        cfg.step_size * price_scale * mismatch / np.sqrt(iteration)
+                    )
+                    #  average the boundary state of charge across iterations,
+                    #  which damps the oscillation of the linear chunks
+                    midpoint = np.clip((before + after) / 2, 0, capacity)
+                    if averages:
+                        midpoint = (
+                            averages[b][name]
+                            + (midpoint - averages[b][name]) / iteration
+                        )
+                    target[name] = midpoint
+                targets.append(target)
+            averages = targets
+
+            logger.debug(
+                "decomposition.optimize_decomposed",
+                iteration=iteration,
+                max_mismatch=max_mismatch,
+            )
+            if max_mismatch <= cfg.tolerance:
+                converged = True
+                break
+
+        #  fix the boundary state of charge to the targets
+        outcomes = solve(
+            [
+                task(
+                    k,
+                    initial_targets=targets[k - 1] if k > 0 else None,
+                    final_targets=targets[k] if k < len(coupled) else None,
+                )
+                for k in range(cfg.n_chunks)
+            ]
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    #  repair chunks that can't meet their targets in sequence - each starts from
+    #  where the previous chunk ended, keeping its final target if it can
+    for k in range(cfg.n_chunks):
+        previous = (
+            boundary_socs(site.assets, outcomes[k - 1].results)[1] if k > 0 else None
+        )
+        if outcomes[k].feasible:
+            initial = boundary_socs(site.assets, outcomes[k].results)[0]
+            if previous is None or all(
+                np.allclose(
+                    initial[name][coupled[k - 1][name]],
+                    previous[name][coupled[k - 1][name]],
+                    atol=1e-6,
+                )
+                for name in capacities
+            ):
+                continue
+
+        final_targets = targets[k] if k < len(coupled) else None
+        outcome = solve_chunk(task(k, previous, final_targets))
+        if not outcome.feasible and final_targets is not None:
+            outcome = solve_chunk(task(k, previous, None))
+        logger.debug(
+            "decomposition.optimize_decomposed.repair",
+            chunk=k,
+            feasible=outcome.feasible,
+        )
+        outcomes[k] = outcome
+
+    objective_value = float(sum(o.objective for o in outcomes))
+    bound = relaxation_bound(site, objective, flags) if cfg.compute_bound else None
+    gap = None
+    if bound is not None and np.isfinite(objective_value):
+        gap = (objective_value - bound) / max(abs(objective_value), 1e-9)
+
+    report = DecompositionReport(
+        iterations=iteration,
+        converged=converged,
+        max_mismatch=max_mismatch,
+        objective=objective_value,
+        bound=bound,
+        gap=gap,
+        prices=prices,
+    )
+    if verbose:
+        logger.info("decomposition.optimize_decomposed", report=report)
+
+    return epl.SimulationResult(
+        site=site,
+        assets=site.assets,
+        results=pd.concat([o.results for o in outcomes], ignore_index=True),
+        feasible=all(o.feasible for o in outcomes),
+        spill=any(o.spill for o in outcomes),
+        decomposition=report,
+    )
@@ -16,8 +16,14 @@ class Defaults(pydantic.BaseModel):
     low_temperature_generation_mwh: float = 0
     electric_load_mwh: float = 0
 
-    #   setting this too high will break the evs... was as 1e10
-    spill_objective_penalty: float = 1e11
+    #  spill is penalized at this multiple of the largest price or carbon
+    #  intensity in the objective - the penalty used to be a fixed 1e11,
+    #  which spanned too many orders of magnitude for the solver, while a
+    #  penalty much smaller than this weakens the relaxation of the big-M
+    #  site import and export constraints
+    spill_penalty_multiplier: float = 1e6
+    #  smallest magnitude the spill penalty is derived from
+    spill_penalty_min_magnitude: float = 1.0
 
     boiler_efficiency_pct: float = 0.8
     boiler_high_temperature_generation_max_mw: float = 10000.0
@@ -29,6 +35,9 @@ class Defaults(pydantic.BaseModel):
 
     decimal_tolerance: int = 4
 
+    #  relative margin on tightened big-M, so rounding never cuts off a dispatch
+    big_m_margin: float = 1e-6
+
     #  used for < 0 stuff
     epsilon: float = -1e-4
 
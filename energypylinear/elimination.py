@@ -0,0 +1,125 @@
+"""Elimination of binary variables that can't change the optimal dispatch.
+
+Some binary variables only rule out dispatch that is never optimal, or link to
+a minimum that is zero.  Leaving them out gives a linear program with the same
+optimal objective and fewer integer variables - often a pure linear program,
+solved without any branch and bound.
+
+Binary variables are left out when:
+
+- site import and export - export never earns more than import costs, so
+  importing and exporting in the same interval never pays,
+- CHP and boiler on / off - the minimum output is zero,
+- heat pump on / off - the heat pump has no minimum power,
+- battery charge and discharge - electricity never has a negative value and
+  the battery loses energy, so charging and discharging at once never pays.
+
+The site and battery cases depend on the site interval data, so they are only
+used when the interval data is fixed - not for compiled sites.
+
+`Flags(force_full_milp=True)` keeps every binary variable.
+"""
+import dataclasses
+import typing
+
+import numpy as np
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+
+#  site interval data valuing imported and exported electricity for each objective
+import_export_fields = {
+    "price": ("electricity_prices", "export_electricity_prices"),
+    "carbon": ("electricity_carbon_intensities", "electricity_carbon_intensities"),
+}
+
+
+@dataclasses.dataclass
+class BinaryElimination:
+    """Binary variables left out of a site linear program.
+
+    Attributes:
+        eliminated: why each binary variable was left out, by variable name.
+    """
+
+    eliminated: dict[str, str] = dataclasses.field(default_factory=dict)
+
+    def asset_flags(self, asset: typing.Any, flags: Flags) -> Flags:
+        """Get the flags to build an asset with.
+
+        Batteries with eliminated binary variables are built as if
+        `include_charge_discharge_binary_variables` was off.
+
+        Args:
+            asset: the asset to build.
+            flags: boolean flags to change simulation and results behaviour.
+        """
+        if f"{asset.cfg.name}-electric_charge_binary" in self.eliminated:
+            return flags.model_copy(
+                update={"include_charge_discharge_binary_variables": False}
+            )
+        return flags
+
+
+def eliminate_binaries(
+    site: "epl.Site",
+    objective: str = "price",
+    flags: Flags = Flags(),
+    fixed_interval_data: bool = True,
+) -> BinaryElimination:
+    """Find the binary variables of a site that can't change the optimal dispatch.
+
+    Args:
+        site: the site.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        fixed_interval_data: whether the site interval data stays fixed.
+
+    Returns:
+        The binary variables to leave out, with the reason for each.
+    """
+    report = BinaryElimination()
+    if flags.force_full_milp:
+        return report
+
+    interval_data = site.cfg.interval_data
+    import_value, export_value = (
+        np.asarray(getattr(interval_data, name), dtype=np.float64)
+        for name in import_export_fields[objective]
+    )
+    if fixed_interval_data and (export_value <= import_value).all():
+        for binary in ["import_power_bin", "export_power_bin"]:
+            report.eliminated[
+                f"{site.cfg.name}-{binary}"
+            ] = "export never earns more than import costs"
+
+    never_negative = import_value.min() >= 0 and export_value.min() >= 0
+    for asset in site.assets:
+        name = asset.cfg.name
+        if (
+            isinstance(asset, epl.Battery)
+            and fixed_interval_data
+            and never_negative
+            and flags.include_charge_discharge_binary_variables
+            and asset.cfg.efficiency_pct < 1
+        ):
+            for binary in ["electric_charge_binary", "electric_discharge_binary"]:
+                report.eliminated[
+                    f"{name}-{binary}"
+                ] = "electricity is never negative and the battery has losses"
+        if isinstance(asset, epl.CHP) and not epl.assets.chp.needs_binary(
+            asset.cfg, flags
+        ):
+            report.eliminated[f"{name}-binary_mwh"] = "minimum output is zero"
+        if isinstance(asset, epl.Boiler) and not epl.assets.boiler.needs_binary(
+            asset.cfg, flags
+        ):
+            report.eliminated[f"{name}-binary_mwh"] = "minimum output is zero"
+        if isinstance(asset, epl.HeatPump) and not epl.assets.heat_pump.needs_binary(
+            asset.cfg, flags
+        ):
+            report.eliminated[f"{name}-electric_load_binary"] = "no minimum power"
+
+    logger.debug("elimination.eliminate_binaries", eliminated=report.eliminated)
+    return report
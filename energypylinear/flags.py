@@ -8,6 +8,8 @@ class Flags(pydantic.BaseModel):
     #  general
     fail_on_spill_asset_use: bool = False
     allow_infeasible: bool = False
+    force_full_milp: bool = False
+    two_phase_spill: bool = False
 
     #  battery
     include_charge_discharge_binary_variables: bool = False
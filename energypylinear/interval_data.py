@@ -22,6 +22,14 @@ class IntervalVars:
         self.asset: collections.defaultdict = collections.defaultdict(
             lambda: {"evs_array": [], "spill_evs_array": [], "site": []}
         )
+        #  typed index over the objective variables - type -> asset name -> interval
+        #  maintained on `append` so that filtering doesn't rescan every interval
+        self.index: dict[type, dict[str | None, list[list[AssetOneInterval]]]] = {}
+        self._matching_types: dict[type, list[type]] = {}
+        #  column of each results quantity in the solution vector - built on the
+        #  first extraction and reused while the optimizer columns are unchanged
+        self.value_index: dict[typing.Hashable, tuple[np.ndarray, np.ndarray]] = {}
+        self.value_columns: dict[str, int] | None = None
 
     def __repr__(self) -> str:
         """A string representation of self."""
@@ -55,6 +63,48 @@ class IntervalVars:
         else:
             assert isinstance(one_interval, list)
             self.objective_variables.append(one_interval)
+            self._index_interval(one_interval)
+
+    def _index_interval(self, assets: list[AssetOneInterval]) -> None:
+        """Adds the assets for one interval to the typed index.
+
+        Every (type, name) pair in the index gets an entry for this interval,
+        so that the interval dimension stays aligned with `objective_variables`.
+
+        Args:
+            assets: the assets for the interval just appended.
+        """
+        i = len(self.objective_variables) - 1
+        grouped: dict[tuple[type, str | None], list[AssetOneInterval]] = {}
+        for asset in assets:
+            key = (type(asset), getattr(asset.cfg, "name", None))
+            grouped.setdefault(key, []).append(asset)
+
+        for (instance_type, name), group in grouped.items():
+            if instance_type not in self.index:
+                self.index[instance_type] = {}
+                self._matching_types = {}
+            by_name = self.index[instance_type]
+            if name not in by_name:
+                by_name[name] = [[] for _ in range(i)]
+            by_name[name].append(group)
+
+        for by_name in self.index.values():
+            for by_interval in by_name.values():
+                if len(by_interval) == i:
+                    by_interval.append([])
+
+    def _types_matching(self, instance_type: type) -> list[type]:
+        """Returns the indexed types that are instances of `instance_type`.
+
+        Args:
+            instance_type: the type to match against.
+        """
+        if instance_type not in self._matching_types:
+            self._matching_types[instance_type] = [
+                t for t in self.index if issubclass(t, instance_type)
+            ]
+        return self._matching_types[instance_type]
 
     def filter_evs_array(
         self, is_spill: bool, i: int, asset_name: str
@@ -125,36 +175,60 @@ class IntervalVars:
             list[list[AssetOneInterval]]:
                 Filtered list of AssetOneInterval instances.
         """
-        #  here we return data for all intervals
-        if i is None:
-            pkg = []
-            for i, assets_one_interval in enumerate(self.objective_variables):
-                pkg.append(
-                    [
-                        asset
-                        for asset in assets_one_interval
-                        if isinstance(asset, instance_type)
-                        and (
-                            asset.cfg.name == asset_name
-                            if asset_name is not None
-                            else True
-                        )
-                    ]
-                )
-            return pkg
+        types = self._types_matching(instance_type)
 
-        #  here we return data for one interval
-        else:
+        #  a parent type can match many indexed types - scan to keep the interval ordering
+        if len(types) > 1:
+            return self._scan_objective_variables(instance_type, i, asset_name)
+
+        if not types:
+            n_intervals = len(self.objective_variables) if i is None else 1
+            return [[] for _ in range(n_intervals)]
+
+        by_name = self.index[types[0]]
+        if asset_name is not None:
+            if asset_name not in by_name:
+                n_intervals = len(self.objective_variables) if i is None else 1
+                return [[] for _ in range(n_intervals)]
+            by_interval = by_name[asset_name]
+            #  the index itself is returned here - callers must not mutate it
+            return by_interval if i is None else [by_interval[i]]
 
-            #  why a list of lists??????????
-            assets = self.objective_variables[i]
+        if len(by_name) == 1:
+            by_interval = next(iter(by_name.values()))
+            return by_interval if i is None else [by_interval[i]]
+
+        if i is None:
             return [
-                [
-                    asset
-                    for asset in assets
-                    if isinstance(asset, instance_type)
-                    and (
-                        asset.cfg.name == asset_name if asset_name is not None else True
-                    )
-                ]
+                [asset for by_interval in by_name.values() for asset in by_interval[n]]
+                for n in range(len(self.objective_variables))
+            ]
+        return [[asset for by_interval in by_name.values() for asset in by_interval[i]]]
+
+    def _scan_objective_variables(
+        self,
+        instance_type: type[AssetOneInterval],
+        i: int | None = None,
+        asset_name: str | None = None,
+    ) -> list[list[AssetOneInterval]]:
+        """Filters objective variables by scanning every interval.
+
+        Used when `instance_type` matches more than one indexed type.
+
+        Args:
+            instance_type: type of the AssetOneInterval instances to filter.
+            i: interval index - if None, filters across all intervals.
+            asset_name: name of the asset to filter by - if None, no filtering by name.
+        """
+        intervals = (
+            self.objective_variables if i is None else [self.objective_variables[i]]
+        )
+        return [
+            [
+                asset
+                for asset in assets
+                if isinstance(asset, instance_type)
+                and (asset.cfg.name == asset_name if asset_name is not None else True)
             ]
+            for assets in intervals
+        ]
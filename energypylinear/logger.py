@@ -6,10 +6,6 @@ import pathlib
 import time
 
 import structlog
-from rich.console import Console
-from rich.logging import RichHandler
-
-console = Console()
 
 
 class PulpRedirectHandler(logging.Handler):
@@ -38,6 +34,43 @@ class PulpRedirectHandler(logging.Handler):
         self._structlog.debug("pulp", pulp_message=message)
 
 
+class LazyRichHandler(logging.Handler):
+    """Logging handler that writes to the console with `rich`.
+
+    `rich` is imported when the first record is emitted, so processes that
+    only log below the handler level never import it.
+    """
+
+    def __init__(self, level: int = logging.NOTSET) -> None:
+        """Initialize the LazyRichHandler with the given logging level.
+
+        Args:
+            level (int, optional): The logging level. Defaults to logging.NOTSET.
+        """
+        super().__init__(level)
+        self._handler: logging.Handler | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Emit a log record with a `rich.logging.RichHandler`.
+
+        Args:
+            record (logging.LogRecord): The log record to emit.
+        """
+        if self._handler is None:
+            from rich.console import Console
+            from rich.logging import RichHandler
+
+            self._handler = RichHandler(
+                level=self.level,
+                console=Console(),
+                rich_tracebacks=True,
+                show_level=False,
+                show_time=False,
+                show_path=False,
+            )
+        self._handler.emit(record)
+
+
 def configure_logger(enable_file_logging: bool = False) -> None:
     """Configure root and PuLP loggers. Optionally enable file logging.
 
@@ -67,14 +100,7 @@ def configure_logger(enable_file_logging: bool = False) -> None:
         root_logger.addHandler(latest_file_handler)
 
     # Set up the stream handler to write info logs to stdout
-    stream_handler = RichHandler(
-        console=console,
-        rich_tracebacks=True,
-        show_level=False,
-        show_time=False,
-        show_path=False,
-    )
-    stream_handler.setLevel(logging.INFO)
+    stream_handler = LazyRichHandler(level=logging.INFO)
     root_logger.addHandler(stream_handler)
     pulp_logger = logging.getLogger("pulp")
 
@@ -1,4 +1,7 @@
 """Linear programming objective cost functions for price and carbon."""
+import dataclasses
+import typing
+
 import numpy as np
 import pulp
 
@@ -35,6 +38,180 @@ def filter_spill_evs(
     return spill_evs
 
 
+@dataclasses.dataclass
+class SpillPenalty:
+    """Objective penalty on each MWh of spill.
+
+    The penalty is `defaults.spill_penalty_multiplier` times the largest
+    magnitude of the interval data valued in the objective, so spilling always
+    costs more than any dispatch it could replace, without the objective
+    coefficients spanning more orders of magnitude than needed.
+
+    Attributes:
+        fields: names of the `SiteIntervalData` fields valued in the objective.
+        constants: other values in the objective, like the gas carbon intensity.
+    """
+
+    fields: tuple[str, ...]
+    constants: tuple[float, ...] = ()
+
+    def value(self, interval_data: "epl.assets.site.SiteIntervalData") -> float:
+        """Calculate the penalty for the interval data.
+
+        Args:
+            interval_data: interval data used in the simulation.
+        """
+        magnitudes = [
+            float(np.max(np.abs(getattr(interval_data, field)), initial=0.0))
+            for field in self.fields
+        ]
+        magnitudes += [abs(float(constant)) for constant in self.constants]
+        return defaults.spill_penalty_multiplier * max(
+            [*magnitudes, defaults.spill_penalty_min_magnitude]
+        )
+
+
+@dataclasses.dataclass
+class ObjectiveTerm:
+    """Objective coefficients for a group of variables.
+
+    The coefficient of each variable is `scale * interval_data.<field>[interval]`,
+    `scale * penalty.value(interval_data)` for spill penalties, or `scale` when
+    neither `field` nor `penalty` is set.  Keeping the interval of each variable
+    allows the coefficients to be recalculated for new interval data without
+    rebuilding the objective.
+
+    Attributes:
+        variables: linear program variables - floats are treated as constants.
+        intervals: interval index of each variable.
+        scale: multiplier applied to each coefficient.
+        field: name of the `SiteIntervalData` field the coefficients come from.
+        penalty: spill penalty the coefficients come from.
+    """
+
+    variables: list
+    intervals: list[int]
+    scale: float
+    field: str | None = None
+    penalty: SpillPenalty | None = None
+
+    def coefficients(
+        self, interval_data: "epl.assets.site.SiteIntervalData"
+    ) -> np.ndarray:
+        """Calculate the coefficient of each variable.
+
+        Args:
+            interval_data: interval data used in the simulation.
+        """
+        if self.penalty is not None:
+            return np.full(
+                len(self.variables), self.scale * self.penalty.value(interval_data)
+            )
+        if self.field is None:
+            return np.full(len(self.variables), float(self.scale))
+        data = getattr(interval_data, self.field)
+        assert isinstance(data, np.ndarray)
+        return self.scale * data[np.array(self.intervals, dtype=int)]
+
+
+def objective_term(
+    assets: "list[list[typing.Any]]",
+    attrs: list[str],
+    scale: float,
+    field: str | None = None,
+    penalty: SpillPenalty | None = None,
+) -> ObjectiveTerm:
+    """Create an objective term from per interval lists of assets.
+
+    Args:
+        assets: asset data for each interval.
+        attrs: names of the asset attributes to include.
+        scale: multiplier applied to each coefficient.
+        field: name of the `SiteIntervalData` field the coefficients come from.
+        penalty: spill penalty the coefficients come from.
+    """
+    variables = []
+    intervals = []
+    for i, assets_one_interval in enumerate(assets):
+        for asset in assets_one_interval:
+            for attr in attrs:
+                variables.append(getattr(asset, attr))
+                intervals.append(i)
+    return ObjectiveTerm(variables, intervals, scale, field, penalty)
+
+
+def objective_from_terms(
+    optimizer: "epl.Optimizer",
+    terms: list[ObjectiveTerm],
+    interval_data: "epl.assets.site.SiteIntervalData",
+) -> pulp.LpAffineExpression:
+    """Create a linear program objective from objective terms.
+
+    Args:
+        optimizer: an instance of `epl.Optimizer` class.
+        terms: objective terms to sum.
+        interval_data: interval data used in the simulation.
+    """
+    return optimizer.sum(
+        [
+            variable * coefficient
+            for term in terms
+            for variable, coefficient in zip(
+                term.variables, term.coefficients(interval_data).tolist()
+            )
+        ]
+    )
+
+
+def price_objective_terms(
+    ivars: "epl.IntervalVars",
+    interval_data: "epl.assets.site.SiteIntervalData",
+) -> list[ObjectiveTerm]:
+    """Objective terms for cost minimization.
+
+    Inputs:
+        ivars: linear program variables in the optimization problem.
+        interval_data: interval data used in the simulation.
+    """
+    #  cheating here with the site name (the second `site`)
+    sites = [[site] for site in ivars.asset["site"]["site"]]
+    spills = ivars.filter_objective_variables(epl.assets.spill.SpillOneInterval)
+    spill_evs = filter_spill_evs(ivars, interval_data)
+    generators = ivars.filter_objective_variables(epl.assets.chp.CHPOneInterval)
+    boilers = ivars.filter_objective_variables(epl.assets.boiler.BoilerOneInterval)
+
+    assert isinstance(interval_data.gas_prices, np.ndarray)
+    assert isinstance(interval_data.electricity_prices, np.ndarray)
+    assert isinstance(interval_data.export_electricity_prices, np.ndarray)
+
+    penalty = SpillPenalty(
+        ("electricity_prices", "export_electricity_prices", "gas_prices")
+    )
+    return [
+        objective_term(sites, ["import_power_mwh"], 1.0, "electricity_prices"),
+        objective_term(sites, ["export_power_mwh"], -1.0, "export_electricity_prices"),
+        objective_term(
+            spills,
+            [
+                "electric_generation_mwh",
+                "high_temperature_generation_mwh",
+                "electric_load_mwh",
+                "high_temperature_load_mwh",
+            ],
+            1.0,
+            penalty=penalty,
+        ),
+        objective_term(
+            spill_evs,
+            ["electric_charge_mwh", "electric_discharge_mwh"],
+            1.0,
+            penalty=penalty,
+        ),
+        objective_term(generators, ["gas_consumption_mwh"], 1.0, "gas_prices"),
+        objective_term(boilers, ["gas_consumption_mwh"], 1.0, "gas_prices"),
+    ]
+
+
 def price_objective(
     optimizer: "epl.Optimizer",
     ivars: "epl.IntervalVars",
@@ -54,44 +231,57 @@ def price_objective(
     Returns:
         A linear programming objective as an instance of `pulp.LpAffineExpression` class.
     """
+    return objective_from_terms(
+        optimizer, price_objective_terms(ivars, interval_data), interval_data
+    )
 
+
+def carbon_objective_terms(
+    ivars: "epl.IntervalVars",
+    interval_data: "epl.assets.site.SiteIntervalData",
+) -> list[ObjectiveTerm]:
+    """Objective terms for carbon emission minimization.
+
+    Inputs:
+        ivars: linear program variables in the optimization problem.
+        interval_data: interval data used in the simulation.
+    """
     #  cheating here with the site name (the second `site`)
-    sites = ivars.asset["site"]["site"]
+    sites = [[site] for site in ivars.asset["site"]["site"]]
     spills = ivars.filter_objective_variables(epl.assets.spill.SpillOneInterval)
     spill_evs = filter_spill_evs(ivars, interval_data)
     generators = ivars.filter_objective_variables(epl.assets.chp.CHPOneInterval)
     boilers = ivars.filter_objective_variables(epl.assets.boiler.BoilerOneInterval)
 
-    assert isinstance(interval_data.gas_prices, np.ndarray)
-    assert isinstance(interval_data.electricity_prices, np.ndarray)
-    assert isinstance(interval_data.export_electricity_prices, np.ndarray)
+    assert isinstance(interval_data.electricity_carbon_intensities, np.ndarray)
 
-    obj = [
-        sites[i].import_power_mwh * interval_data.electricity_prices[i]
-        - sites[i].export_power_mwh * interval_data.export_electricity_prices[i]
-        + [
-            spill.electric_generation_mwh * defaults.spill_objective_penalty
-            + spill.high_temperature_generation_mwh * defaults.spill_objective_penalty
-            + spill.electric_load_mwh * defaults.spill_objective_penalty
-            + spill.high_temperature_load_mwh * defaults.spill_objective_penalty
-            for spill in spills[i]
-        ]
-        + [
-            spill_ev.electric_charge_mwh * defaults.spill_objective_penalty
-            + spill_ev.electric_discharge_mwh * defaults.spill_objective_penalty
-            for spill_ev in spill_evs[i]
-        ]
-        + [
-            generator.gas_consumption_mwh * interval_data.gas_prices[i]
-            for generator in generators[i]
-        ]
-        + [
-            boiler.gas_consumption_mwh * interval_data.gas_prices[i]
-            for boiler in boilers[i]
-        ]
-        for i in interval_data.idx
+    #  dumping heat has no penalty
+    #  so high_temperature_load_mwh and low_temperature_load_mwh
+    #  are not included here
+    spill_attrs = [
+        "electric_generation_mwh",
+        "high_temperature_generation_mwh",
+        "electric_load_mwh",
+        "electric_charge_mwh",
+        "electric_discharge_mwh",
+    ]
+    penalty = SpillPenalty(
+        ("electricity_carbon_intensities",), (defaults.gas_carbon_intensity,)
+    )
+    return [
+        objective_term(
+            sites, ["import_power_mwh"], 1.0, "electricity_carbon_intensities"
+        ),
+        objective_term(
+            sites, ["export_power_mwh"], -1.0, "electricity_carbon_intensities"
+        ),
+        objective_term(spills, spill_attrs, 1.0, penalty=penalty),
+        objective_term(spill_evs, spill_attrs, 1.0, penalty=penalty),
+        objective_term(
+            generators, ["gas_consumption_mwh"], defaults.gas_carbon_intensity
+        ),
+        objective_term(boilers, ["gas_consumption_mwh"], defaults.gas_carbon_intensity),
     ]
-    return optimizer.sum(obj)
 
 
 def carbon_objective(
@@ -113,48 +303,10 @@ def carbon_objective(
     Returns:
         A linear programming objective as an instance of `pulp.LpAffineExpression` class.
     """
-
-    #  cheating here with the site name (the second `site`)
-    sites = ivars.asset["site"]["site"]
-    spills = ivars.filter_objective_variables(epl.assets.spill.SpillOneInterval)
-    spill_evs = filter_spill_evs(ivars, interval_data)
-    generators = ivars.filter_objective_variables(epl.assets.chp.CHPOneInterval)
-    boilers = ivars.filter_objective_variables(epl.assets.boiler.BoilerOneInterval)
-
-    assert isinstance(interval_data.electricity_carbon_intensities, np.ndarray)
-    obj = [
-        sites[i].import_power_mwh * interval_data.electricity_carbon_intensities[i]
-        - sites[i].export_power_mwh * interval_data.electricity_carbon_intensities[i]
-        + [
-            spill.electric_generation_mwh * defaults.spill_objective_penalty
-            + spill.high_temperature_generation_mwh * defaults.spill_objective_penalty
-            + spill.electric_load_mwh * defaults.spill_objective_penalty
-            + spill.electric_charge_mwh * defaults.spill_objective_penalty
-            + spill.electric_discharge_mwh * defaults.spill_objective_penalty
-            #  dumping heat has no penalty
-            #  so high_temperature_load_mwh and low_temperature_load_mwh
-            #  are not included here
-            for spill in spills[i]
-        ]
-        + [
-            spill.electric_generation_mwh * defaults.spill_objective_penalty
-            + spill.high_temperature_generation_mwh * defaults.spill_objective_penalty
-            + spill.electric_load_mwh * defaults.spill_objective_penalty
-            + spill.electric_charge_mwh * defaults.spill_objective_penalty
-            + spill.electric_discharge_mwh * defaults.spill_objective_penalty
-            for spill in spill_evs[i]
-        ]
-        + [
-            generator.gas_consumption_mwh * defaults.gas_carbon_intensity
-            for generator in generators[i]
-        ]
-        + [
-            boiler.gas_consumption_mwh * defaults.gas_carbon_intensity
-            for boiler in boilers[i]
-        ]
-        for i in interval_data.idx
-    ]
-    return optimizer.sum(obj)
+    return objective_from_terms(
+        optimizer, carbon_objective_terms(ivars, interval_data), interval_data
+    )
 
 
 objectives = {"price": price_objective, "carbon": carbon_objective}
+objective_terms = {"price": price_objective_terms, "carbon": carbon_objective_terms}
@@ -4,33 +4,114 @@ Interface to the `pulp` optimization library to solve linear programming problem
 The `Optimizer` allows creating linear constraints, variables, and objectives, along with a linear program solver.
 """
 import dataclasses
-import datetime
+import pathlib
+import tempfile
 import typing
 
+import numpy as np
 import pulp
 
+from energypylinear import presolve, scaling, telemetry
 from energypylinear.logger import logger
+from energypylinear.solvers import backends, follow_log, parse_cbc_log
+from energypylinear.sparse import SparseModel
 
 
 @dataclasses.dataclass
 class OptimizationStatus:
-    """Result of a linear program optimization."""
+    """Result of a linear program optimization.
+
+    Attributes:
+        status: the `pulp` status string.
+        feasible: whether a feasible solution was found.
+        stats: objective, bound, gap, nodes, iterations and time of the solve.
+    """
 
     status: str
     feasible: bool
+    stats: telemetry.SolverStats = dataclasses.field(
+        default_factory=telemetry.SolverStats
+    )
+
+
+builders = ("pulp", "sparse")
+solvers = tuple(backends.keys())
+
+
+def bounds_array(
+    bound: float | np.ndarray | None, shape: tuple[int, ...], unbounded: float
+) -> np.ndarray:
+    """Broadcast variable bounds to an array, with None for no bound.
+
+    Args:
+        bound: bound of each variable - None or infinite for no bound.
+        shape: shape of the variable array.
+        unbounded: value used for no bound - either -inf or inf.
+    """
+    values = np.broadcast_to(
+        np.asarray(unbounded if bound is None else bound, dtype=np.float64), shape
+    )
+    bounds = values.astype(object)
+    bounds[~np.isfinite(values)] = None
+    return bounds
+
+
+def array_labels(
+    shape: tuple[int, ...], index: typing.Sequence[int | str] | None = None
+) -> typing.Iterator[str]:
+    """Labels of each position of an array, in C order.
+
+    Args:
+        shape: shape of the array.
+        index: labels for the first dimension - defaults to the position.
+    """
+    if index is not None:
+        assert len(index) == shape[0], "index must match the first dimension"
+    for position in np.ndindex(shape):
+        first = position[0] if index is None else index[position[0]]
+        yield "-".join([str(first), *map(str, position[1:])])
 
 
 @dataclasses.dataclass
 class OptimizerConfig:
-    """Configures the CBC optimizer.
+    """Configures the optimizer.
 
     See https://coin-or.github.io/pulp/technical/solvers.html#pulp.apis.PULP_CBC_CMD
+
+    The `solver` selects the backend used to solve the linear program:
+
+    - `cbc` runs the CBC binary that ships with `pulp`,
+    - `highs` solves in-process with the `highspy` bindings, using the
+        `sparse` builder to pass the model as arrays.
+
+    The `builder` controls how the linear program is held before solving:
+
+    - `pulp` builds a `pulp.LpProblem`, which `pulp` serializes for the solver,
+    - `sparse` converts constraints into a `energypylinear.sparse.SparseModel`
+        of coefficient triplets as they are added, which is written straight
+        to the solver.
+
+    With `scaling`, the rows and objective are scaled by powers of two before
+    solving - see `energypylinear.scaling`.
+
+    With `model_presolve`, the model is presolved before it is passed to the
+    solver, using the `sparse` builder - see `energypylinear.presolve`.  This
+    is separate from `presolve`, which turns the solver presolve on or off.
     """
 
     verbose: bool = False
     presolve: bool = True
     relative_tolerance: float = 0.02
     timeout: int = 60 * 3
+    builder: str = "pulp"
+    solver: str = "cbc"
+    scaling: bool = False
+    model_presolve: bool = False
+
+    def __post_init__(self) -> None:
+        """Validates the optimizer configuration."""
+        assert self.builder in builders, f"builder must be one of {builders}"
+        assert self.solver in solvers, f"solver must be one of {solvers}"
 
     def dict(self) -> dict:
         """Creates a dictionary - matching the pydantic.dict() API."""
@@ -44,24 +125,48 @@ class Optimizer:
     Attributes:
         prob: problem to be optimized.
         solver: solver to use for solving the optimization problem.
+        model: sparse matrix model, used instead of `prob` with the `sparse` builder.
+        backend: solves the sparse model and holds its solution.
+        presolve_report: how much the last solve was presolved, with
+            `model_presolve`.
+        timings: time spent in each phase of building and solving.
+        model_stats: size of the linear program at the last solve.
+        solver_stats: solver statistics of the last solve, in the units of the
+            objective function.
+        variable_labels: array name and label of each variable, by the `pulp`
+            variable name, to map the solution of one linear program onto another.
     """
 
     def __init__(self, cfg: OptimizerConfig = OptimizerConfig()) -> None:
         """Initialize an Optimizer."""
         self.cfg = cfg
-        name = str(datetime.datetime.now())
-        name = name.replace(" ", "-")
-        self.prob = pulp.LpProblem(name, pulp.LpMinimize)
+        #  a fixed name keeps the linear program independent of when it was built
+        self.prob = pulp.LpProblem("energypylinear", pulp.LpMinimize)
+        #  the CBC log is written to a file to read the solver statistics,
+        #  and printed after the solve when verbose
         self.solver = pulp.PULP_CBC_CMD(
-            msg=self.cfg.verbose,
+            msg=False,
             presolve=self.cfg.presolve,
             gapRel=self.cfg.relative_tolerance,
             timeLimit=self.cfg.timeout,
         )
+        sparse = (
+            self.cfg.builder == "sparse"
+            or self.cfg.solver != "cbc"
+            or self.cfg.model_presolve
+        )
+        self.model = SparseModel() if sparse else None
+        self.backend = backends[self.cfg.solver](self.cfg)
+        self.presolve_report: presolve.PresolveReport | None = None
+        self.timings = telemetry.Timings()
+        self.backend.timings = self.timings
+        self.model_stats: telemetry.ModelStats | None = None
+        self.solver_stats: telemetry.SolverStats | None = None
+        self.variable_labels: dict[str, tuple[str, str]] = {}
 
     def __repr__(self) -> str:
         """A string representation of self."""
-        return f"<energypylinear.Optimizer cfg: {self.cfg} variables: {len(self.variables())} constraints: {len(self.constraints())}>"
+        return f"<energypylinear.Optimizer cfg: {self.cfg} variables: {len(self.variables())} constraints: {self.n_constraints()}>"
 
     def continuous(
         self, name: str, low: float = 0, up: float | None = None
@@ -74,7 +179,12 @@ class Optimizer:
             up: The upper bound of the variable.
         """
         # logger.debug("optimizer.continuous", name=name)
-        return pulp.LpVariable(name=name, lowBound=low, upBound=up, cat="Continuous")
+        variable = pulp.LpVariable(
+            name=name, lowBound=low, upBound=up, cat="Continuous"
+        )
+        if self.model is not None:
+            self.model.add_variable(variable)
+        return variable
 
     def binary(self, name: str) -> pulp.LpVariable:
         """Creates a new binary linear programming variable.
@@ -83,7 +193,92 @@ class Optimizer:
             name: The name of the variable.
         """
         # logger.debug("optimizer.binary", name=name)
-        return pulp.LpVariable(name=name, cat="Binary")
+        variable = pulp.LpVariable(name=name, cat="Binary")
+        if self.model is not None:
+            self.model.add_variable(variable)
+        return variable
+
+    def continuous_array(
+        self,
+        name: str,
+        shape: int | tuple[int, ...],
+        low: float | np.ndarray | None = 0,
+        up: float | np.ndarray | None = None,
+        index: typing.Sequence[int | str] | None = None,
+        mask: np.ndarray | list | None = None,
+    ) -> np.ndarray:
+        """Creates an array of continuous linear programming variables.
+
+        Variables are named `{name}-{index}`, with the index of each dimension
+        separated by `-`.
+
+        Args:
+            name: The name prefix of the variables.
+            shape: The shape of the array.
+            low: The lower bounds, broadcast to `shape` - None or -inf is unbounded.
+            up: The upper bounds, broadcast to `shape` - None or inf is unbounded.
+            index: Labels for the first dimension, used in the variable names -
+                defaults to the position along the first dimension.
+            mask: Where to create variables, broadcast to `shape` - other
+                positions are 0.
+        """
+        return self._variable_array(
+            name, shape, low, up, pulp.LpContinuous, index, mask
+        )
+
+    def binary_array(
+        self,
+        name: str,
+        shape: int | tuple[int, ...],
+        index: typing.Sequence[int | str] | None = None,
+        mask: np.ndarray | list | None = None,
+    ) -> np.ndarray:
+        """Creates an array of binary linear programming variables.
+
+        Variables are named `{name}-{index}`, with the index of each dimension
+        separated by `-`.
+
+        Args:
+            name: The name prefix of the variables.
+            shape: The shape of the array.
+            index: Labels for the first dimension, used in the variable names -
+                defaults to the position along the first dimension.
+            mask: Where to create variables, broadcast to `shape` - other
+                positions are 0.
+        """
+        return self._variable_array(name, shape, 0, 1, pulp.LpInteger, index, mask)
+
+    def _variable_array(
+        self,
+        name: str,
+        shape: int | tuple[int, ...],
+        low: float | np.ndarray | None,
+        up: float | np.ndarray | None,
+        cat: str,
+        index: typing.Sequence[int | str] | None,
+        mask: np.ndarray | list | None,
+    ) -> np.ndarray:
+        """Creates an array of linear programming variables of one category."""
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        lows = bounds_array(low, shape, -np.inf)
+        ups = bounds_array(up, shape, np.inf)
+        create = (
+            np.ones(shape, dtype=bool)
+            if mask is None
+            else np.broadcast_to(np.asarray(mask, dtype=bool), shape)
+        )
+        variables = np.zeros(shape, dtype=object)
+        for position, label in zip(np.ndindex(shape), array_labels(shape, index)):
+            if create[position]:
+                variable = pulp.LpVariable(
+                    f"{name}-{label}", lows[position], ups[position], cat
+                )
+                variables[position] = variable
+                self.variable_labels[variable.name] = (name, label)
+        if self.model is not None:
+            for variable in variables[create]:
+                self.model.add_variable(variable)
+        return variables
 
     def sum(
         self, vector: list[pulp.LpAffineExpression | float]
@@ -100,46 +295,246 @@ class Optimizer:
     ) -> pulp.LpConstraint:
         """Create a linear program constrain.
 
+        With the `sparse` builder the constraint is converted into a row of the
+        sparse model and not kept.
+
         Args:
             constraint: equality or inequality expression.
             name: optional name to give to the constraint.
         """
+        if self.model is not None:
+            self.model.add_constraint(constraint)
+            return constraint
         return self.prob.addConstraint(constraint, name)
 
+    def constrain_many(
+        self,
+        coefficients: np.ndarray | list | float,
+        variables: np.ndarray | list,
+        sense: int,
+        rhs: np.ndarray | float = 0,
+    ) -> np.ndarray:
+        """Create a block of linear program constraints.
+
+        Row `r` of the block constrains `sum(coefficients[r] * variables[r])`
+        against `rhs[r]`.  Entries of `variables` that are numbers rather than
+        variables are moved to the right hand side.
+
+        Args:
+            coefficients: coefficient of each term, broadcast to `variables`.
+            variables: 2D array of the variables in each row - shape (rows, terms).
+            sense: sense of every row - one of `pulp.LpConstraintEQ`,
+                `pulp.LpConstraintLE` or `pulp.LpConstraintGE`.
+            rhs: right hand side of each row, broadcast to the number of rows.
+
+        Returns:
+            The row indices of the constraints.
+        """
+        variables = np.asarray(variables, dtype=object)
+        assert variables.ndim == 2, "variables must be a 2D array of (rows, terms)"
+        n_rows = variables.shape[0]
+        coefficients = np.broadcast_to(
+            np.asarray(coefficients, dtype=np.float64), variables.shape
+        )
+        is_variable = np.array(
+            [isinstance(v, pulp.LpVariable) for v in variables.flat], dtype=bool
+        ).reshape(variables.shape)
+        constants = np.where(is_variable, 0.0, variables).astype(np.float64)
+        row_rhs = np.broadcast_to(
+            np.asarray(rhs, dtype=np.float64), (n_rows,)
+        ) - np.sum(coefficients * constants, axis=1)
+
+        keep = is_variable & (coefficients != 0)
+        rows, terms = np.nonzero(keep)
+        if self.model is not None:
+            cols = np.array(
+                [self.model.column(v) for v in variables[rows, terms]], dtype=np.int64
+            )
+            #  a variable repeated in a row is one coefficient, like in `pulp`
+            n_cols = self.model.n_cols
+            entries, inverse = np.unique(rows * n_cols + cols, return_inverse=True)
+            vals = np.zeros(len(entries))
+            np.add.at(vals, inverse, coefficients[rows, terms])
+            nonzero = vals != 0
+            entries, vals = entries[nonzero], vals[nonzero]
+            return self.model.add_rows(
+                entries // n_cols,
+                entries % n_cols,
+                vals,
+                np.full(n_rows, sense, dtype=np.int8),
+                row_rhs,
+            )
+
+        start = len(self.prob.constraints)
+        expressions: list[dict] = [{} for _ in range(n_rows)]
+        for row, variable, coefficient in zip(
+            rows.tolist(), variables[rows, terms], coefficients[rows, terms].tolist()
+        ):
+            expression = expressions[row]
+            expression[variable] = expression.get(variable, 0) + coefficient
+        for expression, value in zip(expressions, row_rhs.tolist()):
+            self.prob.addConstraint(
+                pulp.LpConstraint(expression, sense=sense, rhs=value)
+            )
+        return np.arange(start, start + n_rows, dtype=np.int64)
+
     def objective(self, objective: pulp.LpAffineExpression) -> pulp.LpConstraint:
         """Sets the linear program objective function.
 
         Args:
             objective: cost function to optimize.
         """
+        if self.model is not None:
+            return self.model.set_objective(objective)
         return self.prob.setObjective(objective)
 
+    def relax(self) -> None:
+        """Relax all integer and binary variables to continuous variables.
+
+        Variables keep their bounds, so binary variables are relaxed into [0, 1].
+        Solving the relaxed linear program gives a lower bound on the objective.
+        """
+        for variable in self.variables():
+            if variable.cat == pulp.LpInteger:
+                variable.cat = pulp.LpContinuous
+
     def solve(
-        self, verbose: bool = False, allow_infeasible: bool = False
+        self,
+        verbose: bool = False,
+        allow_infeasible: bool = False,
+        timeout: float | None = None,
     ) -> OptimizationStatus:
         """Solve the optimization problem.
 
         Args:
             verbose: a flag indicating how verbose the output should be.  0 for no output.
             allow_infeasible: whether an infeasible solution should raise an error.
+            timeout: time limit in seconds for this solve - defaults to `cfg.timeout`.
         """
-        logger.debug(
-            "optimizer.solve",
-            variables=len(self.variables()),
-            constraints=len(self.constraints()),
-        )
+        self.model_stats = telemetry.model_stats(self)
+        logger.debug("optimizer.solve", **dataclasses.asdict(self.model_stats))
         self.assert_no_duplicate_variables()
-        self.solver.solve(self.prob)
+        if self.model is not None:
+            self.solve_model(self.model, timeout=timeout)
+        else:
+            self.solve_problem(self.prob, timeout=timeout)
 
         status = self.status()
         if verbose > 0:
-            logger.info("optimizer.solve", status=status)
+            logger.info("optimizer.solve", status=status, stats=self.solver_stats)
 
         feasible = status == "Optimal"
         if not allow_infeasible:
             assert feasible
 
-        return OptimizationStatus(status=status, feasible=feasible)
+        assert self.solver_stats is not None
+        return OptimizationStatus(
+            status=status, feasible=feasible, stats=self.solver_stats
+        )
+
+    def coefficient_ranges(self) -> scaling.CoefficientRanges:
+        """Smallest and largest magnitudes of the coefficients, before scaling.
+
+        With the `pulp` builder this is measured after any scaling done by a
+        previous `solve`.
+        """
+        model = self.model
+        if model is None:
+            model = SparseModel.from_problem(self.prob)
+        return scaling.coefficient_ranges(model)
+
+    def solve_problem(self, prob: pulp.LpProblem, timeout: float | None = None) -> None:
+        """Solve the `pulp` problem with CBC, and read the solver statistics from its log.
+
+        Args:
+            prob: the problem to solve.
+            timeout: time limit in seconds - defaults to `cfg.timeout`.
+        """
+        solved, objective_scale = prob, 1.0
+        if self.cfg.scaling:
+            with self.timings.phase("presolve"):
+                solved, objective_scale = scaling.scale_problem(prob)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            log = pathlib.Path(tmp) / "cbc.log"
+            self.solver.optionsDict["logPath"] = str(log)
+            self.solver.timeLimit = self.cfg.timeout if timeout is None else timeout
+            try:
+                with self.timings.phase("solve"), follow_log(log, self.cfg.verbose):
+                    self.solver.solve(solved)
+            finally:
+                del self.solver.optionsDict["logPath"]
+                self.solver.timeLimit = self.cfg.timeout
+            prob.status, prob.sol_status = solved.status, solved.sol_status
+            text = log.read_text() if log.exists() else ""
+
+        value = pulp.value(prob.objective) if prob.objective is not None else 0.0
+        self.solver_stats = parse_cbc_log(text).rescale(value, objective_scale)
+
+    def solve_model(self, model: SparseModel, timeout: float | None = None) -> None:
+        """Solve the sparse model with the backend, and assign the solution.
+
+        The backend solves a presolved or scaled copy of the model, so
+        compiled updates to the model stay in the original columns and units.
+
+        Args:
+            model: the sparse model to solve.
+            timeout: time limit in seconds - defaults to `cfg.timeout`.
+        """
+        solved = model
+        presolved = None
+        with self.timings.phase("presolve"):
+            if self.cfg.model_presolve:
+                presolved = presolve.presolve(model)
+                self.presolve_report = presolved.report
+                logger.debug("optimizer.presolve", report=presolved.report)
+                solved = presolved.model
+            objective_scale = 1.0
+            if self.cfg.scaling:
+                objective_scale = scaling.objective_scale(solved.cost_vector())
+                solved = scaling.scale_model(solved)
+
+        warm_start = self.backend.warm_start
+        if presolved is not None and warm_start is not None:
+            self.backend.warm_start = presolved.reduce(warm_start)
+        try:
+            self.backend.solve(solved, timeout=timeout)
+        finally:
+            self.backend.warm_start = warm_start
+
+        assert self.backend.solution is not None
+        if presolved is not None:
+            self.backend.solution = presolved.postsolve(self.backend.solution)
+        model.assign(self.backend.solution)
+        objective = float(model.cost_vector() @ self.backend.solution)
+        self.solver_stats = self.backend.stats.rescale(
+            objective + model.objective_offset, objective_scale
+        )
+
+    def set_warm_start(self, values: typing.Mapping[str, float]) -> int:
+        """Set a MIP start for the next solve, from values of variables by name.
+
+        With the `sparse` builder, variables without a value are left for the
+        solver to complete - with `pulp` they start at zero.
+
+        Args:
+            values: start value of variables, by `pulp` variable name.
+
+        Returns:
+            The number of variables given a start value.
+        """
+        variables = self.variables()
+        start = np.array(
+            [values.get(variable.name, np.nan) for variable in variables],
+            dtype=np.float64,
+        )
+        if self.model is not None:
+            self.backend.warm_start = start
+        else:
+            for variable, value in zip(variables, start.tolist()):
+                variable.varValue = None if np.isnan(value) else value
+            self.solver.optionsDict["warmStart"] = True
+        return int(np.isfinite(start).sum())
 
     def assert_no_duplicate_variables(self) -> None:
         """Check there are no duplicate variable names in the optimization problem."""
@@ -151,16 +546,49 @@ class Optimizer:
 
     def status(self) -> str:
         """Return the status of the optimization problem."""
+        if self.model is not None:
+            return self.backend.status()
         return pulp.LpStatus[self.prob.status]
 
     def constraints(self) -> list[pulp.LpConstraint]:
-        """Constraints of the optimization problem."""
+        """Constraints of the optimization problem.
+
+        Empty with the `sparse` builder, which doesn't keep constraint objects.
+        """
         return self.prob.constraints
 
+    def n_constraints(self) -> int:
+        """Number of constraints in the optimization problem."""
+        if self.model is not None:
+            return self.model.n_rows
+        return len(self.prob.constraints)
+
     def variables(self) -> list[pulp.LpVariable]:
         """Variables of the optimization problem."""
+        if self.model is not None:
+            return self.model.variables
         return self.prob.variables()
 
+    def solution(self) -> tuple[dict[str, int], np.ndarray]:
+        """Return the column of each variable and the value of each column.
+
+        With the `sparse` builder this is the backend solution vector - with `pulp`
+        the values are collected from the variables.  Variables without a value
+        are NaN.
+        """
+        if self.model is not None and self.backend.solution is not None:
+            return self.model.columns, self.backend.solution
+        variables = self.variables()
+        columns = {variable.name: col for col, variable in enumerate(variables)}
+        values = np.array(
+            [
+                np.nan if variable.varValue is None else variable.varValue
+                for variable in variables
+            ],
+            dtype=np.float64,
+        )
+        return columns, values
+
     def constrain_max(
         self, continuous: pulp.LpVariable, binary: pulp.LpVariable, max: float
     ) -> pulp.LpConstraint:
@@ -192,6 +620,10 @@ class Optimizer:
             variable: either a pulp variable or number.
         """
         if isinstance(variable, pulp.LpVariable):
+            if self.model is not None and self.backend.solution is not None:
+                col = self.model.columns.get(variable.name)
+                if col is not None:
+                    return self.backend.value(col)
             return variable.value()
         else:
             return float(variable)
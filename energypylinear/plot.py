@@ -193,7 +193,11 @@ def plot_evs(
         **charge_event_heatmap_config,
         #  unmask out the periods where charge_event was positive
         # mask=results.interval_data.evs.charge_events == 0,
-        mask=asset.cfg.charge_events == 0,
+        mask=asset.cfg.is_active(
+            np.arange(charge_event_usage.shape[0])[:, np.newaxis],
+            np.arange(charge_event_usage.shape[1]),
+        )
+        == 0,
         fmt="",
     )
     axes[1].set_xlabel("Charge Events Net Charge (Discharge is Negative)")
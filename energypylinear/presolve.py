@@ -0,0 +1,360 @@
+"""Presolve of sparse linear programs, before they are passed to the solver.
+
+Many asset constraints are definitions, like battery losses or CHP gas use, or
+single variable bounds written as rows, like EV charger binaries pinned to zero
+outside of charge events.  Presolve removes them from the model the solver sees:
+
+- singleton rows become variable bounds,
+- fixed variables are substituted into their rows and the objective,
+- a continuous variable defined by an equality of two variables is substituted
+  by the other variable, with its bounds moved onto the other variable,
+- duplicate rows are dropped, keeping the tightest right hand side.
+
+The solution of the presolved model is mapped back onto all the variables of
+the original model with `Presolved.postsolve`.
+"""
+import dataclasses
+import math
+
+import numpy as np
+import pulp
+
+from energypylinear.sparse import EQ, GE, LE, SparseModel
+
+#  coefficients and bound violations smaller than this are treated as zero
+tolerance = 1e-9
+#  largest ratio of coefficients in a substituted equality, to keep the
+#  substituted rows well conditioned
+max_substitution_ratio = 1e3
+
+
+@dataclasses.dataclass
+class PresolveReport:
+    """How much presolve reduced a linear program.
+
+    Attributes:
+        rows: number of rows before and after presolve.
+        cols: number of columns before and after presolve.
+        singleton_rows: rows turned into variable bounds.
+        fixed_cols: columns fixed at a value and substituted out.
+        substituted_cols: columns defined by an equality and substituted out.
+        duplicate_rows: duplicate rows dropped.
+    """
+
+    rows: tuple[int, int] = (0, 0)
+    cols: tuple[int, int] = (0, 0)
+    singleton_rows: int = 0
+    fixed_cols: int = 0
+    substituted_cols: int = 0
+    duplicate_rows: int = 0
+
+
+@dataclasses.dataclass
+class Presolved:
+    """A presolved linear program, and how to map its solution back.
+
+    Attributes:
+        model: the presolved model, with its own copy of the kept variables.
+        kept: column in the original model of each presolved model column.
+        n_cols: number of columns in the original model.
+        postsolve_steps: fixed columns as `(col, value, None)` and substituted
+            columns as `(col, constant, (other col, coefficient))`, in the order
+            they were removed.
+        report: how much presolve reduced the linear program.
+    """
+
+    model: SparseModel
+    kept: np.ndarray
+    n_cols: int
+    postsolve_steps: list[tuple[int, float, tuple[int, float] | None]]
+    report: PresolveReport
+
+    def postsolve(self, solution: np.ndarray) -> np.ndarray:
+        """Map a solution of the presolved model onto the original model columns.
+
+        Args:
+            solution: value of each presolved model column.
+        """
+        values = np.zeros(self.n_cols)
+        values[self.kept] = solution
+        for col, constant, substitution in reversed(self.postsolve_steps):
+            if substitution is None:
+                values[col] = constant
+            else:
+                other, coefficient = substitution
+                values[col] = constant + coefficient * values[other]
+        return values
+
+    def reduce(self, values: np.ndarray) -> np.ndarray:
+        """Map values of the original model columns onto the presolved model.
+
+        Args:
+            values: value of each original model column.
+        """
+        return np.asarray(values)[self.kept]
+
+
+def tighten_bound(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    integer: np.ndarray,
+    col: int,
+    low: float,
+    up: float,
+) -> bool:
+    """Tighten the bounds of a column, if the new bounds are consistent.
+
+    Args:
+        lower: lower bound of each column, updated in place.
+        upper: upper bound of each column, updated in place.
+        integer: whether each column is an integer variable.
+        col: the column to tighten.
+        low: new lower bound.
+        up: new upper bound.
+
+    Returns:
+        Whether the bounds were consistent, and so updated.
+    """
+    low, up = max(lower[col], low), min(upper[col], up)
+    if integer[col]:
+        low = math.ceil(low - tolerance) if np.isfinite(low) else low
+        up = math.floor(up + tolerance) if np.isfinite(up) else up
+    if low > up + tolerance:
+        return False
+    lower[col], upper[col] = low, max(low, up)
+    return True
+
+
+def presolve(model: SparseModel) -> Presolved:
+    """Presolve a sparse model.
+
+    The model itself isn't changed, so a compiled model can be updated and
+    presolved again.
+
+    Args:
+        model: the model to presolve.
+    """
+    n_rows, n_cols = model.n_rows, model.n_cols
+    report = PresolveReport()
+
+    row_entries: list[dict[int, float]] = [{} for _ in range(n_rows)]
+    col_rows: list[set[int]] = [set() for _ in range(n_cols)]
+    for row, col, val in zip(
+        np.frombuffer(model.rows, dtype=np.int64).tolist(),
+        np.frombuffer(model.cols, dtype=np.int64).tolist(),
+        np.frombuffer(model.vals, dtype=np.float64).tolist(),
+    ):
+        if val != 0:
+            entries = row_entries[row]
+            entries[col] = entries.get(col, 0.0) + val
+            col_rows[col].add(row)
+
+    sense = np.frombuffer(model.sense, dtype=np.int8).copy()
+    rhs = np.frombuffer(model.rhs, dtype=np.float64).copy()
+    lower, upper = model.col_bounds()
+    integer = model.integrality()
+    cost = model.cost_vector()
+    offset = model.objective_offset
+
+    active_rows = np.ones(n_rows, dtype=bool)
+    active_cols = np.ones(n_cols, dtype=bool)
+    steps: list[tuple[int, float, tuple[int, float] | None]] = []
+
+    def drop_row(row: int) -> None:
+        """Remove a row from the model."""
+        for col in row_entries[row]:
+            col_rows[col].discard(row)
+        row_entries[row] = {}
+        active_rows[row] = False
+
+    def singleton_row(row: int) -> bool:
+        """Move a row with one entry onto the bounds of its column."""
+        ((col, val),) = row_entries[row].items()
+        bound = rhs[row] / val
+        if sense[row] == EQ:
+            low, up = bound, bound
+        elif (sense[row] == LE) == (val > 0):
+            low, up = -np.inf, bound
+        else:
+            low, up = bound, np.inf
+        if not tighten_bound(lower, upper, integer, col, low, up):
+            return False
+        drop_row(row)
+        report.singleton_rows += 1
+        return True
+
+    def fix_col(col: int) -> None:
+        """Remove a column with equal bounds, moving its value into the rhs."""
+        nonlocal offset
+        value = float(lower[col])
+        for row in col_rows[col]:
+            rhs[row] -= row_entries[row].pop(col) * value
+        col_rows[col] = set()
+        offset += cost[col] * value
+        cost[col] = 0.0
+        active_cols[col] = False
+        steps.append((col, value, None))
+        report.fixed_cols += 1
+
+    def substitute(row: int) -> bool:
+        """Eliminate a continuous column of an equality row with two entries."""
+        nonlocal offset
+        (x, a), (y, b) = row_entries[row].items()
+        #  eliminate a continuous column, preferring the one in fewer rows
+        if integer[x] or (not integer[y] and len(col_rows[y]) < len(col_rows[x])):
+            (x, a), (y, b) = (y, b), (x, a)
+        if integer[x] or abs(b / a) > max_substitution_ratio:
+            return False
+
+        #  x = constant + coefficient * y, and the bounds of x move onto y
+        constant, coefficient = rhs[row] / a, -b / a
+        bounds = sorted(
+            [(lower[x] - constant) / coefficient, (upper[x] - constant) / coefficient]
+        )
+        if not tighten_bound(lower, upper, integer, y, *bounds):
+            return False
+
+        drop_row(row)
+        for other in col_rows[x]:
+            entries = row_entries[other]
+            val = entries.pop(x)
+            rhs[other] -= val * constant
+            merged = entries.get(y, 0.0) + val * coefficient
+            if abs(merged) > tolerance:
+                entries[y] = merged
+                col_rows[y].add(other)
+            else:
+                entries.pop(y, None)
+                col_rows[y].discard(other)
+        col_rows[x] = set()
+        offset += cost[x] * constant
+        cost[y] += cost[x] * coefficient
+        cost[x] = 0.0
+        active_cols[x] = False
+        steps.append((x, constant, (y, coefficient)))
+        report.substituted_cols += 1
+        return True
+
+    changed = True
+    while changed:
+        changed = False
+        for row in np.flatnonzero(active_rows).tolist():
+            n_entries = len(row_entries[row])
+            if n_entries == 0:
+                violation = {EQ: abs(rhs[row]), LE: -rhs[row], GE: rhs[row]}
+                if violation[int(sense[row])] <= tolerance:
+                    active_rows[row] = False
+            elif n_entries == 1:
+                changed |= singleton_row(row)
+            elif n_entries == 2 and sense[row] == EQ:
+                changed |= substitute(row)
+
+        for col in np.flatnonzero(active_cols & (lower == upper)).tolist():
+            fix_col(col)
+            changed = True
+
+    report.duplicate_rows = drop_duplicate_rows(
+        row_entries, sense, rhs, active_rows, col_rows
+    )
+
+    #  create the presolved model, with copies of the kept variables
+    kept = np.flatnonzero(active_cols)
+    new_col = np.full(n_cols, -1, dtype=np.int64)
+    new_col[kept] = np.arange(len(kept))
+    presolved = SparseModel()
+    for col in kept.tolist():
+        variable = model.variables[col]
+        presolved.add_variable(
+            pulp.LpVariable(
+                variable.name,
+                None if lower[col] == -np.inf else float(lower[col]),
+                None if upper[col] == np.inf else float(upper[col]),
+                variable.cat,
+            )
+        )
+    rows = np.flatnonzero(active_rows)
+    triplets = [
+        (k, new_col[col], val)
+        for k, row in enumerate(rows.tolist())
+        for col, val in row_entries[row].items()
+    ]
+    presolved.add_rows(
+        np.array([t[0] for t in triplets], dtype=np.int64),
+        np.array([t[1] for t in triplets], dtype=np.int64),
+        np.array([t[2] for t in triplets], dtype=np.float64),
+        sense[rows],
+        rhs[rows],
+    )
+    presolved.set_cost(cost[kept], offset)
+
+    report.rows = (n_rows, presolved.n_rows)
+    report.cols = (n_cols, presolved.n_cols)
+    return Presolved(
+        model=presolved,
+        kept=kept,
+        n_cols=n_cols,
+        postsolve_steps=steps,
+        report=report,
+    )
+
+
+def drop_duplicate_rows(
+    row_entries: list[dict[int, float]],
+    sense: np.ndarray,
+    rhs: np.ndarray,
+    active_rows: np.ndarray,
+    col_rows: list[set[int]],
+) -> int:
+    """Drop rows that are a multiple of another row, keeping the tightest.
+
+    Rows are normalized by their first coefficient, so `2x + 2y <= 4` and
+    `-x - y >= -1` are duplicates, and are kept as `2x + 2y <= 2`.
+
+    Args:
+        row_entries: coefficient of each column in each row.
+        sense: sense of each row.
+        rhs: right hand side of each row, updated in place.
+        active_rows: whether each row is kept, updated in place.
+        col_rows: rows of each column, updated in place.
+
+    Returns:
+        The number of rows dropped.
+    """
+    flipped = {EQ: EQ, LE: GE, GE: LE}
+    seen: dict[tuple, tuple[int, float, float]] = {}
+    dropped = 0
+    for row in np.flatnonzero(active_rows).tolist():
+        entries = row_entries[row]
+        if not entries:
+            continue
+        cols = sorted(entries)
+        scale = entries[cols[0]]
+        row_sense = int(sense[row]) if scale > 0 else flipped[int(sense[row])]
+        key = (
+            row_sense,
+            tuple(cols),
+            tuple(float(f"{entries[c] / scale:.12g}") for c in cols),
+        )
+        normalized_rhs = rhs[row] / scale
+        if key not in seen:
+            seen[key] = (row, scale, normalized_rhs)
+            continue
+
+        kept, kept_scale, kept_rhs = seen[key]
+        if row_sense == EQ:
+            if abs(normalized_rhs - kept_rhs) > tolerance * max(1.0, abs(kept_rhs)):
+                continue
+            tightest = kept_rhs
+        elif row_sense == LE:
+            tightest = min(kept_rhs, normalized_rhs)
+        else:
+            tightest = max(kept_rhs, normalized_rhs)
+
+        rhs[kept] = tightest * kept_scale
+        seen[key] = (kept, kept_scale, tightest)
+        for col in entries:
+            col_rows[col].discard(row)
+        row_entries[row] = {}
+        active_rows[row] = False
+        dropped += 1
+    return dropped
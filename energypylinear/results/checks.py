@@ -5,9 +5,6 @@ import json
 import pandas as pd
 
 from energypylinear.logger import logger
-from energypylinear.optimizer import Optimizer
-
-optimizer = Optimizer()
 
 
 def check_electricity_balance(
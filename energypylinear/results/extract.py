@@ -1,20 +1,28 @@
 """Extract results from a solved linear program to a pd.DataFrame."""
-import collections
+import copy
+import typing
 
 import numpy as np
 import pandas as pd
+import pulp
 import pydantic
 
 import energypylinear as epl
+from energypylinear.anytime import AnytimeReport
+from energypylinear.assets.asset import AssetOneInterval
+from energypylinear.decomposition import DecompositionReport
+from energypylinear.elimination import BinaryElimination
 from energypylinear.flags import Flags
 from energypylinear.logger import logger
 from energypylinear.optimizer import Optimizer
 from energypylinear.results.checks import check_results
-from energypylinear.results.schema import quantities, simulation_schema
+from energypylinear.results.schema import get_simulation_schema, quantities
 from energypylinear.results.warnings import warn_spills
+from energypylinear.telemetry import ModelStats, SolverStats, Timings
+from energypylinear.tightening import TighteningReport
+from energypylinear.two_phase import SpillPhaseReport
 from energypylinear.utils import check_array_lengths
-
-optimizer = Optimizer()
+from energypylinear.warm_start import WarmStartReport
 
 
 class SimulationResult(pydantic.BaseModel):
@@ -26,6 +34,15 @@ class SimulationResult(pydantic.BaseModel):
         results: simulation results
         feasible: whether the linear program was feasible
         spill: whether the spill asset was used to make the program feasible
+        decomposition: convergence and quality of a temporal decomposition
+        tightening: how much each big-M bound of the linear program was tightened
+        elimination: binary variables left out of the linear program
+        spill_phase: which phase of a two phase spill optimization was used
+        timings: wall clock and CPU time of each phase of the optimization
+        model_stats: number of variables, binaries, constraints and non-zeros
+        solver_stats: objective, bound, gap, nodes, iterations and time of the solve
+        anytime: quality of a result solved within a latency budget
+        warm_start: how a MIP start was used by the solver
     """
 
     site: "epl.assets.site.Site"
@@ -33,16 +50,173 @@ class SimulationResult(pydantic.BaseModel):
     results: pd.DataFrame
     feasible: bool
     spill: bool
+    decomposition: DecompositionReport | None = None
+    tightening: TighteningReport | None = None
+    elimination: BinaryElimination | None = None
+    spill_phase: SpillPhaseReport | None = None
+    timings: Timings | None = None
+    model_stats: ModelStats | None = None
+    solver_stats: SolverStats | None = None
+    anytime: AnytimeReport | None = None
+    warm_start: WarmStartReport | None = None
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
 
 
+class SolutionValues:
+    """Values of linear program variables, looked up from one solution vector.
+
+    The column of each variable is looked up once per results quantity, and kept
+    on the `IntervalVars`, so re-solving the same linear program reuses it.
+
+    Args:
+        optimizer: the solved optimizer.
+        ivars: linear program variables for each interval.
+    """
+
+    def __init__(self, optimizer: Optimizer, ivars: "epl.IntervalVars") -> None:
+        """Initialize the solution values."""
+        columns, solution = optimizer.solution()
+        #  constants index the trailing zero, and have their value added on
+        self.solution = np.append(solution, 0.0)
+        self.columns = columns
+        if ivars.value_columns is not columns:
+            ivars.value_index = {}
+            ivars.value_columns = columns
+        self.index = ivars.value_index
+
+    def variable_index(self, variables: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Get the column of each variable, and the value of each constant.
+
+        Args:
+            variables: array of variables and constants.
+        """
+        flat = variables.ravel()
+        index = np.full(flat.shape, -1, dtype=np.int64)
+        constants = np.zeros(flat.shape)
+        for n, variable in enumerate(flat):
+            if isinstance(variable, pulp.LpVariable):
+                col = self.columns.get(variable.name)
+                if col is not None:
+                    index[n] = col
+                else:
+                    value = variable.value()
+                    constants[n] = np.nan if value is None else value
+            else:
+                constants[n] = float(variable)
+        return index.reshape(variables.shape), constants.reshape(variables.shape)
+
+    def __call__(
+        self,
+        key: typing.Hashable,
+        variables: typing.Callable[..., np.ndarray | list],
+        *args: typing.Any,
+    ) -> np.ndarray:
+        """Get the values of a results quantity.
+
+        Args:
+            key: identifies the results quantity.
+            variables: creates the array of variables for the quantity from `args` -
+                only called when the quantity isn't indexed yet.
+            args: arguments of `variables`.
+        """
+        if key not in self.index:
+            self.index[key] = self.variable_index(
+                np.asarray(variables(*args), dtype=object)
+            )
+        index, constants = self.index[key]
+        return self.solution[index] + constants
+
+
+def attributes(items: list, attr: str) -> list:
+    """Get an attribute of each item.
+
+    Args:
+        items: the items to get the attribute from.
+        attr: name of the attribute.
+    """
+    return [getattr(item, attr) for item in items]
+
+
+def aggregate_evs_variables(ivars: "epl.IntervalVars", asset_name: str) -> np.ndarray:
+    """Get the aggregate variables of an EVs asset.
+
+    Args:
+        ivars: linear program variables for each interval.
+        asset_name: name of the EVs asset.
+    """
+    return epl.assets.evs.aggregate_variables(
+        ivars.filter_objective_variables(
+            epl.assets.evs.EVOneInterval, asset_name=asset_name
+        )
+    )
+
+
+def by_charge_event(
+    pairs: np.ndarray,
+    positions: np.ndarray,
+    events: np.ndarray,
+    shape: tuple[int, int],
+) -> np.ndarray:
+    """Scatter one value per pair onto (interval, charge event).
+
+    Args:
+        pairs: one value for each (interval, charge event) pair.
+        positions: interval of each pair.
+        events: charge event of each pair.
+        shape: number of intervals and charge events.
+    """
+    dense = np.zeros(shape)
+    dense[positions, events] = pairs
+    return dense
+
+
+def one_intervals(
+    ivars: "epl.IntervalVars", instance_type: type
+) -> dict[str | None, list[AssetOneInterval]]:
+    """Get the one interval data of each asset of a type, for every interval.
+
+    Args:
+        ivars: linear program variables for each interval.
+        instance_type: the one interval type of the asset.
+    """
+    return {
+        name: [group[0] for group in by_interval]
+        for name, by_interval in ivars.index.get(instance_type, {}).items()
+    }
+
+
+def extract_asset_results(
+    ivars: "epl.IntervalVars",
+    results: dict,
+    values: SolutionValues,
+    instance_type: type,
+    attrs: list[str],
+) -> None:
+    """Extract simulation result data for each asset of a type.
+
+    Args:
+        ivars: linear program variables for each interval.
+        results: simulation results columns.
+        values: values of the linear program variables.
+        instance_type: the one interval type of the asset.
+        attrs: the one interval attributes to extract.
+    """
+    for name, assets in one_intervals(ivars, instance_type).items():
+        for attr in attrs:
+            results[f"{name}-{attr}"] = values(
+                (instance_type.__name__, name, attr), attributes, assets, attr
+            )
+
+
 def extract_site_results(
-    site: "epl.Site", ivars: "epl.IntervalVars", results: dict, i: int
+    site: "epl.Site", ivars: "epl.IntervalVars", results: dict, values: SolutionValues
 ) -> None:
     """Extract simulation result data for epl.Site."""
-    site_one_interval = ivars.filter_site(i, site.cfg.name)
-    results["site-import_power_mwh"].append(site_one_interval.import_power_mwh.value())
-    results["site-export_power_mwh"].append(site_one_interval.export_power_mwh.value())
+    sites = ivars.asset[site.cfg.name]["site"]
+    for attr in ["import_power_mwh", "export_power_mwh"]:
+        results[f"site-{attr}"] = values(
+            ("site", site.cfg.name, attr), attributes, sites, attr
+        )
 
     assert isinstance(site.cfg.interval_data.electricity_prices, np.ndarray)
     assert isinstance(site.cfg.interval_data.electricity_carbon_intensities, np.ndarray)
@@ -56,232 +230,301 @@ def extract_site_results(
         "gas_prices",
         "electric_load_mwh",
     ]:
-        results[f"{site.cfg.name}-{attr}"].append(
-            getattr(site.cfg.interval_data, attr)[i]
+        results[f"{site.cfg.name}-{attr}"] = np.asarray(
+            getattr(site.cfg.interval_data, attr)
         )
 
 
-def extract_spill_results(ivars: "epl.IntervalVars", results: dict, i: int) -> None:
+def extract_spill_results(
+    ivars: "epl.IntervalVars", results: dict, values: SolutionValues
+) -> None:
     """Extract simulation result data for epl.Spill."""
-    if spills := ivars.filter_objective_variables(
-        epl.assets.spill.SpillOneInterval, i=i
-    )[0]:
-        for spill in spills:
-            assert isinstance(spill, epl.assets.spill.SpillOneInterval)
-
-            spill_quantities = [
-                "electric_generation_mwh",
-                "electric_load_mwh",
-                "high_temperature_generation_mwh",
-                "low_temperature_generation_mwh",
-                "high_temperature_load_mwh",
-                "low_temperature_load_mwh",
-                "gas_consumption_mwh",
-            ]
-            for attr in spill_quantities:
-                results[f"{spill.cfg.name}-{attr}"].append(
-                    optimizer.value(getattr(spill, attr))
-                )
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.spill.SpillOneInterval,
+        [
+            "electric_generation_mwh",
+            "electric_load_mwh",
+            "high_temperature_generation_mwh",
+            "low_temperature_generation_mwh",
+            "high_temperature_load_mwh",
+            "low_temperature_load_mwh",
+            "gas_consumption_mwh",
+        ],
+    )
 
 
-def extract_chp_results(ivars: "epl.IntervalVars", results: dict, i: int) -> None:
+def extract_chp_results(
+    ivars: "epl.IntervalVars", results: dict, values: SolutionValues
+) -> None:
     """Extract simulation result data for epl.CHP."""
-    if generators := ivars.filter_objective_variables(
-        epl.assets.chp.CHPOneInterval, i=i
-    )[0]:
-        for generator in generators:
-            assert isinstance(generator, epl.assets.chp.CHPOneInterval)
-            for attr in [
-                "electric_generation_mwh",
-                "gas_consumption_mwh",
-                "high_temperature_generation_mwh",
-                "low_temperature_generation_mwh",
-            ]:
-                results[f"{generator.cfg.name}-{attr}"].append(
-                    getattr(generator, attr).value()
-                )
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.chp.CHPOneInterval,
+        [
+            "electric_generation_mwh",
+            "gas_consumption_mwh",
+            "high_temperature_generation_mwh",
+            "low_temperature_generation_mwh",
+        ],
+    )
 
 
-def extract_boiler_results(ivars: "epl.IntervalVars", results: dict, i: int) -> None:
+def extract_boiler_results(
+    ivars: "epl.IntervalVars", results: dict, values: SolutionValues
+) -> None:
     """Extract simulation result data for epl.Boiler."""
-    if boilers := ivars.filter_objective_variables(
-        epl.assets.boiler.BoilerOneInterval, i=i
-    )[0]:
-        for boiler in boilers:
-            assert isinstance(boiler, epl.assets.boiler.BoilerOneInterval)
-            for attr in ["high_temperature_generation_mwh", "gas_consumption_mwh"]:
-                results[f"{boiler.cfg.name}-{attr}"].append(
-                    getattr(boiler, attr).value()
-                )
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.boiler.BoilerOneInterval,
+        ["high_temperature_generation_mwh", "gas_consumption_mwh"],
+    )
 
 
-def extract_valve_results(ivars: "epl.IntervalVars", results: dict, i: int) -> None:
+def extract_valve_results(
+    ivars: "epl.IntervalVars", results: dict, values: SolutionValues
+) -> None:
     """Extract simulation result data for epl.Valve."""
-    if valves := ivars.filter_objective_variables(
-        epl.assets.valve.ValveOneInterval, i=i
-    )[0]:
-        for valve in valves:
-            assert isinstance(valve, epl.assets.valve.ValveOneInterval)
-            for attr in [
-                "high_temperature_load_mwh",
-                "low_temperature_generation_mwh",
-            ]:
-                results[f"{valve.cfg.name}-{attr}"].append(
-                    optimizer.value(getattr(valve, attr))
-                )
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.valve.ValveOneInterval,
+        ["high_temperature_load_mwh", "low_temperature_generation_mwh"],
+    )
 
 
-def extract_battery_results(ivars: "epl.IntervalVars", results: dict, i: int) -> None:
+def extract_battery_results(
+    ivars: "epl.IntervalVars", results: dict, values: SolutionValues
+) -> None:
     """Extract simulation result data for epl.Battery."""
-    if batteries := ivars.filter_objective_variables(
-        epl.assets.battery.BatteryOneInterval, i=i
-    )[0]:
-        for battery in batteries:
-            assert isinstance(battery, epl.assets.battery.BatteryOneInterval)
-            name = f"{battery.cfg.name}"
-            for attr in [
-                "electric_charge_mwh",
-                "electric_charge_binary",
-                "electric_discharge_mwh",
-                "electric_discharge_binary",
-                "electric_loss_mwh",
-                "electric_initial_charge_mwh",
-                "electric_final_charge_mwh",
-                # "efficiency_pct",  TODO this is a float
-            ]:
-                results[f"{name}-{attr}"].append(
-                    optimizer.value(getattr(battery, attr))
-                )
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.battery.BatteryOneInterval,
+        [
+            "electric_charge_mwh",
+            "electric_charge_binary",
+            "electric_discharge_mwh",
+            "electric_discharge_binary",
+            "electric_loss_mwh",
+            "electric_initial_charge_mwh",
+            "electric_final_charge_mwh",
+            # "efficiency_pct",  TODO this is a float
+        ],
+    )
 
 
 def extract_evs_results(
-    ivars: "epl.IntervalVars", results: dict, i: int, verbose: bool = True
+    ivars: "epl.IntervalVars",
+    results: dict,
+    values: SolutionValues,
+    verbose: bool = True,
 ) -> None:
-    """Extract simulation result data for epl.EVs."""
-    if ivars.filter_objective_variables(epl.assets.evs.EVOneInterval, i=i):
-        pkg = []
-        for asset_name in ivars.asset.keys():
-            try:
-                was = ivars.filter_evs_array(is_spill=False, i=i, asset_name=asset_name)
-                pkg.append(was)
-
-            except IndexError:
-                pass
-
-        #  extract all of the ev assets
-        for evs in pkg:
-            asset_name = evs.cfg.name
-            assert not evs.is_spill
-            ev_cols = [
-                "electric_charge_mwh",
-                "electric_charge_binary",
-                "electric_discharge_mwh",
-                "electric_discharge_binary",
-            ]
-
-            #  chargers are summed across each charge event
-            for charger_idx, charger_cfg in enumerate(evs.cfg.charger_cfgs):
-                for attr in ev_cols:
-                    name = f"{asset_name}-{charger_cfg.name}-{attr}"
-                    results[name].append(
-                        sum(
-                            [
-                                optimizer.value(x)
-                                for x in getattr(evs, attr)[0, :, charger_idx]
-                            ]
-                        )
-                    )
-
-            #  charge events (non-spill) are summed across each charger
-            #  one charge event, multiple chargers
+    """Extract simulation result data for epl.EVs.
+
+    The variables of each EVs asset are stacked into arrays with one row for
+    each (interval, charge event) pair that has variables.  These are summed
+    across charge events for the charger results and across chargers for the
+    charge event results.
+
+    Aggregate EVs assets are first disaggregated into the same arrays.
+    """
+    ev_cols = [
+        "electric_charge_mwh",
+        "electric_charge_binary",
+        "electric_discharge_mwh",
+        "electric_discharge_binary",
+    ]
+    stacked = epl.assets.evs.stack_evs_arrays
+
+    evs_assets = {
+        name: asset["evs_array"]
+        for name, asset in ivars.asset.items()
+        if asset["evs_array"]
+    }
+    disaggregated = {}
+    for asset_name, evs_arrays in evs_assets.items():
+        evs = evs_arrays[0]
+        assert not evs.is_spill
+        assert isinstance(evs.cfg.charge_event_cfgs, np.ndarray)
+        n_intervals = len(evs_arrays)
+        n_charge_events = len(evs.cfg.charge_event_cfgs)
+
+        if evs.cfg.aggregate:
+            aggregate = values(
+                ("evs", asset_name, "aggregate"),
+                aggregate_evs_variables,
+                ivars,
+                asset_name,
+            )
+            disaggregation = epl.assets.evs.disaggregate_evs(
+                evs.cfg,
+                [ev.i for ev in evs_arrays],
+                aggregate[:, 1],
+                aggregate[:, 2],
+                epl.Freq(evs.cfg.freq_mins),
+            )
+            disaggregated[asset_name] = disaggregation
+            positions, events = disaggregation.positions, disaggregation.events
+        else:
+            positions, events = epl.assets.evs.evs_pairs(evs_arrays)
+
+        if evs.cfg.aggregate:
+            arrays = disaggregation.arrays
+        else:
+            arrays = {
+                attr: values(("evs", asset_name, attr), stacked, evs_arrays, attr)
+                for attr in ev_cols + ["electric_loss_mwh"]
+            }
+
+        #  chargers are summed across each charge event
+        for charger_idx, charger_cfg in enumerate(evs.cfg.charger_cfgs):
+            for attr in ev_cols:
+                name = f"{asset_name}-{charger_cfg.name}-{attr}"
+                results[name] = np.bincount(
+                    positions,
+                    weights=arrays[attr][:, charger_idx],
+                    minlength=n_intervals,
+                )
+
+        #  charge events (non-spill) are summed across each charger
+        #  one charge event, multiple chargers
+        for attr in [
+            "electric_charge_mwh",
+            "electric_discharge_mwh",
+            "electric_loss_mwh",
+        ]:
+            summed = by_charge_event(
+                arrays[attr].sum(axis=1),
+                positions,
+                events,
+                (n_intervals, n_charge_events),
+            )
             for charge_event_idx, charge_event_cfg in enumerate(
                 evs.cfg.charge_event_cfgs
             ):
-                for attr in [
-                    "electric_charge_mwh",
-                    "electric_discharge_mwh",
-                    "electric_loss_mwh",
-                ]:
-                    name = f"{asset_name}-{charge_event_cfg.name}-{attr}"
-                    results[name].append(
-                        sum(
-                            [
-                                optimizer.value(x)
-                                for x in getattr(evs, attr)[0, charge_event_idx, :]
-                            ]
-                        )
-                    )
-
-            #  socs are for a charge event - one soc per charge event
-            for attr in [
+                name = f"{asset_name}-{charge_event_cfg.name}-{attr}"
+                results[name] = summed[:, charge_event_idx]
+
+        #  socs are for a charge event - one soc per charge event
+        #  the soc is constant outside of the charge event window, so before the
+        #  window it is the initial soc of the window, and after the final soc
+        if evs.cfg.aggregate:
+            initial = disaggregation.initial_soc_mwh
+            final = disaggregation.final_soc_mwh
+        else:
+            initial = values(
+                ("evs", asset_name, "initial_soc_mwh"),
+                stacked,
+                evs_arrays,
                 "initial_soc_mwh",
+            )
+            final = values(
+                ("evs", asset_name, "final_soc_mwh"),
+                stacked,
+                evs_arrays,
                 "final_soc_mwh",
-            ]:
-                socs = getattr(evs, attr)[0]
-                assert isinstance(socs, np.ndarray)
-                assert isinstance(evs.cfg.charge_event_cfgs, np.ndarray)
-
-                assert socs.shape == evs.cfg.charge_event_cfgs.shape
-
-                for charge_event_idx, soc in enumerate(socs):
-                    name = f"{asset_name}-charge-event-{charge_event_idx}-{attr}"
-                    results[name].append(soc.value())
-
-        pkg = []
-        for asset_name in ivars.asset.keys():
-            try:
-                was = ivars.filter_evs_array(is_spill=True, i=i, asset_name=asset_name)
-                pkg.append(was)
-            except IndexError:
-                pass
-
-        for spill_evs in pkg:
-            asset_name = spill_evs.cfg.name
-            assert spill_evs.is_spill
-            #  spill charger charge & discharge
+            )
+        before = np.array(
+            [cfg.initial_soc_mwh or 0.0 for cfg in evs.cfg.charge_event_cfgs]
+        )
+        after = before.copy()
+        first = np.full(n_charge_events, n_intervals)
+        last = np.full(n_charge_events, -1)
+        window_events, rows = np.unique(events, return_index=True)
+        before[window_events] = initial[rows]
+        first[window_events] = positions[rows]
+        window_events, rows = np.unique(events[::-1], return_index=True)
+        rows = len(events) - 1 - rows
+        after[window_events] = final[rows]
+        last[window_events] = positions[rows]
+
+        intervals = np.arange(n_intervals)[:, np.newaxis]
+        for attr, socs in [("initial_soc_mwh", initial), ("final_soc_mwh", final)]:
+            socs = np.where(
+                intervals < first,
+                before,
+                np.where(
+                    intervals > last,
+                    after,
+                    by_charge_event(
+                        socs, positions, events, (n_intervals, n_charge_events)
+                    ),
+                ),
+            )
+            for charge_event_idx in range(n_charge_events):
+                name = f"{asset_name}-charge-event-{charge_event_idx}-{attr}"
+                results[name] = socs[:, charge_event_idx]
+
+    for asset_name, asset in ivars.asset.items():
+        spill_evs_arrays = asset["spill_evs_array"]
+        if not spill_evs_arrays or asset_name not in evs_assets:
+            continue
+        spill_evs = spill_evs_arrays[0]
+        assert spill_evs.is_spill
+        if asset_name in disaggregated:
+            positions = disaggregated[asset_name].positions
+        else:
+            positions, _ = epl.assets.evs.evs_pairs(spill_evs_arrays)
+        #  spill charger charge & discharge
+        for attr in ev_cols:
+            if asset_name in disaggregated:
+                spill_values = disaggregated[asset_name].spill[attr]
+            else:
+                spill_values = values(
+                    ("spill_evs", asset_name, attr), stacked, spill_evs_arrays, attr
+                )
             for charger_idx, spill_cfg in enumerate(spill_evs.cfg.spill_charger_cfgs):
-                for attr in ev_cols:
-                    name = f"{spill_evs.cfg.name}-{spill_cfg.name}-{attr}"
-
-                    results[name].append(
-                        sum(
-                            [
-                                optimizer.value(x)
-                                for x in getattr(spill_evs, attr)[0, :, charger_idx]
-                            ]
-                        )
-                    )
+                name = f"{spill_evs.cfg.name}-{spill_cfg.name}-{attr}"
+                results[name] = np.bincount(
+                    positions,
+                    weights=spill_values[:, charger_idx],
+                    minlength=len(spill_evs_arrays),
+                )
 
 
 def extract_heat_pump_results(
-    ivars: "epl.IntervalVars", results: dict, i: int, verbose: bool = True
+    ivars: "epl.IntervalVars",
+    results: dict,
+    values: SolutionValues,
+    verbose: bool = True,
 ) -> None:
     """Extract simulation result data for epl.HeatPump."""
-    if heat_pumps := ivars.filter_objective_variables(
-        epl.assets.heat_pump.HeatPumpOneInterval, i=i
-    )[0]:
-        for heat_pump in heat_pumps:
-            for attr in [
-                "electric_load_mwh",
-                "low_temperature_load_mwh",
-                "high_temperature_generation_mwh",
-            ]:
-                name = f"{heat_pump.cfg.name}-{attr}"
-                results[name].append(optimizer.value(getattr(heat_pump, attr)))
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.heat_pump.HeatPumpOneInterval,
+        [
+            "electric_load_mwh",
+            "low_temperature_load_mwh",
+            "high_temperature_generation_mwh",
+        ],
+    )
 
 
 def extract_renewable_generator_results(
-    ivars: "epl.IntervalVars", results: dict, i: int, verbose: bool = True
+    ivars: "epl.IntervalVars",
+    results: dict,
+    values: SolutionValues,
+    verbose: bool = True,
 ) -> None:
     """Extract simulation result data for epl.RenewableGenerator."""
-    if renewables := ivars.filter_objective_variables(
-        epl.assets.renewable_generator.RenewableGeneratorOneInterval, i=i
-    )[0]:
-        fields = ["electric_generation_mwh"]
-        for renewable in renewables:
-            for attr in fields:
-                name = f"{renewable.cfg.name}-{attr}"
-                results[name].append(optimizer.value(getattr(renewable, attr)))
+    extract_asset_results(
+        ivars,
+        results,
+        values,
+        epl.assets.renewable_generator.RenewableGeneratorOneInterval,
+        ["electric_generation_mwh"],
+    )
 
 
 def add_totals(
@@ -319,12 +562,16 @@ def extract_results(
     feasible: bool,
     flags: Flags = Flags(),
     verbose: bool = True,
+    optimizer: Optimizer | None = None,
 ) -> SimulationResult:
     """Extracts simulation results from the site, assets and linear program data.
 
     Also adds total columns & performs checks like energy balances.
 
     This function returns the output simulation results as a single pd.DataFrame.
+
+    Values are read from the solution vector of the optimizer - the site
+    optimizer unless another is given.
     """
 
     """
@@ -353,24 +600,27 @@ def extract_results(
     #         assert len(asset.cfg.interval_data.idx) == len(ivars.objective_variables)
     """
 
-    #  extract linear program results from the assets
-    lp_results: dict[str, list] = collections.defaultdict(list)
-    for i in site.cfg.interval_data.idx:
-        extract_site_results(site, ivars, lp_results, i)
-        extract_spill_results(ivars, lp_results, i)
-        extract_battery_results(ivars, lp_results, i)
-        extract_chp_results(ivars, lp_results, i)
-        extract_boiler_results(ivars, lp_results, i)
-        extract_valve_results(ivars, lp_results, i)
-        extract_evs_results(ivars, lp_results, i, verbose=verbose)
-        extract_heat_pump_results(ivars, lp_results, i, verbose=verbose)
-        extract_renewable_generator_results(ivars, lp_results, i, verbose=verbose)
-
-    check_array_lengths(lp_results)
-    results = pd.DataFrame(lp_results)
-
-    #  add total columns to the results df
-    total_mapper = add_totals(results)
+    #  extract linear program results from the assets, a column at a time
+    optimizer = optimizer or site.optimizer
+    timings = optimizer.timings
+    with timings.phase("extraction"):
+        values = SolutionValues(optimizer, ivars)
+        lp_results: dict[str, np.ndarray] = {}
+        extract_site_results(site, ivars, lp_results, values)
+        extract_spill_results(ivars, lp_results, values)
+        extract_battery_results(ivars, lp_results, values)
+        extract_chp_results(ivars, lp_results, values)
+        extract_boiler_results(ivars, lp_results, values)
+        extract_valve_results(ivars, lp_results, values)
+        extract_evs_results(ivars, lp_results, values, verbose=verbose)
+        extract_heat_pump_results(ivars, lp_results, values, verbose=verbose)
+        extract_renewable_generator_results(ivars, lp_results, values, verbose=verbose)
+
+        check_array_lengths(lp_results)
+        results = pd.DataFrame(lp_results)
+
+        #  add total columns to the results df
+        total_mapper = add_totals(results)
 
     if verbose:
         logger.info("total_mapper", mapper=total_mapper)
@@ -378,14 +628,16 @@ def extract_results(
         logger.debug("total_mapper", mapper=total_mapper)
 
     if feasible:
-        simulation_schema.validate(results)
-        check_results(
-            results,
-            total_mapper=total_mapper,
-            verbose=verbose,
-            check_valve=any([isinstance(a, epl.Valve) for a in assets]),
-            check_evs=any([isinstance(a, epl.EVs) for a in assets]),
-        )
+        with timings.phase("schema"):
+            get_simulation_schema().validate(results)
+        with timings.phase("checks"):
+            check_results(
+                results,
+                total_mapper=total_mapper,
+                verbose=verbose,
+                check_valve=any([isinstance(a, epl.Valve) for a in assets]),
+                check_evs=any([isinstance(a, epl.EVs) for a in assets]),
+            )
     spill_occured = warn_spills(results, flags, verbose=verbose)
 
     return SimulationResult(
@@ -394,4 +646,10 @@ def extract_results(
         results=results,
         feasible=feasible,
         spill=spill_occured,
+        tightening=getattr(site, "tightening", None),
+        elimination=getattr(site, "elimination", None),
+        #  a copy, as a compiled site keeps adding to the optimizer timings
+        timings=copy.deepcopy(timings),
+        model_stats=optimizer.model_stats,
+        solver_stats=optimizer.solver_stats,
     )
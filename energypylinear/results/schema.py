@@ -1,27 +1,18 @@
-"""Schema for simulation results."""
-import pandera as pa
+"""Schema for simulation results.
+
+`pandera` is slow to import, so the schema is created the first time results
+are validated.
+"""
+import dataclasses
+import functools
+import typing
 
 from energypylinear.assets.asset import AssetOneInterval
 from energypylinear.defaults import defaults
-from energypylinear.optimizer import Optimizer
-
-optimizer = Optimizer()
-
-
-schema = {
-    "site-import_power_mwh": pa.Column(
-        pa.Float,
-        checks=[pa.Check.ge(defaults.epsilon)],
-        title="Site Import Power MWh",
-        coerce=True,
-    ),
-    "site-export_power_mwh": pa.Column(
-        pa.Float,
-        checks=[pa.Check.ge(defaults.epsilon)],
-        title="Site Export Power MWh",
-        coerce=True,
-    ),
-}
+
+if typing.TYPE_CHECKING:
+    import pandera as pa
+
 #  maybe could get this from epl.assets.AssetOneInterval ?
 quantities = [
     "electric_generation_mwh",
@@ -35,15 +26,43 @@ quantities = [
     "electric_discharge_mwh",
 ]
 
-for qu in [q for q in AssetOneInterval.__fields__ if (q != "cfg") and (q != "binary")]:
-    schema[rf"\w+-{qu}"] = pa.Column(
-        pa.Float, checks=[pa.Check.ge(defaults.epsilon)], coerce=True, regex=True
-    )
-    schema[f"total-{qu}"] = pa.Column(
-        pa.Float,
-        checks=[pa.Check.ge(defaults.epsilon)],
-        coerce=True,
-        regex=True,
-        required=True,
-    )
-simulation_schema = pa.DataFrameSchema(schema)
+
+@functools.cache
+def get_simulation_schema() -> "pa.DataFrameSchema":
+    """Create the schema for simulation results, importing `pandera` on first use."""
+    import pandera as pa
+
+    schema = {
+        "site-import_power_mwh": pa.Column(
+            pa.Float,
+            checks=[pa.Check.ge(defaults.epsilon)],
+            title="Site Import Power MWh",
+            coerce=True,
+        ),
+        "site-export_power_mwh": pa.Column(
+            pa.Float,
+            checks=[pa.Check.ge(defaults.epsilon)],
+            title="Site Export Power MWh",
+            coerce=True,
+        ),
+    }
+    fields = [field.name for field in dataclasses.fields(AssetOneInterval)]
+    for qu in [q for q in fields if (q != "cfg") and (q != "binary")]:
+        schema[rf"\w+-{qu}"] = pa.Column(
+            pa.Float, checks=[pa.Check.ge(defaults.epsilon)], coerce=True, regex=True
+        )
+        schema[f"total-{qu}"] = pa.Column(
+            pa.Float,
+            checks=[pa.Check.ge(defaults.epsilon)],
+            coerce=True,
+            regex=True,
+            required=True,
+        )
+    return pa.DataFrameSchema(schema)
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Create `simulation_schema` on first use."""
+    if name == "simulation_schema":
+        return get_simulation_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,9 +3,6 @@ import pandas as pd
 
 from energypylinear.flags import Flags
 from energypylinear.logger import logger
-from energypylinear.optimizer import Optimizer
-
-optimizer = Optimizer()
 
 
 def warn_spills(simulation: pd.DataFrame, flags: Flags, verbose: bool = True) -> bool:
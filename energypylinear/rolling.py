@@ -0,0 +1,325 @@
+"""Rolling horizon simulation - a sequence of smaller optimizations across a long horizon.
+
+Each window is optimized over `window` intervals, of which the first `commit`
+intervals are kept.  The remaining `overlap` intervals are a look ahead, which
+reduces end of window effects.  Battery and EV charge event state of charge at
+the end of the committed intervals is carried forward into the next window.
+"""
+import copy
+import dataclasses
+import typing
+
+import numpy as np
+import pandas as pd
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+
+#  state of charge of a battery, or of each charge event of an EVs asset - None
+#  leaves the state of charge of a battery free
+typing_socs = float | None | np.ndarray
+
+
+@dataclasses.dataclass
+class RollingHorizonConfig:
+    """Configures a rolling horizon simulation.
+
+    Two of `window`, `commit` and `overlap` are needed - `window = commit + overlap`.
+
+    Attributes:
+        window: number of intervals optimized in each window.
+        commit: number of intervals kept from each window.
+        overlap: number of look ahead intervals solved but not kept.
+    """
+
+    window: int
+    commit: int | None = None
+    overlap: int | None = None
+
+    def __post_init__(self) -> None:
+        """Validates the rolling horizon configuration."""
+        if self.commit is None:
+            self.commit = self.window - (self.overlap or 0)
+        if self.overlap is None:
+            self.overlap = self.window - self.commit
+        assert (
+            self.commit + self.overlap == self.window
+        ), "window must equal commit plus overlap"
+        assert 0 < self.commit <= self.window, "commit must be in (0, window]"
+
+
+def window_asset(
+    asset: typing.Any,
+    start: int,
+    stop: int,
+    last: bool,
+    socs: dict[str, typing_socs],
+    cycles: dict[str, float] | None = None,
+) -> typing.Any:
+    """Create a copy of an asset for the intervals `start:stop`.
+
+    Args:
+        asset: the asset to copy - any asset with a `cfg`.
+        start: first interval of the window.
+        stop: interval after the last interval of the window.
+        last: whether this is the final window of the simulation.
+        socs: state of charge carried forward for each storage asset.
+        cycles: initial charge of each battery with a cyclic charge, which the
+            final window returns to.
+    """
+    window = copy.copy(asset)
+    cfg = asset.cfg
+
+    if isinstance(asset, epl.Battery):
+        final_charge_mwh = cfg.final_charge_mwh if last else None
+        #  a cyclic charge spanning many windows ends where the first window started
+        if cfg.cyclic_charge and last and start > 0:
+            assert cycles is not None
+            final_charge_mwh = cycles[cfg.name]
+        window.cfg = cfg.model_copy(
+            update={
+                "initial_charge_mwh": socs[cfg.name],
+                "final_charge_mwh": final_charge_mwh,
+                "cyclic_charge": cfg.cyclic_charge and start == 0 and last,
+            }
+        )
+
+    elif isinstance(asset, epl.EVs):
+        _, last_active = cfg.windows()
+        charge_event_socs = socs[cfg.name]
+        assert isinstance(charge_event_socs, np.ndarray)
+        charge_event_cfgs = []
+        for charge_event_idx, charge_event_cfg in enumerate(cfg.charge_event_cfgs):
+            #  only require the final soc of charge events that end in this window
+            ends_in_window = start <= last_active[charge_event_idx] < stop
+            update = {
+                "initial_soc_mwh": charge_event_socs[charge_event_idx],
+                "final_soc_mwh": charge_event_cfg.final_soc_mwh
+                if ends_in_window
+                else None,
+            }
+            #  compact charge event windows are shifted onto the window
+            if cfg.charge_events is None:
+                update["start_interval"] = min(
+                    max(charge_event_cfg.start_interval - start, 0), stop - start
+                )
+                update["end_interval"] = min(
+                    max(charge_event_cfg.end_interval - start, 0), stop - start
+                )
+            charge_event_cfgs.append(charge_event_cfg.model_copy(update=update))
+        window.cfg = cfg.model_copy(
+            update={
+                "charge_event_cfgs": np.array(charge_event_cfgs),
+                "charge_events": None
+                if cfg.charge_events is None
+                else cfg.charge_events[start:stop],
+            }
+        )
+
+    elif hasattr(cfg, "interval_data"):
+        interval_data = cfg.interval_data
+        update = {
+            name: value[start:stop]
+            for name, value in interval_data.__dict__.items()
+            if isinstance(value, np.ndarray) and name != "idx"
+        }
+        update["idx"] = np.arange(stop - start)
+        window.cfg = cfg.model_copy(
+            update={"interval_data": interval_data.model_copy(update=update)}
+        )
+
+    return window
+
+
+def initial_socs(assets: list) -> dict[str, typing_socs]:
+    """Get the initial state of charge of each storage asset.
+
+    Args:
+        assets: assets in the site.
+    """
+    socs: dict[str, typing_socs] = {}
+    for asset in assets:
+        if isinstance(asset, epl.Battery):
+            socs[asset.cfg.name] = asset.cfg.initial_charge_mwh
+        elif isinstance(asset, epl.EVs):
+            socs[asset.cfg.name] = np.array(
+                [cfg.initial_soc_mwh for cfg in asset.cfg.charge_event_cfgs]
+            )
+    return socs
+
+
+def cycle_socs(assets: list, results: pd.DataFrame) -> dict[str, float]:
+    """Get the initial charge of each battery with a cyclic charge.
+
+    Args:
+        assets: assets in the site.
+        results: simulation results for the first window.
+    """
+    return {
+        asset.cfg.name: float(
+            results[f"{asset.cfg.name}-electric_initial_charge_mwh"].iloc[0]
+        )
+        for asset in assets
+        if isinstance(asset, epl.Battery) and asset.cfg.cyclic_charge
+    }
+
+
+def final_socs(
+    assets: list, results: pd.DataFrame, interval: int
+) -> dict[str, typing_socs]:
+    """Get the state of charge of each storage asset at the end of an interval.
+
+    Args:
+        assets: assets in the site.
+        results: simulation results for a window.
+        interval: the interval within the window.
+    """
+    socs: dict[str, typing_socs] = {}
+    for asset in assets:
+        name = asset.cfg.name
+        if isinstance(asset, epl.Battery):
+            socs[name] = float(
+                np.clip(
+                    results[f"{name}-electric_final_charge_mwh"].iloc[interval],
+                    0,
+                    asset.cfg.capacity_mwh,
+                )
+            )
+        elif isinstance(asset, epl.EVs):
+            socs[name] = np.array(
+                [
+                    np.clip(
+                        results[
+                            f"{name}-charge-event-{charge_event_idx}-final_soc_mwh"
+                        ].iloc[interval],
+                        0,
+                        charge_event_cfg.capacity_mwh,
+                    )
+                    for charge_event_idx, charge_event_cfg in enumerate(
+                        asset.cfg.charge_event_cfgs
+                    )
+                ]
+            )
+    return socs
+
+
+def can_reuse_structure(assets: list) -> bool:
+    """Whether windows of the same length share the same linear program structure.
+
+    Assets with their own interval data, and EVs with their charge events, change
+    the linear program between windows - other assets only change through the
+    site interval data and the battery initial charge.  A battery with a free
+    initial charge has no initial charge constraint to update.
+
+    Args:
+        assets: assets in the site.
+    """
+    return not any(
+        isinstance(asset, epl.EVs)
+        or hasattr(asset.cfg, "interval_data")
+        or (isinstance(asset, epl.Battery) and asset.cfg.initial_charge_mwh is None)
+        for asset in assets
+    )
+
+
+def optimize_rolling(
+    site: "epl.Site",
+    cfg: RollingHorizonConfig,
+    objective: str = "price",
+    flags: Flags = Flags(),
+    verbose: bool = False,
+) -> "epl.SimulationResult":
+    """Optimize a site as a rolling horizon of windows.
+
+    When the linear program structure allows it, each window of the same length
+    reuses one compiled linear program, updating the site interval data and battery
+    initial charge in place.
+
+    Args:
+        site: the site to simulate.
+        cfg: rolling horizon configuration.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        verbose: level of printing.
+
+    Returns:
+        epl.results.SimulationResult with the committed intervals of each window.
+    """
+    assert cfg.commit is not None
+    interval_data = site.cfg.interval_data
+    n_intervals = len(interval_data.idx)
+    fields = [
+        name
+        for name, value in interval_data.__dict__.items()
+        if isinstance(value, np.ndarray) and name != "idx"
+    ]
+    reuse = can_reuse_structure(site.assets)
+    compiled: dict[tuple[int, bool], epl.CompiledSite] = {}
+
+    socs = initial_socs(site.assets)
+    cycles: dict[str, float] = {}
+    windows = []
+    feasible = True
+    spill = False
+    start = 0
+    while start < n_intervals:
+        stop = min(start + cfg.window, n_intervals)
+        last = stop == n_intervals
+        commit = stop - start if last else cfg.commit
+        window_data = {
+            name: getattr(interval_data, name)[start:stop] for name in fields
+        }
+
+        key = (stop - start, last)
+        if reuse and key in compiled:
+            window = compiled[key]
+            window.update(**window_data)
+            for name, soc in socs.items():
+                assert isinstance(soc, float)
+                window.set_initial_charge(name, soc)
+            simulation = window.optimize(verbose=verbose)
+
+        else:
+            window_site = epl.Site(
+                assets=[
+                    window_asset(asset, start, stop, last, socs, cycles)
+                    for asset in site.assets
+                ],
+                name=site.cfg.name,
+                freq_mins=site.cfg.freq_mins,
+                import_limit_mw=site.cfg.import_limit_mw,
+                export_limit_mw=site.cfg.export_limit_mw,
+                optimizer_config=site.optimizer_cfg,
+                **window_data,
+            )
+            if reuse:
+                compiled[key] = window_site.compile(objective=objective, flags=flags)
+                simulation = compiled[key].optimize(verbose=verbose)
+            else:
+                simulation = window_site.optimize(
+                    objective=objective, flags=flags, verbose=verbose
+                )
+
+        logger.debug(
+            "rolling.optimize_rolling",
+            start=start,
+            stop=stop,
+            commit=commit,
+            feasible=simulation.feasible,
+        )
+        windows.append(simulation.results.iloc[:commit])
+        feasible = feasible and simulation.feasible
+        spill = spill or simulation.spill
+        if start == 0:
+            cycles = cycle_socs(site.assets, simulation.results)
+        socs = final_socs(site.assets, simulation.results, commit - 1)
+        start += commit
+
+    return epl.SimulationResult(
+        site=site,
+        assets=site.assets,
+        results=pd.concat(windows, ignore_index=True),
+        feasible=feasible,
+        spill=spill,
+    )
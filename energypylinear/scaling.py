@@ -0,0 +1,180 @@
+"""Scaling of linear program rows and objective, and coefficient range diagnostics.
+
+Solvers work to absolute tolerances, so a linear program with coefficients
+spanning many orders of magnitude is solved less accurately, and more slowly,
+than the same linear program with coefficients close to one.
+
+Rows and the objective are scaled by powers of two, which are exact in floating
+point, so the geometric mean of the largest and smallest magnitude in each row,
+and in the objective, is close to one.  Scaling rows or the objective doesn't
+change the solution, so the variable values need no unscaling.
+"""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pulp
+
+from energypylinear.sparse import SparseModel
+
+
+def power_of_two_scale(smallest: np.ndarray, largest: np.ndarray) -> np.ndarray:
+    """Get the power of two that scales the geometric mean of two magnitudes to one.
+
+    Args:
+        smallest: smallest non-zero magnitude - zero where there are none.
+        largest: largest non-zero magnitude - zero where there are none.
+    """
+    smallest = np.asarray(smallest, dtype=np.float64)
+    largest = np.asarray(largest, dtype=np.float64)
+    scale = np.ones(smallest.shape)
+    mask = (smallest > 0) & np.isfinite(largest)
+    scale[mask] = np.exp2(-np.round(0.5 * np.log2(smallest[mask] * largest[mask])))
+    return scale
+
+
+def magnitude_range(values: np.ndarray) -> tuple[float, float]:
+    """Get the smallest and largest non-zero, finite magnitude of some values."""
+    magnitudes = np.abs(np.asarray(values, dtype=np.float64))
+    magnitudes = magnitudes[(magnitudes > 0) & np.isfinite(magnitudes)]
+    if magnitudes.size == 0:
+        return 0.0, 0.0
+    return float(magnitudes.min()), float(magnitudes.max())
+
+
+def row_scales(model: SparseModel) -> np.ndarray:
+    """Get the power of two scale of each row of a sparse model."""
+    rows = np.frombuffer(model.rows, dtype=np.int64)
+    vals = np.abs(np.frombuffer(model.vals, dtype=np.float64))
+    mask = vals > 0
+    smallest = np.full(model.n_rows, np.inf)
+    largest = np.zeros(model.n_rows)
+    np.minimum.at(smallest, rows[mask], vals[mask])
+    np.maximum.at(largest, rows[mask], vals[mask])
+    smallest[~np.isfinite(smallest)] = 0.0
+    return power_of_two_scale(smallest, largest)
+
+
+def objective_scale(cost: np.ndarray) -> float:
+    """Get the power of two scale of an objective cost vector."""
+    smallest, largest = magnitude_range(cost)
+    return float(power_of_two_scale(np.array([smallest]), np.array([largest]))[0])
+
+
+def scale_model(model: SparseModel) -> SparseModel:
+    """Create a copy of a sparse model with scaled rows and objective.
+
+    The copy shares the variables and columns of the model, so a solution of the
+    copy is a solution of the model.
+
+    Args:
+        model: the model to scale.
+    """
+    rows = np.frombuffer(model.rows, dtype=np.int64)
+    scales = row_scales(model)
+    cost_scale = objective_scale(model.cost_vector())
+
+    scaled = SparseModel()
+    scaled.variables = model.variables
+    scaled.columns = model.columns
+    scaled.add_rows(
+        rows,
+        np.frombuffer(model.cols, dtype=np.int64),
+        np.frombuffer(model.vals, dtype=np.float64) * scales[rows],
+        np.frombuffer(model.sense, dtype=np.int8),
+        np.frombuffer(model.rhs, dtype=np.float64) * scales,
+    )
+    scaled.set_cost(
+        model.cost_vector() * cost_scale, model.objective_offset * cost_scale
+    )
+    return scaled
+
+
+def scale_problem(prob: pulp.LpProblem) -> tuple[pulp.LpProblem, float]:
+    """Create a copy of a `pulp` problem with scaled rows and objective.
+
+    The copy shares the variables of the problem, so solving the copy assigns the
+    solution to the variables of the problem, which is left unscaled.
+
+    Args:
+        prob: the problem to scale.
+
+    Returns:
+        The scaled copy, and the scale of the objective.
+    """
+    scaled = prob.copy()
+    for name, constraint in prob.constraints.items():
+        smallest, largest = magnitude_range(
+            np.array(list(constraint.values()), dtype=np.float64)
+        )
+        scale = float(power_of_two_scale(np.array([smallest]), np.array([largest]))[0])
+        if scale != 1.0:
+            row = constraint.copy()
+            row.name = constraint.name
+            for variable in row:
+                row[variable] *= scale
+            row.constant *= scale
+            scaled.constraints[name] = row
+
+    objective = prob.objective
+    scale = 1.0
+    if objective is not None:
+        scale = objective_scale(np.array(list(objective.values()), dtype=np.float64))
+        if scale != 1.0:
+            scaled.objective = objective * scale
+    return scaled, scale
+
+
+@dataclasses.dataclass
+class CoefficientRanges:
+    """Smallest and largest non-zero magnitudes in each part of a linear program.
+
+    Attributes:
+        matrix: range of the constraint coefficients.
+        objective: range of the objective coefficients.
+        rhs: range of the constraint right hand sides.
+        bounds: range of the finite variable bounds.
+    """
+
+    matrix: tuple[float, float]
+    objective: tuple[float, float]
+    rhs: tuple[float, float]
+    bounds: tuple[float, float]
+
+    def orders_of_magnitude(self) -> dict[str, float]:
+        """Orders of magnitude spanned by each part of the linear program."""
+        return {
+            part: float(np.log10(largest / smallest)) if smallest > 0 else 0.0
+            for part, (smallest, largest) in dataclasses.asdict(self).items()
+        }
+
+    def summary(self) -> pd.DataFrame:
+        """Smallest and largest magnitude and orders of magnitude of each part."""
+        orders = self.orders_of_magnitude()
+        return pd.DataFrame(
+            [
+                {
+                    "part": part,
+                    "smallest": smallest,
+                    "largest": largest,
+                    "orders_of_magnitude": orders[part],
+                }
+                for part, (smallest, largest) in dataclasses.asdict(self).items()
+            ],
+            columns=["part", "smallest", "largest", "orders_of_magnitude"],
+        )
+
+
+def coefficient_ranges(model: SparseModel) -> CoefficientRanges:
+    """Get the coefficient ranges of a sparse model.
+
+    Args:
+        model: the model to check.
+    """
+    lower, upper = model.col_bounds()
+    return CoefficientRanges(
+        matrix=magnitude_range(np.frombuffer(model.vals, dtype=np.float64)),
+        objective=magnitude_range(model.cost_vector()),
+        rhs=magnitude_range(np.frombuffer(model.rhs, dtype=np.float64)),
+        bounds=magnitude_range(np.concatenate([lower, upper])),
+    )
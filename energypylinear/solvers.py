@@ -0,0 +1,432 @@
+"""Solver backends for sparse linear programs.
+
+A backend solves an `energypylinear.sparse.SparseModel` and holds the solution,
+which the `Optimizer` uses for `status()` and `value()`, and the solver
+statistics, in the units the solver saw.
+
+- `CBCBackend` runs the CBC binary that ships with `pulp`, via MPS and solution files,
+- `HighsBackend` passes the model arrays to HiGHS in-process with `highspy`.
+"""
+import contextlib
+import pathlib
+import re
+import subprocess
+import tempfile
+import threading
+import typing
+
+import numpy as np
+import pulp
+
+from energypylinear.sparse import SparseModel
+from energypylinear.telemetry import SolverStats, Timings, relative_gap
+
+if typing.TYPE_CHECKING:
+    from energypylinear.optimizer import OptimizerConfig
+
+
+class Backend:
+    """Base class for solving a sparse model.
+
+    Attributes:
+        cfg: optimizer configuration.
+        solution: value of each column after solving.
+        warm_start: value of each column to start the next solve from.
+        timings: records the time spent in solver I/O and solving.
+        stats: solver statistics of the last solve.
+    """
+
+    def __init__(self, cfg: "OptimizerConfig") -> None:
+        """Initialize a backend.
+
+        Args:
+            cfg: optimizer configuration.
+        """
+        self.cfg = cfg
+        self.solution: np.ndarray | None = None
+        self.warm_start: np.ndarray | None = None
+        self.timings = Timings()
+        self.stats = SolverStats()
+        self._status: str = pulp.LpStatus[pulp.LpStatusNotSolved]
+
+    def solve(self, model: SparseModel, timeout: float | None = None) -> None:
+        """Solves a sparse model, storing the status and solution.
+
+        Args:
+            model: the model to solve.
+            timeout: time limit in seconds - defaults to `cfg.timeout`.
+        """
+        raise NotImplementedError()
+
+    def status(self) -> str:
+        """Return the `pulp` status string of the last solve."""
+        return self._status
+
+    def value(self, col: int) -> float:
+        """Return the value of a column from the last solve.
+
+        Args:
+            col: column index in the sparse model.
+        """
+        assert self.solution is not None, "model has not been solved"
+        return float(self.solution[col])
+
+
+cbc_status = {
+    "Optimal": pulp.LpStatusOptimal,
+    "Infeasible": pulp.LpStatusInfeasible,
+    "Integer": pulp.LpStatusInfeasible,
+    "Unbounded": pulp.LpStatusUnbounded,
+    "Stopped": pulp.LpStatusNotSolved,
+}
+
+
+def read_cbc_solution(path: pathlib.Path, n_cols: int) -> tuple[str, np.ndarray]:
+    """Reads a CBC solution file written for a model from `SparseModel.write_mps`.
+
+    Args:
+        path: location of the solution file.
+        n_cols: number of columns in the model.
+
+    Returns:
+        The `pulp` status string and the value of each column.
+    """
+    solution = np.zeros(n_cols)
+    with open(path) as f:
+        header = f.readline().split()
+        status = cbc_status.get(header[0], pulp.LpStatusUndefined)
+        #  CBC reports a time limit with an incumbent as stopped with an objective
+        if (
+            status == pulp.LpStatusNotSolved
+            and len(header) >= 5
+            and header[4] == "objective"
+        ):
+            status = pulp.LpStatusOptimal
+
+        for line in f:
+            parts = line.split()
+            if len(parts) < 3:
+                break
+            if parts[0] == "**":
+                parts = parts[1:]
+            if parts[1].startswith("X"):
+                solution[int(parts[1][1:])] = float(parts[2])
+    return pulp.LpStatus[status], solution
+
+
+cbc_log_patterns = {
+    "objective": [r"^Objective value:\s+(\S+)", r"^Optimal objective (\S+) -"],
+    "bound": [r"\(best possible (\S+)\)", r"^Lower bound:\s+(\S+)"],
+    "nodes": [r"^Enumerated nodes:\s+(\d+)"],
+    "iterations": [
+        r"^Total iterations:\s+(\d+)",
+        r"^Optimal objective \S+ - (\d+) iterations",
+    ],
+    "solve_time": [
+        r"^Time \(Wallclock seconds\):\s+(\S+)",
+        r"^Optimal objective .* time ([\d.]+)",
+    ],
+}
+
+
+def parse_cbc_log(log: str) -> SolverStats:
+    """Reads the solver statistics from a CBC log.
+
+    The statistics are in the units of the objective CBC saw - see
+    `SolverStats.rescale`.
+
+    Args:
+        log: the CBC log.
+    """
+    values: dict[str, float | None] = {}
+    for name, patterns in cbc_log_patterns.items():
+        values[name] = None
+        for pattern in patterns:
+            match = re.search(pattern, log, flags=re.MULTILINE | re.IGNORECASE)
+            if match:
+                values[name] = float(match.group(1))
+                break
+
+    #  a completed search, and a linear program solved without branch and
+    #  bound, have no separate bound
+    objective, bound = values["objective"], values["bound"]
+    result = re.search(r"^Result - (.*)$", log, flags=re.MULTILINE)
+    completed = result is None or result.group(1) == "Optimal solution found"
+    if objective is not None and bound is None and completed:
+        bound = objective
+    mip_start, mip_start_objective = None, None
+    start = re.search(r"MIPStart provided solution with cost (\S+)", log)
+    if start:
+        mip_start, mip_start_objective = True, float(start.group(1))
+    elif re.search(r"mipstart values could not be used", log, flags=re.IGNORECASE):
+        mip_start = False
+
+    nodes, iterations = values["nodes"], values["iterations"]
+    return SolverStats(
+        objective=objective,
+        bound=bound,
+        gap=relative_gap(objective, bound),
+        nodes=None if nodes is None else int(nodes),
+        iterations=None if iterations is None else int(iterations),
+        solve_time=values["solve_time"],
+        mip_start=mip_start,
+        mip_start_objective=mip_start_objective,
+    )
+
+
+@contextlib.contextmanager
+def follow_log(path: pathlib.Path, verbose: bool) -> typing.Iterator[None]:
+    """Print the log a solver writes to a file, as it is written.
+
+    `pulp` sends the CBC output to the log file, so the log is followed while
+    the solver runs, like the output of `solve_cbc`.
+
+    Args:
+        path: the log file.
+        verbose: whether to print the log.
+    """
+    if not verbose:
+        yield
+        return
+    done = threading.Event()
+
+    def follow() -> None:
+        """Print the text appended to the log, until the solve is done."""
+        position = 0
+        while True:
+            finished = done.is_set()
+            if path.exists():
+                with path.open() as log:
+                    log.seek(position)
+                    print(log.read(), end="", flush=True)
+                    position = log.tell()
+            if finished:
+                return
+            done.wait(0.1)
+
+    thread = threading.Thread(target=follow, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def write_cbc_start(path: pathlib.Path, values: np.ndarray) -> None:
+    """Writes a CBC MIP start file for a model from `SparseModel.write_mps`.
+
+    Args:
+        path: location of the MIP start file.
+        values: value of each column - NaN columns are left for CBC to complete.
+    """
+    lines = ["Stopped on time - objective value 0"]
+    lines.extend(
+        f"{col:>7} X{col:07d} {value:>15} {0:>23}"
+        for col, value in enumerate(values.tolist())
+        if not np.isnan(value)
+    )
+    pathlib.Path(path).write_text("\n".join(lines) + "\n")
+
+
+def solve_cbc(
+    model: SparseModel,
+    verbose: bool = False,
+    presolve: bool = True,
+    relative_tolerance: float | None = None,
+    timeout: float | None = None,
+    warm_start: np.ndarray | None = None,
+    timings: Timings | None = None,
+) -> tuple[str, np.ndarray, SolverStats]:
+    """Solves a sparse model with the CBC command line solver that ships with `pulp`.
+
+    Args:
+        model: the model to solve.
+        verbose: whether to show the CBC log.
+        presolve: whether to use the CBC presolve.
+        relative_tolerance: relative MIP gap to stop at.
+        timeout: time limit in seconds.
+        warm_start: value of each column to use as a MIP start.
+        timings: records the time spent in solver I/O and solving.
+
+    Returns:
+        The `pulp` status string, the value of each column and the solver statistics.
+    """
+    timings = Timings() if timings is None else timings
+    path = pulp.PULP_CBC_CMD().path
+    with tempfile.TemporaryDirectory() as tmp:
+        mps = pathlib.Path(tmp) / "model.mps"
+        sol = pathlib.Path(tmp) / "model.sol"
+        args: list[typing.Any] = [path, str(mps)]
+        with timings.phase("solver_io"):
+            model.write_mps(mps)
+            if warm_start is not None:
+                start = pathlib.Path(tmp) / "start.sol"
+                write_cbc_start(start, warm_start)
+                args += ["-mips", str(start)]
+        if timeout is not None:
+            args += ["-sec", timeout, "-timeMode", "elapsed"]
+        if relative_tolerance is not None:
+            args += ["-ratio", relative_tolerance]
+        if presolve:
+            args += ["-presolve", "on"]
+        args += ["-branch", "-printingOptions", "all", "-solution", str(sol)]
+
+        log = []
+        with timings.phase("solve"), subprocess.Popen(
+            [str(a) for a in args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+        ) as cbc:
+            assert cbc.stdout is not None
+            for line in cbc.stdout:
+                if verbose:
+                    print(line, end="")
+                log.append(line)
+        if cbc.returncode != 0:
+            raise subprocess.CalledProcessError(cbc.returncode, cbc.args)
+
+        with timings.phase("solver_io"):
+            status, solution = read_cbc_solution(sol, model.n_cols)
+        return status, solution, parse_cbc_log("".join(log))
+
+
+class CBCBackend(Backend):
+    """Solves with the CBC binary that ships with `pulp`."""
+
+    def solve(self, model: SparseModel, timeout: float | None = None) -> None:
+        """Solves a sparse model, storing the status and solution.
+
+        Args:
+            model: the model to solve.
+            timeout: time limit in seconds - defaults to `cfg.timeout`.
+        """
+        self._status, self.solution, self.stats = solve_cbc(
+            model,
+            verbose=self.cfg.verbose,
+            presolve=self.cfg.presolve,
+            relative_tolerance=self.cfg.relative_tolerance,
+            timeout=self.cfg.timeout if timeout is None else timeout,
+            warm_start=self.warm_start,
+            timings=self.timings,
+        )
+
+
+class HighsBackend(Backend):
+    """Solves in-process with the HiGHS Python bindings.
+
+    The model is passed to HiGHS as arrays - there is no subprocess or file I/O,
+    and HiGHS releases the GIL while solving, so solves can run in a thread pool.
+
+    Requires the optional `highspy` dependency.
+    """
+
+    def solve(self, model: SparseModel, timeout: float | None = None) -> None:
+        """Solves a sparse model, storing the status and solution.
+
+        Args:
+            model: the model to solve.
+            timeout: time limit in seconds - defaults to `cfg.timeout`.
+        """
+        try:
+            import highspy
+        except ImportError as error:
+            raise ImportError(
+                "the highs solver requires highspy - install with `pip install highspy`"
+            ) from error
+
+        with self.timings.phase("solver_io"):
+            #  the highspy stubs type the arrays as lists - pybind11 takes arrays
+            lp: typing.Any = highspy.HighsLp()
+            lp.num_col_ = model.n_cols
+            lp.num_row_ = model.n_rows
+            lp.offset_ = model.objective_offset
+            lp.col_cost_ = model.cost_vector()
+
+            inf = highspy.kHighsInf
+            col_lower, col_upper = model.col_bounds()
+            row_lower, row_upper = model.row_bounds()
+            lp.col_lower_ = np.clip(col_lower, -inf, inf)
+            lp.col_upper_ = np.clip(col_upper, -inf, inf)
+            lp.row_lower_ = np.clip(row_lower, -inf, inf)
+            lp.row_upper_ = np.clip(row_upper, -inf, inf)
+
+            indptr, rows, vals = model.to_csc()
+            lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+            lp.a_matrix_.start_ = indptr
+            lp.a_matrix_.index_ = rows
+            lp.a_matrix_.value_ = vals
+
+            integrality = model.integrality()
+            if integrality.any():
+                lp.integrality_ = [
+                    highspy.HighsVarType.kInteger
+                    if integer
+                    else highspy.HighsVarType.kContinuous
+                    for integer in integrality.tolist()
+                ]
+
+            highs = highspy.Highs()  # type: ignore[no-untyped-call]
+            highs.setOptionValue("output_flag", self.cfg.verbose)
+            highs.setOptionValue("presolve", "on" if self.cfg.presolve else "off")
+            highs.setOptionValue("mip_rel_gap", self.cfg.relative_tolerance)
+            highs.setOptionValue(
+                "time_limit", float(self.cfg.timeout if timeout is None else timeout)
+            )
+            highs.passModel(lp)
+            if self.warm_start is not None:
+                start = highspy.HighsSolution()
+                #  HiGHS needs a value for every column
+                start.col_value = np.nan_to_num(self.warm_start).tolist()
+                highs.setSolution(start)
+        with self.timings.phase("solve"):
+            highs.run()
+
+        model_status = highs.getModelStatus()
+        has_solution = highs.getInfo().primal_solution_status == 2
+        self._status = highs_status(model_status, has_solution)
+        self.solution = (
+            np.array(highs.getSolution().col_value)
+            if has_solution
+            else np.zeros(model.n_cols)
+        )
+
+        info = highs.getInfo()
+        objective = info.objective_function_value if has_solution else None
+        bound = info.mip_dual_bound if integrality.any() else objective
+        self.stats = SolverStats(
+            objective=objective,
+            bound=bound,
+            gap=relative_gap(objective, bound),
+            nodes=info.mip_node_count if integrality.any() else None,
+            iterations=info.simplex_iteration_count,
+            solve_time=highs.getRunTime(),
+        )
+
+
+def highs_status(model_status: typing.Any, has_solution: bool) -> str:
+    """Maps a HiGHS model status onto a `pulp` status string.
+
+    Matching CBC, a limit reached with a feasible solution is reported as optimal.
+
+    Args:
+        model_status: the `highspy.HighsModelStatus` after solving.
+        has_solution: whether HiGHS has a feasible primal solution.
+    """
+    name = str(model_status).split(".")[-1]
+    if name == "kOptimal":
+        status = pulp.LpStatusOptimal
+    elif name == "kInfeasible":
+        status = pulp.LpStatusInfeasible
+    elif name in ("kUnbounded", "kUnboundedOrInfeasible"):
+        status = pulp.LpStatusUnbounded
+    elif has_solution:
+        status = pulp.LpStatusOptimal
+    else:
+        status = pulp.LpStatusNotSolved
+    return pulp.LpStatus[status]
+
+
+backends: dict[str, type[Backend]] = {"cbc": CBCBackend, "highs": HighsBackend}
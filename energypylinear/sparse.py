@@ -0,0 +1,358 @@
+"""Sparse matrix representation of a linear program.
+
+The `SparseModel` holds a linear program as coefficient triplets plus bound and
+cost vectors, rather than as `pulp` constraint objects.  Constraints are converted
+to triplets as they are added, so `pulp` expressions are not retained by the model.
+
+Variable names are only kept in a side table, which maps results back onto the
+`pulp.LpVariable` objects the assets use for results extraction.
+"""
+import array
+import pathlib
+
+import numpy as np
+import pulp
+
+#  row senses - match the `pulp` constants
+EQ = pulp.LpConstraintEQ
+LE = pulp.LpConstraintLE
+GE = pulp.LpConstraintGE
+
+
+class SparseModel:
+    """Linear program stored as a sparse constraint matrix.
+
+    Attributes:
+        variables: the `pulp.LpVariable` for each column.
+        columns: side table mapping variable names to column indices.
+        rows: row index for each non-zero coefficient.
+        cols: column index for each non-zero coefficient.
+        vals: value of each non-zero coefficient.
+        sense: sense of each row - one of `EQ`, `LE` or `GE`.
+        rhs: right hand side of each row.
+        cost: objective coefficient for each column, set by `set_cost`.
+        objective_offset: constant term of the objective.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty sparse model."""
+        self.variables: list[pulp.LpVariable] = []
+        self.columns: dict[str, int] = {}
+
+        self.rows = array.array("q")
+        self.cols = array.array("q")
+        self.vals = array.array("d")
+        self.sense = array.array("b")
+        self.rhs = array.array("d")
+
+        self.cost = np.zeros(0)
+        self.objective_offset = 0.0
+
+    def __repr__(self) -> str:
+        """A string representation of self."""
+        return f"<energypylinear.SparseModel variables: {self.n_cols} constraints: {self.n_rows} non-zeros: {len(self.vals)}>"
+
+    @property
+    def n_cols(self) -> int:
+        """Number of columns (variables) in the model."""
+        return len(self.variables)
+
+    @property
+    def n_rows(self) -> int:
+        """Number of rows (constraints) in the model."""
+        return len(self.rhs)
+
+    def add_variable(self, variable: pulp.LpVariable) -> int:
+        """Adds a variable as a new column.
+
+        Args:
+            variable: the variable to add.
+
+        Returns:
+            The column index of the variable.
+        """
+        assert (
+            variable.name not in self.columns
+        ), f"duplicate variable detected - {variable.name}"
+        col = len(self.variables)
+        self.columns[variable.name] = col
+        self.variables.append(variable)
+        return col
+
+    def column(self, variable: pulp.LpVariable) -> int:
+        """Returns the column of a variable, adding it to the model if needed.
+
+        Args:
+            variable: the variable to find.
+        """
+        col = self.columns.get(variable.name)
+        if col is None:
+            return self.add_variable(variable)
+        assert (
+            self.variables[col] is variable
+        ), f"duplicate variable detected - {variable.name}"
+        return col
+
+    def add_constraint(self, constraint: pulp.LpConstraint) -> int:
+        """Adds a `pulp` constraint as a new row of coefficient triplets.
+
+        Args:
+            constraint: equality or inequality expression.
+
+        Returns:
+            The row index of the constraint.
+        """
+        row = len(self.rhs)
+        for variable, coefficient in constraint.items():
+            if coefficient != 0:
+                self.rows.append(row)
+                self.cols.append(self.column(variable))
+                self.vals.append(coefficient)
+        self.sense.append(constraint.sense)
+        self.rhs.append(-constraint.constant)
+        return row
+
+    def add_rows(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        vals: np.ndarray,
+        sense: np.ndarray,
+        rhs: np.ndarray,
+    ) -> np.ndarray:
+        """Adds a block of rows from coefficient triplets.
+
+        Args:
+            rows: row index within the block for each non-zero coefficient.
+            cols: column index for each non-zero coefficient.
+            vals: value of each non-zero coefficient.
+            sense: sense of each row in the block.
+            rhs: right hand side of each row in the block.
+
+        Returns:
+            The row indices of the block.
+        """
+        start = len(self.rhs)
+        self.rows.frombytes(
+            (np.asarray(rows, dtype=np.int64) + start).astype(np.int64).tobytes()
+        )
+        self.cols.frombytes(np.asarray(cols, dtype=np.int64).tobytes())
+        self.vals.frombytes(np.asarray(vals, dtype=np.float64).tobytes())
+        self.sense.frombytes(np.asarray(sense, dtype=np.int8).tobytes())
+        self.rhs.frombytes(np.asarray(rhs, dtype=np.float64).tobytes())
+        return np.arange(start, len(self.rhs), dtype=np.int64)
+
+    def set_objective(self, objective: pulp.LpAffineExpression) -> None:
+        """Sets the objective cost vector from a `pulp` expression.
+
+        Args:
+            objective: cost function to minimize.
+        """
+        objective = pulp.LpAffineExpression(objective)
+        cols = np.array(
+            [self.column(variable) for variable in objective], dtype=np.int64
+        )
+        cost = np.zeros(self.n_cols)
+        np.add.at(cost, cols, list(objective.values()))
+        self.set_cost(cost, float(objective.constant))
+
+    def set_cost(self, cost: np.ndarray, offset: float = 0.0) -> None:
+        """Sets the objective cost vector in place.
+
+        Args:
+            cost: objective coefficient for each column.
+            offset: constant term of the objective.
+        """
+        assert len(cost) <= self.n_cols
+        self.cost = np.asarray(cost, dtype=np.float64)
+        self.objective_offset = offset
+
+    def cost_vector(self) -> np.ndarray:
+        """Returns the objective coefficients as a dense array."""
+        cost = np.zeros(self.n_cols)
+        cost[: len(self.cost)] = self.cost
+        return cost
+
+    def shift_rhs(self, rows: np.ndarray, delta: np.ndarray) -> None:
+        """Shifts the right hand side of rows in place.
+
+        Args:
+            rows: row indices to shift.
+            delta: amount to add to the right hand side of each row.
+        """
+        rhs = np.frombuffer(self.rhs, dtype=np.float64)
+        rhs[rows] += delta
+
+    def col_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the lower and upper bounds of each column.
+
+        Bounds are read from the variables, so changes made to a variable after
+        it was added to the model are respected.
+        """
+        lower = np.array(
+            [-np.inf if v.lowBound is None else v.lowBound for v in self.variables],
+            dtype=np.float64,
+        )
+        upper = np.array(
+            [np.inf if v.upBound is None else v.upBound for v in self.variables],
+            dtype=np.float64,
+        )
+        return lower, upper
+
+    def integrality(self) -> np.ndarray:
+        """Returns whether each column is an integer variable."""
+        return np.array([v.cat == pulp.LpInteger for v in self.variables], dtype=bool)
+
+    def row_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the lower and upper bounds of each row."""
+        sense = np.frombuffer(self.sense, dtype=np.int8)
+        rhs = np.frombuffer(self.rhs, dtype=np.float64)
+        lower = np.where(sense == LE, -np.inf, rhs)
+        upper = np.where(sense == GE, np.inf, rhs)
+        return lower, upper
+
+    def to_csr(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compresses the coefficient triplets into compressed sparse row arrays.
+
+        Returns:
+            The row pointers, column indices and values of the CSR matrix.
+        """
+        return compress(
+            np.frombuffer(self.rows, dtype=np.int64),
+            np.frombuffer(self.cols, dtype=np.int64),
+            np.frombuffer(self.vals, dtype=np.float64),
+            self.n_rows,
+        )
+
+    def to_csc(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compresses the coefficient triplets into compressed sparse column arrays.
+
+        Returns:
+            The column pointers, row indices and values of the CSC matrix.
+        """
+        return compress(
+            np.frombuffer(self.cols, dtype=np.int64),
+            np.frombuffer(self.rows, dtype=np.int64),
+            np.frombuffer(self.vals, dtype=np.float64),
+            self.n_cols,
+        )
+
+    def assign(self, solution: np.ndarray) -> None:
+        """Assigns a solution vector onto the `pulp` variables.
+
+        Args:
+            solution: value for each column.
+        """
+        assert len(solution) == self.n_cols
+        for variable, value in zip(self.variables, solution.tolist()):
+            variable.varValue = value
+
+    @classmethod
+    def from_problem(cls, prob: pulp.LpProblem) -> "SparseModel":
+        """Creates a sparse model from a `pulp` problem.
+
+        Args:
+            prob: the problem to convert.
+        """
+        model = cls()
+        for variable in prob.variables():
+            model.add_variable(variable)
+        for constraint in prob.constraints.values():
+            model.add_constraint(constraint)
+        model.set_objective(prob.objective)
+        return model
+
+    def write_mps(self, path: pathlib.Path) -> None:
+        """Writes the model to a fixed format MPS file.
+
+        Columns are named `X<index>` and rows `C<index>`, so the variable names
+        never need to be written.
+
+        Args:
+            path: location of the MPS file.
+        """
+        indptr, rows, vals = self.to_csc()
+        cost = self.cost_vector()
+        col_lower, col_upper = self.col_bounds()
+        integrality = self.integrality()
+        senses = {EQ: "E", LE: "L", GE: "G"}
+
+        lines = ["NAME          MODEL", "ROWS", " N  OBJ"]
+        lines.extend(f" {senses[s]}  C{r:07d}" for r, s in enumerate(self.sense))
+
+        lines.append("COLUMNS")
+        integer = False
+        for col in range(self.n_cols):
+            name = f"X{col:07d}"
+            if integrality[col] != integer:
+                integer = bool(integrality[col])
+                marker = "'INTORG'" if integer else "'INTEND'"
+                lines.append(f"    MARK      'MARKER'                 {marker}")
+            start, stop = indptr[col], indptr[col + 1]
+            if cost[col] != 0 or start == stop:
+                lines.append(mps_entry(name, "OBJ", cost[col]))
+            lines.extend(
+                mps_entry(name, f"C{r:07d}", v)
+                for r, v in zip(rows[start:stop].tolist(), vals[start:stop].tolist())
+            )
+        if integer:
+            lines.append("    MARK      'MARKER'                 'INTEND'")
+
+        lines.append("RHS")
+        lines.extend(
+            mps_entry("RHS", f"C{r:07d}", v) for r, v in enumerate(self.rhs) if v != 0
+        )
+
+        lines.append("BOUNDS")
+        for col, (low, up) in enumerate(zip(col_lower.tolist(), col_upper.tolist())):
+            name = f"X{col:07d}"
+            if low == up:
+                lines.append(mps_entry("BND", name, low, " FX "))
+                continue
+            if low == -np.inf and up == np.inf:
+                lines.append(f" FR BND       {name}")
+                continue
+            if low == -np.inf:
+                lines.append(f" MI BND       {name}")
+            elif low != 0:
+                lines.append(mps_entry("BND", name, low, " LO "))
+            if up != np.inf:
+                lines.append(mps_entry("BND", name, up, " UP "))
+        lines.append("ENDATA")
+
+        pathlib.Path(path).write_text("\n".join(lines) + "\n")
+
+
+def mps_entry(first: str, second: str, value: float, prefix: str = "    ") -> str:
+    """Formats one fixed format MPS data line.
+
+    Args:
+        first: name in the first name field.
+        second: name in the second name field.
+        value: numeric value of the entry.
+        prefix: the four character field before the first name.
+    """
+    return f"{prefix}{first:<8}  {second:<8}  {value: .12e}"
+
+
+def compress(
+    major: np.ndarray, minor: np.ndarray, vals: np.ndarray, n_major: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compresses coordinate triplets along the major axis.
+
+    Used to create either CSR (rows as the major axis) or CSC (columns as the
+    major axis) arrays from coordinate (COO) triplets.
+
+    Args:
+        major: index along the compressed axis for each triplet.
+        minor: index along the other axis for each triplet.
+        vals: value of each triplet.
+        n_major: size of the compressed axis.
+
+    Returns:
+        The pointers, minor indices and values of the compressed matrix.
+    """
+    order = np.argsort(major, kind="stable")
+    indptr = np.zeros(n_major + 1, dtype=np.int64)
+    np.cumsum(np.bincount(major, minlength=n_major), out=indptr[1:])
+    return indptr, minor[order], vals[order]
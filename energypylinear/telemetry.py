@@ -0,0 +1,218 @@
+"""Time of each phase of an optimization, linear program size and solver statistics.
+
+The phases of a `Site.optimize` are:
+
+- `validation` - checking the site and asset interval data,
+- `tightening` - tightening big-M bounds and eliminating binary variables,
+- `variables` - creating the linear program variables,
+- `constraints` - creating the linear program constraints,
+- `objective` - creating the objective function,
+- `presolve` - presolving and scaling the sparse model,
+- `solver_io` - writing the model for, and reading the solution from, the solver,
+- `solve` - running the solver,
+- `extraction` - reading the solution into the results dataframe,
+- `schema` - validating the results dataframe schema,
+- `checks` - checking energy balances and other results invariants.
+
+With the `pulp` builder, `pulp` writes the model and reads the solution inside
+the solve, so `solver_io` is part of `solve`.
+
+CPU time includes child processes, like the CBC binary.
+
+Solver statistics show how good a solution is - after a time limit, the gap
+between the objective and the best bound shows how far from optimal the
+solution can be.
+"""
+import contextlib
+import dataclasses
+import os
+import time
+import typing
+
+import pandas as pd
+import pulp
+
+if typing.TYPE_CHECKING:
+    from energypylinear.optimizer import Optimizer
+
+
+def cpu_time() -> float:
+    """CPU time used by this process and its finished child processes, in seconds."""
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+@dataclasses.dataclass
+class PhaseTiming:
+    """Time spent in one phase of an optimization.
+
+    Attributes:
+        wall_s: wall clock time in seconds.
+        cpu_s: CPU time in seconds, including child processes.
+        calls: number of times the phase was entered.
+    """
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    calls: int = 0
+
+
+@dataclasses.dataclass
+class Timings:
+    """Time spent in each phase of an optimization.
+
+    Attributes:
+        phases: time spent in each phase, in the order the phases first ran.
+    """
+
+    phases: dict[str, PhaseTiming] = dataclasses.field(default_factory=dict)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> typing.Generator[None, None, None]:
+        """Add the time spent inside the context to a phase.
+
+        Args:
+            name: the phase name.
+        """
+        wall, cpu = time.perf_counter(), cpu_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, PhaseTiming())
+            timing.wall_s += time.perf_counter() - wall
+            timing.cpu_s += cpu_time() - cpu
+            timing.calls += 1
+
+    def update(self, other: "Timings") -> None:
+        """Add the phases of another timings to this one.
+
+        Args:
+            other: the timings to add.
+        """
+        for name, other_timing in other.phases.items():
+            timing = self.phases.setdefault(name, PhaseTiming())
+            timing.wall_s += other_timing.wall_s
+            timing.cpu_s += other_timing.cpu_s
+            timing.calls += other_timing.calls
+
+    @property
+    def wall_s(self) -> float:
+        """Total wall clock time across all phases, in seconds."""
+        return sum(timing.wall_s for timing in self.phases.values())
+
+    def summary(self) -> pd.DataFrame:
+        """Wall clock time, CPU time and number of calls of each phase."""
+        return pd.DataFrame(
+            [
+                {"phase": name, **dataclasses.asdict(timing)}
+                for name, timing in self.phases.items()
+            ],
+            columns=["phase", "wall_s", "cpu_s", "calls"],
+        )
+
+
+@dataclasses.dataclass
+class ModelStats:
+    """Size of a linear program.
+
+    Attributes:
+        variables: number of variables.
+        binaries: number of binary or integer variables.
+        constraints: number of constraints.
+        nonzeros: number of non-zero constraint coefficients.
+    """
+
+    variables: int
+    binaries: int
+    constraints: int
+    nonzeros: int
+
+
+def model_stats(optimizer: "Optimizer") -> ModelStats:
+    """Get the size of the linear program held by an optimizer.
+
+    Args:
+        optimizer: the optimizer.
+    """
+    variables = optimizer.variables()
+    if optimizer.model is not None:
+        nonzeros = len(optimizer.model.vals)
+    else:
+        nonzeros = sum(len(c) for c in optimizer.prob.constraints.values())
+    return ModelStats(
+        variables=len(variables),
+        binaries=sum(v.cat == pulp.LpInteger for v in variables),
+        constraints=optimizer.n_constraints(),
+        nonzeros=nonzeros,
+    )
+
+
+@dataclasses.dataclass
+class SolverStats:
+    """Statistics reported by the solver for a solve.
+
+    Statistics the solver didn't report are None.
+
+    Attributes:
+        objective: objective value of the best solution found.
+        bound: best bound on the objective - a lower bound, as we minimize.
+        gap: relative gap between the objective and the bound.
+        nodes: number of branch and bound nodes.
+        iterations: number of simplex iterations.
+        solve_time: wall clock time reported by the solver, in seconds.
+        mip_start: whether the solver accepted the MIP start as a feasible
+            solution - None without a MIP start.
+        mip_start_objective: objective value of an accepted MIP start.
+    """
+
+    objective: float | None = None
+    bound: float | None = None
+    gap: float | None = None
+    nodes: int | None = None
+    iterations: int | None = None
+    solve_time: float | None = None
+    mip_start: bool | None = None
+    mip_start_objective: float | None = None
+
+    def rescale(self, objective: float | None, scale: float) -> "SolverStats":
+        """Map statistics of a scaled solve onto the units of the objective function.
+
+        The solver objective can be scaled, and miss the constant term, so the
+        bound and MIP start objective are moved by their scaled distance from
+        the solver objective.
+
+        Args:
+            objective: objective function value of the solution.
+            scale: scale of the objective the solver saw.
+        """
+
+        def unscale(value: float | None) -> float | None:
+            """Move a scaled solver value into the units of the objective."""
+            if objective is None or self.objective is None or value is None:
+                return None
+            return objective - (self.objective - value) / scale
+
+        bound = unscale(self.bound)
+        return dataclasses.replace(
+            self,
+            objective=objective if self.objective is not None else None,
+            bound=bound,
+            gap=relative_gap(objective, bound),
+            mip_start_objective=unscale(self.mip_start_objective),
+        )
+
+
+def relative_gap(objective: float | None, bound: float | None) -> float | None:
+    """Relative gap between an objective and a bound, as a fraction of the objective.
+
+    Args:
+        objective: objective value of a solution.
+        bound: bound on the objective.
+    """
+    if objective is None or bound is None:
+        return None
+    if objective == bound:
+        return 0.0
+    if objective == 0:
+        return float("inf")
+    return abs(objective - bound) / abs(objective)
@@ -0,0 +1,347 @@
+"""Tightening of the big-M constraints that link binary and continuous variables.
+
+A big-M constraint `continuous <= M * binary` is valid for any `M` at least as
+large as the most the continuous variable can be.  The smaller `M` is, the
+closer the linear program relaxation is to the mixed-integer program, and the
+less branch and bound work the solver does.
+
+Each `M` here is the smallest value implied by the asset configurations and
+interval data, plus a small relative margin for rounding, so tightening never
+removes a feasible dispatch:
+
+- site import is capped by the site load plus the most the assets can consume,
+- site export is capped by the most the assets can generate less the site load,
+- battery charge and discharge are capped by the battery power, not capacity,
+- EV charge is capped by the energy each charge event can take, when the EVs
+  don't discharge - but never below the charger minimum power.
+
+Spill can consume and generate any amount of electricity, so the site import
+and export are left untightened in the intervals spill is allowed in - the
+report records these bounds in `untightened`.
+"""
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+import energypylinear as epl
+from energypylinear.defaults import defaults
+from energypylinear.flags import Flags
+from energypylinear.freq import Freq
+from energypylinear.logger import logger
+
+
+@dataclasses.dataclass
+class TightenedBound:
+    """A big-M bound before and after tightening.
+
+    Attributes:
+        name: the continuous variable the bound applies to.
+        original: big-M of each constraint before tightening.
+        tightened: big-M of each constraint after tightening.
+    """
+
+    name: str
+    original: np.ndarray
+    tightened: np.ndarray
+
+    @property
+    def tightening_pct(self) -> float:
+        """Mean reduction of the big-M, as a fraction of the original big-M."""
+        mask = self.original > 0
+        if not mask.any():
+            return 0.0
+        return float(np.mean(1 - self.tightened[mask] / self.original[mask]))
+
+
+@dataclasses.dataclass
+class TighteningReport:
+    """How much each big-M bound of a site linear program was tightened.
+
+    Attributes:
+        bounds: the tightened bounds, by variable name.
+        untightened: why a bound was left at its original big-M in some
+            constraints, by variable name.
+    """
+
+    bounds: dict[str, TightenedBound] = dataclasses.field(default_factory=dict)
+    untightened: dict[str, str] = dataclasses.field(default_factory=dict)
+
+    def add(
+        self,
+        name: str,
+        original: np.ndarray | list | float,
+        tightened: np.ndarray | list | float,
+    ) -> None:
+        """Add a tightened bound to the report.
+
+        Args:
+            name: the continuous variable the bound applies to.
+            original: big-M of each constraint before tightening.
+            tightened: big-M of each constraint after tightening.
+        """
+        original_array = np.asarray(original, dtype=np.float64)
+        self.bounds[name] = TightenedBound(
+            name=name,
+            original=original_array,
+            tightened=np.broadcast_to(tightened, original_array.shape).astype(
+                np.float64
+            ),
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """Mean original and tightened big-M, the reduction of each bound, and why
+        a bound was left untightened."""
+        return pd.DataFrame(
+            [
+                {
+                    "name": bound.name,
+                    "original": bound.original.mean() if bound.original.size else 0.0,
+                    "tightened": bound.tightened.mean()
+                    if bound.tightened.size
+                    else 0.0,
+                    "tightening_pct": bound.tightening_pct,
+                    "untightened": self.untightened.get(bound.name),
+                }
+                for bound in self.bounds.values()
+            ],
+            columns=["name", "original", "tightened", "tightening_pct", "untightened"],
+        )
+
+
+def evs_electric_limits_mwh(
+    asset: "epl.EVs", idx: np.ndarray, flags: Flags
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the most the EV chargers can consume and generate in each interval.
+
+    Each charger serves one charge event at a time, and each charge event can't
+    take more than the energy left to charge - so the chargers are capped by
+    both their power and the charge events active in the interval.
+
+    Args:
+        asset: the EVs asset.
+        idx: the intervals to get limits for.
+        flags: boolean flags to change simulation and results behaviour.
+    """
+    cfg = asset.cfg
+    freq = Freq(cfg.freq_mins)
+    charge, spill, discharge = epl.assets.evs.charge_event_big_m_mwh(cfg, flags)
+
+    positions, events = epl.assets.evs.window_pairs(*cfg.windows(), idx)
+
+    def active_sum(event_limit: np.ndarray) -> np.ndarray:
+        """Sum a limit of each charge event over the active charge events."""
+        return np.bincount(positions, weights=event_limit[events], minlength=len(idx))
+
+    chargers_mwh = sum(freq.mw_to_mwh(c.power_max_mw) for c in cfg.charger_cfgs)
+    spill_chargers_mwh = sum(
+        freq.mw_to_mwh(c.power_max_mw) for c in cfg.spill_charger_cfgs
+    )
+    consumption = np.minimum(chargers_mwh, active_sum(charge)) + np.minimum(
+        spill_chargers_mwh, active_sum(spill)
+    )
+    generation = (
+        np.minimum(chargers_mwh, active_sum(discharge))
+        if flags.allow_evs_discharge
+        else np.zeros(len(idx))
+    )
+    return consumption, generation
+
+
+def spill_mask(asset: "epl.Spill", idx: np.ndarray) -> np.ndarray:
+    """Get whether a spill asset is allowed in each interval.
+
+    Args:
+        asset: the spill asset.
+        idx: the intervals to check.
+    """
+    if asset.cfg.intervals is None:
+        return np.full(len(idx), True)
+    return np.isin(idx, asset.cfg.intervals)
+
+
+def electric_limits_mwh(
+    asset: "epl.Asset", idx: np.ndarray, flags: Flags
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the most an asset can consume and generate electricity in each interval.
+
+    Assets without a limit get infinite limits - the spill asset only in the
+    intervals it is allowed in.
+
+    Args:
+        asset: the asset.
+        idx: the intervals to get limits for.
+        flags: boolean flags to change simulation and results behaviour.
+
+    Returns:
+        The most electricity consumed and generated in each interval.
+    """
+    n = len(idx)
+    zeros = np.zeros(n)
+
+    def constant(value_mw: float, freq_mins: int) -> np.ndarray:
+        """The energy of a constant power in each interval."""
+        return np.full(n, Freq(freq_mins).mw_to_mwh(value_mw))
+
+    if isinstance(asset, epl.Battery):
+        power = constant(asset.cfg.power_mw, asset.cfg.freq_mins)
+        return power, power
+    if isinstance(asset, epl.CHP):
+        return zeros, constant(asset.cfg.electric_power_max_mw, asset.cfg.freq_mins)
+    if isinstance(asset, epl.HeatPump):
+        return constant(asset.cfg.electric_power_mw, asset.cfg.freq_mins), zeros
+    if isinstance(asset, epl.RenewableGenerator):
+        available = np.asarray(asset.cfg.interval_data.electric_generation_mwh)
+        return zeros, available[idx].astype(np.float64)
+    if isinstance(asset, epl.EVs):
+        return evs_electric_limits_mwh(asset, idx, flags)
+    if isinstance(asset, (epl.Boiler, epl.Valve)):
+        return zeros, zeros
+    if isinstance(asset, epl.Spill):
+        unbounded = np.where(spill_mask(asset, idx), np.inf, 0.0)
+        return unbounded, unbounded
+    return np.full(n, np.inf), np.full(n, np.inf)
+
+
+def site_big_m_mwh(
+    site: "epl.Site", flags: Flags, fixed_interval_data: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the smallest big-M of the site import and export binary constraints.
+
+    The site only imports or exports in an interval, so import is at most the
+    site load plus the most the assets can consume, and export is at most the
+    most the assets can generate less the site load.
+
+    Args:
+        site: the site.
+        flags: boolean flags to change simulation and results behaviour.
+        fixed_interval_data: whether the site loads are fixed - a compiled site
+            updates its loads in place, so its big-M can't depend on them.
+
+    Returns:
+        The big-M of the import and export constraints in each interval.
+    """
+    freq = Freq(site.cfg.freq_mins)
+    idx = np.asarray(site.cfg.interval_data.idx)
+    import_limit = np.full(len(idx), freq.mw_to_mwh(site.cfg.import_limit_mw))
+    export_limit = np.full(len(idx), freq.mw_to_mwh(site.cfg.export_limit_mw))
+    if not fixed_interval_data:
+        return import_limit, export_limit
+
+    consumption = np.zeros(len(idx))
+    generation = np.zeros(len(idx))
+    for asset in site.assets:
+        asset_consumption, asset_generation = electric_limits_mwh(asset, idx, flags)
+        consumption += asset_consumption
+        generation += asset_generation
+
+    load = np.asarray(site.cfg.interval_data.electric_load_mwh, dtype=np.float64)
+    margin = 1 + defaults.big_m_margin
+    return (
+        np.minimum(import_limit, np.maximum(load + consumption, 0.0) * margin),
+        np.minimum(export_limit, np.maximum(generation - load, 0.0) * margin),
+    )
+
+
+def tighten(
+    site: "epl.Site", flags: Flags = Flags(), fixed_interval_data: bool = True
+) -> TighteningReport:
+    """Get the tightened big-M bounds of a site linear program.
+
+    The site import and export bounds are used when creating the site
+    variables.  The battery and EV bounds are recomputed from the asset
+    configurations when each asset is constrained - they are reported here.
+
+    Args:
+        site: the site.
+        flags: boolean flags to change simulation and results behaviour.
+        fixed_interval_data: whether the site loads are fixed.
+
+    Returns:
+        How much each big-M bound was tightened.
+    """
+    report = TighteningReport()
+    freq = Freq(site.cfg.freq_mins)
+    idx = np.asarray(site.cfg.interval_data.idx)
+
+    import_big_m, export_big_m = site_big_m_mwh(site, flags, fixed_interval_data)
+    report.add(
+        f"{site.cfg.name}-import_power_mwh",
+        np.full(len(idx), freq.mw_to_mwh(site.cfg.import_limit_mw)),
+        import_big_m,
+    )
+    report.add(
+        f"{site.cfg.name}-export_power_mwh",
+        np.full(len(idx), freq.mw_to_mwh(site.cfg.export_limit_mw)),
+        export_big_m,
+    )
+    spills = [asset for asset in site.assets if isinstance(asset, epl.Spill)]
+    if fixed_interval_data and spills:
+        n_spill = int(
+            np.logical_or.reduce([spill_mask(spill, idx) for spill in spills]).sum()
+        )
+        if n_spill:
+            for direction in ["import", "export"]:
+                report.untightened[
+                    f"{site.cfg.name}-{direction}_power_mwh"
+                ] = f"spill is allowed in {n_spill} of {len(idx)} intervals"
+
+    for asset in site.assets:
+        name = asset.cfg.name
+        if (
+            isinstance(asset, epl.Battery)
+            and flags.include_charge_discharge_binary_variables
+        ):
+            charge_mwh, discharge_mwh = epl.assets.battery.charge_discharge_big_m_mwh(
+                asset.cfg
+            )
+            capacity = [asset.cfg.capacity_mwh]
+            report.add(f"{name}-electric_charge_mwh", capacity, charge_mwh)
+            report.add(f"{name}-electric_discharge_mwh", capacity, discharge_mwh)
+
+        if isinstance(asset, epl.EVs) and not asset.cfg.aggregate:
+            asset_freq = Freq(asset.cfg.freq_mins)
+            charge, spill, discharge = epl.assets.evs.charge_event_big_m_mwh(
+                asset.cfg, flags
+            )
+            bounds: list[tuple[str, np.ndarray, np.ndarray]] = [
+                ("charger-electric_charge_mwh", asset.cfg.charger_cfgs, charge),
+                (
+                    "spill-charger-electric_charge_mwh",
+                    asset.cfg.spill_charger_cfgs,
+                    spill,
+                ),
+            ]
+            if flags.allow_evs_discharge:
+                bounds.append(
+                    (
+                        "charger-electric_discharge_mwh",
+                        asset.cfg.charger_cfgs,
+                        discharge,
+                    )
+                )
+            for label, charger_cfgs, event_big_m in bounds:
+                shape = (len(event_big_m), len(charger_cfgs))
+                original = np.broadcast_to(
+                    [asset_freq.mw_to_mwh(c.power_max_mw) for c in charger_cfgs], shape
+                )
+                minimum = np.broadcast_to(
+                    [asset_freq.mw_to_mwh(c.power_min_mw) for c in charger_cfgs], shape
+                )
+                report.add(
+                    f"{name}-{label}",
+                    original,
+                    np.maximum(
+                        np.minimum(original, event_big_m[:, np.newaxis]), minimum
+                    ),
+                )
+
+    logger.debug(
+        "tightening.tighten",
+        tightening_pct={
+            name: round(bound.tightening_pct, 4)
+            for name, bound in report.bounds.items()
+        },
+        untightened=report.untightened,
+    )
+    return report
@@ -0,0 +1,175 @@
+"""Two phase spill - only add spill variables when a site is infeasible without them.
+
+Spill assets and EV spill chargers make any site feasible, but most sites are
+feasible without them, and they add many variables to every linear program.
+
+With `Flags(two_phase_spill=True)`, a site is optimized in phases:
+
+1. without spill variables - most sites stop here,
+2. with spill variables only in the intervals that need them, found from the
+   linear program relaxation of the site with spill everywhere,
+3. with spill variables in all intervals, if the limited spill is still
+   infeasible - the relaxation can spill in different intervals than the
+   mixed-integer program needs.
+
+Spill is penalized far above any price, so the limited spill result spills as
+little as it can in those intervals - it can still cost more than spilling
+in all intervals would.
+"""
+import contextlib
+import copy
+import dataclasses
+import typing
+
+import energypylinear as epl
+from energypylinear.flags import Flags
+from energypylinear.logger import logger
+
+
+@dataclasses.dataclass
+class SpillPhaseReport:
+    """Which phase of a two phase spill optimization gave the result.
+
+    Attributes:
+        phase: one of `without_spill`, `limited_spill` or `full_spill`.
+        spill_intervals: intervals spill was allowed in - None for all intervals.
+        solves: number of linear programs solved.
+    """
+
+    phase: str
+    spill_intervals: list[int] | None = None
+    solves: int = 1
+
+
+def limit_spill(asset: "epl.Asset", intervals: list[int]) -> "epl.Asset":
+    """Get a copy of an asset that can only spill in some intervals.
+
+    Assets without spill variables are returned as they are.
+
+    Args:
+        asset: the asset to limit.
+        intervals: the intervals spill is allowed in.
+    """
+    if isinstance(asset, epl.Spill):
+        if asset.cfg.intervals is not None:
+            intervals = sorted(set(intervals) & set(asset.cfg.intervals))
+        return epl.Spill(name=asset.cfg.name, intervals=intervals)
+    if isinstance(asset, epl.EVs) and not asset.cfg.aggregate:
+        if asset.cfg.spill_intervals is not None:
+            intervals = sorted(set(intervals) & set(asset.cfg.spill_intervals))
+        limited = copy.copy(asset)
+        limited.cfg = asset.cfg.model_copy(update={"spill_intervals": intervals})
+        return limited
+    return asset
+
+
+@contextlib.contextmanager
+def limited_spill(
+    site: "epl.Site", intervals: list[int]
+) -> typing.Generator[None, None, None]:
+    """Swap the site assets for copies that can only spill in some intervals.
+
+    Args:
+        site: the site.
+        intervals: the intervals spill is allowed in.
+    """
+    assets = site.assets
+    site.assets = [limit_spill(asset, intervals) for asset in assets]
+    try:
+        yield
+    finally:
+        site.assets = assets
+
+
+def spill_intervals(site: "epl.Site", ivars: "epl.IntervalVars") -> list[int]:
+    """Get the intervals where a solved site used spill.
+
+    Args:
+        site: the solved site.
+        ivars: linear program variables for each interval.
+    """
+    idx = list(site.cfg.interval_data.idx)
+    quantities = [
+        "electric_generation_mwh",
+        "electric_load_mwh",
+        "high_temperature_generation_mwh",
+        "low_temperature_load_mwh",
+    ]
+    used = []
+    for k, assets in enumerate(ivars.objective_variables):
+        spilled = 0.0
+        for asset in assets:
+            if isinstance(asset, epl.assets.spill.SpillOneInterval):
+                spilled += sum(
+                    site.optimizer.value(getattr(asset, q)) for q in quantities
+                )
+            elif isinstance(asset, epl.assets.evs.EVOneInterval) and asset.is_spill:
+                spilled += site.optimizer.value(asset.electric_charge_mwh)
+        if spilled > 0:
+            used.append(int(idx[k]))
+    return used
+
+
+def optimize_two_phase(
+    site: "epl.Site",
+    objective: str = "price",
+    flags: Flags = Flags(),
+    verbose: bool = False,
+) -> "epl.SimulationResult":
+    """Optimize a site without spill, only adding spill if it is infeasible.
+
+    Args:
+        site: the site to optimize.
+        objective: name of the objective to minimize.
+        flags: boolean flags to change simulation and results behaviour.
+        verbose: level of printing.
+
+    Returns:
+        epl.results.SimulationResult, with the phase used in `spill_phase`.
+    """
+    solves = 0
+
+    def solve(intervals: list[int] | None, relax: bool = False) -> tuple:
+        """Build and solve the site, with spill limited to `intervals` if given."""
+        nonlocal solves
+        solves += 1
+        with contextlib.ExitStack() as stack:
+            if intervals is not None:
+                stack.enter_context(limited_spill(site, intervals))
+            ivars = site.build(objective=objective, flags=flags)
+            if relax:
+                site.optimizer.relax()
+            status = site.optimizer.solve(verbose=verbose, allow_infeasible=True)
+        return ivars, status
+
+    ivars, status = solve([])
+    report = SpillPhaseReport(phase="without_spill", spill_intervals=[])
+
+    if not status.feasible:
+        relaxed_ivars, relaxed = solve(None, relax=True)
+        #  when the relaxation doesn't spill, it can't point to where the
+        #  integer variables need spill
+        intervals = spill_intervals(site, relaxed_ivars) if relaxed.feasible else []
+        if intervals:
+            ivars, status = solve(intervals)
+            report = SpillPhaseReport(phase="limited_spill", spill_intervals=intervals)
+
+    if not status.feasible:
+        ivars, status = solve(None)
+        report = SpillPhaseReport(phase="full_spill")
+
+    report.solves = solves
+    logger.debug("two_phase.optimize_two_phase", report=report)
+    if not flags.allow_infeasible:
+        assert status.feasible
+
+    simulation = epl.extract_results(
+        site,
+        site.assets,
+        ivars,
+        feasible=status.feasible,
+        verbose=verbose,
+        flags=flags,
+    )
+    simulation.spill_phase = report
+    return simulation
@@ -8,12 +8,12 @@ def repeat_to_match_length(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     return np.concatenate([np.tile(a, quotient), a[:remainder]])
 
 
-def check_array_lengths(results: dict[str, list]) -> None:
+def check_array_lengths(results: dict[str, list] | dict[str, np.ndarray]) -> None:
     """Check that all lists in the results dictionary have the same length.
 
     Args:
-        results (dict[str, list]):
-            Dictionary containing lists whose lengths need to be checked.
+        results (dict[str, list] | dict[str, np.ndarray]):
+            Dictionary containing lists or arrays whose lengths need to be checked.
 
     Raises:
         AssertionError: If lists in the dictionary have different lengths.
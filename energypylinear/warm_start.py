@@ -0,0 +1,140 @@
+"""MIP warm starts from a previous or heuristic dispatch.
+
+Consecutive optimizations, like the runs of a backtest, often have nearly the
+same solution.  A `WarmStart` maps a start onto the variables of a new linear
+program, which is passed to the solver as a MIP start - a feasible start gives
+the solver an incumbent before it starts branching.
+
+A start can be:
+
+- a previous `SimulationResult` - the value of every variable, including the
+  binary variables, read from the optimizer of the result's site,
+- a schedule - a dataframe of results columns, like
+  `battery-electric_charge_mwh`, indexed by interval,
+- values of variables by name.
+
+With a `shift`, interval `i` of a previous result or schedule starts interval
+`i - shift` of the new optimization, for rolling windows.
+"""
+import dataclasses
+import typing
+
+import numpy as np
+import pandas as pd
+import pulp
+
+import energypylinear as epl
+
+
+@dataclasses.dataclass
+class WarmStart:
+    """A MIP start for an optimization.
+
+    Attributes:
+        source: a previous simulation result, a schedule of results columns
+            indexed by interval, or values of variables by name.
+        shift: number of intervals the optimization is ahead of the source.
+    """
+
+    source: "epl.SimulationResult | pd.DataFrame | typing.Mapping[str, float]"
+    shift: int = 0
+
+    def values(self) -> dict[str, float]:
+        """Start values by `pulp` variable name, in the intervals of the optimization.
+
+        A previous result is read from the optimizer of its site, so the values
+        must be read before the site is optimized again.
+        """
+        if isinstance(self.source, epl.SimulationResult):
+            return result_values(self.source, self.shift)
+        if isinstance(self.source, pd.DataFrame):
+            return schedule_values(self.source, self.shift)
+        assert self.shift == 0, "shift needs a simulation result or schedule"
+        return {variable_name(name): value for name, value in self.source.items()}
+
+
+@dataclasses.dataclass
+class WarmStartReport:
+    """How a warm start was used by the solver.
+
+    Attributes:
+        mapped: number of variables given a start value.
+        variables: number of variables in the linear program.
+        accepted: whether the solver accepted the start as a feasible
+            solution - None when the solver doesn't report it.
+        objective: objective value of an accepted start.
+    """
+
+    mapped: int
+    variables: int
+    accepted: bool | None
+    objective: float | None
+
+
+def variable_name(name: str) -> str:
+    """The name `pulp` gives a variable, which replaces characters like `-`.
+
+    Args:
+        name: the name the variable was created with.
+    """
+    return name.translate(pulp.LpElement.trans)
+
+
+def shift_label(label: str, shift: int) -> str | None:
+    """Move the interval of a variable label back by a number of intervals.
+
+    Args:
+        label: the variable label, starting with the interval.
+        shift: number of intervals to move back.
+
+    Returns:
+        The shifted label - None when it is before the first interval.
+    """
+    first, _, rest = label.partition("-")
+    interval = int(first) - shift
+    if interval < 0:
+        return None
+    return f"{interval}-{rest}" if rest else str(interval)
+
+
+def result_values(simulation: "epl.SimulationResult", shift: int) -> dict[str, float]:
+    """Values of the variables of a previous result, by name.
+
+    Args:
+        simulation: the previous result.
+        shift: number of intervals the optimization is ahead of the result.
+    """
+    optimizer = simulation.site.optimizer
+    columns, solution = optimizer.solution()
+    values = {}
+    for name, col in columns.items():
+        value = float(solution[col])
+        if np.isnan(value):
+            continue
+        if shift:
+            if name not in optimizer.variable_labels:
+                continue
+            array, label = optimizer.variable_labels[name]
+            shifted = shift_label(label, shift)
+            if shifted is None:
+                continue
+            name = variable_name(f"{array}-{shifted}")
+        values[name] = value
+    return values
+
+
+def schedule_values(schedule: pd.DataFrame, shift: int) -> dict[str, float]:
+    """Values of the variables of a schedule of results columns, by name.
+
+    The variable of a column in an interval is named `{column}-{interval}`.
+
+    Args:
+        schedule: results columns, indexed by interval.
+        shift: number of intervals the optimization is ahead of the schedule.
+    """
+    values = {}
+    for column, series in schedule.select_dtypes("number").items():
+        for interval, value in zip(series.index.tolist(), series.tolist()):
+            if interval - shift >= 0 and not np.isnan(value):
+                values[variable_name(f"{column}-{interval - shift}")] = float(value)
+    return values
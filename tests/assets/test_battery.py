@@ -193,6 +193,7 @@ def test_hypothesis(
         assert all(simulation.results[f"{name}-{var}"] >= 0 - tol)
 
     #  check we set initial and final charge correctly
+    assert isinstance(asset.cfg.initial_charge_mwh, float)
     np.testing.assert_almost_equal(
         simulation.results[f"{name}-electric_initial_charge_mwh"].iloc[0],
         asset.cfg.initial_charge_mwh,
@@ -273,3 +274,43 @@ def test_no_simultaneous_import_export() -> None:
     export_mask = results["site-export_power_mwh"] > 0
     check = import_mask.astype(int) + export_mask.astype(int)
     assert all(check <= 1)
+
+
+def test_free_initial_charge() -> None:
+    """Test an initial charge of None is free, and the final charge returns to it."""
+    asset = epl.Battery(
+        power_mw=2,
+        capacity_mwh=4,
+        electricity_prices=np.array([100, 100, 100]),
+        initial_charge_mwh=None,
+    )
+    assert asset.cfg.initial_charge_mwh is None
+    assert asset.cfg.final_charge_mwh is None
+    assert asset.cfg.cyclic_charge
+    simulation = asset.optimize(verbose=False)
+    results = simulation.results
+    #  energy can't be sold from a free initial charge that is never bought
+    np.testing.assert_almost_equal(
+        results["battery-electric_initial_charge_mwh"].iloc[0],
+        results["battery-electric_final_charge_mwh"].iloc[-1],
+    )
+    np.testing.assert_almost_equal(results["site-export_power_mwh"].sum(), 0)
+
+    #  a final charge leaves the initial charge free
+    asset = epl.Battery(
+        power_mw=4,
+        capacity_mwh=6,
+        efficiency_pct=1.0,
+        electricity_prices=np.array([50, 10, 10]),
+        freq_mins=60,
+        initial_charge_mwh=None,
+        final_charge_mwh=0,
+    )
+    assert not asset.cfg.cyclic_charge
+    simulation = asset.optimize(verbose=False)
+    np.testing.assert_almost_equal(
+        simulation.results["battery-electric_initial_charge_mwh"].iloc[0], 6
+    )
+    np.testing.assert_almost_equal(
+        simulation.results["battery-electric_discharge_mwh"].iloc[0], 4
+    )
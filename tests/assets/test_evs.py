@@ -1,6 +1,7 @@
 """Test electric vehicle asset."""
 import collections
 import statistics
+import typing
 from concurrent.futures import ProcessPoolExecutor
 
 import hypothesis
@@ -275,3 +276,176 @@ def test_evs_hypothesis(
             allow_infeasible=False,
         ),
     )
+
+
+def test_evs_charge_event_windows() -> None:
+    """Test variables are only created inside each charge event window."""
+    charge_events_capacity_mwh = [50.0, 100, 30, 40]
+    evs = epl.EVs(
+        chargers_power_mw=[100, 100],
+        charge_events_capacity_mwh=charge_events_capacity_mwh,
+        charger_turndown=0.0,
+        charge_event_efficiency=1.0,
+        electricity_prices=[-100, 50, 30, 50, 40],
+        charge_events=[
+            [1, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 1, 1],
+            [0, 1, 0, 0, 0],
+        ],
+        freq_mins=60,
+    )
+    simulation = evs.optimize(verbose=False)
+
+    #  each charge event is active for one interval, except the third
+    ivars = evs.site.build()
+    all_evs = ivars.filter_all_evs_array(False, evs.cfg.name)
+    positions, events = epl.assets.evs.evs_pairs(all_evs)
+    np.testing.assert_array_equal(positions, [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(events, [0, 3, 1, 2, 2])
+    assert all(ev.electric_charge_mwh.shape[2] == 2 for ev in all_evs)
+
+    #  the state of charge is constant outside of the window
+    socs = simulation.results[
+        [f"evs-charge-event-{idx}-final_soc_mwh" for idx in range(4)]
+    ]
+    np.testing.assert_array_almost_equal(socs.iloc[-1], charge_events_capacity_mwh)
+    np.testing.assert_array_almost_equal(
+        socs["evs-charge-event-0-final_soc_mwh"], [50, 50, 50, 50, 50]
+    )
+    np.testing.assert_array_almost_equal(
+        socs["evs-charge-event-2-final_soc_mwh"], [0, 0, 0, 0, 30]
+    )
+
+
+def test_evs_charge_event_records() -> None:
+    """Test charge events given as compact records match the dense matrix."""
+    charge_events = [
+        [1, 0, 0, 0, 0],
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 1, 1],
+        [0, 1, 0, 0, 0],
+    ]
+    records = [(0, 1, 50, 0.9), (1, 4, 100, 0.9), (3, 5, 30, 0.9), (1, 2, 40, 0.9)]
+    kwargs: dict[str, typing.Any] = {
+        "chargers_power_mw": [100, 100],
+        "charger_turndown": 0.0,
+        "electricity_prices": [-100, 50, 30, 50, 40],
+        "freq_mins": 60,
+    }
+    dense = epl.EVs(
+        charge_events=charge_events,
+        charge_events_capacity_mwh=[50, 100, 30, 40],
+        charge_event_efficiency=0.9,
+        **kwargs,
+    )
+    compact = epl.EVs(charge_event_records=records, **kwargs)
+
+    assert compact.cfg.charge_events is None
+    np.testing.assert_array_equal(
+        compact.cfg.dense_charge_events(), np.array(charge_events).T
+    )
+    for first, second in zip(dense.cfg.windows(), compact.cfg.windows()):
+        np.testing.assert_array_equal(first, second)
+
+    dense_results = dense.optimize(verbose=False).results
+    compact_results = compact.optimize(verbose=False).results
+    np.testing.assert_allclose(
+        epl.get_accounts(compact_results, verbose=False).cost,
+        epl.get_accounts(dense_results, verbose=False).cost,
+    )
+    cols = [c for c in dense_results.columns if "soc_mwh" in c]
+    np.testing.assert_allclose(compact_results[cols], dense_results[cols], atol=1e-6)
+
+    with pytest.raises(AssertionError):
+        epl.EVs(
+            charge_event_records=records,
+            charge_events_capacity_mwh=[1, 2, 3, 4],
+            **kwargs,
+        )
+
+    #  records are only read from `charge_event_records` - records given as
+    #  lists, like from JSON, aren't mistaken for a dense matrix
+    lists = epl.EVs(charge_event_records=[list(r) for r in records], **kwargs)
+    for first, second in zip(dense.cfg.windows(), lists.cfg.windows()):
+        np.testing.assert_array_equal(first, second)
+    with pytest.raises(AssertionError):
+        epl.EVs(charge_event_records=[r[:3] for r in records], **kwargs)
+    with pytest.raises(AssertionError):
+        epl.EVs(
+            charge_events=charge_events,
+            charge_event_records=records,
+            charge_events_capacity_mwh=[50, 100, 30, 40],
+            **kwargs,
+        )
+
+
+def test_evs_aggregate() -> None:
+    """Test the aggregate EVs virtual battery matches the detailed model."""
+    kwargs: dict[str, typing.Any] = {
+        "chargers_power_mw": [100, 100],
+        "charge_events_capacity_mwh": [50.0, 100, 30, 40],
+        "charger_turndown": 0.0,
+        "charge_event_efficiency": 1.0,
+        "electricity_prices": [-100, 50, 30, 50, 40],
+        "charge_events": [
+            [1, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 1, 1],
+            [0, 1, 0, 0, 0],
+        ],
+        "freq_mins": 60,
+    }
+    detailed = epl.EVs(**kwargs).optimize(verbose=False)
+    aggregate = epl.EVs(aggregate=True, **kwargs).optimize(
+        verbose=False, flags=Flags(fail_on_spill_asset_use=True)
+    )
+    assert set(aggregate.results.columns) == set(detailed.results.columns)
+    np.testing.assert_allclose(
+        epl.get_accounts(aggregate.results, verbose=False).cost,
+        epl.get_accounts(detailed.results, verbose=False).cost,
+    )
+    cols = [c for c in detailed.results.columns if "final_soc_mwh" in c]
+    np.testing.assert_allclose(
+        aggregate.results[cols].iloc[-1], detailed.results[cols].iloc[-1], atol=1e-6
+    )
+
+    #  charge events only charge when active, with one charge event per charger
+    charge_events = np.array(kwargs["charge_events"]).T
+    charges = aggregate.results[
+        [f"evs-charge-event-{n}-electric_charge_mwh" for n in range(4)]
+    ].to_numpy()
+    assert (charges[charge_events == 0] == 0).all()
+    assert ((charges > 0).sum(axis=1) <= 2).all()
+    for n in range(2):
+        assert (aggregate.results[f"evs-charger-{n}-electric_charge_mwh"] <= 100).all()
+
+    with pytest.raises(AssertionError):
+        epl.EVs(aggregate=True, **kwargs).optimize(
+            verbose=False, flags=Flags(allow_evs_discharge=True)
+        )
+
+
+def test_evs_disaggregate_least_laxity_first() -> None:
+    """Test the aggregate charge goes to the least laxity charge events first."""
+    evs = epl.EVs(
+        chargers_power_mw=[10],
+        charge_event_records=[(0, 2, 10, 1.0), (0, 4, 10, 1.0)],
+        charger_turndown=0.0,
+        freq_mins=60,
+        aggregate=True,
+    )
+    disaggregation = epl.assets.evs.disaggregate_evs(
+        evs.cfg,
+        np.arange(4),
+        charge_mwh=np.array([10.0, 0, 10, 0]),
+        spill_charge_mwh=np.zeros(4),
+        freq=epl.Freq(60),
+    )
+    #  the first charge event leaves first, so is charged first
+    charge = disaggregation.arrays["electric_charge_mwh"][:, 0]
+    np.testing.assert_array_equal(disaggregation.positions, [0, 0, 1, 1, 2, 3])
+    np.testing.assert_array_equal(disaggregation.events, [0, 1, 0, 1, 1, 1])
+    np.testing.assert_allclose(charge, [10, 0, 0, 0, 10, 0])
+    np.testing.assert_allclose(disaggregation.final_soc_mwh, [10, 0, 10, 0, 10, 10])
+    assert disaggregation.unassigned_mwh == 0
@@ -0,0 +1,82 @@
+"""Tests anytime solving - a labelled result within a latency budget."""
+import pathlib
+
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_anytime(builder: str) -> None:
+    """Test a site is solved within a latency budget, and falls back to a repair."""
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_power_min_mw=1,
+                electric_efficiency_pct=0.4,
+            ),
+        ],
+        electricity_prices=np.random.default_rng(0).normal(50, 30, 24),
+        optimizer_config=epl.OptimizerConfig(builder=builder),
+    )
+    budget = epl.LatencyBudget(seconds=30)
+    simulation = site.optimize(verbose=False, latency_budget=budget)
+    report = simulation.anytime
+    assert report is not None
+    assert report.quality == "optimal"
+    assert report.gap is not None
+    assert report.gap <= epl.OptimizerConfig().relative_tolerance
+    assert report.solves == 1
+    assert report.elapsed_s <= budget.seconds
+    assert simulation.feasible
+
+    #  reserving the whole budget skips the mixed-integer solve
+    budget = epl.LatencyBudget(seconds=30, reserve=1.0)
+    repaired = site.optimize(verbose=False, latency_budget=budget)
+    report = repaired.anytime
+    assert report is not None
+    assert report.quality == "repaired"
+    assert report.gap is not None and report.gap >= 0
+    assert report.solves == 2
+    assert repaired.feasible
+    assert (
+        epl.get_accounts(repaired.results, verbose=False).cost
+        >= epl.get_accounts(simulation.results, verbose=False).cost - 1e-6
+    )
+
+    assert site.optimize(verbose=False).anytime is None
+
+
+def test_latency_budget() -> None:
+    """Test the latency budget is validated."""
+    with pytest.raises(AssertionError):
+        epl.LatencyBudget(seconds=0)
+    with pytest.raises(AssertionError):
+        epl.LatencyBudget(seconds=1, reserve=1.5)
+
+
+def test_anytime_cache(tmp_path: pathlib.Path) -> None:
+    """Test a cache hit keeps the quality of an anytime result."""
+    cache = epl.ResultsCache(tmp_path)
+    budget = epl.LatencyBudget(seconds=30, reserve=1.0)
+    prices = np.random.default_rng(0).normal(50, 30, 24)
+    assets = [
+        epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+        epl.CHP(
+            electric_power_max_mw=5,
+            electric_power_min_mw=1,
+            electric_efficiency_pct=0.4,
+        ),
+    ]
+    first = epl.Site(assets=assets, electricity_prices=prices).optimize(
+        verbose=False, latency_budget=budget, cache=cache
+    )
+    second = epl.Site(assets=assets, electricity_prices=prices).optimize(
+        verbose=False, latency_budget=budget, cache=cache
+    )
+    assert cache.hits == 1
+    assert second.anytime == first.anytime
+    assert second.anytime is not None
@@ -0,0 +1,81 @@
+"""Tests optimizing many scenarios of site interval data."""
+import pickle
+import typing
+
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimize_many(workers: int) -> None:
+    """Test each scenario matches optimizing the site with its interval data."""
+    idx_len = 24
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, initial_charge_mwh=1),
+            epl.Boiler(),
+        ],
+        electricity_prices=np.random.normal(100, 10, idx_len),
+        high_temperature_load_mwh=5,
+        optimizer_config=epl.OptimizerConfig(relative_tolerance=0.0),
+    )
+    prices = site.cfg.interval_data.electricity_prices
+    assert isinstance(prices, np.ndarray)
+    base_prices = prices.copy()
+    scenarios: list[dict[str, typing.Any]] = [
+        {"electricity_prices": np.random.normal(100, 80, idx_len)},
+        {"high_temperature_load_mwh": 10},
+        {
+            "electricity_prices": np.random.normal(100, 80, idx_len),
+            "electric_load_mwh": np.random.uniform(0, 2, idx_len),
+        },
+    ]
+    simulations = site.optimize_many(scenarios, workers=workers)
+    assert len(simulations) == len(scenarios)
+
+    for scenario, simulation in zip(scenarios, simulations):
+        assert simulation.feasible
+        interval_data: dict[str, typing.Any] = {
+            "electricity_prices": base_prices,
+            "high_temperature_load_mwh": 5,
+            **scenario,
+        }
+        expected = epl.Site(
+            assets=site.assets,
+            **interval_data,
+            optimizer_config=site.optimizer_cfg,
+        ).optimize(verbose=False)
+        np.testing.assert_allclose(
+            epl.get_accounts(simulation.results, verbose=False).cost,
+            epl.get_accounts(expected.results, verbose=False).cost,
+            atol=1e-4,
+        )
+
+    #  the interval data of the site isn't changed by the scenarios
+    np.testing.assert_array_equal(
+        np.asarray(site.cfg.interval_data.electricity_prices), base_prices
+    )
+    with pytest.raises(AssertionError):
+        site.optimize_many([{"idx": [0]}])
+
+
+def test_pickle_site() -> None:
+    """Test a site pickles without the linear program after optimizing."""
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, initial_charge_mwh=1),
+            epl.Boiler(),
+        ],
+        electricity_prices=np.random.normal(100, 10, 24),
+        high_temperature_load_mwh=5,
+        optimizer_config=epl.OptimizerConfig(relative_tolerance=0.0),
+    )
+    site.optimize(verbose=False)
+    assert hasattr(site, "optimizer")
+
+    loaded = pickle.loads(pickle.dumps(site))
+    assert not hasattr(loaded, "optimizer")
+    simulation = loaded.optimize(verbose=False)
+    assert simulation.feasible
@@ -0,0 +1,77 @@
+"""Tests the on-disk cache of optimization results."""
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+import energypylinear as epl
+from energypylinear.cache import cache_key
+
+
+def test_cache_key() -> None:
+    """Test the cache key only depends on inputs that change the results."""
+    prices = np.random.normal(100, 10, 24)
+    assets = [epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()]
+    site = epl.Site(assets=assets, electricity_prices=prices)
+    key = cache_key(site)
+    assert key == cache_key(epl.Site(assets=assets, electricity_prices=prices.copy()))
+    assert key == cache_key(
+        epl.Site(
+            assets=assets,
+            electricity_prices=prices,
+            optimizer_config=epl.OptimizerConfig(verbose=True),
+        )
+    )
+    assert key != cache_key(epl.Site(assets=assets, electricity_prices=prices + 1))
+    assert key != cache_key(site, objective="carbon")
+    assert key != cache_key(site, flags=epl.Flags(allow_evs_discharge=True))
+
+
+def test_cache_hit_miss(tmp_path: pathlib.Path) -> None:
+    """Test a cache hit returns the stored results without building the program."""
+    cache = epl.ResultsCache(tmp_path)
+    prices = np.random.normal(100, 10, 24)
+    assets = [epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()]
+
+    first = epl.Site(assets=assets, electricity_prices=prices).optimize(
+        verbose=False, cache=cache
+    )
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    site = epl.Site(assets=assets, electricity_prices=prices)
+    second = site.optimize(verbose=False, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not hasattr(site, "optimizer")
+    assert second.feasible == first.feasible
+    pd.testing.assert_frame_equal(first.results, second.results)
+
+    #  a hit keeps the reports of the stored optimization, timed as a lookup
+    assert second.timings is not None
+    assert set(second.timings.phases) == {"validation", "cache"}
+    assert second.model_stats == first.model_stats
+    assert second.solver_stats == first.solver_stats
+    assert second.tightening is not None and first.tightening is not None
+    assert set(second.tightening.bounds) == set(first.tightening.bounds)
+
+
+def test_cache_eviction(tmp_path: pathlib.Path) -> None:
+    """Test the least recently used results are evicted over the size limit."""
+    cache = epl.ResultsCache(tmp_path)
+    assets = [epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()]
+    sites = [
+        epl.Site(assets=assets, electricity_prices=np.random.normal(100, 10, 24))
+        for _ in range(3)
+    ]
+    for site in sites:
+        site.optimize(verbose=False, cache=cache)
+    assert len(cache.entries()) == 3
+
+    #  use the first results, so the second are the least recently used
+    sites[0].optimize(verbose=False, cache=cache)
+    size = max(path.stat().st_size for path in cache.entries())
+    cache.max_bytes = 2 * size
+    cache.evict()
+    remaining = {path.name for path in cache.entries()}
+    assert cache.path(cache_key(sites[1])).name not in remaining
+    assert cache.path(cache_key(sites[0])).name in remaining
+    assert cache.size() <= cache.max_bytes
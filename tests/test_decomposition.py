@@ -0,0 +1,91 @@
+"""Tests the temporal decomposition of a whole horizon optimization."""
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+def test_decomposition_config() -> None:
+    """Test the decomposition configuration is validated."""
+    cfg = epl.DecompositionConfig(n_chunks=2)
+    assert cfg.workers == 1
+    with pytest.raises(AssertionError):
+        epl.DecompositionConfig(n_chunks=0)
+    with pytest.raises(AssertionError):
+        epl.DecompositionConfig(workers=0)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_decomposition_battery(workers: int) -> None:
+    """Test battery chunks are stitched into one whole horizon solution."""
+    idx_len = 48
+    initial_charge_mwh = 1.0
+    final_charge_mwh = 3.0
+    site = epl.Site(
+        assets=[
+            epl.Battery(
+                power_mw=2,
+                capacity_mwh=4,
+                initial_charge_mwh=initial_charge_mwh,
+                final_charge_mwh=final_charge_mwh,
+            ),
+            epl.Boiler(),
+        ],
+        electricity_prices=np.random.normal(100, 80, idx_len),
+        high_temperature_load_mwh=5,
+        optimizer_config=epl.OptimizerConfig(relative_tolerance=0.0),
+    )
+    simulation = site.optimize(
+        verbose=False,
+        decomposition=epl.DecompositionConfig(
+            n_chunks=3, workers=workers, max_iterations=5
+        ),
+    )
+    results = simulation.results
+    assert simulation.feasible
+    assert len(results) == idx_len
+
+    initial = results["battery-electric_initial_charge_mwh"].values
+    final = results["battery-electric_final_charge_mwh"].values
+    np.testing.assert_allclose(initial[1:], final[:-1], atol=1e-5)
+    np.testing.assert_allclose(initial[0], initial_charge_mwh)
+    np.testing.assert_allclose(final[-1], final_charge_mwh)
+
+    #  the relaxation bounds the whole horizon optimum, which bounds the chunks
+    report = simulation.decomposition
+    assert report is not None
+    assert report.iterations <= 5
+    assert report.bound is not None and report.gap is not None
+    full = site.optimize(verbose=False)
+    full_cost = epl.get_accounts(full.results, verbose=False).cost
+    assert report.bound <= full_cost + 1e-4
+    assert full_cost <= epl.get_accounts(results, verbose=False).cost + 1e-4
+    assert report.gap >= -1e-6
+
+
+def test_decomposition_evs() -> None:
+    """Test charge events that span chunks are charged by the end of the horizon."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        48, n_chargers=3, charge_length=8, n_charge_events=12, seed=42
+    )
+    evs = epl.EVs(**ds, charger_turndown=0.0)
+    simulation = evs.site.optimize(
+        verbose=False,
+        decomposition=epl.DecompositionConfig(
+            n_chunks=3, max_iterations=3, compute_bound=False
+        ),
+    )
+    assert simulation.feasible
+    assert len(simulation.results) == 48
+    assert simulation.decomposition is not None
+    assert simulation.decomposition.bound is None
+
+    cols = [
+        f"evs-charge-event-{idx}-final_soc_mwh"
+        for idx in range(len(ds["charge_events_capacity_mwh"]))
+    ]
+    np.testing.assert_allclose(
+        simulation.results[cols].iloc[-1].values,
+        ds["charge_events_capacity_mwh"],
+        atol=1e-4,
+    )
@@ -0,0 +1,143 @@
+"""Tests the elimination of binary variables that can't change the optimum."""
+import numpy as np
+import pulp
+
+import energypylinear as epl
+
+
+def n_integers(site: epl.Site) -> int:
+    """Count the integer variables in the last linear program built by a site."""
+    return sum(v.cat == pulp.LpInteger for v in site.optimizer.variables())
+
+
+def test_eliminate_binaries() -> None:
+    """Test a site without negative prices or export premiums is a linear program."""
+    prices = np.random.default_rng(0).uniform(10, 100, 24)
+    flags = epl.Flags(include_charge_discharge_binary_variables=True)
+
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.HeatPump(electric_power_mw=1, cop=3),
+            epl.Boiler(),
+            epl.Valve(),
+            epl.Spill(),
+        ],
+        electricity_prices=prices,
+        gas_prices=20,
+        high_temperature_load_mwh=2,
+        low_temperature_load_mwh=1,
+        low_temperature_generation_mwh=1,
+    )
+    relaxed = site.optimize(verbose=False, flags=flags)
+    assert relaxed.elimination is not None
+    assert set(relaxed.elimination.eliminated) == {
+        "site-import_power_bin",
+        "site-export_power_bin",
+        "battery-electric_charge_binary",
+        "battery-electric_discharge_binary",
+        "chp-binary_mwh",
+        "boiler-binary_mwh",
+        "heat-pump-electric_load_binary",
+    }
+    assert n_integers(site) == 0
+
+    full_site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.HeatPump(electric_power_mw=1, cop=3),
+            epl.Boiler(),
+            epl.Valve(),
+            epl.Spill(),
+        ],
+        electricity_prices=prices,
+        gas_prices=20,
+        high_temperature_load_mwh=2,
+        low_temperature_load_mwh=1,
+        low_temperature_generation_mwh=1,
+    )
+    full = full_site.optimize(
+        verbose=False,
+        flags=epl.Flags(
+            include_charge_discharge_binary_variables=True, force_full_milp=True
+        ),
+    )
+    assert full.elimination is not None
+    assert full.elimination.eliminated == {}
+    assert n_integers(full_site) > 0
+    np.testing.assert_allclose(
+        epl.get_accounts(relaxed.results).cost,
+        epl.get_accounts(full.results).cost,
+        rtol=1e-4,
+    )
+
+
+def test_keep_binaries() -> None:
+    """Test binary variables are kept when they can change the optimum."""
+    prices = np.array([50.0, -20.0, 80.0, 10.0])
+    flags = epl.Flags(include_charge_discharge_binary_variables=True)
+
+    #  negative prices and export premiums keep the battery and site binaries
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_power_min_mw=1,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.HeatPump(electric_power_mw=1, cop=3),
+            epl.Boiler(),
+            epl.Valve(),
+            epl.Spill(),
+        ],
+        electricity_prices=prices,
+        export_electricity_prices=prices + 5,
+        gas_prices=20,
+        high_temperature_load_mwh=2,
+        low_temperature_load_mwh=1,
+        low_temperature_generation_mwh=1,
+    )
+    simulation = site.optimize(verbose=False, flags=flags)
+    assert simulation.elimination is not None
+    assert set(simulation.elimination.eliminated) == {
+        "boiler-binary_mwh",
+        "heat-pump-electric_load_binary",
+    }
+    assert n_integers(site) == 5 * len(prices)
+
+    #  a compiled site can change its prices, so keeps the site binaries
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.HeatPump(electric_power_mw=1, cop=3),
+            epl.Boiler(),
+            epl.Valve(),
+            epl.Spill(),
+        ],
+        electricity_prices=np.abs(prices),
+        gas_prices=20,
+        high_temperature_load_mwh=2,
+        low_temperature_load_mwh=1,
+        low_temperature_generation_mwh=1,
+    )
+    compiled = site.compile(flags=flags)
+    assert "site-import_power_bin" not in site.elimination.eliminated
+    assert "battery-electric_charge_binary" not in site.elimination.eliminated
+    assert compiled.optimize(verbose=False).feasible
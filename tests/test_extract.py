@@ -0,0 +1,54 @@
+"""Tests extracting results from the solution vector."""
+import numpy as np
+import pandas as pd
+
+import energypylinear as epl
+
+
+def test_extract_builders() -> None:
+    """Test results extracted with the pulp and sparse builders are the same."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        12, n_chargers=2, charge_length=4, n_charge_events=3, seed=2
+    )
+    results = []
+    for builder in ["pulp", "sparse"]:
+        evs = epl.EVs(
+            **ds,
+            optimizer_config=epl.OptimizerConfig(
+                relative_tolerance=0.0, builder=builder
+            ),
+        )
+        simulation = evs.site.optimize(
+            verbose=False, flags=epl.Flags(allow_evs_discharge=True)
+        )
+        results.append(simulation.results)
+    pd.testing.assert_frame_equal(results[0], results[1], atol=1e-6)
+
+
+def test_extract_reuses_index() -> None:
+    """Test a compiled site reuses the column of each results quantity."""
+    site = epl.Site(
+        assets=[epl.Battery(), epl.Boiler()],
+        electricity_prices=np.random.normal(100, 10, 12),
+    )
+    compiled = site.compile()
+    first = compiled.optimize(verbose=False)
+    index = compiled.ivars.value_index
+    assert ("BatteryOneInterval", "battery", "electric_charge_mwh") in index
+
+    compiled.update(electricity_prices=np.random.normal(100, 80, 12))
+    second = compiled.optimize(verbose=False)
+    assert compiled.ivars.value_index is index
+    assert list(first.results.columns) == list(second.results.columns)
+    np.testing.assert_allclose(
+        second.results["battery-electric_charge_mwh"],
+        [
+            compiled.optimizer.value(v)
+            for v in [
+                b[0].electric_charge_mwh
+                for b in compiled.ivars.filter_objective_variables(
+                    epl.assets.battery.BatteryOneInterval, asset_name="battery"
+                )
+            ]
+        ],
+    )
@@ -0,0 +1,49 @@
+"""Tests the cost of importing `energypylinear`."""
+import json
+import subprocess
+import sys
+
+#  slow libraries that importing shouldn't need
+lazy_modules = ["matplotlib", "seaborn", "pandera"]
+#  plotting libraries that optimizing shouldn't need
+plot_modules = ["matplotlib", "seaborn"]
+
+
+def run_python(code: str) -> dict:
+    """Run code in a fresh interpreter and return the JSON it prints."""
+    process = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def test_import_is_lazy() -> None:
+    """Test importing doesn't import plotting or validation libraries."""
+    out = run_python(
+        f"""
+import json, sys
+import energypylinear as epl
+imported = [m for m in {lazy_modules} if m in sys.modules]
+
+site = epl.Site(assets=[epl.Battery()], electricity_prices=[100, -50, 200])
+site.optimize(verbose=False)
+optimized = [m for m in {plot_modules} if m in sys.modules]
+print(json.dumps({{"imported": imported, "optimized": optimized}}))
+"""
+    )
+    assert out["imported"] == []
+    assert out["optimized"] == []
+
+
+def test_plot_is_imported_on_use() -> None:
+    """Test the plot module is imported when first accessed."""
+    out = run_python(
+        """
+import json, sys
+import energypylinear as epl
+before = "energypylinear.plot" in sys.modules
+plot = epl.plot
+print(json.dumps({"before": before, "after": "matplotlib" in sys.modules, "has": hasattr(plot, "plot_battery")}))
+"""
+    )
+    assert out == {"before": False, "after": True, "has": True}
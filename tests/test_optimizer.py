@@ -2,8 +2,10 @@
 
 
 import numpy as np
+import pytest
 
 import energypylinear as epl
+from energypylinear.sparse import GE, SparseModel
 
 
 def test_optimizer_config() -> None:
@@ -26,3 +28,167 @@ def test_optimizer_config() -> None:
     asset.optimize()
 
     asset.site.optimizer.cfg.dict()
+
+
+def test_sparse_builder() -> None:
+    """Test the sparse builder gives the same results as the pulp builder."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        24, n_chargers=2, charge_length=6, n_charge_events=8, seed=42
+    )
+    results = {}
+    for builder in epl.optimizer.builders:
+        site = epl.Site(
+            assets=[
+                epl.Battery(power_mw=2, capacity_mwh=4),
+                epl.EVs(**ds, charger_turndown=0.0),
+                epl.CHP(electric_power_max_mw=50, electric_efficiency_pct=0.4),
+            ],
+            electricity_prices=ds["electricity_prices"],
+            optimizer_config=epl.OptimizerConfig(builder=builder),
+        )
+        simulation = site.optimize(verbose=False)
+        assert simulation.feasible
+        results[builder] = simulation.results
+
+    #  dispatch can differ between alternative optima - the cost cannot
+    sparse = epl.get_accounts(results["sparse"], verbose=False)
+    pulp = epl.get_accounts(results["pulp"], verbose=False)
+    np.testing.assert_allclose(sparse.cost, pulp.cost, rtol=1e-6, atol=1e-2)
+
+
+def test_highs_solver() -> None:
+    """Test the in-process HiGHS backend against CBC."""
+    pytest.importorskip("highspy")
+    electricity_prices = np.random.normal(100, 1000, 48)
+    costs = []
+    for solver in epl.optimizer.solvers:
+        asset = epl.Battery(
+            electricity_prices=electricity_prices,
+            optimizer_config=epl.OptimizerConfig(solver=solver, relative_tolerance=0.0),
+        )
+        simulation = asset.optimize(verbose=False)
+        assert asset.site.optimizer.status() == "Optimal"
+        costs.append(epl.get_accounts(simulation.results, verbose=False).cost)
+    np.testing.assert_allclose(costs[0], costs[1], rtol=1e-6, atol=1e-2)
+
+    optimizer = epl.Optimizer(epl.OptimizerConfig(solver="highs"))
+    x = optimizer.continuous("x", low=0, up=5)
+    optimizer.constrain(x >= 10)
+    optimizer.objective(x)
+    status = optimizer.solve(allow_infeasible=True)
+    assert not status.feasible
+    assert status.status == "Infeasible"
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_variable_and_constraint_factories(builder: str) -> None:
+    """Test creating variables and constraints in blocks."""
+    optimizer = epl.Optimizer(epl.OptimizerConfig(builder=builder))
+
+    x = optimizer.continuous_array("x", (2, 3), up=np.array([1.0, 2.0, np.inf]))
+    assert x.shape == (2, 3)
+    assert x[1, 2].name == "x_1_2"
+    assert x[0, 1].upBound == 2.0
+    assert x[0, 2].upBound is None
+
+    b = optimizer.binary_array("b", 2, index=[5, 7], mask=[True, False])
+    assert b[0].name == "b_5"
+    assert b[0].cat == "Integer"
+    assert b[1] == 0
+
+    #  x[i, 0] + x[i, 1] >= 1.5 + b[i] - b[1] is a number, so moves to the rhs
+    rows = optimizer.constrain_many(
+        [1, 1, -1], np.column_stack([x[:, 0], x[:, 1], b]), GE, 1.5
+    )
+    assert len(rows) == 2
+
+    #  a repeated variable is summed into one coefficient - 2 * y >= 3
+    y = optimizer.continuous("y", low=0, up=5)
+    optimizer.constrain_many([1, 1, -1, 1], [[y, y, x[0, 2], x[0, 2]]], GE, rhs=3)
+    optimizer.objective(optimizer.sum(x.ravel().tolist()) + b[0] + y)
+    status = optimizer.solve(verbose=False)
+    assert status.feasible
+    np.testing.assert_allclose(optimizer.value(x[0, 0]) + optimizer.value(x[0, 1]), 1.5)
+    np.testing.assert_allclose(optimizer.value(x[1, 0]) + optimizer.value(x[1, 1]), 1.5)
+    np.testing.assert_allclose(optimizer.value(y), 1.5)
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_scaling(builder: str) -> None:
+    """Test scaling the rows and objective doesn't change the results."""
+    prices = np.random.default_rng(0).normal(100, 1000, 48)
+    results = {}
+    for scaling in [True, False]:
+        site = epl.Site(
+            assets=[
+                epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+                epl.CHP(electric_power_max_mw=5, electric_efficiency_pct=0.4),
+            ],
+            electricity_prices=prices,
+            optimizer_config=epl.OptimizerConfig(builder=builder, scaling=scaling),
+        )
+        simulation = site.optimize(verbose=False)
+        assert simulation.feasible
+        results[scaling] = epl.get_accounts(simulation.results, verbose=False).cost
+
+        ranges = site.optimizer.coefficient_ranges()
+        summary = ranges.summary()
+        assert set(summary["part"]) == {"matrix", "objective", "rhs", "bounds"}
+        assert (summary["smallest"] <= summary["largest"]).all()
+        assert ranges.objective[1] > 0
+
+    np.testing.assert_allclose(results[True], results[False], rtol=1e-6, atol=1e-2)
+
+
+def test_scale_model() -> None:
+    """Test rows and the objective are scaled by powers of two."""
+    model = SparseModel()
+    variables = [epl.LpVariable(f"x{i}", 0, 10) for i in range(2)]
+    for variable in variables:
+        model.add_variable(variable)
+    model.add_rows(
+        np.array([0, 0, 1]),
+        np.array([0, 1, 1]),
+        np.array([2**10, 2**12, 2**-10]),
+        np.array([GE, GE, GE]),
+        np.array([2**13, 2**-10]),
+    )
+    model.set_cost(np.array([2**20, 2**22]))
+
+    scaled = epl.scaling.scale_model(model)
+    assert scaled.variables is model.variables
+    np.testing.assert_allclose(np.frombuffer(scaled.vals), [0.5, 2.0, 1.0])
+    np.testing.assert_allclose(np.frombuffer(scaled.rhs), [4.0, 1.0])
+    np.testing.assert_allclose(scaled.cost_vector(), [0.5, 2.0])
+
+    #  the original model is left unscaled
+    np.testing.assert_allclose(np.frombuffer(model.vals), [2**10, 2**12, 2**-10])
+    ranges = epl.scaling.coefficient_ranges(model)
+    assert ranges.matrix == (2**-10, 2**12)
+    assert ranges.bounds == (10.0, 10.0)
+
+
+def test_scale_problem() -> None:
+    """Test solving a scaled problem leaves the rows of the problem unscaled."""
+    optimizer = epl.Optimizer(epl.OptimizerConfig(builder="pulp"))
+    x = optimizer.continuous("x", low=0, up=2**12)
+    optimizer.constrain(2**10 * x >= 2**13)
+    optimizer.objective(2**20 * x)
+    status = optimizer.solve(verbose=False)
+    assert status.feasible
+    np.testing.assert_allclose(optimizer.value(x), 8.0)
+
+    (constraint,) = optimizer.prob.constraints.values()
+    assert constraint[x] == 2**10
+    assert constraint.constant == -(2**13)
+    assert optimizer.prob.objective[x] == 2**20
+
+
+def test_verbose_solver_log(capsys: pytest.CaptureFixture) -> None:
+    """Test the CBC log is printed with a verbose optimizer config."""
+    asset = epl.Battery(
+        electricity_prices=np.random.normal(100, 1000, 24),
+        optimizer_config=epl.OptimizerConfig(builder="pulp", verbose=True),
+    )
+    asset.optimize(verbose=False)
+    assert "CBC MILP Solver" in capsys.readouterr().out
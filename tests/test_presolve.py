@@ -0,0 +1,94 @@
+"""Tests the presolve of sparse linear programs."""
+import numpy as np
+import pulp
+
+import energypylinear as epl
+from energypylinear.presolve import presolve
+from energypylinear.sparse import EQ, GE, LE, SparseModel
+
+
+def test_presolve_model() -> None:
+    """Test singleton rows, fixed columns, substitutions and duplicate rows."""
+    model = SparseModel()
+    x, y, z = (model.column(pulp.LpVariable(n, 0, 10)) for n in "xyz")
+    b = model.column(pulp.LpVariable("b", 0, 1, pulp.LpInteger))
+    model.add_rows(
+        np.array([0, 1, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5]),
+        np.array([b, x, y, x, x, z, b, x, z, b, x, z]),
+        np.array([1.0, 2.0, 1.0, -0.5, 1.0, 1.0, 1.0, -2.0, -2.0, -2.0, 1.0, 1.0]),
+        np.array([LE, LE, EQ, GE, LE, GE]),
+        np.array([0.5, 8.0, 0.0, 6.0, -8.0, 1.0]),
+    )
+    model.set_cost(np.array([-1.0, 2.0, 1.0, 5.0]))
+    presolved = presolve(model)
+    report = presolved.report
+
+    #  b <= 0.5 fixes the binary at 0, and 2x <= 8 becomes a bound on x
+    assert report.singleton_rows == 2
+    assert report.fixed_cols == 1
+    #  y = 0.5x is substituted out, and the x + z rows are duplicates - the
+    #  tightest, x + z >= 6, is kept
+    assert report.substituted_cols == 1
+    assert report.duplicate_rows == 2
+    assert report.rows == (6, 1)
+    assert report.cols == (4, 2)
+
+    assert [v.name for v in presolved.model.variables] == ["x", "z"]
+    assert presolved.model.variables[0].upBound == 4.0
+    np.testing.assert_allclose(np.frombuffer(presolved.model.rhs), [6.0])
+    np.testing.assert_allclose(presolved.model.cost_vector(), [0.0, 1.0])
+
+    #  the original model is unchanged, and values map back onto all columns
+    assert model.n_rows == 6
+    np.testing.assert_allclose(presolved.postsolve(np.array([4.0, 2.0])), [4, 2, 2, 0])
+    np.testing.assert_allclose(presolved.reduce(np.array([4, 2, 2, 0])), [4, 2])
+
+
+def test_presolve_site() -> None:
+    """Test a presolved site gives the same results as the full linear program."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        24, n_chargers=2, charge_length=6, n_charge_events=8, seed=42
+    )
+    costs = {}
+    for model_presolve in [False, True]:
+        site = epl.Site(
+            assets=[
+                epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+                epl.EVs(**ds, charger_turndown=0.1),
+                epl.CHP(
+                    electric_power_max_mw=50,
+                    electric_efficiency_pct=0.4,
+                    high_temperature_efficiency_pct=0.4,
+                ),
+                epl.HeatPump(electric_power_mw=1, cop=3),
+                epl.Boiler(),
+                epl.Valve(),
+                epl.Spill(),
+            ],
+            electricity_prices=ds["electricity_prices"],
+            high_temperature_load_mwh=2,
+            low_temperature_load_mwh=1,
+            optimizer_config=epl.OptimizerConfig(model_presolve=model_presolve),
+        )
+        simulation = site.optimize(verbose=False, flags=epl.Flags(force_full_milp=True))
+        assert simulation.feasible
+        costs[model_presolve] = epl.get_accounts(simulation.results, verbose=False).cost
+
+    report = site.optimizer.presolve_report
+    assert report is not None
+    assert report.rows[1] < report.rows[0]
+    assert report.cols[1] < report.cols[0]
+    np.testing.assert_allclose(costs[True], costs[False], rtol=1e-6, atol=1e-2)
+
+    #  a compiled site is presolved again after its interval data is updated
+    compiled = site.compile()
+    first = compiled.optimize(verbose=False)
+    prices = site.cfg.interval_data.electricity_prices
+    assert isinstance(prices, np.ndarray)
+    compiled.update(electricity_prices=prices * 2)
+    second = compiled.optimize(verbose=False)
+    assert first.feasible and second.feasible
+    assert (
+        epl.get_accounts(second.results, verbose=False).cost
+        != epl.get_accounts(first.results, verbose=False).cost
+    )
@@ -0,0 +1,94 @@
+"""Tests the rolling horizon simulation."""
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+def test_rolling_horizon_config() -> None:
+    """Test the window, commit and overlap are consistent."""
+    cfg = epl.RollingHorizonConfig(window=24, commit=12)
+    assert cfg.overlap == 12
+    cfg = epl.RollingHorizonConfig(window=24, overlap=6)
+    assert cfg.commit == 18
+    cfg = epl.RollingHorizonConfig(window=24)
+    assert cfg.commit == 24
+    with pytest.raises(AssertionError):
+        epl.RollingHorizonConfig(window=24, commit=12, overlap=6)
+
+
+def test_rolling_battery() -> None:
+    """Test battery state of charge is carried between windows."""
+    idx_len = 72
+    initial_charge_mwh = 1.0
+    final_charge_mwh = 3.0
+    site = epl.Site(
+        assets=[
+            epl.Battery(
+                power_mw=2,
+                capacity_mwh=4,
+                initial_charge_mwh=initial_charge_mwh,
+                final_charge_mwh=final_charge_mwh,
+            ),
+            epl.Boiler(),
+        ],
+        electricity_prices=np.random.normal(100, 80, idx_len),
+        high_temperature_load_mwh=5,
+    )
+    simulation = site.optimize_rolling(window=24, commit=12)
+    results = simulation.results
+    assert simulation.feasible
+    assert len(results) == idx_len
+
+    initial = results["battery-electric_initial_charge_mwh"].values
+    final = results["battery-electric_final_charge_mwh"].values
+    np.testing.assert_allclose(initial[1:], final[:-1], atol=1e-5)
+    np.testing.assert_allclose(initial[0], initial_charge_mwh)
+    np.testing.assert_allclose(final[-1], final_charge_mwh)
+
+    #  the rolling horizon can't do better than the whole horizon
+    full = site.optimize(verbose=False)
+    assert (
+        epl.get_accounts(full.results, verbose=False).cost
+        <= epl.get_accounts(results, verbose=False).cost + 1e-4
+    )
+
+
+def test_rolling_free_initial_charge() -> None:
+    """Test a free initial charge is chosen by the first window and returned to."""
+    idx_len = 48
+    site = epl.Site(
+        assets=[epl.Battery(power_mw=2, capacity_mwh=4, initial_charge_mwh=None)],
+        electricity_prices=np.random.normal(100, 80, idx_len),
+    )
+    assert not epl.rolling.can_reuse_structure(site.assets)
+    simulation = site.optimize_rolling(window=12, commit=6)
+    results = simulation.results
+    assert simulation.feasible
+    assert len(results) == idx_len
+
+    initial = results["battery-electric_initial_charge_mwh"].values
+    final = results["battery-electric_final_charge_mwh"].values
+    np.testing.assert_allclose(initial[1:], final[:-1], atol=1e-5)
+    np.testing.assert_allclose(final[-1], initial[0], atol=1e-5)
+
+
+def test_rolling_evs() -> None:
+    """Test charge events that span windows are charged by the end of the simulation."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        48, n_chargers=3, charge_length=8, n_charge_events=12, seed=42
+    )
+    evs = epl.EVs(**ds, charger_turndown=0.0)
+    simulation = evs.site.optimize_rolling(window=16, overlap=8)
+    assert simulation.feasible
+    assert len(simulation.results) == 48
+
+    cols = [
+        f"evs-charge-event-{idx}-final_soc_mwh"
+        for idx in range(len(ds["charge_events_capacity_mwh"]))
+    ]
+    np.testing.assert_allclose(
+        simulation.results[cols].iloc[-1].values,
+        ds["charge_events_capacity_mwh"],
+        atol=1e-4,
+    )
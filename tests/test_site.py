@@ -1,5 +1,6 @@
 """Test the site API."""
 import random
+import typing
 
 import numpy as np
 import pydantic_core
@@ -51,6 +52,52 @@ def test_site() -> None:
         [0.0, 0, 4.6, 0.2222, 0.0],
         decimal=defaults.decimal_tolerance,
     )
+    #  the gas engine breaks even in the last interval, so the export there is
+    #  a tie between alternative optima - the cost is not
+    np.testing.assert_array_almost_equal(
+        simulation.results["site-export_power_mwh"][:-1],
+        [96.75, 102.8, 0.0, 0.0],
+        decimal=defaults.decimal_tolerance,
+    )
+    np.testing.assert_allclose(
+        epl.get_accounts(simulation.results, verbose=False).cost, -101041.4443
+    )
+
+
+def test_site_full_milp() -> None:
+    """Tests the dispatch of the full, unscaled mixed-integer program."""
+    site = epl.Site(
+        assets=[
+            epl.Battery(
+                power_mw=2, capacity_mwh=4, efficiency_pct=0.9, name="small-battery"
+            ),
+            epl.Battery(
+                power_mw=8, capacity_mwh=1, efficiency_pct=0.8, name="big-battery"
+            ),
+            epl.CHP(
+                electric_power_max_mw=50,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.CHP(
+                electric_power_max_mw=50,
+                electric_efficiency_pct=0.4,
+                high_temperature_efficiency_pct=0.4,
+                name="gas-engine-chp",
+            ),
+            epl.Boiler(high_temperature_generation_max_mw=100),
+            epl.Spill(),
+            epl.Valve(),
+        ],
+        electricity_prices=[100, 1000, -20, 40, 50],
+        optimizer_config=epl.OptimizerConfig(scaling=False),
+    )
+    simulation = site.optimize(verbose=False, flags=epl.Flags(force_full_milp=True))
+    np.testing.assert_array_almost_equal(
+        simulation.results["site-import_power_mwh"],
+        [0.0, 0, 4.6, 0.2222, 0.0],
+        decimal=defaults.decimal_tolerance,
+    )
     np.testing.assert_array_almost_equal(
         simulation.results["site-export_power_mwh"],
         [96.75, 102.8, 0.0, 0.0, 53.0],
@@ -230,3 +277,134 @@ def test_site_interval_data_export_prices() -> None:
         id = SiteIntervalData(
             electricity_prices=[10, 20, 30], export_electricity_prices=[30, 20, 30, 40]
         )
+
+
+class PerIntervalValve(epl.Asset):
+    """Valve without a whole horizon hook - used to test the per-interval fallback."""
+
+    def __init__(self) -> None:
+        """Initialize the asset."""
+        self.cfg = epl.assets.valve.ValveConfig(name="per-interval-valve")
+        self.constrained_intervals: list[int] = []
+
+    def __repr__(self) -> str:
+        """A string representation of self."""
+        return "<PerIntervalValve>"
+
+    def one_interval(
+        self, optimizer: epl.Optimizer, i: int, freq: epl.Freq, flags: epl.Flags
+    ) -> epl.assets.valve.ValveOneInterval:
+        """Create asset data for a single interval."""
+        return epl.assets.valve.ValveOneInterval(
+            cfg=self.cfg,
+            high_temperature_load_mwh=optimizer.continuous(
+                f"{self.cfg.name}-high_temperature_load_mwh-{i}", low=0
+            ),
+            low_temperature_generation_mwh=optimizer.continuous(
+                f"{self.cfg.name}-low_temperature_generation_mwh-{i}", low=0
+            ),
+        )
+
+    def constrain_within_interval(
+        self,
+        optimizer: epl.Optimizer,
+        ivars: epl.IntervalVars,
+        i: int,
+        freq: epl.Freq,
+        flags: epl.Flags,
+    ) -> None:
+        """Constrain thermal balance across the valve."""
+        self.constrained_intervals.append(i)
+        valve = ivars.filter_objective_variables(
+            epl.assets.valve.ValveOneInterval, i=-1, asset_name=self.cfg.name
+        )[0][0]
+        optimizer.constrain(
+            valve.high_temperature_load_mwh == valve.low_temperature_generation_mwh
+        )
+
+    def constrain_after_intervals(
+        self, optimizer: epl.Optimizer, ivars: epl.IntervalVars
+    ) -> None:
+        """Constrain the asset after all intervals."""
+        return
+
+
+def test_site_per_interval_fallback() -> None:
+    """Test assets without `constrain_all_intervals` are constrained per interval."""
+    valve = PerIntervalValve()
+    site = epl.Site(
+        assets=[
+            valve,
+            epl.CHP(
+                electric_power_max_mw=50,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.Boiler(),
+            epl.Spill(),
+        ],
+        electricity_prices=[100, 1000, -20],
+        low_temperature_load_mwh=[20, 20, 20],
+    )
+    assert not hasattr(valve, "constrain_all_intervals")
+    simulation = site.optimize(verbose=False)
+    assert valve.constrained_intervals == [0, 1, 2]
+    np.testing.assert_array_almost_equal(
+        simulation.results["per-interval-valve-low_temperature_generation_mwh"],
+        simulation.results["per-interval-valve-high_temperature_load_mwh"],
+    )
+
+
+def test_site_compile() -> None:
+    """Test a compiled site re-solves to the same results as rebuilding the site."""
+
+    def get_assets() -> list:
+        """Create a fresh battery, CHP, boiler and valve for each site."""
+        return [
+            epl.Battery(power_mw=2, capacity_mwh=4),
+            epl.CHP(
+                electric_power_max_mw=50,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.Boiler(),
+            epl.Valve(),
+        ]
+
+    idx_len = 24
+    opt_cfg = epl.OptimizerConfig(relative_tolerance=0.0)
+    site = epl.Site(
+        assets=get_assets(),
+        electricity_prices=np.random.normal(100, 50, idx_len),
+        gas_prices=20,
+        optimizer_config=opt_cfg,
+    )
+    compiled = site.compile()
+    compiled.optimize(verbose=False)
+
+    for _ in range(2):
+        interval_data: dict[str, typing.Any] = {
+            "electricity_prices": np.random.normal(100, 50, idx_len),
+            "electric_load_mwh": np.random.uniform(0, 20, idx_len),
+            "high_temperature_load_mwh": np.random.uniform(0, 30, idx_len),
+            "low_temperature_load_mwh": np.random.uniform(0, 5, idx_len),
+        }
+        compiled.update(**interval_data)
+        simulation = compiled.optimize(verbose=False)
+
+        fresh = epl.Site(
+            assets=get_assets(),
+            gas_prices=20,
+            optimizer_config=opt_cfg,
+            **interval_data,
+        ).optimize(verbose=False)
+
+        np.testing.assert_array_equal(
+            simulation.results["site-electricity_prices"],
+            interval_data["electricity_prices"],
+        )
+        np.testing.assert_allclose(
+            epl.get_accounts(simulation.results, verbose=False).cost,
+            epl.get_accounts(fresh.results, verbose=False).cost,
+            rtol=1e-6,
+        )
@@ -0,0 +1,153 @@
+"""Tests the phase timings, linear program size and solver statistics of an optimization."""
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_timings_and_model_stats(builder: str) -> None:
+    """Test each phase of an optimization is timed, and the model size recorded."""
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_power_min_mw=1,
+                electric_efficiency_pct=0.4,
+            ),
+            epl.Spill(),
+        ],
+        electricity_prices=np.random.default_rng(0).normal(50, 30, 24),
+        optimizer_config=epl.OptimizerConfig(builder=builder),
+    )
+    simulation = site.optimize(verbose=False)
+
+    timings = simulation.timings
+    assert timings is not None
+    expected = {
+        "validation",
+        "tightening",
+        "variables",
+        "constraints",
+        "objective",
+        "solve",
+        "extraction",
+        "schema",
+        "checks",
+    }
+    assert expected <= set(timings.phases)
+    if builder == "sparse":
+        assert "solver_io" in timings.phases
+    summary = timings.summary()
+    assert list(summary.columns) == ["phase", "wall_s", "cpu_s", "calls"]
+    assert (summary["wall_s"] >= 0).all()
+    assert timings.phases["variables"].calls == 25
+    assert timings.wall_s == pytest.approx(summary["wall_s"].sum())
+
+    stats = simulation.model_stats
+    assert stats is not None
+    assert stats.variables == len(site.optimizer.variables())
+    assert stats.constraints == site.optimizer.n_constraints()
+    #  the CHP has a minimum power, so keeps its binary variables
+    assert stats.binaries == 24
+    assert stats.nonzeros > stats.constraints
+
+    #  results of a compiled site don't change as it is solved again
+    compiled = site.compile()
+    first = compiled.optimize(verbose=False)
+    compiled.optimize(verbose=False)
+    assert first.timings is not None
+    assert first.timings.phases["solve"].calls == 1
+
+
+stopped_log = """
+Cbc0020I Exiting on maximum time
+Cbc0005I Partial search - best objective -429.74592 (best possible -464.06863), took 25 iterations and 3 nodes (1.97 seconds)
+Result - Stopped on time limit
+
+Objective value:                -429.74592241
+Lower bound:                    -464.069
+Gap:                            0.07
+Enumerated nodes:               3
+Total iterations:               25
+Time (CPU seconds):             0.98
+Time (Wallclock seconds):       2.17
+"""
+
+
+def test_parse_cbc_log() -> None:
+    """Test the solver statistics are read from CBC logs."""
+    stats = epl.solvers.parse_cbc_log(stopped_log)
+    assert stats.objective == -429.74592241
+    assert stats.bound == -464.06863
+    assert stats.gap == pytest.approx((464.06863 - 429.74592241) / 429.74592241)
+    assert stats.nodes == 3
+    assert stats.iterations == 25
+    assert stats.solve_time == 2.17
+
+    #  a completed search has no separate bound
+    completed = stopped_log.replace("Stopped on time limit", "Optimal solution found")
+    completed = completed.replace("(best possible -464.06863)", "")
+    completed = completed.replace("Lower bound:                    -464.069\n", "")
+    stats = epl.solvers.parse_cbc_log(completed)
+    assert stats.bound == stats.objective
+    assert stats.gap == 0.0
+
+    #  a linear program solved without branch and bound
+    stats = epl.solvers.parse_cbc_log("Optimal objective 5 - 1 iterations time 0.002\n")
+    assert (stats.objective, stats.bound, stats.iterations) == (5.0, 5.0, 1)
+    assert stats.nodes is None
+    assert stats.mip_start is None
+
+    #  a MIP start is accepted with its objective, or rejected
+    started = "Cbc0045I MIPStart provided solution with cost -400.5\n" + stopped_log
+    stats = epl.solvers.parse_cbc_log(started)
+    assert stats.mip_start
+    assert stats.mip_start_objective == -400.5
+    rejected = (
+        "Cbc0045I Warning: mipstart values could not be used to build a solution.\n"
+    )
+    assert epl.solvers.parse_cbc_log(rejected + stopped_log).mip_start is False
+
+    stats = epl.solvers.parse_cbc_log("Result - Linear relaxation infeasible\n")
+    assert stats.objective is None
+    assert stats.gap is None
+
+    #  the bound moves by the distance from the objective, in objective units
+    rescaled = epl.solvers.parse_cbc_log(stopped_log).rescale(100.0, scale=0.5)
+    assert rescaled.objective == 100.0
+    assert rescaled.bound == pytest.approx(100.0 - 2 * (464.06863 - 429.74592241))
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_solver_stats(builder: str) -> None:
+    """Test the solver statistics are in the units of the objective function."""
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_power_min_mw=1,
+                electric_efficiency_pct=0.4,
+            ),
+        ],
+        electricity_prices=np.random.default_rng(0).normal(50, 30, 24),
+        optimizer_config=epl.OptimizerConfig(builder=builder),
+    )
+    simulation = site.optimize(verbose=False)
+
+    stats = simulation.solver_stats
+    assert stats is not None
+    accounts = epl.get_accounts(simulation.results, verbose=False)
+    assert stats.objective == pytest.approx(-accounts.profit)
+    assert stats.bound is not None and stats.objective is not None
+    assert stats.bound <= stats.objective + 1e-6
+    assert stats.gap is not None
+    assert 0 <= stats.gap <= site.optimizer.cfg.relative_tolerance
+    assert stats.nodes is not None
+    assert stats.iterations is not None
+    assert stats.solve_time is not None
+
+    status = site.optimizer.solve(verbose=False)
+    assert status.stats.objective == pytest.approx(stats.objective)
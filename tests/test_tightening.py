@@ -0,0 +1,182 @@
+"""Tests the tightening of big-M constraints."""
+import typing
+
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+def test_tighten_site_import_export() -> None:
+    """Test the site import and export bounds are capped by the assets and load."""
+    rng = np.random.default_rng(0)
+    site = epl.Site(
+        assets=[
+            epl.Battery(power_mw=2, capacity_mwh=4, name="battery"),
+            epl.RenewableGenerator(electric_generation_mwh=np.full(12, 3.0)),
+        ],
+        electricity_prices=rng.normal(50, 60, 12),
+        electric_load_mwh=rng.uniform(1, 5, 12),
+    )
+    simulation = site.optimize(verbose=False)
+    report = simulation.tightening
+    assert report is not None
+
+    freq = epl.Freq(site.cfg.freq_mins)
+    load = site.cfg.interval_data.electric_load_mwh
+    assert isinstance(load, np.ndarray)
+    import_bound = report.bounds["site-import_power_mwh"]
+    export_bound = report.bounds["site-export_power_mwh"]
+    np.testing.assert_allclose(import_bound.original, freq.mw_to_mwh(10000))
+    np.testing.assert_allclose(
+        import_bound.tightened, load + freq.mw_to_mwh(2), rtol=1e-5
+    )
+    np.testing.assert_allclose(
+        export_bound.tightened,
+        np.maximum(3.0 + freq.mw_to_mwh(2) - load, 0),
+        rtol=1e-5,
+    )
+    assert import_bound.tightening_pct > 0.99
+    assert set(report.summary()["name"]) == set(report.bounds)
+
+    results = simulation.results
+    assert (results["site-import_power_mwh"] <= import_bound.tightened + 1e-6).all()
+    assert (results["site-export_power_mwh"] <= export_bound.tightened + 1e-6).all()
+
+
+def test_tighten_keeps_optimum(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test tightening doesn't change the optimal cost."""
+
+    def get_assets() -> list:
+        """Create assets with every kind of big-M constraint."""
+        return [
+            epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+            epl.CHP(
+                electric_power_max_mw=5,
+                electric_power_min_mw=1,
+                electric_efficiency_pct=0.3,
+                high_temperature_efficiency_pct=0.5,
+            ),
+            epl.Boiler(),
+            epl.Valve(),
+            epl.EVs(
+                chargers_power_mw=[2, 2],
+                charge_event_records=[(0, 4, 3, 0.9), (2, 8, 1, 0.9), (5, 12, 4, 0.9)],
+                charger_turndown=0.1,
+            ),
+        ]
+
+    rng = np.random.default_rng(0)
+    prices = rng.normal(50, 60, 12)
+    load = rng.uniform(1, 5, 12)
+    flags = epl.Flags(include_charge_discharge_binary_variables=True)
+    tightened = epl.Site(
+        assets=get_assets(), electricity_prices=prices, electric_load_mwh=load
+    ).optimize(verbose=False, flags=flags)
+
+    #  the original big-M - site limits, battery capacity and charger power
+    tighten_site = epl.tightening.site_big_m_mwh
+
+    def site_big_m_mwh(
+        site: epl.Site, *args: typing.Any, **kwargs: typing.Any
+    ) -> tuple:
+        """The site limits, without tightening."""
+        return tighten_site(site, flags, fixed_interval_data=False)
+
+    def charge_event_big_m_mwh(cfg: typing.Any, flags: epl.Flags) -> tuple:
+        """No charge event limit, leaving the charger power."""
+        return tuple(np.full(len(cfg.charge_event_cfgs), np.inf) for _ in range(3))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(epl.tightening, "site_big_m_mwh", site_big_m_mwh)
+        patch.setattr(
+            epl.assets.battery,
+            "charge_discharge_big_m_mwh",
+            lambda cfg: (cfg.capacity_mwh, cfg.capacity_mwh),
+        )
+        patch.setattr(epl.assets.evs, "charge_event_big_m_mwh", charge_event_big_m_mwh)
+        loose = epl.Site(
+            assets=get_assets(), electricity_prices=prices, electric_load_mwh=load
+        ).optimize(verbose=False, flags=flags)
+
+    assert loose.tightening is not None
+    assert loose.tightening.bounds["site-import_power_mwh"].tightening_pct == 0
+    assert tightened.tightening is not None
+    assert tightened.tightening.bounds["site-import_power_mwh"].tightening_pct > 0.99
+    np.testing.assert_allclose(
+        epl.get_accounts(tightened.results).cost,
+        epl.get_accounts(loose.results).cost,
+        rtol=1e-4,
+    )
+
+
+def test_tighten_battery_and_evs() -> None:
+    """Test the battery and EV big-M are capped by power and charge event energy."""
+    evs = epl.EVs(
+        chargers_power_mw=[10, 1],
+        charge_event_records=[(0, 4, 2, 0.5), (0, 4, 10, 1.0)],
+    )
+    battery = epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.5)
+    rng = np.random.default_rng(0)
+    site = epl.Site(
+        assets=[battery, evs],
+        electricity_prices=rng.normal(50, 60, 4),
+        electric_load_mwh=rng.uniform(1, 5, 4),
+    )
+    report = epl.tightening.tighten(
+        site, epl.Flags(include_charge_discharge_binary_variables=True)
+    )
+
+    charge = report.bounds["battery-electric_charge_mwh"]
+    discharge = report.bounds["battery-electric_discharge_mwh"]
+    assert charge.original[0] == 4.0
+    np.testing.assert_allclose(charge.tightened, 2.0, rtol=1e-5)
+    np.testing.assert_allclose(discharge.tightened, 2.0, rtol=1e-5)
+
+    #  charge events can take 2 / 0.5 and 10 MWh, chargers 10 and 1 MWh
+    chargers = report.bounds["evs-charger-electric_charge_mwh"]
+    np.testing.assert_allclose(chargers.original, [[10, 1], [10, 1]])
+    np.testing.assert_allclose(chargers.tightened, [[4, 1], [10, 1]], rtol=1e-5)
+    spill = report.bounds["evs-spill-charger-electric_charge_mwh"]
+    np.testing.assert_allclose(spill.tightened[:, 0], [2, 10], rtol=1e-5)
+
+    #  compiled sites update their loads, so the site bounds stay at the limits
+    compiled = site.compile()
+    assert site.tightening.bounds["site-import_power_mwh"].tightening_pct == 0
+    assert compiled.optimize(verbose=False).feasible
+
+
+def test_tighten_spill() -> None:
+    """Test the site big-M is only left untightened where spill is allowed."""
+    load = np.full(4, 2.0)
+    site = epl.Site(
+        assets=[epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill(intervals=[1, 2])],
+        electricity_prices=np.full(4, 50.0),
+        electric_load_mwh=load,
+    )
+    report = epl.tightening.tighten(
+        site, epl.Flags(include_charge_discharge_binary_variables=True)
+    )
+    freq = epl.Freq(site.cfg.freq_mins)
+    import_bound = report.bounds["site-import_power_mwh"]
+    np.testing.assert_allclose(import_bound.tightened[[1, 2]], freq.mw_to_mwh(10000))
+    np.testing.assert_allclose(
+        import_bound.tightened[[0, 3]], load[[0, 3]] + freq.mw_to_mwh(2), rtol=1e-5
+    )
+    assert report.untightened["site-import_power_mwh"] == (
+        "spill is allowed in 2 of 4 intervals"
+    )
+    summary = report.summary().set_index("name")
+    assert summary.loc["site-export_power_mwh", "untightened"] is not None
+    assert summary.loc["battery-electric_charge_mwh", "untightened"] is None
+
+    site = epl.Site(
+        assets=[epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()],
+        electricity_prices=np.full(4, 50.0),
+        electric_load_mwh=load,
+    )
+    report = epl.tightening.tighten(site)
+    assert report.bounds["site-import_power_mwh"].tightening_pct == 0
+    assert report.untightened["site-export_power_mwh"] == (
+        "spill is allowed in 4 of 4 intervals"
+    )
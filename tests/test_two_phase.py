@@ -0,0 +1,89 @@
+"""Tests two phase spill - only adding spill variables when they are needed."""
+import pathlib
+
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+def test_two_phase_without_spill() -> None:
+    """Test a feasible site is optimized without spill variables."""
+    flags = epl.Flags(two_phase_spill=True)
+    prices = np.random.default_rng(0).normal(50, 20, 12)
+    assets = [epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()]
+    site = epl.Site(assets=assets, electricity_prices=prices)
+    simulation = site.optimize(verbose=False, flags=flags)
+    assert simulation.spill_phase is not None
+    assert simulation.spill_phase.phase == "without_spill"
+    assert simulation.spill_phase.solves == 1
+    assert not any("spill" in v.name for v in site.optimizer.variables())
+
+    full = epl.Site(assets=assets, electricity_prices=prices).optimize(verbose=False)
+    assert full.spill_phase is None
+    assert list(simulation.results.columns) == list(full.results.columns)
+    np.testing.assert_allclose(
+        epl.get_accounts(simulation.results, verbose=False).cost,
+        epl.get_accounts(full.results, verbose=False).cost,
+    )
+
+
+def test_two_phase_limited_spill(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test spill is only allowed in the intervals that are infeasible without it."""
+    flags = epl.Flags(two_phase_spill=True)
+    load = np.zeros(12)
+    load[[3, 7]] = 5.0
+    site = epl.Site(
+        assets=[epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()],
+        electricity_prices=np.random.default_rng(0).normal(50, 20, 12),
+        high_temperature_load_mwh=load,
+    )
+    simulation = site.optimize(verbose=False, flags=flags)
+    assert simulation.spill_phase is not None
+    assert simulation.spill_phase.phase == "limited_spill"
+    assert simulation.spill_phase.spill_intervals == [3, 7]
+    assert simulation.spill
+    np.testing.assert_allclose(
+        simulation.results["spill-high_temperature_generation_mwh"], load
+    )
+
+    #  EV charge the chargers can't deliver goes to the spill charger
+    evs = epl.EVs(
+        chargers_power_mw=[1],
+        charge_event_records=[(2, 5, 6, 1.0), (6, 9, 1, 1.0)],
+        charger_turndown=0.0,
+    )
+    simulation = epl.Site(
+        assets=[evs, epl.Spill()],
+        electricity_prices=np.full(12, 50.0),
+    ).optimize(verbose=False, flags=flags)
+    assert simulation.spill_phase is not None
+    assert simulation.spill_phase.phase == "limited_spill"
+    np.testing.assert_allclose(simulation.results["total-spills_mwh"].sum(), 3.0)
+
+    #  when the relaxation spills in the wrong intervals, spill is allowed everywhere
+    monkeypatch.setattr(epl.two_phase, "spill_intervals", lambda site, ivars: [0])
+    simulation = site.optimize(verbose=False, flags=flags)
+    assert simulation.spill_phase is not None
+    assert simulation.spill_phase.phase == "full_spill"
+    assert simulation.spill_phase.solves == 4
+    np.testing.assert_allclose(
+        simulation.results["spill-high_temperature_generation_mwh"], load
+    )
+
+
+def test_two_phase_cache(tmp_path: pathlib.Path) -> None:
+    """Test a cache hit keeps the spill phase of a two phase optimization."""
+    cache = epl.ResultsCache(tmp_path)
+    flags = epl.Flags(two_phase_spill=True)
+    prices = np.random.default_rng(0).normal(50, 20, 12)
+    assets = [epl.Battery(power_mw=2, capacity_mwh=4), epl.Spill()]
+    first = epl.Site(assets=assets, electricity_prices=prices).optimize(
+        verbose=False, flags=flags, cache=cache
+    )
+    second = epl.Site(assets=assets, electricity_prices=prices).optimize(
+        verbose=False, flags=flags, cache=cache
+    )
+    assert cache.hits == 1
+    assert second.spill_phase == first.spill_phase
+    assert second.spill_phase is not None
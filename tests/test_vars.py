@@ -1,4 +1,5 @@
 """Interval variable testing."""
+import pytest
 from rich import print
 
 import energypylinear as epl
@@ -52,3 +53,69 @@ def test_var() -> None:
 
     ivars.filter_all_evs_array(True, asset.cfg.name)
     ivars.filter_all_evs_array(False, asset.cfg.name)
+
+
+def test_filter_objective_variables_index() -> None:
+    """Test the typed index returns the same data as scanning every interval."""
+    ds = epl.data_generation.generate_random_ev_input_data(
+        8, n_chargers=2, charge_length=3, n_charge_events=4, seed=42
+    )
+    site = epl.Site(
+        assets=[
+            epl.Battery(name="battery-one"),
+            epl.Battery(name="battery-two"),
+            epl.EVs(**ds),
+            epl.CHP(electric_power_max_mw=10, electric_efficiency_pct=0.3),
+            epl.Spill(),
+        ],
+        electricity_prices=ds["electricity_prices"],
+    )
+    optimizer = epl.Optimizer()
+    freq = epl.Freq(60)
+    ivars = IntervalVars()
+    for i in site.cfg.interval_data.idx:
+        assets = []
+        for asset in site.assets:
+            neu = asset.one_interval(optimizer, i, freq, epl.Flags())
+            if isinstance(asset, epl.EVs):
+                assets.extend(neu[0])
+                assets.extend(neu[2])
+            else:
+                assets.append(neu)
+        ivars.append(assets)
+
+    for instance_type in [
+        epl.assets.battery.BatteryOneInterval,
+        epl.assets.evs.EVOneInterval,
+        epl.assets.chp.CHPOneInterval,
+        epl.assets.spill.SpillOneInterval,
+        epl.assets.boiler.BoilerOneInterval,
+        epl.assets.asset.AssetOneInterval,
+    ]:
+        for asset_name in [None, "battery-one", "battery-two", "evs", "chp"]:
+            for i in [None, 0, 3, -1]:
+                indexed = ivars.filter_objective_variables(
+                    instance_type, i=i, asset_name=asset_name
+                )
+                scanned = ivars._scan_objective_variables(
+                    instance_type, i=i, asset_name=asset_name
+                )
+                assert [[id(a) for a in one] for one in indexed] == [
+                    [id(a) for a in one] for one in scanned
+                ]
+
+
+def test_one_interval_slots() -> None:
+    """Test one interval data is slotted, with defaults for unused quantities."""
+    optimizer = epl.Optimizer()
+    battery = epl.Battery().one_interval(
+        optimizer, i=0, freq=epl.Freq(60), flags=epl.Flags()
+    )
+    assert not hasattr(battery, "__dict__")
+    assert battery.gas_consumption_mwh == 0
+    with pytest.raises(AttributeError):
+        battery.not_a_field = 0  # type: ignore
+
+    spill = epl.Spill().one_interval(optimizer, i=0, freq=epl.Freq(60))
+    assert spill.cfg.name == "spill"
+    assert not hasattr(spill, "__dict__")
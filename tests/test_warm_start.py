@@ -0,0 +1,74 @@
+"""Tests MIP warm starts from a previous or heuristic dispatch."""
+import numpy as np
+import pytest
+
+import energypylinear as epl
+
+
+@pytest.mark.parametrize("builder", epl.optimizer.builders)
+def test_warm_start(builder: str) -> None:
+    """Test a previous result, shifted result and schedule are used as MIP starts."""
+    prices = np.random.default_rng(0).normal(50, 30, 36)
+    assets = [
+        epl.Battery(power_mw=2, capacity_mwh=4, efficiency_pct=0.9),
+        epl.CHP(
+            electric_power_max_mw=5,
+            electric_power_min_mw=1,
+            electric_efficiency_pct=0.4,
+        ),
+    ]
+    config = epl.OptimizerConfig(builder=builder)
+    site = epl.Site(
+        assets=assets, electricity_prices=prices[:24], optimizer_config=config
+    )
+    first = site.optimize(verbose=False)
+    assert first.warm_start is None
+    assert first.solver_stats is not None
+
+    again = site.optimize(verbose=False, warm_start=epl.WarmStart(first))
+    report = again.warm_start
+    assert report is not None
+    assert report.mapped == report.variables
+    assert report.accepted
+    assert report.objective == pytest.approx(first.solver_stats.objective, rel=1e-4)
+    np.testing.assert_allclose(
+        epl.get_accounts(again.results, verbose=False).cost,
+        epl.get_accounts(first.results, verbose=False).cost,
+    )
+
+    #  half of the intervals overlap the previous result
+    shifted = epl.Site(
+        assets=assets, electricity_prices=prices[12:], optimizer_config=config
+    ).optimize(verbose=False, warm_start=epl.WarmStart(first, shift=12))
+    report = shifted.warm_start
+    assert report is not None
+    assert report.mapped == report.variables // 2
+    assert report.accepted is not None
+
+    #  a schedule of results columns has no binary variables
+    scheduled = site.optimize(verbose=False, warm_start=epl.WarmStart(first.results))
+    report = scheduled.warm_start
+    assert report is not None
+    assert 0 < report.mapped < report.variables
+
+
+def test_warm_start_values() -> None:
+    """Test start values are mapped onto `pulp` variable names."""
+    start = epl.WarmStart({"battery-electric_charge_mwh-0": 1.0})
+    assert start.values() == {"battery_electric_charge_mwh_0": 1.0}
+    with pytest.raises(AssertionError):
+        epl.WarmStart({"battery-electric_charge_mwh-0": 1.0}, shift=1).values()
+
+    assert epl.warm_start.shift_label("14", 12) == "2"
+    assert epl.warm_start.shift_label("14-3", 12) == "2-3"
+    assert epl.warm_start.shift_label("4", 12) is None
+
+    with pytest.raises(AssertionError):
+        epl.Site(
+            assets=[epl.Battery(power_mw=2, capacity_mwh=4)],
+            electricity_prices=np.random.normal(100, 10, 24),
+        ).optimize(
+            verbose=False,
+            warm_start=epl.WarmStart({}),
+            flags=epl.Flags(two_phase_spill=True),
+        )